@@ -0,0 +1,48 @@
+"""
+Cost of producing a frontend error page: rendering the template on every
+request against interpolating the body into the pre-rendered page.
+
+Run with `python -m benchmarks.bench_error_pages`.
+"""
+
+import tempfile
+import timeit
+from pathlib import Path
+
+from mrok.frontend.errors import ErrorPage, create_jinja_env
+
+NUMBER = 100_000
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+  <head><title>{{ status }} {{ status_title }}</title></head>
+  <body>
+    <h1>{{ status }} {{ status_title }}</h1>
+    <p>{{ body }}</p>
+  </body>
+</html>
+"""
+
+BODY = "Bad Gateway: invalid target extension."
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as template_dir:
+        Path(template_dir, "502.html").write_text(TEMPLATE)
+        env = create_jinja_env(Path(template_dir))
+        template = env.get_template("502.html")
+        page = ErrorPage(env, "502.html", 502, "text/html")
+
+        def render_template() -> None:
+            template.render(status=502, status_title="Bad Gateway", body=BODY).encode()
+
+        def precompiled_page() -> None:
+            page.render(BODY)
+
+        for bench in (render_template, precompiled_page):
+            elapsed = timeit.timeit(bench, number=NUMBER)
+            print(f"{bench.__name__:>20}: {elapsed / NUMBER * 1e6:.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
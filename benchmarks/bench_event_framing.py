@@ -0,0 +1,63 @@
+"""
+Size and encode/decode time of a captured response event on the events bus:
+a single JSON frame with base64 bodies against the multipart wire format.
+
+Run with `python -m benchmarks.bench_event_framing`.
+"""
+
+import os
+import timeit
+
+from mrok.proxy.models import Event, HTTPHeaders, HTTPRequest, HTTPResponse
+from mrok.proxy.wire import decode_event, encode_event
+
+NUMBER = 2_000
+BODY_SIZES = (1024, 64 * 1024, 1024 * 1024)
+
+
+def response_event(body_size: int) -> Event:
+    return Event(
+        type="response",
+        data=HTTPResponse(
+            request=HTTPRequest(
+                method="POST",
+                url="/api/v1/orders",
+                headers=HTTPHeaders({"content-type": "application/json", "accept": "*/*"}),
+                query_string=b"page=1",
+                start_time=0,
+                body=os.urandom(body_size // 4),
+                body_truncated=False,
+            ),
+            status=200,
+            headers=HTTPHeaders({"content-type": "application/octet-stream"}),
+            duration=0.02,
+            body=os.urandom(body_size),
+            body_truncated=False,
+        ),
+    )
+
+
+def main() -> None:
+    for body_size in BODY_SIZES:
+        event = response_event(body_size)
+        message = event.model_dump_json().encode()
+        frames = encode_event(event)
+        number = NUMBER * 1024 // body_size or 10
+        json_time = timeit.timeit(
+            lambda: Event.model_validate_json(event.model_dump_json().encode()),  # noqa: B023
+            number=number,
+        )
+        wire_time = timeit.timeit(
+            lambda: decode_event(encode_event(event)),  # noqa: B023
+            number=number,
+        )
+        print(
+            f"{body_size // 1024:>5} KiB body: "
+            f"json {len(message):>8} B {json_time / number * 1e6:>8.1f} us, "
+            f"multipart {sum(len(frame) for frame in frames):>8} B "
+            f"{wire_time / number * 1e6:>8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Per-request overhead of MetricsMiddleware on a request with a chunked body and a
+chunked response, compared with the bare application and with counters updated
+under an asyncio.Lock from awaited hooks.
+
+Run with `python -m benchmarks.bench_metrics_middleware`.
+"""
+
+import asyncio
+import time
+
+from mrok.proxy.metrics import MetricsCollector
+from mrok.proxy.middleware import MetricsMiddleware
+
+NUMBER = 50_000
+CHUNKS = 8
+CHUNK = b"x" * 1024
+
+
+async def app(scope, receive, send):
+    while (await receive()).get("more_body"):
+        pass
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    for i in range(CHUNKS):
+        await send({"type": "http.response.body", "body": CHUNK, "more_body": i < CHUNKS - 1})
+
+
+class LockedMetricsMiddleware:
+    """Awaited hooks taking a lock for every counter update."""
+
+    def __init__(self, app):
+        self.app = app
+        self.lock = asyncio.Lock()
+        self.bytes_in = self.bytes_out = self.requests = 0
+
+    async def add(self, name: str, value: int) -> None:
+        async with self.lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    async def __call__(self, scope, receive, send):
+        async def wrapped_receive():
+            msg = await receive()
+            await self.add("bytes_in", len(msg.get("body", b"")))
+            return msg
+
+        async def wrapped_send(msg):
+            if msg["type"] == "http.response.body":
+                await self.add("bytes_out", len(msg["body"]))
+            await send(msg)
+
+        await self.app(scope, wrapped_receive, wrapped_send)
+        await self.add("requests", 1)
+
+
+async def run(handler) -> float:
+    scope = {"type": "http", "method": "POST", "path": "/users/1234567/orders"}
+    messages = [
+        {"type": "http.request", "body": CHUNK, "more_body": i < CHUNKS - 1} for i in range(CHUNKS)
+    ]
+
+    async def send(msg):
+        pass
+
+    started_at = time.perf_counter()
+    for _ in range(NUMBER):
+        pending = iter(messages)
+
+        async def receive(pending=pending):  # noqa: RUF029
+            return next(pending)
+
+        await handler(scope, receive, send)
+    return time.perf_counter() - started_at
+
+
+async def main() -> None:
+    baseline = await run(app)
+    handlers = {
+        "locked hooks": LockedMetricsMiddleware(app),
+        "MetricsMiddleware": MetricsMiddleware(app, MetricsCollector("bench")),
+    }
+    print(f"{'bare app':>18}: {baseline / NUMBER * 1e6:.2f} us/request")
+    for name, handler in handlers.items():
+        elapsed = await run(handler)
+        print(
+            f"{name:>18}: {elapsed / NUMBER * 1e6:.2f} us/request "
+            f"(+{(elapsed - baseline) / NUMBER * 1e6:.2f} us)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+"""
+Per-request header parsing overhead of a frontend request that goes through
+the healthcheck middleware, authentication, target resolution and an error page.
+
+Run from the repository root, so that `settings.yaml` is picked up, with
+`python -m benchmarks.bench_request_headers`.
+"""
+
+import timeit
+
+from mrok.frontend.utils import get_target_name
+from mrok.proxy.headers import RequestHeaders, parse_accept_header
+from mrok.proxy.models import HTTPHeaders
+
+NUMBER = 100_000
+
+RAW_HEADERS = [
+    (b"host", b"ext-1234-5678.ext.mrok.test"),
+    (b"user-agent", b"Mozilla/5.0 (X11; Linux x86_64) Gecko/20100101 Firefox/131.0"),
+    (b"accept", b"text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"),
+    (b"accept-language", b"en-US,en;q=0.5"),
+    (b"accept-encoding", b"gzip, deflate, br"),
+    (b"authorization", b"Bearer eyJhbGciOiJSUzI1NiIsInR5cCI6IkpXVCJ9.e30.c2ln"),
+    (b"cookie", b"session=abc; theme=dark"),
+    (b"x-request-id", b"5d0f7a4e-3b5c-4d8e-9a51-6c1d3f2e8b7a"),
+]
+
+
+def _decode(scope):
+    return {k.decode("latin1"): v.decode("latin1") for k, v in scope.get("headers", [])}
+
+
+def repeated_decoding() -> None:
+    scope = {"type": "http", "headers": RAW_HEADERS}
+    # healthcheck and upstream url
+    get_target_name(_decode(scope))
+    get_target_name(_decode(scope))
+    # bearer credentials
+    HTTPHeaders.from_asgi(scope["headers"]).get("authorization", "").partition(" ")
+    # error page: accept negotiation and template context
+    parse_accept_header(_decode(scope).get("accept"))
+    _decode(scope)
+
+
+def shared_view() -> None:
+    scope = {"type": "http", "headers": RAW_HEADERS}
+    RequestHeaders.from_scope(scope).get_target(get_target_name)
+    RequestHeaders.from_scope(scope).get_target(get_target_name)
+    RequestHeaders.from_scope(scope).bearer_token  # noqa: B018
+    RequestHeaders.from_scope(scope).accept  # noqa: B018
+    RequestHeaders.from_scope(scope).index  # noqa: B018
+
+
+def main() -> None:
+    for bench in (repeated_decoding, shared_view):
+        elapsed = timeit.timeit(bench, number=NUMBER)
+        print(f"{bench.__name__:>20}: {elapsed / NUMBER * 1e6:.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
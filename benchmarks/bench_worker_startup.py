@@ -0,0 +1,76 @@
+"""
+Startup time and private memory of agent workers: spawned workers importing
+the worker stack and the application against workers forked from a master
+that preloaded them.
+
+The Ziti context isn't loaded, only the imports done before binding are measured.
+
+Run with `python -m benchmarks.bench_worker_startup`.
+"""
+
+import gc
+import importlib
+import multiprocessing
+import statistics
+import time
+from multiprocessing.synchronize import Event
+
+import psutil
+
+WORKERS = 4
+MODULES = ("mrok.proxy.worker", "mrok.agent.sidecar.app")
+
+
+def import_worker_stack() -> None:
+    for module in MODULES:
+        importlib.import_module(module)
+
+
+def worker(ready_event: Event, stop_event: Event) -> None:
+    import_worker_stack()
+    ready_event.set()
+    stop_event.wait()
+
+
+def run_workers(context_name: str) -> tuple[float, float]:
+    context = multiprocessing.get_context(context_name)
+    stop_event = context.Event()
+    ready_events = [context.Event() for _ in range(WORKERS)]
+    started_at = time.perf_counter()
+    processes = [
+        context.Process(target=worker, args=(ready_event, stop_event))
+        for ready_event in ready_events
+    ]
+    for process in processes:
+        process.start()
+    for ready_event in ready_events:
+        ready_event.wait()
+    startup = time.perf_counter() - started_at
+    uss = statistics.mean(
+        psutil.Process(process.pid).memory_full_info().uss for process in processes
+    )
+    stop_event.set()
+    for process in processes:
+        process.join()
+    return startup, uss
+
+
+def main() -> None:
+    startup, uss = run_workers("spawn")
+    print(f"{'spawn':>16}: {startup:.2f} s startup, {uss / 2**20:.1f} MiB private/worker")
+
+    started_at = time.perf_counter()
+    gc.disable()
+    import_worker_stack()
+    gc.freeze()
+    gc.enable()
+    preload = time.perf_counter() - started_at
+    startup, uss = run_workers("fork")
+    print(
+        f"{'preload + fork':>16}: {startup:.2f} s startup (+{preload:.2f} s preload), "
+        f"{uss / 2**20:.1f} MiB private/worker"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -40,17 +40,21 @@ from mrok.agent.devtools.inspector.utils import (
     parse_content_type,
     parse_form_data,
 )
+from mrok.proxy.aggregator import MetricsAggregator
 from mrok.proxy.models import (
-    Event,
+    AgentMetrics,
     HTTPHeaders,
     HTTPRequest,
     HTTPResponse,
+    RouteMetrics,
     ServiceMetadata,
     WorkerMetrics,
 )
+from mrok.proxy.wire import decode_event
 
 MIN_COLS = 160
 MIN_ROWS = 45
+STATUS_CLASSES = ("2xx", "3xx", "4xx", "5xx")
 
 
 class Counter(Digits):
@@ -185,11 +189,18 @@ class Requests(Static):
     """
 
     def compose(self) -> ComposeResult:
-        # give the table an id so CSS can target it; enable zebra stripes
-        yield DataTable(id="requests", zebra_stripes=True, cursor_type="row")
+        with ContentSwitcher(initial="requests"):
+            # give the table an id so CSS can target it; enable zebra stripes
+            yield DataTable(id="requests", zebra_stripes=True, cursor_type="row")
+            yield RoutesTable(id="routes", zebra_stripes=True, cursor_type="row")
+
+    def toggle_routes(self) -> None:
+        switcher = self.query_one(ContentSwitcher)
+        switcher.current = "routes" if switcher.current == "requests" else "requests"
+        self.border_title = "Routes" if switcher.current == "routes" else "Requests"
 
     def on_mount(self) -> None:
-        table = self.query_one(DataTable)
+        table = self.query_one("#requests", DataTable)
         table.add_column(
             "Method",
             width=7,
@@ -205,6 +216,43 @@ class Requests(Static):
         )
 
 
+class RoutesTable(DataTable):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.workers_metrics: dict[str, WorkerMetrics] = {}
+
+    def on_mount(self) -> None:
+        self.add_column("Route", width=25, key="route")
+        self.add_column("Requests", width=8)
+        for status_class in STATUS_CLASSES:
+            self.add_column(status_class, width=6)
+        self.add_column("p50 (ms)", width=8)
+        self.add_column("p99 (ms)", width=8)
+
+    def update_metrics(self, metrics: WorkerMetrics) -> None:
+        if isinstance(metrics, AgentMetrics):
+            # The agent metrics already merge the ones of its workers.
+            self.workers_metrics.clear()
+        self.workers_metrics[metrics.worker_id] = metrics
+        routes: dict[str, RouteMetrics] = (
+            metrics.routes
+            if len(self.workers_metrics) == 1
+            else MetricsAggregator().merge(list(self.workers_metrics.values())).routes
+        )
+        self.clear()
+        for route, route_metrics in sorted(
+            routes.items(), key=lambda item: sum(item[1].requests.values()), reverse=True
+        ):
+            self.add_row(
+                route,
+                sum(route_metrics.requests.values()),
+                *(route_metrics.requests.get(status_class, 0) for status_class in STATUS_CLASSES),
+                route_metrics.response_time.p50,
+                route_metrics.response_time.p99,
+                key=route,
+            )
+
+
 class Details(Static):
     BORDER_TITLE = "Details"
 
@@ -740,6 +788,7 @@ class InspectorApp(App):
 
     BINDINGS = [
         Binding("m", "toggle_metrics()", "Toggle Metrics"),
+        Binding("r", "toggle_routes()", "Toggle Routes"),
     ]
 
     def __init__(
@@ -757,6 +806,8 @@ class InspectorApp(App):
         self.socket.connect(f"tcp://127.0.0.1:{subscriber_port}")
         self.max_requests = max_requests
         self.requests: OrderedDict = OrderedDict()
+        # Once the agent publishes its aggregated metrics, the workers ones are ignored.
+        self.agent_metrics = False
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -779,8 +830,12 @@ class InspectorApp(App):
         requests_table = self.query_one("#requests", DataTable)
         while not worker.is_cancelled:
             try:
-                event = Event.model_validate_json(await self.socket.recv_string())
-                if event.type == "status":
+                event = decode_event(await self.socket.recv_multipart())
+                if event.type == "agent_status":
+                    self.agent_metrics = True
+                if event.type == "agent_status" or (
+                    event.type == "status" and not self.agent_metrics
+                ):
                     info_widget = self.query_one(InfoPanel)
                     info_widget.update_meta(event.data.meta)
                     process_metrics_widget = self.query_one(ProcessMetrics)
@@ -789,6 +844,9 @@ class InspectorApp(App):
                     requests_metrics_widget.update_metrics(event.data.metrics)
                     data_transfer_metrics_widget = self.query_one(DataTransferMetrics)
                     data_transfer_metrics_widget.update_metrics(event.data.metrics)
+                    self.query_one(RoutesTable).update_metrics(event.data.metrics)
+                    continue
+                if event.type != "response":
                     continue
 
                 response = event.data
@@ -811,7 +869,10 @@ class InspectorApp(App):
     def action_toggle_metrics(self):
         self.query_one(RightPanel).toggle_class("-hidden")
 
-    @on(DataTable.RowHighlighted)
+    def action_toggle_routes(self):
+        self.query_one(Requests).toggle_routes()
+
+    @on(DataTable.RowHighlighted, "#requests")
     def on_http_request_changed(self, event: DataTable.RowHighlighted) -> None:
         if not event.row_key:
             return
@@ -825,6 +886,8 @@ class InspectorApp(App):
         width = event.size.width
         table = self.query_one("#requests", DataTable)
         table.columns[ColumnKey("path")].width = width - 69
+        routes_table = self.query_one("#routes", DataTable)
+        routes_table.columns[ColumnKey("route")].width = width - 99
 
     def _check_minimum_size(self, width: int, height: int):
         if width < MIN_COLS or height < MIN_ROWS:
@@ -4,7 +4,15 @@ from typing import Literal
 
 from httpcore import AsyncConnectionPool
 
-from mrok.proxy.app import ProxyAppBase
+from mrok.proxy.app import DEFAULT_EXPECT_CONTINUE_TIMEOUT, ProxyAppBase
+from mrok.proxy.backend import AIONetworkBackend
+from mrok.proxy.buffering import (
+    DEFAULT_BUFFER_MAX_SIZE,
+    DEFAULT_BUFFER_MEMORY_SIZE,
+    DEFAULT_BUFFERS_MEMORY_LIMIT,
+    DEFAULT_REQUEST_BUFFER_SIZE,
+)
+from mrok.proxy.tracing import TracingConfig
 from mrok.types.proxy import Scope
 
 logger = logging.getLogger("mrok.agent")
@@ -22,6 +30,16 @@ class SidecarProxyApp(ProxyAppBase):
         max_keepalive_connections: int | None = None,
         keepalive_expiry: float | None = None,
         retries: int = 0,
+        response_buffering: bool = False,
+        response_buffer_memory_size: int = DEFAULT_BUFFER_MEMORY_SIZE,
+        response_buffer_max_size: int | None = DEFAULT_BUFFER_MAX_SIZE,
+        response_buffers_memory_limit: int | None = DEFAULT_BUFFERS_MEMORY_LIMIT,
+        request_buffer_size: int = DEFAULT_REQUEST_BUFFER_SIZE,
+        request_buffering: bool = False,
+        request_buffer_max_size: int | None = DEFAULT_BUFFER_MAX_SIZE,
+        expect_continue_timeout: float = DEFAULT_EXPECT_CONTINUE_TIMEOUT,
+        server_timing: bool = False,
+        tracing: TracingConfig | None = None,
     ):
         self._target = target
         self._target_type, self._target_address = self._parse_target()
@@ -30,6 +48,16 @@ class SidecarProxyApp(ProxyAppBase):
             max_keepalive_connections=max_keepalive_connections,
             keepalive_expiry=keepalive_expiry,
             retries=retries,
+            response_buffering=response_buffering,
+            response_buffer_memory_size=response_buffer_memory_size,
+            response_buffer_max_size=response_buffer_max_size,
+            response_buffers_memory_limit=response_buffers_memory_limit,
+            request_buffer_size=request_buffer_size,
+            request_buffering=request_buffering,
+            request_buffer_max_size=request_buffer_max_size,
+            expect_continue_timeout=expect_continue_timeout,
+            server_timing=server_timing,
+            tracing=tracing,
         )
 
     def setup_connection_pool(
@@ -46,12 +74,14 @@ class SidecarProxyApp(ProxyAppBase):
                 keepalive_expiry=keepalive_expiry,
                 retries=retries,
                 uds=self._target_address,
+                network_backend=AIONetworkBackend(on_dial=self._on_dial),
             )
         return AsyncConnectionPool(
             max_connections=max_connections,
             max_keepalive_connections=max_keepalive_connections,
             keepalive_expiry=keepalive_expiry,
             retries=retries,
+            network_backend=AIONetworkBackend(on_dial=self._on_dial),
         )
 
     def get_upstream_base_url(self, scope: Scope) -> str:
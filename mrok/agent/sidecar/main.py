@@ -2,7 +2,18 @@ import logging
 from pathlib import Path
 
 from mrok.agent.sidecar.app import SidecarProxyApp
+from mrok.proxy.app import DEFAULT_EXPECT_CONTINUE_TIMEOUT
+from mrok.proxy.autoscaler import DEFAULT_TARGET_CPU
+from mrok.proxy.buffering import (
+    DEFAULT_BUFFER_MAX_SIZE,
+    DEFAULT_BUFFER_MEMORY_SIZE,
+    DEFAULT_BUFFERS_MEMORY_LIMIT,
+    DEFAULT_REQUEST_BUFFER_SIZE,
+)
+from mrok.proxy.capture import CaptureConfig
 from mrok.proxy.master import MasterBase
+from mrok.proxy.routes import RoutesConfig
+from mrok.proxy.tracing import TracingConfig
 
 logger = logging.getLogger("mrok.proxy")
 
@@ -13,39 +24,85 @@ class SidecarAgent(MasterBase):
         identity_file: str,
         target: str | Path | tuple[str, int],
         ziti_load_timeout_ms: int = 5000,
+        ziti_binds: int = 1,
+        ziti_contexts: int = 1,
         server_workers: int = 4,
         server_backlog: int = 2048,
         server_timeout_keep_alive: int = 5,
         server_limit_concurrency: int | None = None,
         server_limit_max_requests: int | None = None,
+        server_restart_batch_size: int = 1,
+        server_drain_timeout: int = 30,
+        server_max_workers: int | None = None,
+        server_preload: bool = False,
+        server_readiness_file: str | None = None,
+        autoscale_target_cpu: float | None = DEFAULT_TARGET_CPU,
+        autoscale_target_rps: float | None = None,
+        autoscale_target_p99: float | None = None,
         events_enabled: bool = True,
         events_publishers_port: int = 50000,
         events_subscribers_port: int = 50001,
         events_metrics_collect_interval: float = 5.0,
+        events_capture: CaptureConfig | None = None,
+        events_routes: RoutesConfig | None = None,
+        metrics_port: int | None = None,
         upstream_max_connections: int | None = 10,
         upstream_max_keepalive_connections: int | None = None,
         upstream_keepalive_expiry: float | None = None,
         upstream_max_connect_retries: int = 0,
+        response_buffering: bool = False,
+        response_buffer_memory_size: int = DEFAULT_BUFFER_MEMORY_SIZE,
+        response_buffer_max_size: int | None = DEFAULT_BUFFER_MAX_SIZE,
+        response_buffers_memory_limit: int | None = DEFAULT_BUFFERS_MEMORY_LIMIT,
+        request_buffer_size: int = DEFAULT_REQUEST_BUFFER_SIZE,
+        request_buffering: bool = False,
+        request_buffer_max_size: int | None = DEFAULT_BUFFER_MAX_SIZE,
+        expect_continue_timeout: float = DEFAULT_EXPECT_CONTINUE_TIMEOUT,
+        server_timing: bool = False,
+        tracing: TracingConfig | None = None,
     ):
         super().__init__(
             identity_file,
             ziti_load_timeout_ms=ziti_load_timeout_ms,
+            ziti_binds=ziti_binds,
+            ziti_contexts=ziti_contexts,
             server_workers=server_workers,
             server_reload=False,
             server_backlog=server_backlog,
             server_timeout_keep_alive=server_timeout_keep_alive,
             server_limit_concurrency=server_limit_concurrency,
             server_limit_max_requests=server_limit_max_requests,
+            server_restart_batch_size=server_restart_batch_size,
+            server_drain_timeout=server_drain_timeout,
+            server_max_workers=server_max_workers,
+            server_preload=server_preload,
+            server_readiness_file=server_readiness_file,
+            autoscale_target_cpu=autoscale_target_cpu,
+            autoscale_target_rps=autoscale_target_rps,
+            autoscale_target_p99=autoscale_target_p99,
             events_enabled=events_enabled,
             events_pub_port=events_publishers_port,
             events_sub_port=events_subscribers_port,
             events_metrics_collect_interval=events_metrics_collect_interval,
+            events_capture=events_capture,
+            events_routes=events_routes,
+            metrics_port=metrics_port,
         )
         self._target = target
         self._max_connections = upstream_max_connections
         self._max_keepalive_connections = upstream_max_keepalive_connections
         self._keepalive_expiry = upstream_keepalive_expiry
         self._retries = upstream_max_connect_retries
+        self._response_buffering = response_buffering
+        self._response_buffer_memory_size = response_buffer_memory_size
+        self._response_buffer_max_size = response_buffer_max_size
+        self._response_buffers_memory_limit = response_buffers_memory_limit
+        self._request_buffer_size = request_buffer_size
+        self._request_buffering = request_buffering
+        self._request_buffer_max_size = request_buffer_max_size
+        self._expect_continue_timeout = expect_continue_timeout
+        self._server_timing = server_timing
+        self._tracing = tracing
 
     def get_asgi_app(self):
         return SidecarProxyApp(
@@ -54,6 +111,16 @@ class SidecarAgent(MasterBase):
             max_keepalive_connections=self._max_keepalive_connections,
             keepalive_expiry=self._keepalive_expiry,
             retries=self._retries,
+            response_buffering=self._response_buffering,
+            response_buffer_memory_size=self._response_buffer_memory_size,
+            response_buffer_max_size=self._response_buffer_max_size,
+            response_buffers_memory_limit=self._response_buffers_memory_limit,
+            request_buffer_size=self._request_buffer_size,
+            request_buffering=self._request_buffering,
+            request_buffer_max_size=self._request_buffer_max_size,
+            expect_continue_timeout=self._expect_continue_timeout,
+            server_timing=self._server_timing,
+            tracing=self._tracing,
         )
 
 
@@ -61,36 +128,82 @@ def run(
     identity_file: str,
     target_addr: str | Path | tuple[str, int],
     ziti_load_timeout_ms: int = 5000,
+    ziti_binds: int = 1,
+    ziti_contexts: int = 1,
     server_workers: int = 4,
     server_backlog: int = 2048,
     server_timeout_keep_alive: int = 5,
     server_limit_concurrency: int | None = None,
     server_limit_max_requests: int | None = None,
+    server_restart_batch_size: int = 1,
+    server_drain_timeout: int = 30,
+    server_max_workers: int | None = None,
+    server_preload: bool = False,
+    server_readiness_file: str | None = None,
+    autoscale_target_cpu: float | None = DEFAULT_TARGET_CPU,
+    autoscale_target_rps: float | None = None,
+    autoscale_target_p99: float | None = None,
     events_enabled: bool = True,
     events_publishers_port: int = 50000,
     events_subscribers_port: int = 50001,
     events_metrics_collect_interval: float = 5.0,
+    events_capture: CaptureConfig | None = None,
+    events_routes: RoutesConfig | None = None,
+    metrics_port: int | None = None,
     upstream_max_connections: int | None = 10,
     upstream_max_keepalive_connections: int | None = None,
     upstream_keepalive_expiry: float | None = None,
     upstream_max_connect_retries: int = 0,
+    response_buffering: bool = False,
+    response_buffer_memory_size: int = DEFAULT_BUFFER_MEMORY_SIZE,
+    response_buffer_max_size: int | None = DEFAULT_BUFFER_MAX_SIZE,
+    response_buffers_memory_limit: int | None = DEFAULT_BUFFERS_MEMORY_LIMIT,
+    request_buffer_size: int = DEFAULT_REQUEST_BUFFER_SIZE,
+    request_buffering: bool = False,
+    request_buffer_max_size: int | None = DEFAULT_BUFFER_MAX_SIZE,
+    expect_continue_timeout: float = DEFAULT_EXPECT_CONTINUE_TIMEOUT,
+    server_timing: bool = False,
+    tracing: TracingConfig | None = None,
 ):
     agent = SidecarAgent(
         identity_file,
         target_addr,
         ziti_load_timeout_ms=ziti_load_timeout_ms,
+        ziti_binds=ziti_binds,
+        ziti_contexts=ziti_contexts,
         server_workers=server_workers,
         server_backlog=server_backlog,
         server_timeout_keep_alive=server_timeout_keep_alive,
         server_limit_concurrency=server_limit_concurrency,
         server_limit_max_requests=server_limit_max_requests,
+        server_restart_batch_size=server_restart_batch_size,
+        server_drain_timeout=server_drain_timeout,
+        server_max_workers=server_max_workers,
+        server_preload=server_preload,
+        server_readiness_file=server_readiness_file,
+        autoscale_target_cpu=autoscale_target_cpu,
+        autoscale_target_rps=autoscale_target_rps,
+        autoscale_target_p99=autoscale_target_p99,
         events_enabled=events_enabled,
         events_publishers_port=events_publishers_port,
         events_subscribers_port=events_subscribers_port,
         events_metrics_collect_interval=events_metrics_collect_interval,
+        events_capture=events_capture,
+        events_routes=events_routes,
+        metrics_port=metrics_port,
         upstream_max_connections=upstream_max_connections,
         upstream_max_keepalive_connections=upstream_max_keepalive_connections,
         upstream_keepalive_expiry=upstream_keepalive_expiry,
         upstream_max_connect_retries=upstream_max_connect_retries,
+        response_buffering=response_buffering,
+        response_buffer_memory_size=response_buffer_memory_size,
+        response_buffer_max_size=response_buffer_max_size,
+        response_buffers_memory_limit=response_buffers_memory_limit,
+        request_buffer_size=request_buffer_size,
+        request_buffering=request_buffering,
+        request_buffer_max_size=request_buffer_max_size,
+        expect_continue_timeout=expect_continue_timeout,
+        server_timing=server_timing,
+        tracing=tracing,
     )
     agent.run()
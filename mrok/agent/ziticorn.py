@@ -1,4 +1,7 @@
+from mrok.proxy.autoscaler import DEFAULT_TARGET_CPU
+from mrok.proxy.capture import CaptureConfig
 from mrok.proxy.master import MasterBase
+from mrok.proxy.routes import RoutesConfig
 from mrok.types.proxy import ASGIApp
 
 
@@ -8,29 +11,55 @@ class ZiticornAgent(MasterBase):
         app: ASGIApp | str,
         identity_file: str,
         ziti_load_timeout_ms: int = 5000,
+        ziti_binds: int = 1,
+        ziti_contexts: int = 1,
         server_workers: int = 4,
         server_reload: bool = False,
         server_backlog: int = 2048,
         server_timeout_keep_alive: int = 5,
         server_limit_concurrency: int | None = None,
         server_limit_max_requests: int | None = None,
+        server_restart_batch_size: int = 1,
+        server_drain_timeout: int = 30,
+        server_max_workers: int | None = None,
+        server_preload: bool = False,
+        server_readiness_file: str | None = None,
+        autoscale_target_cpu: float | None = DEFAULT_TARGET_CPU,
+        autoscale_target_rps: float | None = None,
+        autoscale_target_p99: float | None = None,
         events_publishers_port: int = 50000,
         events_subscribers_port: int = 5000,
         events_metrics_collect_interval: float = 5.0,
+        events_capture: CaptureConfig | None = None,
+        events_routes: RoutesConfig | None = None,
+        metrics_port: int | None = None,
         logging_config: dict | None = None,
     ):
         super().__init__(
             identity_file,
             ziti_load_timeout_ms=ziti_load_timeout_ms,
+            ziti_binds=ziti_binds,
+            ziti_contexts=ziti_contexts,
             server_workers=server_workers,
             server_reload=server_reload,
             server_backlog=server_backlog,
             server_timeout_keep_alive=server_timeout_keep_alive,
             server_limit_concurrency=server_limit_concurrency,
             server_limit_max_requests=server_limit_max_requests,
+            server_restart_batch_size=server_restart_batch_size,
+            server_drain_timeout=server_drain_timeout,
+            server_max_workers=server_max_workers,
+            server_preload=server_preload,
+            server_readiness_file=server_readiness_file,
+            autoscale_target_cpu=autoscale_target_cpu,
+            autoscale_target_rps=autoscale_target_rps,
+            autoscale_target_p99=autoscale_target_p99,
             events_pub_port=events_publishers_port,
             events_sub_port=events_subscribers_port,
             events_metrics_collect_interval=events_metrics_collect_interval,
+            events_capture=events_capture,
+            events_routes=events_routes,
+            metrics_port=metrics_port,
             logging_config=logging_config,
         )
         self.app = app
@@ -43,30 +72,56 @@ def run(
     app: ASGIApp | str,
     identity_file: str,
     ziti_load_timeout_ms: int = 5000,
+    ziti_binds: int = 1,
+    ziti_contexts: int = 1,
     server_workers: int = 4,
     server_reload: bool = False,
     server_backlog: int = 2048,
     server_timeout_keep_alive: int = 5,
     server_limit_concurrency: int | None = None,
     server_limit_max_requests: int | None = None,
+    server_restart_batch_size: int = 1,
+    server_drain_timeout: int = 30,
+    server_max_workers: int | None = None,
+    server_preload: bool = False,
+    server_readiness_file: str | None = None,
+    autoscale_target_cpu: float | None = DEFAULT_TARGET_CPU,
+    autoscale_target_rps: float | None = None,
+    autoscale_target_p99: float | None = None,
     events_publishers_port: int = 50000,
     events_subscribers_port: int = 50001,
     events_metrics_collect_interval: float = 5.0,
+    events_capture: CaptureConfig | None = None,
+    events_routes: RoutesConfig | None = None,
+    metrics_port: int | None = None,
     logging_config: dict | None = None,
 ):
     master = ZiticornAgent(
         app,
         identity_file,
         ziti_load_timeout_ms=ziti_load_timeout_ms,
+        ziti_binds=ziti_binds,
+        ziti_contexts=ziti_contexts,
         server_workers=server_workers,
         server_reload=server_reload,
         server_backlog=server_backlog,
         server_timeout_keep_alive=server_timeout_keep_alive,
         server_limit_concurrency=server_limit_concurrency,
         server_limit_max_requests=server_limit_max_requests,
+        server_restart_batch_size=server_restart_batch_size,
+        server_drain_timeout=server_drain_timeout,
+        server_max_workers=server_max_workers,
+        server_preload=server_preload,
+        server_readiness_file=server_readiness_file,
+        autoscale_target_cpu=autoscale_target_cpu,
+        autoscale_target_rps=autoscale_target_rps,
+        autoscale_target_p99=autoscale_target_p99,
         events_publishers_port=events_publishers_port,
         events_subscribers_port=events_subscribers_port,
         events_metrics_collect_interval=events_metrics_collect_interval,
+        events_capture=events_capture,
+        events_routes=events_routes,
+        metrics_port=metrics_port,
         logging_config=logging_config,
     )
     master.run()
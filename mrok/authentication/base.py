@@ -1,10 +1,11 @@
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
 from typing import Any
 
-from dynaconf.utils.boxing import DynaBox
 from pydantic import BaseModel
 
 from mrok.authentication.credentials import Credentials
+from mrok.conf import FrozenConfig
 from mrok.types.proxy import Scope
 
 
@@ -24,8 +25,8 @@ class BaseHTTPAuthBackend(ABC):
 
     """
 
-    def __init__(self, config: DynaBox):
-        self.config = config
+    def __init__(self, config: Mapping[str, Any]):
+        self.config = config if isinstance(config, FrozenConfig) else FrozenConfig(config)
 
     @abstractmethod
     def get_credentials(self, scope: Scope) -> Credentials | None:
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 
-from mrok.proxy.models import HTTPHeaders
+from mrok.proxy.headers import RequestHeaders
 from mrok.types.proxy import Scope
 
 
@@ -18,9 +18,7 @@ class Credentials(ABC):
 class BearerCredentials(Credentials):
     @classmethod
     def extract_from_asgi_scope(cls, scope: Scope):
-        headers = HTTPHeaders.from_asgi(scope.get("headers", []))
-        authorization = headers.get("authorization", "")
-        schema, _, value = authorization.partition(" ")
-        if schema.lower() != "bearer" or not value:
+        token = RequestHeaders.from_scope(scope).bearer_token
+        if not token:
             return None
-        return cls(credentials=value.strip())
+        return cls(credentials=token)
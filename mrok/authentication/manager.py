@@ -1,4 +1,5 @@
-from dynaconf.utils.boxing import DynaBox
+from collections.abc import Callable, Mapping
+from typing import Any
 
 from mrok.authentication.base import AuthIdentity, BaseHTTPAuthBackend
 from mrok.authentication.registry import get_authentication_backend
@@ -6,21 +7,41 @@ from mrok.types.proxy import Scope
 
 
 class HTTPAuthManager:
-    def __init__(self, auth_settings: DynaBox):
+    def __init__(self, auth_settings: Mapping[str, Any]):
         self.auth_settings = auth_settings
         self.active_backends: list[BaseHTTPAuthBackend] = []
         self._setup_backends()
 
     def _setup_backends(self):
-        enabled_keys = self.auth_settings.get("backends", [])
+        self.active_backends = self._create_backends(self.auth_settings)
 
-        for key in enabled_keys:
+    def prepare_reload(self, auth_settings: Mapping[str, Any]) -> Callable[[], None]:
+        """
+        Set up the backends of `auth_settings` and return a callable that swaps them in.
+
+        A reload can't remove all the backends, a misread configuration would
+        otherwise reject every request or turn authentication off.
+        """
+        backends = self._create_backends(auth_settings)
+        if self.active_backends and not backends:
+            raise ValueError("No authentication backends configured, restart to remove them.")
+
+        def apply() -> None:
+            self.auth_settings = auth_settings
+            self.active_backends = backends
+
+        return apply
+
+    def _create_backends(self, auth_settings: Mapping[str, Any]) -> list[BaseHTTPAuthBackend]:
+        backends: list[BaseHTTPAuthBackend] = []
+        for key in auth_settings.get("backends", []):
             backend_cls = get_authentication_backend(key)
             if not backend_cls:
                 raise ValueError(f"Backend '{key}' is not registered.")
 
-            specific_config = self.auth_settings.get(key, {})
-            self.active_backends.append(backend_cls(specific_config))
+            specific_config = auth_settings.get(key, {})
+            backends.append(backend_cls(specific_config))
+        return backends
 
     async def __call__(self, scope: Scope) -> AuthIdentity | None:
         for backend in self.active_backends:
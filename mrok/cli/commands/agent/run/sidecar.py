@@ -4,7 +4,22 @@ from typing import Annotated
 import typer
 
 from mrok.agent import sidecar
-from mrok.cli.utils import number_of_workers
+from mrok.cli.utils import (
+    build_capture_config,
+    build_routes_config,
+    build_tracing_config,
+    number_of_workers,
+)
+from mrok.proxy.app import DEFAULT_EXPECT_CONTINUE_TIMEOUT
+from mrok.proxy.autoscaler import DEFAULT_TARGET_CPU
+from mrok.proxy.buffering import (
+    DEFAULT_BUFFER_MAX_SIZE,
+    DEFAULT_BUFFER_MEMORY_SIZE,
+    DEFAULT_BUFFERS_MEMORY_LIMIT,
+    DEFAULT_REQUEST_BUFFER_SIZE,
+)
+from mrok.proxy.routes import DEFAULT_MAX_ROUTES
+from mrok.proxy.tracing import DEFAULT_TRACE_SAMPLE_RATE
 
 default_workers = number_of_workers()
 
@@ -28,6 +43,25 @@ def register(app: typer.Typer) -> None:
                 show_default=True,
             ),
         ] = 5000,
+        ziti_binds: Annotated[
+            int,
+            typer.Option(
+                "--ziti-binds",
+                help="Number of times each worker binds the Ziti service.",
+                show_default=True,
+            ),
+        ] = 1,
+        ziti_contexts: Annotated[
+            int,
+            typer.Option(
+                "--ziti-contexts",
+                help=(
+                    "Number of Ziti contexts each worker spreads its binds over, "
+                    "allowing binds through different edge routers."
+                ),
+                show_default=True,
+            ),
+        ] = 1,
         server_workers: Annotated[
             int,
             typer.Option(
@@ -70,6 +104,83 @@ def register(app: typer.Typer) -> None:
                 show_default=True,
             ),
         ] = None,
+        server_restart_batch_size: Annotated[
+            int,
+            typer.Option(
+                "--server-restart-batch-size",
+                help="Number of workers replaced at a time on rolling restarts.",
+                show_default=True,
+            ),
+        ] = 1,
+        server_drain_timeout: Annotated[
+            int,
+            typer.Option(
+                "--server-drain-timeout",
+                help=(
+                    "Seconds a replaced worker is given to finish in-flight requests "
+                    "before being killed."
+                ),
+                show_default=True,
+            ),
+        ] = 30,
+        server_max_workers: Annotated[
+            int | None,
+            typer.Option(
+                "--server-max-workers",
+                help=(
+                    "Maximum number of workers. If greater than the number of workers, "
+                    "workers are added and removed according to the load, "
+                    "with the number of workers as minimum."
+                ),
+                show_default=True,
+            ),
+        ] = None,
+        server_preload: Annotated[
+            bool,
+            typer.Option(
+                "--server-preload",
+                help=(
+                    "Import the application once in a fork server and fork the "
+                    "workers from it, for faster startup and shared memory."
+                ),
+                show_default=True,
+            ),
+        ] = False,
+        server_readiness_file: Annotated[
+            Path | None,
+            typer.Option(
+                "--server-readiness-file",
+                help=(
+                    "File where the readiness of the workers is written, "
+                    "as JSON, every time it changes."
+                ),
+                show_default=True,
+            ),
+        ] = None,
+        autoscale_target_cpu: Annotated[
+            float | None,
+            typer.Option(
+                "--autoscale-target-cpu",
+                help="Target average CPU usage (%) of the workers when autoscaling.",
+                show_default=True,
+            ),
+        ] = DEFAULT_TARGET_CPU,
+        autoscale_target_rps: Annotated[
+            float | None,
+            typer.Option(
+                "--autoscale-target-rps",
+                help="Target average requests per second per worker when autoscaling.",
+                show_default=True,
+            ),
+        ] = None,
+        autoscale_target_p99: Annotated[
+            float | None,
+            typer.Option(
+                "--autoscale-target-p99",
+                help="Target p99 response time (ms) of the workers when autoscaling.",
+                show_default=True,
+            ),
+        ] = None,
         events_publishers_port: Annotated[
             int,
             typer.Option(
@@ -98,6 +209,101 @@ def register(app: typer.Typer) -> None:
                 show_default=True,
             ),
         ] = 5.0,
+        capture_sample_rate: Annotated[
+            float,
+            typer.Option(
+                "--capture-sample-rate",
+                help="Fraction (0-1) of the requests captured while an inspector is subscribed.",
+                show_default=True,
+            ),
+        ] = 1.0,
+        capture_method: Annotated[
+            list[str] | None,
+            typer.Option(
+                "--capture-method",
+                help="Only capture requests with this HTTP method. Can be repeated.",
+            ),
+        ] = None,
+        capture_path: Annotated[
+            list[str] | None,
+            typer.Option(
+                "--capture-path",
+                help="Only capture requests whose path matches this glob. Can be repeated.",
+            ),
+        ] = None,
+        capture_exclude_path: Annotated[
+            list[str] | None,
+            typer.Option(
+                "--capture-exclude-path",
+                help="Don't capture requests whose path matches this glob. Can be repeated.",
+            ),
+        ] = None,
+        capture_status: Annotated[
+            list[str] | None,
+            typer.Option(
+                "--capture-status",
+                help=(
+                    "Only capture responses with this status (404) or status class (5xx). "
+                    "Can be repeated."
+                ),
+            ),
+        ] = None,
+        capture_headers_only: Annotated[
+            bool,
+            typer.Option(
+                "--capture-headers-only",
+                help="Capture headers without request/response bodies. Default: False",
+                show_default=True,
+            ),
+        ] = False,
+        capture_queue_size: Annotated[
+            int,
+            typer.Option(
+                "--capture-queue-size",
+                help="Maximum number of captured responses per worker waiting to be published.",
+                show_default=True,
+            ),
+        ] = 256,
+        capture_queue_overflow: Annotated[
+            str,
+            typer.Option(
+                "--capture-queue-overflow",
+                help="Captured response dropped when the queue is full: drop-oldest or drop-new.",
+                show_default=True,
+            ),
+        ] = "drop-oldest",
+        route_pattern: Annotated[
+            list[str] | None,
+            typer.Option(
+                "--route-pattern",
+                help=(
+                    "Route template, like /users/{id}, grouping the matching request paths "
+                    "in the per-route metrics. Can be repeated."
+                ),
+            ),
+        ] = None,
+        no_route_id_collapsing: Annotated[
+            bool,
+            typer.Option(
+                "--no-route-id-collapsing",
+                help=(
+                    "Don't replace the path segments that look like identifiers with {id} "
+                    "in the per-route metrics. Default: False"
+                ),
+                show_default=True,
+            ),
+        ] = False,
+        max_routes: Annotated[
+            int,
+            typer.Option(
+                "--max-routes",
+                help=(
+                    "Maximum number of routes in the per-route metrics, the requests to "
+                    "further routes are counted in the 'other' route."
+                ),
+                show_default=True,
+            ),
+        ] = DEFAULT_MAX_ROUTES,
         no_events: Annotated[
             bool,
             typer.Option(
@@ -106,6 +312,16 @@ def register(app: typer.Typer) -> None:
                 show_default=True,
             ),
         ] = False,
+        metrics_port: Annotated[
+            int | None,
+            typer.Option(
+                "--metrics-port",
+                help=(
+                    "Local TCP port where the agent serves its workers aggregated metrics "
+                    "in the OpenMetrics format. Disabled by default."
+                ),
+            ),
+        ] = None,
         upstream_max_connections: Annotated[
             int,
             typer.Option(
@@ -153,6 +369,127 @@ def register(app: typer.Typer) -> None:
                 show_default=True,
             ),
         ] = 0,
+        response_buffering: Annotated[
+            bool,
+            typer.Option(
+                "--response-buffering",
+                help=(
+                    "Buffer the target service responses before sending them to clients "
+                    "so that slow clients don't hold connections to the target service."
+                ),
+                show_default=True,
+            ),
+        ] = False,
+        response_buffer_memory_size: Annotated[
+            int,
+            typer.Option(
+                "--response-buffer-memory-size",
+                help=(
+                    "The maximum number of bytes of a response kept in memory "
+                    "before spilling it to a temporary file."
+                ),
+                show_default=True,
+            ),
+        ] = DEFAULT_BUFFER_MEMORY_SIZE,
+        response_buffer_max_size: Annotated[
+            int,
+            typer.Option(
+                "--response-buffer-max-size",
+                help=(
+                    "The maximum number of bytes of a response to buffer, "
+                    "the remainder is streamed from the target service."
+                ),
+                show_default=True,
+            ),
+        ] = DEFAULT_BUFFER_MAX_SIZE,
+        response_buffers_memory_limit: Annotated[
+            int,
+            typer.Option(
+                "--response-buffers-memory-limit",
+                help=(
+                    "The maximum number of bytes that all the response buffers "
+                    "of a worker can keep in memory."
+                ),
+                show_default=True,
+            ),
+        ] = DEFAULT_BUFFERS_MEMORY_LIMIT,
+        request_buffer_size: Annotated[
+            int,
+            typer.Option(
+                "--request-buffer-size",
+                help=(
+                    "Request bodies up to this number of bytes are read upfront and sent to "
+                    "the target service in a single write with a Content-Length."
+                ),
+                show_default=True,
+            ),
+        ] = DEFAULT_REQUEST_BUFFER_SIZE,
+        request_buffering: Annotated[
+            bool,
+            typer.Option(
+                "--request-buffering",
+                help=(
+                    "Spool request bodies larger than the request buffer size to a temporary "
+                    "file before sending them to the target service."
+                ),
+                show_default=True,
+            ),
+        ] = False,
+        request_buffer_max_size: Annotated[
+            int,
+            typer.Option(
+                "--request-buffer-max-size",
+                help=(
+                    "The maximum number of bytes of a request body to spool, "
+                    "the remainder is streamed to the target service."
+                ),
+                show_default=True,
+            ),
+        ] = DEFAULT_BUFFER_MAX_SIZE,
+        expect_continue_timeout: Annotated[
+            float,
+            typer.Option(
+                "--expect-continue-timeout",
+                help=(
+                    "Seconds to wait for the target service to accept the body of requests "
+                    "sent with 'Expect: 100-continue' before sending it anyway."
+                ),
+                show_default=True,
+            ),
+        ] = DEFAULT_EXPECT_CONTINUE_TIMEOUT,
+        server_timing: Annotated[
+            bool,
+            typer.Option(
+                "--server-timing",
+                help=(
+                    "Add a Server-Timing header with the time spent in each phase of the "
+                    "target service request to the responses."
+                ),
+                show_default=True,
+            ),
+        ] = False,
+        trace_exporter: Annotated[
+            str | None,
+            typer.Option(
+                "--trace-exporter",
+                help=(
+                    "OTLP/HTTP endpoint, e.g. http://localhost:4318/v1/traces, or path of a "
+                    "file the spans of the sampled requests are exported to. Tracing is "
+                    "disabled by default."
+                ),
+            ),
+        ] = None,
+        trace_sample_rate: Annotated[
+            float,
+            typer.Option(
+                "--trace-sample-rate",
+                help=(
+                    "Fraction of the requests that are traced, between 0 and 1. Requests with "
+                    "a traceparent header are traced if their caller sampled them."
+                ),
+                show_default=True,
+            ),
+        ] = DEFAULT_TRACE_SAMPLE_RATE,
     ):
         """Run a Sidecar Proxy to expose a web application through OpenZiti."""
         if ":" in str(target):
@@ -165,17 +502,51 @@ def register(app: typer.Typer) -> None:
             str(identity_file),
             target_addr,
             ziti_load_timeout_ms=ziti_load_timeout_ms,
+            ziti_binds=ziti_binds,
+            ziti_contexts=ziti_contexts,
             server_workers=server_workers,
             server_backlog=server_backlog,
             server_timeout_keep_alive=server_timeout_keep_alive,
             server_limit_concurrency=server_limit_concurrency,
             server_limit_max_requests=server_limit_max_requests,
+            server_restart_batch_size=server_restart_batch_size,
+            server_drain_timeout=server_drain_timeout,
+            server_max_workers=server_max_workers,
+            server_preload=server_preload,
+            server_readiness_file=str(server_readiness_file) if server_readiness_file else None,
+            autoscale_target_cpu=autoscale_target_cpu,
+            autoscale_target_rps=autoscale_target_rps,
+            autoscale_target_p99=autoscale_target_p99,
             events_enabled=not no_events,
             events_publishers_port=events_publishers_port,
             events_subscribers_port=events_subscribers_port,
             events_metrics_collect_interval=events_metrics_collect_interval,
+            events_capture=build_capture_config(
+                capture_sample_rate,
+                capture_method,
+                capture_path,
+                capture_exclude_path,
+                capture_status,
+                capture_headers_only,
+                capture_queue_size,
+                capture_queue_overflow,
+            ),
+            events_routes=build_routes_config(
+                route_pattern, not no_route_id_collapsing, max_routes
+            ),
+            metrics_port=metrics_port,
             upstream_max_connections=upstream_max_connections,
             upstream_max_keepalive_connections=upstream_max_keepalive_connections,
             upstream_keepalive_expiry=upstream_keepalive_expiry,
             upstream_max_connect_retries=upstream_max_connect_retries,
+            response_buffering=response_buffering,
+            response_buffer_memory_size=response_buffer_memory_size,
+            response_buffer_max_size=response_buffer_max_size,
+            response_buffers_memory_limit=response_buffers_memory_limit,
+            request_buffer_size=request_buffer_size,
+            request_buffering=request_buffering,
+            request_buffer_max_size=request_buffer_max_size,
+            expect_continue_timeout=expect_continue_timeout,
+            server_timing=server_timing,
+            tracing=build_tracing_config(trace_exporter, trace_sample_rate, "mrok-sidecar"),
         )
@@ -4,7 +4,15 @@ from typing import Annotated
 import typer
 
 from mrok import frontend
-from mrok.cli.utils import number_of_workers
+from mrok.cli.utils import build_tracing_config, number_of_workers
+from mrok.proxy.app import DEFAULT_EXPECT_CONTINUE_TIMEOUT
+from mrok.proxy.buffering import (
+    DEFAULT_BUFFER_MAX_SIZE,
+    DEFAULT_BUFFER_MEMORY_SIZE,
+    DEFAULT_BUFFERS_MEMORY_LIMIT,
+    DEFAULT_REQUEST_BUFFER_SIZE,
+)
+from mrok.proxy.tracing import DEFAULT_TRACE_SAMPLE_RATE
 
 default_workers = number_of_workers()
 
@@ -87,6 +95,137 @@ def register(app: typer.Typer) -> None:
                 show_default=True,
             ),
         ] = 300,
+        response_buffering: Annotated[
+            bool,
+            typer.Option(
+                "--response-buffering",
+                help=(
+                    "Buffer upstream responses before sending them to clients so that "
+                    "slow clients don't hold upstream connections."
+                ),
+                show_default=True,
+            ),
+        ] = False,
+        response_buffer_memory_size: Annotated[
+            int,
+            typer.Option(
+                "--response-buffer-memory-size",
+                help=(
+                    "The maximum number of bytes of a response kept in memory "
+                    "before spilling it to a temporary file."
+                ),
+                show_default=True,
+            ),
+        ] = DEFAULT_BUFFER_MEMORY_SIZE,
+        response_buffer_max_size: Annotated[
+            int,
+            typer.Option(
+                "--response-buffer-max-size",
+                help=(
+                    "The maximum number of bytes of a response to buffer, "
+                    "the remainder is streamed from the upstream."
+                ),
+                show_default=True,
+            ),
+        ] = DEFAULT_BUFFER_MAX_SIZE,
+        response_buffers_memory_limit: Annotated[
+            int,
+            typer.Option(
+                "--response-buffers-memory-limit",
+                help=(
+                    "The maximum number of bytes that all the response buffers "
+                    "of a worker can keep in memory."
+                ),
+                show_default=True,
+            ),
+        ] = DEFAULT_BUFFERS_MEMORY_LIMIT,
+        request_buffer_size: Annotated[
+            int,
+            typer.Option(
+                "--request-buffer-size",
+                help=(
+                    "Request bodies up to this number of bytes are read upfront and sent to "
+                    "the upstream in a single write with a Content-Length."
+                ),
+                show_default=True,
+            ),
+        ] = DEFAULT_REQUEST_BUFFER_SIZE,
+        request_buffering: Annotated[
+            bool,
+            typer.Option(
+                "--request-buffering",
+                help=(
+                    "Spool request bodies larger than the request buffer size to a temporary "
+                    "file before sending them to the upstream."
+                ),
+                show_default=True,
+            ),
+        ] = False,
+        request_buffer_max_size: Annotated[
+            int,
+            typer.Option(
+                "--request-buffer-max-size",
+                help=(
+                    "The maximum number of bytes of a request body to spool, "
+                    "the remainder is streamed to the upstream."
+                ),
+                show_default=True,
+            ),
+        ] = DEFAULT_BUFFER_MAX_SIZE,
+        expect_continue_timeout: Annotated[
+            float,
+            typer.Option(
+                "--expect-continue-timeout",
+                help=(
+                    "Seconds to wait for the upstream to accept the body of requests "
+                    "sent with 'Expect: 100-continue' before sending it anyway."
+                ),
+                show_default=True,
+            ),
+        ] = DEFAULT_EXPECT_CONTINUE_TIMEOUT,
+        server_timing: Annotated[
+            bool,
+            typer.Option(
+                "--server-timing",
+                help=(
+                    "Add a Server-Timing header with the time spent in each phase of the "
+                    "upstream request to the responses."
+                ),
+                show_default=True,
+            ),
+        ] = False,
+        trace_exporter: Annotated[
+            str | None,
+            typer.Option(
+                "--trace-exporter",
+                help=(
+                    "OTLP/HTTP endpoint, e.g. http://localhost:4318/v1/traces, or path of a "
+                    "file the spans of the sampled requests are exported to. Tracing is "
+                    "disabled by default."
+                ),
+            ),
+        ] = None,
+        trace_sample_rate: Annotated[
+            float,
+            typer.Option(
+                "--trace-sample-rate",
+                help=(
+                    "Fraction of the requests that are traced, between 0 and 1. Requests with "
+                    "a traceparent header are traced if their caller sampled them."
+                ),
+                show_default=True,
+            ),
+        ] = DEFAULT_TRACE_SAMPLE_RATE,
+        metrics_port: Annotated[
+            int | None,
+            typer.Option(
+                "--metrics-port",
+                help=(
+                    "Local TCP port where the frontend serves its workers merged metrics "
+                    "in the OpenMetrics format. Disabled by default."
+                ),
+            ),
+        ] = None,
     ):
         """Run the mrok frontend with Gunicorn and Uvicorn workers."""
         frontend.run(
@@ -98,4 +237,15 @@ def register(app: typer.Typer) -> None:
             max_connections=max_connections,
             max_keepalive_connections=max_keepalive_connections,
             keepalive_expiry=keepalive_expiry,
+            response_buffering=response_buffering,
+            response_buffer_memory_size=response_buffer_memory_size,
+            response_buffer_max_size=response_buffer_max_size,
+            response_buffers_memory_limit=response_buffers_memory_limit,
+            request_buffer_size=request_buffer_size,
+            request_buffering=request_buffering,
+            request_buffer_max_size=request_buffer_max_size,
+            expect_continue_timeout=expect_continue_timeout,
+            server_timing=server_timing,
+            tracing=build_tracing_config(trace_exporter, trace_sample_rate, "mrok-frontend"),
+            metrics_port=metrics_port,
         )
@@ -4,6 +4,9 @@ import re
 import typer
 
 from mrok.conf import get_settings
+from mrok.proxy.capture import CaptureConfig
+from mrok.proxy.routes import RoutesConfig
+from mrok.proxy.tracing import TracingConfig
 
 
 def number_of_workers() -> int:
@@ -29,3 +32,60 @@ def validate_instance_id(instance_id: str) -> str:
     return validate_identifier(
         settings.identifiers.instance.regex, settings.identifiers.instance.format, instance_id
     )
+
+
+def build_capture_config(
+    sample_rate: float,
+    methods: list[str] | None,
+    paths: list[str] | None,
+    exclude_paths: list[str] | None,
+    statuses: list[str] | None,
+    headers_only: bool,
+    queue_size: int,
+    queue_overflow: str,
+) -> CaptureConfig:
+    try:
+        return CaptureConfig(
+            sample_rate=sample_rate,
+            methods=tuple(methods or ()),
+            paths=tuple(paths or ()),
+            exclude_paths=tuple(exclude_paths or ()),
+            statuses=tuple(statuses or ()),
+            headers_only=headers_only,
+            queue_size=queue_size,
+            queue_overflow=queue_overflow,  # type: ignore[arg-type]
+        )
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+
+
+def build_routes_config(
+    patterns: list[str] | None,
+    collapse_ids: bool,
+    max_routes: int,
+) -> RoutesConfig:
+    try:
+        return RoutesConfig(
+            patterns=tuple(patterns or ()),
+            collapse_ids=collapse_ids,
+            max_routes=max_routes,
+        )
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+
+
+def build_tracing_config(
+    exporter: str | None,
+    sample_rate: float,
+    service_name: str,
+) -> TracingConfig | None:
+    if not exporter:
+        return None
+    try:
+        return TracingConfig(
+            sample_rate=sample_rate,
+            exporter=exporter,
+            service_name=service_name,
+        )
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
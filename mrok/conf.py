@@ -1,8 +1,14 @@
+import re
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
 from dynaconf import Dynaconf, LazySettings
 
 type Settings = LazySettings
 
-DEFAULT_SETTINGS = {
+DEFAULT_SETTINGS: dict[str, Any] = {
     "LOGGING": {
         "debug": False,
         "rich": False,
@@ -34,16 +40,153 @@ DEFAULT_SETTINGS = {
     },
 }
 
+SETTINGS_FILES = ["settings.yaml", ".secrets.yaml"]
+
 _settings = None
 
 
+def load_settings() -> Settings:
+    settings = Dynaconf(
+        envvar_prefix="MROK",
+        settings_files=SETTINGS_FILES,
+        merge_enabled=True,
+    )
+    settings.configure(**DEFAULT_SETTINGS)
+    return settings
+
+
 def get_settings() -> Settings:
     global _settings
     if not _settings:
-        _settings = Dynaconf(
-            envvar_prefix="MROK",
-            settings_files=["settings.yaml", ".secrets.yaml"],
-            merge_enabled=True,
-        )
-        _settings.configure(**DEFAULT_SETTINGS)
+        _settings = load_settings()
     return _settings
+
+
+class FrozenConfig(Mapping[str, Any]):
+    """
+    Read-only copy of a settings section, accessible by key or attribute.
+
+    Keys are lowercased, like Dynaconf they are case-insensitive: nested keys
+    set through environment variables, e.g. `MROK_FRONTEND__AUTH__BACKENDS`,
+    come in uppercase. Keys named like a Mapping method, e.g. `items`, are only
+    accessible by key.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Mapping[str, Any] | None = None):
+        frozen = {str(key).lower(): _freeze(value) for key, value in (data or {}).items()}
+        # Keys are kept apart from the attributes so that keys like `items` or
+        # `get` don't shadow the Mapping methods.
+        object.__setattr__(self, "_data", MappingProxyType(frozen))
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for names that aren't attributes, e.g. the settings keys.
+        if name == "_data":
+            raise AttributeError(name)
+        try:
+            return self._data[name.lower()]
+        except KeyError:
+            raise AttributeError(f"{type(self).__name__} has no attribute {name!r}") from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key.lower()]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self._data)!r})"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return type(self), (dict(self._data),)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return FrozenConfig(value)
+    if isinstance(value, list | tuple):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class FrontendSettings:
+    domain: str
+    auth_enabled: bool
+    auth: FrozenConfig
+    errors: FrozenConfig
+    headers: FrozenConfig
+
+
+@dataclass(frozen=True, slots=True)
+class SettingsSnapshot:
+    """
+    Immutable, typed view of the settings read on hot paths.
+
+    Build it once with `from_settings` and read it through `get_settings_snapshot`;
+    a reload builds a new snapshot and swaps it in with `set_settings_snapshot`.
+    """
+
+    frontend: FrontendSettings
+    controller_auth: FrozenConfig
+    extension_regex: re.Pattern[str]
+    instance_regex: re.Pattern[str]
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "SettingsSnapshot":
+        frontend = settings.get("frontend", {})
+        domain = frontend.get("domain") or ""
+        if domain and not domain.startswith("."):
+            domain = f".{domain}"
+        auth = frontend.get("auth", {})
+        identifiers = settings.get("identifiers", {})
+        default_identifiers = DEFAULT_SETTINGS["IDENTIFIERS"]
+
+        return cls(
+            frontend=FrontendSettings(
+                domain=domain,
+                auth_enabled=bool(auth.get("enabled", False)),
+                auth=FrozenConfig(auth),
+                errors=FrozenConfig(frontend.get("errors", {})),
+                headers=FrozenConfig(frontend.get("headers", {})),
+            ),
+            controller_auth=FrozenConfig(settings.get("controller", {}).get("auth", {})),
+            extension_regex=re.compile(
+                identifiers.get("extension", default_identifiers["extension"])["regex"]
+            ),
+            instance_regex=re.compile(
+                identifiers.get("instance", default_identifiers["instance"])["regex"]
+            ),
+        )
+
+
+_snapshot: SettingsSnapshot | None = None
+
+
+def get_settings_snapshot() -> SettingsSnapshot:
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = SettingsSnapshot.from_settings(get_settings())
+    return _snapshot
+
+
+def set_settings_snapshot(snapshot: SettingsSnapshot) -> None:
+    """Replace the current snapshot; readers see either the old or the new one."""
+    global _snapshot
+    _snapshot = snapshot
+
+
+def set_settings(settings: Settings, snapshot: SettingsSnapshot | None = None) -> None:
+    global _settings
+    _settings = settings
+    set_settings_snapshot(snapshot or SettingsSnapshot.from_settings(settings))
@@ -3,6 +3,11 @@ import re
 RE_EXTENSION_ID = re.compile(r"(?i)EXT-\d{4}-\d{4}")
 RE_INSTANCE_ID = re.compile(r"(?i)INS-\d{4}-\d{4}-\d{4}")
 
+SCOPE_EXT_REQUEST_BODY = "mrok.request_body"
+SCOPE_EXT_HEADERS = "mrok.headers"
+SCOPE_EXT_AUTH_TIME = "mrok.auth_time"
+SCOPE_EXT_TRACE = "mrok.trace"
+
 
 BINARY_CONTENT_TYPES = {
     "application/octet-stream",
@@ -11,6 +11,7 @@ from mrok.controller.dependencies.auth import build_fastapi_auth_dependencies
 from mrok.controller.openapi import generate_openapi_spec
 from mrok.controller.routes.extensions import router as extensions_router
 from mrok.controller.routes.instances import router as instances_router
+from mrok.watcher import SettingsWatcher
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +41,8 @@ def setup_custom_serialization(router: APIRouter):
 def setup_app(settings: Settings):
     auth_manager = HTTPAuthManager(settings.controller.auth)
     auth_dependency = build_fastapi_auth_dependencies(auth_manager)
+    watcher = SettingsWatcher()
+    watcher.add_listener(lambda snapshot: auth_manager.prepare_reload(snapshot.controller_auth))
     app = FastAPI(
         title="mrok Controller API",
         description="API to orchestrate OpenZiti for Extensions.",
@@ -47,6 +50,7 @@ def setup_app(settings: Settings):
         openapi_tags=tags_metadata,
         version="5.0.0",
         root_path="/public/v1",
+        lifespan=watcher.lifespan,
     )
     fastapi_pagination.add_pagination(app)
 
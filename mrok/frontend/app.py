@@ -1,22 +1,24 @@
-from http import HTTPStatus
-from pathlib import Path
+from collections.abc import Callable
 from typing import Any
 
 from httpcore import AsyncConnectionPool
-from jinja2 import Environment, FileSystemLoader, select_autoescape
 
-from mrok.conf import get_settings
-from mrok.frontend.utils import get_target_name, parse_accept_header
-from mrok.proxy.app import ProxyAppBase
+from mrok.conf import SettingsSnapshot, get_settings_snapshot
+from mrok.frontend.errors import build_error_pages
+from mrok.frontend.utils import get_target_name
+from mrok.proxy.app import DEFAULT_EXPECT_CONTINUE_TIMEOUT, ProxyAppBase
 from mrok.proxy.backend import AIOZitiNetworkBackend
+from mrok.proxy.buffering import (
+    DEFAULT_BUFFER_MAX_SIZE,
+    DEFAULT_BUFFER_MEMORY_SIZE,
+    DEFAULT_BUFFERS_MEMORY_LIMIT,
+    DEFAULT_REQUEST_BUFFER_SIZE,
+)
 from mrok.proxy.exceptions import InvalidTargetError
+from mrok.proxy.headers import RequestHeaders
+from mrok.proxy.tracing import TracingConfig
 from mrok.types.proxy import ASGIReceive, ASGISend, Scope
 
-ERROR_TEMPLATE_FORMATS = {
-    "application/json": "json",
-    "text/html": "html",
-}
-
 
 class FrontendProxyApp(ProxyAppBase):
     def __init__(
@@ -27,16 +29,57 @@ class FrontendProxyApp(ProxyAppBase):
         max_keepalive_connections: int | None = None,
         keepalive_expiry: float | None = None,
         retries: int = 0,
+        response_buffering: bool = False,
+        response_buffer_memory_size: int = DEFAULT_BUFFER_MEMORY_SIZE,
+        response_buffer_max_size: int | None = DEFAULT_BUFFER_MAX_SIZE,
+        response_buffers_memory_limit: int | None = DEFAULT_BUFFERS_MEMORY_LIMIT,
+        request_buffer_size: int = DEFAULT_REQUEST_BUFFER_SIZE,
+        request_buffering: bool = False,
+        request_buffer_max_size: int | None = DEFAULT_BUFFER_MAX_SIZE,
+        expect_continue_timeout: float = DEFAULT_EXPECT_CONTINUE_TIMEOUT,
+        server_timing: bool = False,
+        tracing: TracingConfig | None = None,
     ):
         self._identity_file = identity_file
-        self._jinja_env_cache: dict[Path, Environment] = {}
-        self._templates_by_error = get_settings().frontend.get("errors", {})
+        settings = get_settings_snapshot()
+        self._error_pages = build_error_pages(settings.frontend.errors, strict=False)
+        header_rules = settings.frontend.headers
         super().__init__(
             max_connections=max_connections,
             max_keepalive_connections=max_keepalive_connections,
             keepalive_expiry=keepalive_expiry,
             retries=retries,
+            response_buffering=response_buffering,
+            response_buffer_memory_size=response_buffer_memory_size,
+            response_buffer_max_size=response_buffer_max_size,
+            response_buffers_memory_limit=response_buffers_memory_limit,
+            request_buffer_size=request_buffer_size,
+            request_buffering=request_buffering,
+            request_buffer_max_size=request_buffer_max_size,
+            expect_continue_timeout=expect_continue_timeout,
+            server_timing=server_timing,
+            tracing=tracing,
+            request_header_rules=header_rules.get("request", []),
+            response_header_rules=header_rules.get("response", []),
+        )
+
+    def prepare_settings_reload(self, settings: SettingsSnapshot) -> Callable[[], None]:
+        """
+        Compile the header rules and the error templates of `settings`,
+        return a callable that swaps them in. The connection pool is kept.
+        """
+        header_rules = settings.frontend.headers
+        request_headers, response_headers = self._create_header_rewriters(
+            header_rules.get("request", []), header_rules.get("response", [])
         )
+        error_pages = build_error_pages(settings.frontend.errors, strict=True)
+
+        def apply() -> None:
+            self._error_pages = error_pages
+            self._request_headers = request_headers
+            self._response_headers = response_headers
+
+        return apply
 
     def setup_connection_pool(
         self,
@@ -50,13 +93,11 @@ class FrontendProxyApp(ProxyAppBase):
             max_keepalive_connections=max_keepalive_connections,
             keepalive_expiry=keepalive_expiry,
             retries=retries,
-            network_backend=AIOZitiNetworkBackend(self._identity_file),
+            network_backend=AIOZitiNetworkBackend(self._identity_file, on_dial=self._on_dial),
         )
 
     def get_upstream_base_url(self, scope: Scope) -> str:
-        target = get_target_name(
-            {k.decode("latin1"): v.decode("latin1") for k, v in scope.get("headers", {})}
-        )
+        target = RequestHeaders.from_scope(scope).get_target(get_target_name)
         if not target:
             raise InvalidTargetError()
 
@@ -67,53 +108,30 @@ class FrontendProxyApp(ProxyAppBase):
         scope: Scope,
         send: ASGISend,
         http_status: int,
-        body: str,
+        body: str | bytes,
         headers: list[tuple[bytes, bytes]] | None = None,
     ):
-        request_headers = {
-            k.decode("latin1"): v.decode("latin1") for k, v in scope.get("headers", {})
-        }
-        accept_header = request_headers.get("accept")
-        if not (accept_header and str(http_status) in self._templates_by_error):
+        request_headers = RequestHeaders.from_scope(scope)
+        pages = self._error_pages.get(http_status)
+        if not (pages and request_headers.get("accept")):
             return await super().send_error_response(scope, send, http_status, body)
 
-        available_templates = self._templates_by_error[str(http_status)]
-
-        media_types = parse_accept_header(accept_header)
-        for media_type in media_types:
-            template_format = ERROR_TEMPLATE_FORMATS.get(media_type)
-            if template_format and template_format in available_templates:
-                template_path = available_templates[template_format]
-                rendered = await self._render_error_template(
-                    Path(template_path), scope, http_status, body
-                )
+        for media_type in request_headers.accept:
+            page = pages.get(media_type)
+            if page:
+                request = self._extract_request_context(scope) if page.needs_request else None
                 return await super().send_error_response(
                     scope,
                     send,
                     http_status,
-                    rendered,
-                    headers=[(b"content-type", media_type.encode("latin-1"))],
+                    page.render(body.decode() if isinstance(body, bytes) else body, request),
+                    headers=page.headers,
                 )
 
         return await super().send_error_response(scope, send, http_status, body)
 
-    async def _render_error_template(
-        self, template_path: Path, scope: Scope, http_status: int, body: str
-    ) -> str:
-        env = self._get_jinja_env(template_path)
-        template = env.get_template(template_path.name)
-        status_title = HTTPStatus(http_status).name.replace("_", " ").title()
-        context = {
-            "status": http_status,
-            "status_title": status_title,
-            "body": body,
-            "request": self._extract_request_context(scope),
-        }
-
-        return await template.render_async(context)
-
     def _extract_request_context(self, scope: Scope) -> dict[str, Any]:
-        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        headers = RequestHeaders.from_scope(scope).index
 
         return {
             "method": scope.get("method"),
@@ -127,23 +145,8 @@ class FrontendProxyApp(ProxyAppBase):
             "http_version": scope.get("http_version"),
         }
 
-    def _get_jinja_env(self, template_path: Path) -> Environment:
-        template_dir = template_path.parent
-
-        if template_dir not in self._jinja_env_cache:
-            self._jinja_env_cache[template_dir] = Environment(
-                loader=FileSystemLoader(str(template_dir)),
-                autoescape=select_autoescape(
-                    enabled_extensions=("html", "xml"),
-                    default_for_string=False,
-                ),
-                enable_async=True,
-            )
-
-        return self._jinja_env_cache[template_dir]
-
     async def __call__(self, scope: Scope, receive: ASGIReceive, send: ASGISend) -> None:
-        is_auth_enabled = get_settings().frontend.auth.enabled
+        is_auth_enabled = get_settings_snapshot().frontend.auth_enabled
         if is_auth_enabled and scope.get("type") == "http" and "identity" not in scope:
             return await super().send_error_response(scope, send, 401, "Unauthenticated")
         return await super().__call__(scope, receive, send)
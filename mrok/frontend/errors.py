@@ -0,0 +1,110 @@
+import logging
+from collections.abc import Mapping
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any
+
+from jinja2 import Environment, FileSystemLoader, meta, select_autoescape
+from markupsafe import escape
+
+logger = logging.getLogger("mrok.proxy")
+
+ERROR_TEMPLATE_FORMATS = {
+    "application/json": "json",
+    "text/html": "html",
+}
+
+_BODY_MARKER = "\x00mrok-error-body\x00"
+_BODY_PROBE = "probe <&\"'>"
+
+ErrorPages = dict[int, dict[str, "ErrorPage"]]
+
+
+class ErrorPage:
+    """
+    An error template compiled for one status code and media type.
+
+    Templates that don't use the request are rendered once with a marker in
+    place of the body and split around it, so that rendering a page only
+    takes escaping the body and joining it with the pre-rendered parts.
+    Other templates are rendered on every call.
+    """
+
+    def __init__(self, env: Environment, template_name: str, status: int, media_type: str):
+        self.headers = [(b"content-type", media_type.encode("latin-1"))]
+        self._template = env.get_template(template_name)
+        self._context = {
+            "status": status,
+            "status_title": HTTPStatus(status).name.replace("_", " ").title(),
+        }
+        autoescape = env.autoescape
+        self._autoescape = autoescape(template_name) if callable(autoescape) else autoescape
+
+        source, _, _ = env.loader.get_source(env, template_name)  # type: ignore[union-attr]
+        variables = meta.find_undeclared_variables(env.parse(source))
+        self.needs_request = "request" in variables
+        self._parts = None if self.needs_request else self._split()
+
+    @property
+    def is_static(self) -> bool:
+        return self._parts is not None
+
+    def render(self, body: str, request: Mapping[str, Any] | None = None) -> bytes:
+        if self._parts is not None:
+            return self._interpolate(self._parts, body)
+        return self._template.render(self._context, body=body, request=request).encode()
+
+    def _split(self) -> tuple[bytes, ...] | None:
+        rendered = self._template.render(self._context, body=_BODY_MARKER)
+        parts = tuple(part.encode() for part in rendered.split(_BODY_MARKER))
+        if len(parts) < 2:
+            return None
+        # Templates that transform the body (filters, tests...) can't be split.
+        for probe in (_BODY_PROBE, ""):
+            expected = self._template.render(self._context, body=probe).encode()
+            if self._interpolate(parts, probe) != expected:
+                return None
+        return parts
+
+    def _interpolate(self, parts: tuple[bytes, ...], body: str) -> bytes:
+        value = str(escape(body)) if self._autoescape else body
+        return value.encode().join(parts)
+
+
+def create_jinja_env(template_dir: Path) -> Environment:
+    return Environment(
+        loader=FileSystemLoader(str(template_dir)),
+        autoescape=select_autoescape(
+            enabled_extensions=("html", "xml"),
+            default_for_string=False,
+        ),
+    )
+
+
+def build_error_pages(errors: Mapping[str, Mapping[str, str]], *, strict: bool) -> ErrorPages:
+    """
+    Compile the error templates configured in the `frontend.errors` settings,
+    by status code and media type.
+
+    Templates that can't be loaded raise if `strict` is set and are skipped
+    with an error logged otherwise.
+    """
+    envs: dict[Path, Environment] = {}
+    pages: ErrorPages = {}
+    for status, templates in errors.items():
+        for media_type, template_format in ERROR_TEMPLATE_FORMATS.items():
+            if template_format not in templates:
+                continue
+            template_path = Path(templates[template_format])
+            try:
+                if template_path.parent not in envs:
+                    envs[template_path.parent] = create_jinja_env(template_path.parent)
+                code = int(status)
+                page = ErrorPage(envs[template_path.parent], template_path.name, code, media_type)
+            except Exception:
+                if strict:
+                    raise
+                logger.exception(f"Cannot load the {status} error template {template_path}")
+                continue
+            pages.setdefault(code, {})[media_type] = page
+    return pages
@@ -1,3 +1,4 @@
+import tempfile
 from pathlib import Path
 from typing import Any
 
@@ -5,11 +6,29 @@ from gunicorn.app.base import BaseApplication
 from uvicorn_worker import UvicornWorker
 
 from mrok.authentication import HTTPAuthManager
-from mrok.conf import get_settings
+from mrok.conf import FrozenConfig, SettingsSnapshot, get_settings, get_settings_snapshot
 from mrok.frontend.app import FrontendProxyApp
-from mrok.frontend.middleware import ASGIAuthenticationMiddleware, HealthCheckMiddleware
+from mrok.frontend.metrics import MetricsExporter, WorkerMetricsWriter
+from mrok.frontend.middleware import (
+    ASGIAuthenticationMiddleware,
+    HealthCheckMiddleware,
+    TracingMiddleware,
+)
 from mrok.logging import get_logging_config
-from mrok.proxy.asgi import ASGIAppWrapper
+from mrok.proxy.app import DEFAULT_EXPECT_CONTINUE_TIMEOUT
+from mrok.proxy.asgi import ASGIAppWrapper, combine_lifespans
+from mrok.proxy.buffering import (
+    DEFAULT_BUFFER_MAX_SIZE,
+    DEFAULT_BUFFER_MEMORY_SIZE,
+    DEFAULT_BUFFERS_MEMORY_LIMIT,
+    DEFAULT_REQUEST_BUFFER_SIZE,
+)
+from mrok.proxy.tracing import TracingConfig
+from mrok.watcher import SettingsWatcher
+
+
+def get_auth_settings(settings: SettingsSnapshot) -> FrozenConfig:
+    return settings.frontend.auth if settings.frontend.auth_enabled else FrozenConfig()
 
 
 class MrokUvicornWorker(UvicornWorker):
@@ -31,20 +50,46 @@ class StandaloneApplication(BaseApplication):  # pragma: no cover
             self.cfg.set(key.lower(), value)
 
     def load(self):
-        settings = get_settings()
+        settings = get_settings_snapshot()
         frontend_app = FrontendProxyApp(
             str(self.options["mrok"]["identity_file"]),
             max_connections=self.options["mrok"]["max_connections"],
             max_keepalive_connections=self.options["mrok"]["max_keepalive_connections"],
             keepalive_expiry=self.options["mrok"]["keepalive_expiry"],
+            response_buffering=self.options["mrok"]["response_buffering"],
+            response_buffer_memory_size=self.options["mrok"]["response_buffer_memory_size"],
+            response_buffer_max_size=self.options["mrok"]["response_buffer_max_size"],
+            response_buffers_memory_limit=self.options["mrok"]["response_buffers_memory_limit"],
+            request_buffer_size=self.options["mrok"]["request_buffer_size"],
+            request_buffering=self.options["mrok"]["request_buffering"],
+            request_buffer_max_size=self.options["mrok"]["request_buffer_max_size"],
+            expect_continue_timeout=self.options["mrok"]["expect_continue_timeout"],
+            server_timing=self.options["mrok"]["server_timing"],
+            tracing=self.options["mrok"]["tracing"],
         )
-        app = ASGIAppWrapper(frontend_app)
-        app.add_middleware(HealthCheckMiddleware)
-        if settings.frontend.auth.enabled:
-            app.add_middleware(
-                ASGIAuthenticationMiddleware,
-                auth_manager=HTTPAuthManager(settings.frontend.auth),
+        # Authentication is always wired so that it can be enabled by a settings reload,
+        # requests go straight through while no backends are configured.
+        auth_manager = HTTPAuthManager(get_auth_settings(settings))
+        watcher = SettingsWatcher()
+        watcher.add_listener(frontend_app.prepare_settings_reload)
+        watcher.add_listener(
+            lambda snapshot: auth_manager.prepare_reload(get_auth_settings(snapshot))
+        )
+        app = ASGIAppWrapper(
+            frontend_app, lifespan=combine_lifespans(watcher.lifespan, frontend_app.lifespan)
+        )
+        metrics_dir = self.options["mrok"].get("metrics_dir")
+        if metrics_dir:
+            metrics = WorkerMetricsWriter(metrics_dir)
+            metrics.setup(app, frontend_app)
+            app.lifespan = combine_lifespans(
+                watcher.lifespan, frontend_app.lifespan, metrics.lifespan
             )
+        app.add_middleware(HealthCheckMiddleware)
+        app.add_middleware(ASGIAuthenticationMiddleware, auth_manager=auth_manager)
+        if self.options["mrok"]["tracing"] is not None:
+            # Outermost, authentication is only timed for the sampled requests.
+            app.add_middleware(TracingMiddleware, proxy_app=frontend_app)
         return app
 
 
@@ -57,8 +102,19 @@ def run(
     max_connections: int | None,
     max_keepalive_connections: int | None,
     keepalive_expiry: float | None,
+    response_buffering: bool = False,
+    response_buffer_memory_size: int = DEFAULT_BUFFER_MEMORY_SIZE,
+    response_buffer_max_size: int | None = DEFAULT_BUFFER_MAX_SIZE,
+    response_buffers_memory_limit: int | None = DEFAULT_BUFFERS_MEMORY_LIMIT,
+    request_buffer_size: int = DEFAULT_REQUEST_BUFFER_SIZE,
+    request_buffering: bool = False,
+    request_buffer_max_size: int | None = DEFAULT_BUFFER_MAX_SIZE,
+    expect_continue_timeout: float = DEFAULT_EXPECT_CONTINUE_TIMEOUT,
+    server_timing: bool = False,
+    tracing: TracingConfig | None = None,
+    metrics_port: int | None = None,
 ):
-    options = {
+    options: dict[str, Any] = {
         "bind": f"{host}:{port}",
         "workers": workers,
         "worker_class": "mrok.frontend.main.MrokUvicornWorker",
@@ -69,7 +125,25 @@ def run(
             "max_connections": max_connections,
             "max_keepalive_connections": max_keepalive_connections,
             "keepalive_expiry": keepalive_expiry,
+            "response_buffering": response_buffering,
+            "response_buffer_memory_size": response_buffer_memory_size,
+            "response_buffer_max_size": response_buffer_max_size,
+            "response_buffers_memory_limit": response_buffers_memory_limit,
+            "request_buffer_size": request_buffer_size,
+            "request_buffering": request_buffering,
+            "request_buffer_max_size": request_buffer_max_size,
+            "expect_continue_timeout": expect_continue_timeout,
+            "server_timing": server_timing,
+            "tracing": tracing,
         },
     }
+    if metrics_port is not None:
+        metrics_dir = tempfile.mkdtemp(prefix="mrok-metrics-")
+        exporter = MetricsExporter(metrics_dir, port=metrics_port)
+        options["mrok"]["metrics_dir"] = metrics_dir
+        options["when_ready"] = exporter.when_ready
+        options["post_fork"] = exporter.post_fork
+        options["child_exit"] = exporter.child_exit
+        options["on_exit"] = exporter.on_exit
 
     StandaloneApplication(options).run()
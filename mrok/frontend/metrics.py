@@ -0,0 +1,107 @@
+"""
+Metrics of the frontend gunicorn workers.
+
+Each worker periodically writes a snapshot of its metrics to a directory shared
+with the gunicorn master, which merges the snapshots of the running workers and
+serves them in the OpenMetrics format. The snapshots of the exited workers are
+removed by the master, so the directory holds only those of the running ones.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+from mrok.proxy.aggregator import MetricsAggregator
+from mrok.proxy.app import ProxyAppBase
+from mrok.proxy.asgi import ASGIAppWrapper
+from mrok.proxy.metrics import MetricsCollector
+from mrok.proxy.middleware import MetricsMiddleware
+from mrok.proxy.models import AgentMetrics, WorkerMetrics
+from mrok.proxy.openmetrics import MetricsServer
+
+logger = logging.getLogger("mrok.proxy")
+
+METRICS_FLUSH_INTERVAL = 5.0
+
+
+def get_snapshot_path(directory: Path, pid: int) -> Path:
+    return directory / f"{pid}.json"
+
+
+class WorkerMetricsWriter:
+    """Write the metrics of this worker every `flush_interval` seconds."""
+
+    def __init__(self, directory: str | Path, flush_interval: float = METRICS_FLUSH_INTERVAL):
+        self.collector = MetricsCollector(str(os.getpid()))
+        self._path = get_snapshot_path(Path(directory), os.getpid())
+        self._flush_interval = flush_interval
+
+    def setup(self, app: ASGIAppWrapper, proxy_app: ProxyAppBase) -> None:
+        app.add_middleware(MetricsMiddleware, self.collector)  # type: ignore
+        proxy_app.instrument(self.collector)
+
+    async def flush(self) -> None:
+        snapshot = await self.collector.snapshot()
+        tmp_path = self._path.with_suffix(".tmp")
+        tmp_path.write_text(snapshot.model_dump_json())
+        # Readers never see a partially written snapshot.
+        os.replace(tmp_path, self._path)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Cannot write the worker metrics: {e}")
+            await asyncio.sleep(self._flush_interval)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(self, app: Any):
+        task = asyncio.create_task(self.run())
+        try:
+            yield
+        finally:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+
+class MetricsExporter:
+    """
+    Serve the merged metrics of the gunicorn workers from the gunicorn master.
+
+    `when_ready`, `post_fork`, `child_exit` and `on_exit` are gunicorn server
+    hooks. The metrics are served from a thread of the master, which only reads
+    the snapshots directory and never the worker table of the arbiter.
+    """
+
+    def __init__(self, directory: str | Path, *, host: str = "127.0.0.1", port: int = 9090):
+        self.directory = Path(directory)
+        self.server = MetricsServer(self.collect, host=host, port=port)
+        self._aggregator = MetricsAggregator()
+
+    def collect(self) -> AgentMetrics | None:
+        workers = []
+        for path in self.directory.glob("*.json"):
+            with contextlib.suppress(FileNotFoundError):
+                workers.append(WorkerMetrics.model_validate_json(path.read_bytes()))
+        return self._aggregator.merge(workers) if workers else None
+
+    def when_ready(self, server: Any) -> None:
+        self.server.start()
+
+    def post_fork(self, server: Any, worker: Any) -> None:
+        self.server.close_after_fork()
+
+    def child_exit(self, server: Any, worker: Any) -> None:
+        path = get_snapshot_path(self.directory, worker.pid)
+        path.unlink(missing_ok=True)
+        path.with_suffix(".tmp").unlink(missing_ok=True)
+
+    def on_exit(self, server: Any) -> None:
+        self.server.stop()
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -1,7 +1,11 @@
 import json
+import time
 
 from mrok.authentication import HTTPAuthManager
+from mrok.constants import SCOPE_EXT_AUTH_TIME, SCOPE_EXT_TRACE
 from mrok.frontend.utils import get_target_name
+from mrok.proxy.app import ProxyAppBase
+from mrok.proxy.headers import RequestHeaders
 from mrok.types.proxy import ASGIApp, ASGIReceive, ASGISend, Scope
 
 
@@ -11,9 +15,7 @@ class HealthCheckMiddleware:
 
     async def __call__(self, scope: Scope, receive: ASGIReceive, send: ASGISend):
         if scope["type"] == "http" and scope["path"] == "/healthcheck":
-            target = get_target_name(
-                {k.decode("latin1"): v.decode("latin1") for k, v in scope.get("headers", {})}
-            )
+            target = RequestHeaders.from_scope(scope).get_target(get_target_name)
 
             if not target:
                 await send(
@@ -36,13 +38,35 @@ class HealthCheckMiddleware:
         await self.app(scope, receive, send)
 
 
+class TracingMiddleware:
+    """Take the sampling decision of the requests before they are authenticated."""
+
+    def __init__(self, app: ASGIApp, proxy_app: ProxyAppBase):
+        self.app = app
+        self.proxy_app = proxy_app
+
+    async def __call__(self, scope: Scope, receive: ASGIReceive, send: ASGISend):
+        if scope["type"] == "http":
+            self.proxy_app.start_trace(scope)
+        await self.app(scope, receive, send)
+
+
 class ASGIAuthenticationMiddleware:
     def __init__(self, app, auth_manager: HTTPAuthManager):
         self.app = app
         self.auth_manager = auth_manager
 
     async def __call__(self, scope, receive, send):
-        identity = await self.auth_manager(scope)
+        if not self.auth_manager.active_backends:
+            return await self.app(scope, receive, send)
+
+        if scope.get("extensions", {}).get(SCOPE_EXT_TRACE) is None:
+            identity = await self.auth_manager(scope)
+        else:
+            start = time.perf_counter()
+            identity = await self.auth_manager(scope)
+            # Reported as the `auth` span of the trace, see `mrok.proxy.tracing`.
+            scope["extensions"][SCOPE_EXT_AUTH_TIME] = (start, time.perf_counter())
         if identity:
             scope["identity"] = identity
         return await self.app(scope, receive, send)
@@ -1,62 +1,8 @@
-import re
-
-from mrok.conf import get_settings
-
-
-def parse_accept_header(accept: str | None) -> list[str]:
-    if not accept:
-        return ["*/*"]
-
-    result: list[tuple[str, float, int]] = []
-
-    for index, item in enumerate(accept.split(",")):
-        item = item.strip()
-        if not item:
-            continue
-
-        parts = [p.strip() for p in item.split(";")]
-        media_type = parts[0].lower()
-
-        q = 1.0
-        for param in parts[1:]:
-            if param.startswith("q="):
-                try:
-                    q = float(param[2:])
-                except ValueError:
-                    q = 0.0
-
-        result.append((media_type, q, index))
-
-    # Sort by:
-    # 1) q value (desc)
-    # 2) specificity (more specific first)
-    # 3) original order (stable)
-    result.sort(
-        key=lambda x: (
-            -x[1],
-            -_media_type_specificity(x[0]),
-            x[2],
-        )
-    )
-
-    return [media_type for media_type, _, _ in result]
-
-
-def _media_type_specificity(media_type: str) -> int:
-    if media_type == "*/*":
-        return 0
-    if media_type.endswith("/*"):
-        return 1
-    return 2
+from mrok.conf import get_settings_snapshot
 
 
 def get_frontend_domain():
-    settings = get_settings()
-    return (
-        settings.frontend.domain
-        if settings.frontend.domain[0] == "."
-        else f".{settings.frontend.domain}"
-    )
+    return get_settings_snapshot().frontend.domain
 
 
 def _get_target_from_header(headers: dict[str, str], name: str) -> str | None:
@@ -69,15 +15,14 @@ def _get_target_from_header(headers: dict[str, str], name: str) -> str | None:
 
 
 def get_target_name(headers: dict[str, str]) -> str | None:
-    settings = get_settings()
+    settings = get_settings_snapshot()
 
     target = _get_target_from_header(headers, "x-forwarded-host")
     if not target:
         target = _get_target_from_header(headers, "host")
 
     if target and (
-        re.fullmatch(settings.identifiers.extension.regex, target)
-        or re.fullmatch(settings.identifiers.instance.regex, target)
+        settings.extension_regex.fullmatch(target) or settings.instance_regex.fullmatch(target)
     ):
         return target
     return None
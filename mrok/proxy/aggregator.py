@@ -0,0 +1,202 @@
+import math
+import time
+from collections import Counter
+from collections.abc import Iterable
+
+from hdrh.histogram import HdrHistogram
+
+from mrok.proxy.autoscaler import AUTOSCALE_WINDOW
+from mrok.proxy.metrics import (
+    LIFETIME_HISTOGRAM,
+    PHASE_HISTOGRAM_ARGS,
+    ROUTE_HISTOGRAM_ARGS,
+    get_response_time_metrics,
+)
+from mrok.proxy.models import (
+    AgentMetrics,
+    AgentStatus,
+    CaptureMetrics,
+    DataTransferMetrics,
+    DialMetrics,
+    ImbalanceMetrics,
+    PoolMetrics,
+    ProcessMetrics,
+    RequestBodyMetrics,
+    RequestsMetrics,
+    RouteMetrics,
+    Status,
+    WorkerMetrics,
+)
+from mrok.proxy.routes import DEFAULT_MAX_ROUTES, OTHER_ROUTE
+from mrok.proxy.timing import UPSTREAM_PHASES
+
+AGENT_WORKER_ID = "agent"
+
+
+def get_imbalance(values: list[float]) -> float:
+    mean = sum(values) / len(values)
+    return round(max(values) / mean, 2) if mean > 0 else 1.0
+
+
+class MetricsAggregator:
+    """
+    Merge the metrics published by the workers of an agent.
+
+    Counters are summed and the response time percentiles are computed from the
+    merged worker histograms, so they are the percentiles of all the requests
+    served by the agent rather than an average of per worker percentiles.
+    Metrics older than `metrics_max_age` seconds are left out.
+
+    Workers may have seen different routes, only the `max_routes` busiest ones
+    are kept and the others are merged into the `other` route.
+    """
+
+    def __init__(
+        self,
+        lowest=1,
+        highest=60000,
+        sigfigs=3,
+        metrics_max_age: float = 30.0,
+        max_routes: int = DEFAULT_MAX_ROUTES,
+    ):
+        self._args = (lowest, highest, sigfigs)
+        self.metrics_max_age = metrics_max_age
+        self.max_routes = max_routes
+        self._statuses: dict[str, tuple[float, Status]] = {}
+
+    def observe(self, status: Status, now: float | None = None) -> None:
+        self._statuses[status.metrics.worker_id] = (
+            time.monotonic() if now is None else now,
+            status,
+        )
+
+    def forget(self, worker_id: str) -> None:
+        self._statuses.pop(worker_id, None)
+
+    def _merge_histograms(
+        self, encodings: Iterable[str], args: tuple[int, int, int] | None = None
+    ) -> HdrHistogram:
+        merged = HdrHistogram(*(args or self._args))
+        for encoded in encodings:
+            if encoded:
+                merged.decode_and_add(encoded.encode("ascii"))
+        return merged
+
+    def _merge_routes(self, workers: list[WorkerMetrics]) -> dict[str, RouteMetrics]:
+        requests: dict[str, Counter[str]] = {}
+        encodings: dict[str, list[str]] = {}
+        for m in workers:
+            for route, route_metrics in m.routes.items():
+                requests.setdefault(route, Counter()).update(route_metrics.requests)
+                encodings.setdefault(route, []).append(route_metrics.histogram)
+        routes = sorted(
+            (route for route in requests if route != OTHER_ROUTE),
+            key=lambda route: requests[route].total(),
+            reverse=True,
+        )
+        for route in routes[self.max_routes :]:
+            requests.setdefault(OTHER_ROUTE, Counter()).update(requests.pop(route))
+            encodings.setdefault(OTHER_ROUTE, []).extend(encodings.pop(route))
+        merged = {}
+        for route, counts in requests.items():
+            hist = self._merge_histograms(encodings[route], ROUTE_HISTOGRAM_ARGS)
+            merged[route] = RouteMetrics(
+                requests=dict(counts),
+                response_time=get_response_time_metrics(hist),
+                histogram=hist.encode().decode("ascii"),
+            )
+        return merged
+
+    def aggregate(self, worker_ids: Iterable[str], now: float | None = None) -> AgentStatus | None:
+        """Status of the agent, `None` if none of the workers has fresh metrics."""
+        now = time.monotonic() if now is None else now
+        fresh: list[Status] = []
+        for worker_id in worker_ids:
+            observed_at, status = self._statuses.get(worker_id, (-math.inf, None))
+            if status is not None and now - observed_at <= self.metrics_max_age:
+                fresh.append(status)
+        if not fresh:
+            return None
+        return AgentStatus(meta=fresh[0].meta, metrics=self.merge([s.metrics for s in fresh]))
+
+    def merge(self, workers: list[WorkerMetrics]) -> AgentMetrics:
+        """Merge the metrics of one or more workers."""
+        histograms = {
+            name: self._merge_histograms(m.response_time_histograms.get(name, "") for m in workers)
+            for name in (LIFETIME_HISTOGRAM, *workers[0].response_time_windows)
+        }
+        dial_times = self._merge_histograms(m.dials.histogram for m in workers)
+        phases = {
+            phase: self._merge_histograms(
+                (m.upstream_phase_histograms.get(phase, "") for m in workers),
+                PHASE_HISTOGRAM_ARGS,
+            )
+            for phase in UPSTREAM_PHASES
+            if any(phase in m.upstream_phase_histograms for m in workers)
+        }
+        dials = sum(m.dials.total for m in workers)
+        return AgentMetrics(
+            worker_id=AGENT_WORKER_ID,
+            workers=len(workers),
+            process=ProcessMetrics(
+                cpu=sum(m.process.cpu for m in workers),
+                mem=sum(m.process.mem for m in workers),
+            ),
+            requests=RequestsMetrics(
+                rps=sum(m.requests.rps for m in workers),
+                total=sum(m.requests.total for m in workers),
+                successful=sum(m.requests.successful for m in workers),
+                failed=sum(m.requests.failed for m in workers),
+            ),
+            data_transfer=DataTransferMetrics(
+                bytes_in=sum(m.data_transfer.bytes_in for m in workers),
+                bytes_out=sum(m.data_transfer.bytes_out for m in workers),
+            ),
+            response_time=get_response_time_metrics(histograms[LIFETIME_HISTOGRAM]),
+            response_time_windows={
+                name: get_response_time_metrics(hist)
+                for name, hist in histograms.items()
+                if name != LIFETIME_HISTOGRAM
+            },
+            response_time_histograms={
+                name: hist.encode().decode("ascii") for name, hist in histograms.items()
+            },
+            request_bodies=RequestBodyMetrics(
+                **{
+                    mode: sum(getattr(m.request_bodies, mode) for m in workers)
+                    for mode in RequestBodyMetrics.model_fields
+                }
+            ),
+            statuses=dict(sum((Counter(m.statuses) for m in workers), Counter())),
+            routes=self._merge_routes(workers),
+            capture=CaptureMetrics(
+                queued=sum(m.capture.queued for m in workers),
+                dropped=sum(m.capture.dropped for m in workers),
+            ),
+            pool=PoolMetrics(
+                connections=sum(m.pool.connections for m in workers),
+                idle=sum(m.pool.idle for m in workers),
+                pending=sum(m.pool.pending for m in workers),
+            ),
+            dials=DialMetrics(
+                total=dials,
+                failed=sum(m.dials.failed for m in workers),
+                histogram=dial_times.encode().decode("ascii") if dials else "",
+            ),
+            upstream_phases={
+                phase: get_response_time_metrics(hist) for phase, hist in phases.items()
+            },
+            upstream_phase_histograms={
+                phase: hist.encode().decode("ascii") for phase, hist in phases.items()
+            },
+            imbalance=ImbalanceMetrics(
+                rps=get_imbalance([m.requests.rps for m in workers]),
+                cpu=get_imbalance([m.process.cpu for m in workers]),
+                p99=get_imbalance(
+                    [
+                        m.response_time_windows.get(AUTOSCALE_WINDOW, m.response_time).p99
+                        for m in workers
+                    ]
+                ),
+            ),
+        )
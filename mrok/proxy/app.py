@@ -1,25 +1,34 @@
 import abc
+import contextlib
 import logging
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Mapping
+from typing import Any
 
-from httpcore import AsyncConnectionPool, Request
+from httpcore import AsyncConnectionPool, Request, Response
 
+from mrok.constants import SCOPE_EXT_REQUEST_BODY, SCOPE_EXT_TRACE
+from mrok.proxy.buffering import (
+    DEFAULT_BUFFER_MAX_SIZE,
+    DEFAULT_BUFFER_MEMORY_SIZE,
+    DEFAULT_BUFFERS_MEMORY_LIMIT,
+    DEFAULT_REQUEST_BUFFER_SIZE,
+    BufferMemoryBudget,
+    SpooledBodyBuffer,
+)
 from mrok.proxy.exceptions import ProxyError
-from mrok.proxy.stream import ASGIRequestBodyStream
+from mrok.proxy.headers import HeaderRewriter, HeaderRule
+from mrok.proxy.metrics import MetricsCollector
+from mrok.proxy.stream import ASGIRequestBodyStream, ExpectContinue, chain_body
+from mrok.proxy.timing import UpstreamTimings
+from mrok.proxy.tracing import Trace, Tracer, TracingConfig
 from mrok.types.proxy import ASGIReceive, ASGISend, Scope
 
 logger = logging.getLogger("mrok.proxy")
 
+DEFAULT_EXPECT_CONTINUE_TIMEOUT = 1.0
 
-HOP_BY_HOP_HEADERS = [
-    b"connection",
-    b"keep-alive",
-    b"proxy-authenticate",
-    b"proxy-authorization",
-    b"te",
-    b"trailers",
-    b"transfer-encoding",
-    b"upgrade",
-]
+# Upstreams are always reached through https from the client perspective.
+FORWARDED_HEADER_RULES = (HeaderRule(action="set", name="x-forwarded-proto", value="https"),)
 
 
 class ProxyAppBase(abc.ABC):
@@ -30,7 +39,33 @@ class ProxyAppBase(abc.ABC):
         max_keepalive_connections: int | None = None,
         keepalive_expiry: float | None = None,
         retries: int = 0,
+        response_buffering: bool = False,
+        response_buffer_memory_size: int = DEFAULT_BUFFER_MEMORY_SIZE,
+        response_buffer_max_size: int | None = DEFAULT_BUFFER_MAX_SIZE,
+        response_buffers_memory_limit: int | None = DEFAULT_BUFFERS_MEMORY_LIMIT,
+        request_buffer_size: int = DEFAULT_REQUEST_BUFFER_SIZE,
+        request_buffering: bool = False,
+        request_buffer_max_size: int | None = DEFAULT_BUFFER_MAX_SIZE,
+        expect_continue_timeout: float = DEFAULT_EXPECT_CONTINUE_TIMEOUT,
+        server_timing: bool = False,
+        tracing: TracingConfig | None = None,
+        request_header_rules: Iterable[HeaderRule | Mapping[str, Any]] = (),
+        response_header_rules: Iterable[HeaderRule | Mapping[str, Any]] = (),
     ) -> None:
+        self._request_headers, self._response_headers = self._create_header_rewriters(
+            request_header_rules, response_header_rules
+        )
+        self._expect_continue_timeout = expect_continue_timeout
+        self._server_timing = server_timing
+        self._tracer = Tracer(tracing) if tracing is not None else None
+        self._request_buffer_size = request_buffer_size
+        self._request_buffering = request_buffering
+        self._request_buffer_max_size = request_buffer_max_size
+        self._response_buffering = response_buffering
+        self._response_buffer_memory_size = response_buffer_memory_size
+        self._response_buffer_max_size = response_buffer_max_size
+        self._response_buffers_budget = BufferMemoryBudget(response_buffers_memory_limit)
+        self._metrics: MetricsCollector | None = None
         self._pool = self.setup_connection_pool(
             max_connections=max_connections,
             max_keepalive_connections=max_keepalive_connections,
@@ -48,10 +83,44 @@ class ProxyAppBase(abc.ABC):
     ) -> AsyncConnectionPool:
         raise NotImplementedError()
 
+    def instrument(self, metrics: MetricsCollector) -> None:
+        """
+        Report the upstream dials, the upstream phase times and the connection
+        pool occupancy to `metrics`.
+        """
+        self._metrics = metrics
+        metrics.pool = self._pool
+
+    def _on_dial(self, elapsed: float, failed: bool) -> None:
+        if self._metrics is not None:
+            self._metrics.on_dial(elapsed, failed)
+
     @abc.abstractmethod
     def get_upstream_base_url(self, scope: Scope) -> str:
         raise NotImplementedError()
 
+    @contextlib.asynccontextmanager
+    async def lifespan(self, app: Any) -> AsyncIterator[None]:
+        """Export the spans still queued once the requests are drained."""
+        try:
+            yield
+        finally:
+            if self._tracer is not None:
+                await self._tracer.close()
+
+    def start_trace(self, scope: Scope) -> Trace | None:
+        """
+        Trace of the request if it's sampled, `None` otherwise. The decision is
+        kept in the scope, so middlewares running before the app can take it to
+        time their own work.
+        """
+        if self._tracer is None:
+            return None
+        extensions = scope.setdefault("extensions", {})
+        if SCOPE_EXT_TRACE not in extensions:
+            extensions[SCOPE_EXT_TRACE] = self._tracer.start_trace(scope)
+        return extensions[SCOPE_EXT_TRACE]
+
     async def __call__(self, scope: Scope, receive: ASGIReceive, send: ASGISend) -> None:
         if scope.get("type") == "lifespan":
             return
@@ -60,6 +129,7 @@ class ProxyAppBase(abc.ABC):
             await self.send_error_response(scope, send, 500, "Unsupported")
             return
 
+        trace = self.start_trace(scope)
         try:
             base_url = self.get_upstream_base_url(scope)
             if base_url.endswith("/"):  # pragma: no cover
@@ -68,47 +138,58 @@ class ProxyAppBase(abc.ABC):
             url = f"{base_url}{full_path}"
             method = scope.get("method", "GET").encode()
             headers = self._prepare_headers(scope)
+            if trace is not None:
+                trace.inject(headers)
 
-            body_stream = ASGIRequestBodyStream(receive)
+            expectation = self._get_expect_continue(scope)
+            body, body_buffer = await self._prepare_request_body(
+                scope, receive, headers, expectation
+            )
 
+            # Upstream phases are only timed when somebody consumes them.
+            timings = (
+                UpstreamTimings()
+                if self._metrics is not None or self._server_timing or trace is not None
+                else None
+            )
             request = Request(
                 method=method,
                 url=url,
                 headers=headers,
-                content=body_stream,
+                content=body,
+                extensions={"trace": timings} if timings is not None else None,
             )
-            response = await self._pool.handle_async_request(request)
-            logger.debug(f"connection pool status: {self._pool}")
-            response_headers = []
-            for k, v in response.headers:
-                if k.lower() not in HOP_BY_HOP_HEADERS:
-                    response_headers.append((k, v))
+            if trace is not None:
+                trace.upstream_started(url, timings)
+            try:
+                with expectation.activate() if expectation else contextlib.nullcontext():
+                    response = await self._pool.handle_async_request(request)
+            finally:
+                if body_buffer is not None:
+                    body_buffer.close()
+            logger.debug("connection pool status: %s", self._pool)
+            if trace is not None:
+                trace.upstream_finished(response.status)
+            response_headers = self._response_headers(response.headers)
 
-            await send(
-                {
-                    "type": "http.response.start",
-                    "status": response.status,
-                    "headers": response_headers,
-                }
-            )
-
-            async for chunk in response.stream:  # type: ignore[union-attr]
-                await send(
-                    {
-                        "type": "http.response.body",
-                        "body": chunk,
-                        "more_body": True,
-                    }
-                )
-
-            await send({"type": "http.response.body", "body": b"", "more_body": False})
-            await response.aclose()
+            if self._response_buffering and self._is_response_bufferable(response_headers):
+                await self._send_buffered_response(response, response_headers, send, timings)
+            else:
+                await self._send_streamed_response(response, response_headers, send, timings)
+            if timings is not None and self._metrics is not None:
+                self._metrics.on_upstream_phases(timings.phases)
+            if trace is not None:
+                trace.finish(scope, response.status)
 
         except ProxyError as pe:
+            if trace is not None:
+                trace.finish(scope, pe.http_status, error=pe.message)
             await self.send_error_response(scope, send, pe.http_status, pe.message)
 
-        except Exception:
+        except Exception as e:
             logger.exception("Unexpected error in forwarder")
+            if trace is not None:
+                trace.finish(scope, 502, error=str(e) or type(e).__name__)
             await self.send_error_response(scope, send, 502, "Bad Gateway")
 
     async def send_error_response(
@@ -116,60 +197,213 @@ class ProxyAppBase(abc.ABC):
         scope: Scope,
         send: ASGISend,
         http_status: int,
-        body: str,
+        body: str | bytes,
         headers: list[tuple[bytes, bytes]] | None = None,
     ):
         headers = headers or [(b"content-type", b"text/plain")]
+        if isinstance(body, str):
+            body = body.encode()
         try:
             await send({"type": "http.response.start", "status": http_status, "headers": headers})
-            await send({"type": "http.response.body", "body": body.encode()})
+            await send({"type": "http.response.body", "body": body})
         except Exception as e:  # pragma: no cover
             logger.error(f"Cannot send error response: {e}")
 
-    def _prepare_headers(self, scope: Scope) -> list[tuple[bytes, bytes]]:
-        headers: list[tuple[bytes, bytes]] = []
-        scope_headers = scope.get("headers", [])
-
-        for k, v in scope_headers:
-            if k.lower() not in HOP_BY_HOP_HEADERS:
-                headers.append((k, v))
-        self._merge_x_forwarded(headers, scope)
-
-        return headers
-
-    def _find_header(self, headers: list[tuple[bytes, bytes]], name: bytes) -> int | None:
-        """Return index of header `name` in `headers`, or None if missing."""
-        lname = name.lower()
-        for i, (k, _) in enumerate(headers):
-            if k.lower() == lname:
-                return i
+    async def _prepare_request_body(
+        self,
+        scope: Scope,
+        receive: ASGIReceive,
+        headers: list[tuple[bytes, bytes]],
+        expectation: ExpectContinue | None = None,
+    ) -> tuple[bytes | AsyncIterable[bytes] | None, SpooledBodyBuffer | None]:
+        """
+        Read bodies up to the request buffer size before dialing the upstream so
+        that they are sent in a single write with a `Content-Length`.
+
+        Larger bodies are spooled to disk first when request buffering is enabled
+        and streamed otherwise, chunked unless the client sent a `Content-Length`.
+        The returned buffer, if any, must be closed once the request has been sent.
+
+        Bodies of requests that expect `100-continue` are never read upfront: the
+        client is only told to continue once the upstream agreed to receive them.
+        """
+        body_stream = ASGIRequestBodyStream(receive)
+        if expectation is not None:
+            self._set_request_body_mode(scope, "stream")
+            self._ensure_body_framing(headers)
+            return expectation.gate(body_stream), None
+
+        chunks: list[bytes] = []
+        size = 0
+        while body_stream.more_body and size <= self._request_buffer_size:
+            chunk = await anext(body_stream)
+            chunks.append(chunk)
+            size += len(chunk)
+
+        if not body_stream.more_body and size <= self._request_buffer_size:
+            if not size:
+                return None, None
+            self._set_request_body_mode(scope, "memory")
+            self._set_content_length(headers, size)
+            return b"".join(chunks), None
+
+        if not self._request_buffering:
+            self._set_request_body_mode(scope, "stream")
+            self._ensure_body_framing(headers)
+            return chain_body(*chunks, body_stream), None
+
+        buffer = SpooledBodyBuffer(memory_size=0, max_size=self._request_buffer_max_size)
+        source = chain_body(*chunks, body_stream)
+        try:
+            async for chunk in source:
+                if not await buffer.write(chunk):
+                    logger.debug("Request exceeds the buffer max size, streaming the remainder")
+                    self._set_request_body_mode(scope, "stream")
+                    self._ensure_body_framing(headers)
+                    return chain_body(buffer.drain(), chunk, source), buffer
+        except Exception:
+            buffer.close()
+            raise
+
+        self._set_request_body_mode(scope, "file")
+        self._set_content_length(headers, buffer.size)
+        return buffer.drain(), buffer
+
+    def _get_expect_continue(self, scope: Scope) -> ExpectContinue | None:
+        for k, v in scope.get("headers", []):
+            if k.lower() == b"expect" and v.strip().lower() == b"100-continue":
+                return ExpectContinue(self._expect_continue_timeout)
         return None
 
-    def _merge_x_forwarded(self, headers: list[tuple[bytes, bytes]], scope: Scope) -> None:
-        client = scope.get("client")
-        if client:
-            client_ip = client[0].encode()
-            idx = self._find_header(headers, b"x-forwarded-for")
-            if idx is None:
-                headers.append((b"x-forwarded-for", client_ip))
+    def _set_request_body_mode(self, scope: Scope, mode: str) -> None:
+        scope.setdefault("extensions", {})[SCOPE_EXT_REQUEST_BODY] = mode
+
+    def _set_content_length(self, headers: list[tuple[bytes, bytes]], length: int) -> None:
+        headers[:] = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+        headers.append((b"content-length", str(length).encode()))
+
+    def _ensure_body_framing(self, headers: list[tuple[bytes, bytes]]) -> None:
+        # The client transfer-encoding is hop-by-hop: chunk the body upstream
+        # unless its length is known.
+        if not any(k.lower() == b"content-length" for k, _ in headers):
+            headers.append((b"transfer-encoding", b"chunked"))
+
+    async def _send_streamed_response(
+        self,
+        response: Response,
+        headers: list[tuple[bytes, bytes]],
+        send: ASGISend,
+        timings: UpstreamTimings | None = None,
+    ) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status,
+                "headers": self._add_server_timing(headers, timings),
+            }
+        )
+
+        async for chunk in response.stream:  # type: ignore[union-attr]
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": True,
+                }
+            )
+
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+        await response.aclose()
+
+    async def _send_buffered_response(
+        self,
+        response: Response,
+        headers: list[tuple[bytes, bytes]],
+        send: ASGISend,
+        timings: UpstreamTimings | None = None,
+    ) -> None:
+        """
+        Read the upstream body into a buffer and release the upstream connection
+        before sending anything to the client, so slow clients don't hold it.
+
+        If the body exceeds the buffer max size, what has been buffered is sent
+        and the remainder is streamed from upstream.
+        """
+        buffer = SpooledBodyBuffer(
+            budget=self._response_buffers_budget,
+            memory_size=self._response_buffer_memory_size,
+            max_size=self._response_buffer_max_size,
+        )
+        stream = aiter(response.stream)  # type: ignore[arg-type]
+        pending: bytes | None = None
+        try:
+            async for chunk in stream:
+                if not await buffer.write(chunk):
+                    pending = chunk
+                    break
             else:
-                k, v = headers[idx]
-                headers[idx] = (k, v + b", " + client_ip)
+                await response.aclose()
 
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": response.status,
+                    "headers": self._add_server_timing(headers, timings),
+                }
+            )
+            async for chunk in buffer.drain():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+            if pending is not None:
+                logger.debug("Response exceeds the buffer max size, streaming the remainder")
+                await send({"type": "http.response.body", "body": pending, "more_body": True})
+                async for chunk in stream:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                await response.aclose()
+
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            buffer.close()
+
+    def _add_server_timing(
+        self, headers: list[tuple[bytes, bytes]], timings: UpstreamTimings | None
+    ) -> list[tuple[bytes, bytes]]:
+        if not self._server_timing or timings is None:
+            return headers
+        return [*headers, (b"server-timing", timings.get_server_timing())]
+
+    def _is_response_bufferable(self, headers: list[tuple[bytes, bytes]]) -> bool:
+        for k, v in headers:
+            name = k.lower()
+            if name == b"x-accel-buffering" and v.strip().lower() == b"no":
+                return False
+            if name == b"content-type" and v.lower().startswith(b"text/event-stream"):
+                return False
+        return True
+
+    def _create_header_rewriters(
+        self,
+        request_header_rules: Iterable[HeaderRule | Mapping[str, Any]],
+        response_header_rules: Iterable[HeaderRule | Mapping[str, Any]],
+    ) -> tuple[HeaderRewriter, HeaderRewriter]:
+        return (
+            HeaderRewriter((*FORWARDED_HEADER_RULES, *request_header_rules)),
+            HeaderRewriter(response_header_rules),
+        )
+
+    def _prepare_headers(self, scope: Scope) -> list[tuple[bytes, bytes]]:
+        append: dict[bytes, bytes] = {}
+        defaults: dict[bytes, bytes] = {}
+        client = scope.get("client")
+        if client:
+            append[b"x-forwarded-for"] = client[0].encode()
         server = scope.get("server")
         if server:
-            if self._find_header(headers, b"x-forwarded-host") is None:
-                headers.append((b"x-forwarded-host", server[0].encode()))
-            if server[1] and self._find_header(headers, b"x-forwarded-port") is None:
-                headers.append((b"x-forwarded-port", str(server[1]).encode()))
-
-        # Always set the protocol to https for upstream
-        idx_proto = self._find_header(headers, b"x-forwarded-proto")
-        if idx_proto is None:
-            headers.append((b"x-forwarded-proto", b"https"))
-        else:
-            k, _ = headers[idx_proto]
-            headers[idx_proto] = (k, b"https")
+            defaults[b"x-forwarded-host"] = server[0].encode()
+            if server[1]:
+                defaults[b"x-forwarded-port"] = str(server[1]).encode()
+
+        return self._request_headers(scope.get("headers", []), append=append, defaults=defaults)
 
     def _format_path(self, scope: Scope) -> str:
         path = scope.get("raw_path")
@@ -24,6 +24,20 @@ class Middleware:
         return iter(as_tuple)
 
 
+def combine_lifespans(*lifespans: Lifespan) -> Lifespan:
+    """Lifespan running `lifespans` nested in order, their states are merged."""
+
+    @asynccontextmanager
+    async def lifespan(app: ASGIApp):
+        async with AsyncExitStack() as stack:
+            state: dict[Any, Any] = {}
+            for inner in lifespans:
+                state.update(await stack.enter_async_context(inner(app)) or {})  # type: ignore[arg-type]
+            yield state
+
+    return lifespan
+
+
 class ASGIAppWrapper:
     def __init__(
         self,
@@ -0,0 +1,115 @@
+import math
+import time
+from collections.abc import Iterable
+
+from mrok.proxy.models import WorkerMetrics
+
+DEFAULT_TARGET_CPU = 70.0
+DEFAULT_SCALE_UP_COOLDOWN = 30.0
+DEFAULT_SCALE_DOWN_COOLDOWN = 300.0
+AUTOSCALE_WINDOW = "1m"
+
+
+class Autoscaler:
+    """
+    Decide how many workers an agent should run from the metrics its workers publish.
+
+    The load of the workers is the highest of their ratios to the targets:
+    average CPU, average requests per second and worst p99 response time over the
+    last minute.
+    Above `scale_up_threshold` workers are added in proportion to the load,
+    below `scale_down_threshold` one worker is removed and in between the
+    number of workers doesn't change.
+
+    No decision is taken for `scale_up_cooldown` seconds after adding workers
+    and workers are not removed for `scale_down_cooldown` seconds after any change.
+    """
+
+    def __init__(
+        self,
+        min_workers: int,
+        max_workers: int,
+        *,
+        target_cpu: float | None = DEFAULT_TARGET_CPU,
+        target_rps: float | None = None,
+        target_p99_ms: float | None = None,
+        scale_up_threshold: float = 1.0,
+        scale_down_threshold: float = 0.5,
+        scale_up_cooldown: float = DEFAULT_SCALE_UP_COOLDOWN,
+        scale_down_cooldown: float = DEFAULT_SCALE_DOWN_COOLDOWN,
+        metrics_max_age: float = 30.0,
+    ):
+        if not 1 <= min_workers <= max_workers:
+            raise ValueError("Workers bounds must satisfy 1 <= min_workers <= max_workers.")
+        if scale_down_threshold >= scale_up_threshold:
+            raise ValueError("The scale down threshold must be lower than the scale up one.")
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.target_cpu = target_cpu
+        self.target_rps = target_rps
+        self.target_p99_ms = target_p99_ms
+        self.scale_up_threshold = scale_up_threshold
+        self.scale_down_threshold = scale_down_threshold
+        self.scale_up_cooldown = scale_up_cooldown
+        self.scale_down_cooldown = scale_down_cooldown
+        self.metrics_max_age = metrics_max_age
+        self._metrics: dict[str, tuple[float, WorkerMetrics]] = {}
+        self._last_scale_up = -math.inf
+        self._last_change = -math.inf
+
+    def observe(self, metrics: WorkerMetrics, now: float | None = None) -> None:
+        self._metrics[metrics.worker_id] = (
+            time.monotonic() if now is None else now,
+            metrics,
+        )
+
+    def forget(self, worker_id: str) -> None:
+        self._metrics.pop(worker_id, None)
+
+    def get_load(self, worker_ids: Iterable[str], now: float) -> float | None:
+        """Load of the given workers, `None` if none of them has fresh metrics."""
+        fresh: list[WorkerMetrics] = []
+        for worker_id in worker_ids:
+            observed_at, metrics = self._metrics.get(worker_id, (-math.inf, None))
+            if metrics is not None and now - observed_at <= self.metrics_max_age:
+                fresh.append(metrics)
+        if not fresh:
+            return None
+
+        ratios = [0.0]
+        if self.target_cpu:
+            cpu = sum(metrics.process.cpu for metrics in fresh) / len(fresh)
+            ratios.append(cpu / self.target_cpu)
+        if self.target_rps:
+            rps = sum(metrics.requests.rps for metrics in fresh) / len(fresh)
+            ratios.append(rps / self.target_rps)
+        if self.target_p99_ms:
+            p99 = max(
+                metrics.response_time_windows.get(AUTOSCALE_WINDOW, metrics.response_time).p99
+                for metrics in fresh
+            )
+            ratios.append(p99 / self.target_p99_ms)
+        return max(ratios)
+
+    def get_desired_workers(self, worker_ids: Iterable[str], now: float | None = None) -> int:
+        worker_ids = list(worker_ids)
+        current = len(worker_ids)
+        now = time.monotonic() if now is None else now
+        load = self.get_load(worker_ids, now)
+
+        desired = current
+        if load is not None and now - self._last_scale_up >= self.scale_up_cooldown:
+            if load > self.scale_up_threshold:
+                desired = math.ceil(current * load / self.scale_up_threshold)
+            elif (
+                load < self.scale_down_threshold
+                and now - self._last_change >= self.scale_down_cooldown
+            ):
+                desired = current - 1
+        desired = max(self.min_workers, min(self.max_workers, desired))
+
+        if desired > current:
+            self._last_scale_up = self._last_change = now
+        elif desired < current:
+            self._last_change = now
+        return desired
@@ -1,18 +1,33 @@
 import asyncio
-from collections.abc import Iterable
+import time
+from collections.abc import Coroutine, Iterable
 from pathlib import Path
+from typing import Any
 
 import openziti
-from httpcore import SOCKET_OPTION, AsyncNetworkBackend, AsyncNetworkStream
+from httpcore import (
+    SOCKET_OPTION,
+    AsyncNetworkBackend,
+    AsyncNetworkStream,
+    ConnectError,
+    ConnectTimeout,
+)
 from openziti.context import ZitiContext
 
 from mrok.proxy.exceptions import InvalidTargetError, TargetUnavailableError
 from mrok.proxy.stream import AIONetworkStream
+from mrok.types.proxy import DialCallback
+
+
+def report_dial(on_dial: DialCallback | None, start: float, *, failed: bool) -> None:
+    if on_dial is not None:
+        on_dial(time.perf_counter() - start, failed)
 
 
 class AIOZitiNetworkBackend(AsyncNetworkBackend):
-    def __init__(self, identity_file: str | Path) -> None:
+    def __init__(self, identity_file: str | Path, on_dial: DialCallback | None = None) -> None:
         self._identity_file = identity_file
+        self._on_dial = on_dial
         self._ziti_ctx: ZitiContext | None = None
 
     def _get_ziti_ctx(self) -> ZitiContext:
@@ -32,14 +47,72 @@ class AIOZitiNetworkBackend(AsyncNetworkBackend):
         socket_options: Iterable[SOCKET_OPTION] | None = None,
     ) -> AsyncNetworkStream:
         ctx = self._get_ziti_ctx()
+        start = time.perf_counter()
         try:
             sock = ctx.connect(host)
             reader, writer = await asyncio.open_connection(sock=sock)
-            return AIONetworkStream(reader, writer)
         except Exception as e:
+            report_dial(self._on_dial, start, failed=True)
             if e.args and e.args[0] == -24:  # the service exists but is not available
                 raise TargetUnavailableError() from e
             raise InvalidTargetError() from e
+        report_dial(self._on_dial, start, failed=False)
+        return AIONetworkStream(reader, writer)
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class AIONetworkBackend(AsyncNetworkBackend):
+    """Plain TCP and unix domain socket backend built on asyncio streams."""
+
+    def __init__(self, on_dial: DialCallback | None = None) -> None:
+        self._on_dial = on_dial
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: Iterable[SOCKET_OPTION] | None = None,
+    ) -> AsyncNetworkStream:
+        local_addr = (local_address, 0) if local_address else None
+        return await self._connect(
+            asyncio.open_connection(host, port, local_addr=local_addr),
+            timeout,
+            socket_options,
+        )
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: float | None = None,
+        socket_options: Iterable[SOCKET_OPTION] | None = None,
+    ) -> AsyncNetworkStream:
+        return await self._connect(asyncio.open_unix_connection(path), timeout, socket_options)
+
+    async def _connect(
+        self,
+        connect: Coroutine[Any, Any, tuple[asyncio.StreamReader, asyncio.StreamWriter]],
+        timeout: float | None,
+        socket_options: Iterable[SOCKET_OPTION] | None,
+    ) -> AsyncNetworkStream:
+        start = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(connect, timeout)
+        except TimeoutError as e:
+            report_dial(self._on_dial, start, failed=True)
+            raise ConnectTimeout(str(e)) from e
+        except OSError as e:
+            report_dial(self._on_dial, start, failed=True)
+            raise ConnectError(str(e)) from e
+        report_dial(self._on_dial, start, failed=False)
+
+        sock = writer.get_extra_info("socket")
+        for option in socket_options or []:
+            sock.setsockopt(*option)
+        return AIONetworkStream(reader, writer)
 
     async def sleep(self, seconds: float) -> None:
         await asyncio.sleep(seconds)
@@ -0,0 +1,104 @@
+import asyncio
+import tempfile
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import IO
+
+DEFAULT_BUFFER_MEMORY_SIZE = 64 * 1024
+DEFAULT_BUFFER_MAX_SIZE = 1024 * 1024 * 1024
+DEFAULT_BUFFERS_MEMORY_LIMIT = 64 * 1024 * 1024
+BUFFER_READ_CHUNK_SIZE = 64 * 1024
+DEFAULT_REQUEST_BUFFER_SIZE = 64 * 1024
+
+
+class BufferMemoryBudget:
+    """Bytes of memory that all the body buffers of a worker may hold at once."""
+
+    def __init__(self, limit: int | None = DEFAULT_BUFFERS_MEMORY_LIMIT):
+        self.limit = limit
+        self.used = 0
+
+    def acquire(self, size: int) -> bool:
+        if self.limit is not None and self.used + size > self.limit:
+            return False
+        self.used += size
+        return True
+
+    def release(self, size: int) -> None:
+        self.used = max(0, self.used - size)
+
+
+class SpooledBodyBuffer:
+    """
+    Body buffer that keeps up to `memory_size` bytes in memory and spills
+    the rest to an anonymous temporary file.
+
+    Memory is only taken if the shared `budget`, when given, allows it,
+    otherwise chunks go straight to disk. Writes beyond `max_size` are rejected.
+    """
+
+    def __init__(
+        self,
+        *,
+        budget: BufferMemoryBudget | None = None,
+        memory_size: int = DEFAULT_BUFFER_MEMORY_SIZE,
+        max_size: int | None = DEFAULT_BUFFER_MAX_SIZE,
+    ):
+        self._budget = budget
+        self._memory_size = memory_size
+        self._max_size = max_size
+        self._chunks: deque[bytes] = deque()
+        self._memory_used = 0
+        self._file: IO[bytes] | None = None
+        self.size = 0
+
+    @property
+    def spilled(self) -> bool:
+        return self._file is not None
+
+    async def write(self, data: bytes) -> bool:
+        """Buffer `data`, return False if it does not fit within `max_size`."""
+        if not data:
+            return True
+
+        length = len(data)
+        if self._max_size is not None and self.size + length > self._max_size:
+            return False
+
+        if (
+            self._file is None
+            and self._memory_used + length <= self._memory_size
+            and (self._budget is None or self._budget.acquire(length))
+        ):
+            self._chunks.append(data)
+            self._memory_used += length
+        else:
+            if self._file is None:
+                self._file = tempfile.TemporaryFile()
+            await asyncio.to_thread(self._file.write, data)
+
+        self.size += length
+        return True
+
+    async def drain(self) -> AsyncIterator[bytes]:
+        """Yield the buffered bytes in order, giving memory back as it is consumed."""
+        while self._chunks:
+            chunk = self._chunks.popleft()
+            self._memory_used -= len(chunk)
+            if self._budget is not None:
+                self._budget.release(len(chunk))
+            yield chunk
+
+        if self._file is not None:
+            await asyncio.to_thread(self._file.seek, 0)
+            while chunk := await asyncio.to_thread(self._file.read, BUFFER_READ_CHUNK_SIZE):
+                yield chunk
+
+    def close(self) -> None:
+        if self._budget is not None:
+            self._budget.release(self._memory_used)
+        self._chunks.clear()
+        self._memory_used = 0
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,62 @@
+import random
+import re
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Literal
+
+STATUS_PATTERN = re.compile(r"^[1-5](?:xx|\d\d)$")
+QUEUE_OVERFLOW_POLICIES = ("drop-oldest", "drop-new")
+
+
+@dataclass(frozen=True)
+class CaptureConfig:
+    """Which requests/responses get captured and published as events.
+
+    Empty filters match everything. Path filters are glob patterns and status filters are
+    either exact codes (``404``) or classes (``5xx``).
+
+    Captured responses wait in a queue of at most ``queue_size`` responses and
+    ``queue_max_bytes`` bytes of bodies to be published, ``queue_overflow`` tells
+    which response is dropped when it's full.
+    """
+
+    sample_rate: float = 1.0
+    methods: tuple[str, ...] = ()
+    paths: tuple[str, ...] = ()
+    exclude_paths: tuple[str, ...] = ()
+    statuses: tuple[str, ...] = ()
+    headers_only: bool = False
+    queue_size: int = 256
+    queue_max_bytes: int = 64 * 1024 * 1024
+    queue_overflow: Literal["drop-oldest", "drop-new"] = "drop-oldest"
+
+    def __post_init__(self):
+        if not 0 <= self.sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1.")
+        if self.queue_size < 1 or self.queue_max_bytes < 1:
+            raise ValueError("queue_size and queue_max_bytes must be positive.")
+        if self.queue_overflow not in QUEUE_OVERFLOW_POLICIES:
+            raise ValueError(f"queue_overflow must be one of {', '.join(QUEUE_OVERFLOW_POLICIES)}.")
+        for status in self.statuses:
+            if not STATUS_PATTERN.match(status.lower()):
+                raise ValueError(f"Invalid status filter: {status}.")
+        object.__setattr__(self, "methods", tuple(method.upper() for method in self.methods))
+        object.__setattr__(self, "statuses", tuple(status.lower() for status in self.statuses))
+
+    def match_request(self, method: str, path: str) -> bool:
+        if self.methods and method.upper() not in self.methods:
+            return False
+        if self.paths and not any(fnmatchcase(path, pattern) for pattern in self.paths):
+            return False
+        if any(fnmatchcase(path, pattern) for pattern in self.exclude_paths):
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def match_status(self, status: int) -> bool:
+        if not self.statuses:
+            return True
+        code = str(status)
+        return any(
+            code == pattern or (pattern.endswith("xx") and code[0] == pattern[0])
+            for pattern in self.statuses
+        )
@@ -1,18 +1,72 @@
 import asyncio
 import contextlib
 import logging
+from collections import deque
 
 import zmq
 import zmq.asyncio
 
+from mrok.proxy.app import ProxyAppBase
 from mrok.proxy.asgi import ASGIAppWrapper
+from mrok.proxy.capture import CaptureConfig
 from mrok.proxy.metrics import MetricsCollector
 from mrok.proxy.middleware import CaptureMiddleware, MetricsMiddleware
-from mrok.proxy.models import Event, HTTPResponse, ServiceMetadata, Status
+from mrok.proxy.models import CaptureMetrics, Event, HTTPResponse, ServiceMetadata, Status
+from mrok.proxy.routes import RoutesConfig
+from mrok.proxy.wire import encode_event
 from mrok.types.proxy import ASGIApp
 
 logger = logging.getLogger("mrok.proxy")
 
+RESPONSE_EVENT_PREFIX = b"response"
+EVENTS_SNDHWM = 1000
+EVENTS_BATCH_SIZE = 64
+
+
+class ResponsesQueue:
+    """
+    Bounded queue of the captured responses waiting to be published, it never blocks
+    the requests: when it's full the oldest or the new response is dropped.
+    """
+
+    def __init__(self, config: CaptureConfig):
+        self._items: deque[tuple[HTTPResponse, int]] = deque()
+        self._max_size = config.queue_size
+        self._max_bytes = config.queue_max_bytes
+        self._drop_oldest = config.queue_overflow == "drop-oldest"
+        self._bytes = 0
+        self._not_empty = asyncio.Event()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, response: HTTPResponse) -> None:
+        size = len(response.request.body or b"") + len(response.body or b"")
+        if size > self._max_bytes:
+            self.dropped += 1
+            return
+        while len(self._items) >= self._max_size or self._bytes + size > self._max_bytes:
+            self.dropped += 1
+            if not self._drop_oldest:
+                return
+            _, dropped_size = self._items.popleft()
+            self._bytes -= dropped_size
+        self._items.append((response, size))
+        self._bytes += size
+        self._not_empty.set()
+
+    async def get_batch(self, max_items: int) -> list[HTTPResponse]:
+        while not self._items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        batch: list[HTTPResponse] = []
+        while self._items and len(batch) < max_items:
+            response, size = self._items.popleft()
+            self._bytes -= size
+            batch.append(response)
+        return batch
+
 
 class EventsPublisher:
     def __init__(
@@ -21,25 +75,36 @@ class EventsPublisher:
         meta: ServiceMetadata | None = None,
         events_publisher_port: int = 50000,
         events_metrics_collect_interval: float = 5.0,
+        events_capture: CaptureConfig | None = None,
+        events_routes: RoutesConfig | None = None,
     ):
         self._worker_id = worker_id
         self._meta = meta
         self._events_metrics_collect_interval = events_metrics_collect_interval
         self._publisher_port = events_publisher_port
         self._zmq_ctx = zmq.asyncio.Context()
-        self._publisher = self._zmq_ctx.socket(zmq.PUB)
-        self._metrics_collector = MetricsCollector(self._worker_id)
+        self._publisher = self._zmq_ctx.socket(zmq.XPUB)
+        self._publisher.setsockopt(zmq.SNDHWM, EVENTS_SNDHWM)
+        self._metrics_collector = MetricsCollector(self._worker_id, routes=events_routes)
+        self._capture_config = events_capture or CaptureConfig()
+        self._responses = ResponsesQueue(self._capture_config)
+        self._subscriptions: dict[bytes, int] = {}
         self._publish_task = None
+        self._responses_task = None
+        self._subscriptions_task = None
 
     async def on_startup(self):
         self._publisher.connect(f"tcp://localhost:{self._publisher_port}")
         self._publish_task = asyncio.create_task(self.publish_metrics_event())
+        self._responses_task = asyncio.create_task(self.publish_response_events())
+        self._subscriptions_task = asyncio.create_task(self.track_subscriptions())
         logger.info(f"Events publishing for worker {self._worker_id} started")
 
     async def on_shutdown(self):
-        self._publish_task.cancel()
-        with contextlib.suppress(asyncio.CancelledError):
-            await self._publish_task
+        for task in (self._publish_task, self._responses_task, self._subscriptions_task):
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
         self._publisher.close()
         self._zmq_ctx.term()
         logger.info(f"Events publishing for worker {self._worker_id} stopped")
@@ -47,17 +112,52 @@ class EventsPublisher:
     async def publish_metrics_event(self):
         while True:
             snap = await self._metrics_collector.snapshot()
+            snap.capture = CaptureMetrics(
+                queued=len(self._responses), dropped=self._responses.dropped
+            )
             event = Event(type="status", data=Status(meta=self._meta, metrics=snap))
-            await self._publisher.send_string(event.model_dump_json())
+            await self._publisher.send_multipart(encode_event(event), copy=False)
             await asyncio.sleep(self._events_metrics_collect_interval)
 
-    async def publish_response_event(self, response: HTTPResponse):
-        event = Event(type="response", data=response)
-        await self._publisher.send_string(event.model_dump_json())  # type: ignore[attr-defined]
+    async def track_subscriptions(self):
+        while True:
+            message = await self._publisher.recv()
+            if not message or message[0] not in (0, 1):  # pragma: no cover
+                continue
+            topic = message[1:]
+            if message[0] == 1:
+                self._subscriptions[topic] = self._subscriptions.get(topic, 0) + 1
+            elif self._subscriptions.get(topic, 0) > 1:
+                self._subscriptions[topic] -= 1
+            else:
+                self._subscriptions.pop(topic, None)
+            logger.debug(
+                f"Worker {self._worker_id} traffic capture "
+                f"{'enabled' if self.has_response_subscribers() else 'disabled'}"
+            )
+
+    def has_response_subscribers(self) -> bool:
+        return any(RESPONSE_EVENT_PREFIX.startswith(topic) for topic in self._subscriptions)
+
+    def enqueue_response_event(self, response: HTTPResponse) -> None:
+        self._responses.put(response)
+
+    async def publish_response_events(self):
+        while True:
+            for response in await self._responses.get_batch(EVENTS_BATCH_SIZE):
+                event = Event(type="response", data=response)
+                await self._publisher.send_multipart(encode_event(event), copy=False)  # type: ignore[attr-defined]
 
     def setup_middleware(self, app: ASGIAppWrapper):
-        app.add_middleware(CaptureMiddleware, self.publish_response_event)
+        app.add_middleware(
+            CaptureMiddleware,
+            self.enqueue_response_event,
+            config=self._capture_config,
+            is_active=self.has_response_subscribers,
+        )
         app.add_middleware(MetricsMiddleware, self._metrics_collector)  # type: ignore
+        if isinstance(app.app, ProxyAppBase):
+            app.app.instrument(self._metrics_collector)
 
     @contextlib.asynccontextmanager
     async def lifespan(self, app: ASGIApp):
@@ -0,0 +1,11 @@
+"""
+Imported last by the fork server of the preloaded workers.
+
+Freezes the objects allocated by the preloaded modules: the collector never
+touches them, so their pages stay shared with the forked workers
+(copy-on-write) instead of being copied by each worker on its first collection.
+"""
+
+import gc
+
+gc.freeze()
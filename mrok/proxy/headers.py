@@ -0,0 +1,246 @@
+from collections.abc import Callable, Iterable, Mapping
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+from typing import Any, Literal
+
+from pydantic import BaseModel, model_validator
+
+from mrok.constants import SCOPE_EXT_HEADERS
+from mrok.proxy.models import HTTPHeaders
+from mrok.types.proxy import Scope
+
+HeaderList = list[tuple[bytes, bytes]]
+
+HOP_BY_HOP_HEADERS = frozenset(
+    {
+        b"connection",
+        b"keep-alive",
+        b"proxy-authenticate",
+        b"proxy-authorization",
+        b"te",
+        b"trailers",
+        b"transfer-encoding",
+        b"upgrade",
+    }
+)
+
+
+class HeaderRule(BaseModel):
+    """
+    A header rewrite rule as found in the settings:
+
+    - `add`: add a `name: value` header, even if one already exists.
+    - `set`: replace any `name` header with `name: value`.
+    - `remove`: drop any `name` header.
+    - `append`: append `value` to the first `name` header, comma separated,
+      adding the header if missing.
+    - `rename`: rename any `name` header to `to`, keeping its value.
+    """
+
+    action: Literal["add", "set", "remove", "append", "rename"]
+    name: str
+    value: str | None = None
+    to: str | None = None
+
+    @model_validator(mode="after")
+    def check_arguments(self) -> "HeaderRule":
+        if self.action in ("add", "set", "append") and self.value is None:
+            raise ValueError(f"The {self.action} header rule requires a value.")
+        if self.action == "rename" and not self.to:
+            raise ValueError("The rename header rule requires a target name.")
+        return self
+
+
+class HeaderRewriter:
+    """
+    Header rewrite rules compiled into a transformer that walks the headers once.
+
+    Rules are not applied one after the other but by kind: incoming headers
+    that are hop-by-hop, removed or set are dropped, then renamed and appended
+    to. Missing appended headers, set headers and added headers follow,
+    in this order. If several `set` or `rename` rules target the same header
+    the last one wins.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[HeaderRule | Mapping[str, Any]] = (),
+        *,
+        drop: Iterable[bytes] = HOP_BY_HOP_HEADERS,
+    ):
+        dropped = set(drop)
+        renames: dict[bytes, bytes] = {}
+        appends: dict[bytes, bytes] = {}
+        sets: dict[bytes, bytes] = {}
+        adds: list[tuple[bytes, bytes]] = []
+
+        for rule in rules:
+            if not isinstance(rule, HeaderRule):
+                rule = HeaderRule.model_validate(rule)
+            name = rule.name.lower().encode("latin-1")
+            value = (rule.value or "").encode("latin-1")
+            match rule.action:
+                case "remove":
+                    dropped.add(name)
+                case "set":
+                    dropped.add(name)
+                    sets[name] = value
+                case "add":
+                    adds.append((name, value))
+                case "append":
+                    appends[name] = appends[name] + b", " + value if name in appends else value
+                case "rename":
+                    renames[name] = (rule.to or "").lower().encode("latin-1")
+
+        self._drop = frozenset(dropped)
+        self._renames = MappingProxyType(renames)
+        self._appends = MappingProxyType(appends)
+        self._tail = tuple(sets.items()) + tuple(adds)
+
+    def __call__(
+        self,
+        headers: Iterable[tuple[bytes, bytes]],
+        *,
+        append: Mapping[bytes, bytes] | None = None,
+        defaults: Mapping[bytes, bytes] | None = None,
+    ) -> HeaderList:
+        """
+        Return the rewritten `headers`.
+
+        `append` holds per-call values to append like an `append` rule and
+        `defaults` headers to add only if missing; their names must be lowercase.
+        """
+        pending_appends = dict(self._appends)
+        for name, value in (append or {}).items():
+            pending_appends[name] = (
+                pending_appends[name] + b", " + value if name in pending_appends else value
+            )
+        missing = dict(defaults) if defaults else None
+
+        result: HeaderList = []
+        for k, v in headers:
+            name = k.lower()
+            if name in self._drop:
+                continue
+            if name in self._renames:
+                k = name = self._renames[name]
+            if pending_appends and name in pending_appends:
+                v = v + b", " + pending_appends.pop(name)
+            if missing and name in missing:
+                del missing[name]
+            result.append((k, v))
+
+        if pending_appends:
+            result.extend(pending_appends.items())
+        if missing:
+            result.extend(missing.items())
+        result.extend(self._tail)
+        return result
+
+
+_UNRESOLVED: Any = object()
+
+
+class RequestHeaders:
+    """
+    Parsed view of the headers of a request, built lazily and shared through
+    the scope by all the stages that handle the request.
+
+    The view is bound to the scope headers list: replacing it creates a new
+    view, mutating it in place is not detected.
+    """
+
+    def __init__(self, raw: Iterable[tuple[bytes, bytes]]):
+        self.raw = raw
+        self._target: str | None = _UNRESOLVED
+
+    @classmethod
+    def from_scope(cls, scope: Scope) -> "RequestHeaders":
+        raw = scope.get("headers", [])
+        extensions = scope.setdefault("extensions", {})
+        view = extensions.get(SCOPE_EXT_HEADERS)
+        if view is None or view.raw is not raw:
+            view = extensions[SCOPE_EXT_HEADERS] = cls(raw)
+        return view
+
+    @cached_property
+    def index(self) -> HTTPHeaders:
+        return HTTPHeaders({k.decode("latin-1"): v.decode("latin-1") for k, v in self.raw})
+
+    def get(self, name: str, default: str | None = None) -> str | None:
+        return self.index.get(name, default)
+
+    @cached_property
+    def accept(self) -> tuple[str, ...]:
+        """Accepted media types, most preferred first."""
+        return _parse_accept_header(self.get("accept") or "")
+
+    @cached_property
+    def bearer_token(self) -> str | None:
+        schema, _, value = self.index.get("authorization", "").partition(" ")
+        value = value.strip()
+        if schema.lower() != "bearer" or not value:
+            return None
+        return value
+
+    def get_target(self, resolve: Callable[[dict[str, str]], str | None]) -> str | None:
+        """Return the request target name, resolving it with `resolve` on first use."""
+        if self._target is _UNRESOLVED:
+            self._target = resolve(self.index)
+        return self._target
+
+
+ACCEPT_CACHE_SIZE = 256
+
+
+def parse_accept_header(accept: str | None) -> list[str]:
+    return list(_parse_accept_header(accept or ""))
+
+
+# Clients send a handful of distinct Accept values, so parsing is memoized.
+@lru_cache(maxsize=ACCEPT_CACHE_SIZE)
+def _parse_accept_header(accept: str) -> tuple[str, ...]:
+    if not accept:
+        return ("*/*",)
+
+    result: list[tuple[str, float, int]] = []
+
+    for index, item in enumerate(accept.split(",")):
+        item = item.strip()
+        if not item:
+            continue
+
+        parts = [p.strip() for p in item.split(";")]
+        media_type = parts[0].lower()
+
+        q = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+
+        result.append((media_type, q, index))
+
+    # Sort by:
+    # 1) q value (desc)
+    # 2) specificity (more specific first)
+    # 3) original order (stable)
+    result.sort(
+        key=lambda x: (
+            -x[1],
+            -_media_type_specificity(x[0]),
+            x[2],
+        )
+    )
+
+    return tuple(media_type for media_type, _, _ in result)
+
+
+def _media_type_specificity(media_type: str) -> int:
+    if media_type == "*/*":
+        return 0
+    if media_type.endswith("/*"):
+        return 1
+    return 2
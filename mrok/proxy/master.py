@@ -1,9 +1,16 @@
 import logging
+import multiprocessing
 import os
+import random
 import signal
+import sys
 import threading
 import time
 from abc import ABC, abstractmethod
+from multiprocessing import forkserver
+from multiprocessing.connection import Connection, wait
+from multiprocessing.process import BaseProcess
+from multiprocessing.synchronize import Event
 from pathlib import Path
 from uuid import uuid4
 
@@ -14,6 +21,20 @@ from watchfiles.run import CombinedProcess, start_process
 
 from mrok.conf import get_settings
 from mrok.logging import setup_logging
+from mrok.proxy.aggregator import MetricsAggregator
+from mrok.proxy.autoscaler import DEFAULT_TARGET_CPU, Autoscaler
+from mrok.proxy.capture import CaptureConfig
+from mrok.proxy.models import (
+    AgentMetrics,
+    AgentReadiness,
+    WorkerReady,
+    WorkerRestart,
+    WorkerStartup,
+)
+from mrok.proxy.models import Event as BusEvent
+from mrok.proxy.openmetrics import MetricsServer
+from mrok.proxy.routes import RoutesConfig
+from mrok.proxy.wire import decode_event, encode_event
 from mrok.proxy.worker import Worker
 from mrok.types.proxy import ASGIApp
 
@@ -21,6 +42,21 @@ logger = logging.getLogger("mrok.agent")
 
 MONITOR_THREAD_JOIN_TIMEOUT = 5
 MONITOR_THREAD_CHECK_DELAY = 1
+WORKER_READY_TIMEOUT = 60
+# Time left to a drained worker to run its lifespan shutdown and exit.
+WORKER_DRAIN_GRACE = 5
+WORKER_BACKOFF_BASE = 0.5
+WORKER_BACKOFF_MAX = 30
+WORKER_STABLE_UPTIME = 60
+AUTOSCALE_INTERVAL = 10
+AUTOSCALE_POLL_TIMEOUT_MS = 1000
+AUTOSCALE_THREAD_JOIN_TIMEOUT = 5
+METRICS_POLL_TIMEOUT_MS = 1000
+METRICS_THREAD_JOIN_TIMEOUT = 5
+# Serialized events start with their type, subscribe to status events only.
+STATUS_EVENT_PREFIX = b"status"
+WORKER_READY_CHECK_DELAY = 0.1
+RESTART_CHECK_DELAY = 1
 
 
 def print_path(path):
@@ -30,23 +66,62 @@ def print_path(path):
         return f'"{path}"'
 
 
+def get_restart_backoff(crashes: int) -> float:
+    """
+    Seconds to wait before restarting a worker that crashed `crashes` times in a row:
+    none after the first crash, then exponential with jitter.
+    """
+    if crashes <= 1:
+        return 0.0
+    delay = min(WORKER_BACKOFF_MAX, WORKER_BACKOFF_BASE * 2 ** (crashes - 2))
+    return delay / 2 + random.uniform(0, delay / 2)  # noqa: S311
+
+
+def get_process_sentinel(process: CombinedProcess) -> int:
+    # watchfiles doesn't expose the sentinel of the spawned process.
+    return process._p.sentinel  # type: ignore[union-attr]
+
+
+class ForkedProcess(CombinedProcess):
+    """A worker forked from the fork server, `CombinedProcess` only handles spawned ones."""
+
+    def __init__(self, p: BaseProcess):
+        self._process = p
+        super().__init__(p)  # type: ignore[arg-type]
+
+    def is_alive(self) -> bool:
+        return self._process.is_alive()
+
+    def join(self, timeout: int) -> None:
+        self._process.join(timeout)
+
+    @property
+    def exitcode(self) -> int | None:
+        return self._process.exitcode
+
+
 def start_uvicorn_worker(
     worker_id: str,
     app: ASGIApp | str,
     identity_file: str,
     *,
     ziti_load_timeout_ms: int = 5000,
+    ziti_binds: int = 1,
+    ziti_contexts: int = 1,
     server_backlog: int = 2048,
     server_timeout_keep_alive: int = 5,
     server_limit_concurrency: int | None = None,
     server_limit_max_requests: int | None = None,
+    server_drain_timeout: int = 30,
     events_enabled: bool = True,
     events_pub_port: int = 5000,
     events_metrics_collect_interval: float = 5.0,
+    events_capture: CaptureConfig | None = None,
+    events_routes: RoutesConfig | None = None,
     logging_config: dict | None = None,
+    ready_conn: Connection | None = None,
+    drained_event: Event | None = None,
 ):
-    import sys
-
     sys.path.insert(0, os.getcwd())
 
     worker = Worker(
@@ -54,18 +129,33 @@ def start_uvicorn_worker(
         app,
         identity_file,
         ziti_load_timeout_ms=ziti_load_timeout_ms,
+        ziti_binds=ziti_binds,
+        ziti_contexts=ziti_contexts,
         server_backlog=server_backlog,
         server_timeout_keep_alive=server_timeout_keep_alive,
         server_limit_concurrency=server_limit_concurrency,
         server_limit_max_requests=server_limit_max_requests,
+        server_drain_timeout=server_drain_timeout,
         events_enabled=events_enabled,
         events_publisher_port=events_pub_port,
         events_metrics_collect_interval=events_metrics_collect_interval,
+        events_capture=events_capture,
+        events_routes=events_routes,
         logging_config=logging_config,
+        ready_conn=ready_conn,
+        drained_event=drained_event,
     )
     worker.run()
 
 
+def start_forked_uvicorn_worker(*args, **kwargs):
+    # Forked workers inherit the signal handlers of their parent.
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_DFL)
+    start_uvicorn_worker(*args, **kwargs)
+
+
 MONITOR_THREAD_ERROR_DELAY = 3
 
 
@@ -96,32 +186,95 @@ class MasterBase(ABC):
         identity_file: str,
         *,
         ziti_load_timeout_ms: int = 5000,
+        ziti_binds: int = 1,
+        ziti_contexts: int = 1,
         server_workers: int = 4,
         server_reload: bool = False,
         server_backlog: int = 2048,
         server_timeout_keep_alive: int = 5,
         server_limit_concurrency: int | None = None,
         server_limit_max_requests: int | None = None,
+        server_restart_batch_size: int = 1,
+        server_drain_timeout: int = 30,
+        server_max_workers: int | None = None,
+        server_preload: bool = False,
+        server_readiness_file: str | Path | None = None,
+        autoscale_target_cpu: float | None = DEFAULT_TARGET_CPU,
+        autoscale_target_rps: float | None = None,
+        autoscale_target_p99: float | None = None,
         events_enabled: bool = True,
         events_pub_port: int = 50000,
         events_sub_port: int = 50001,
         events_metrics_collect_interval: float = 5.0,
+        events_capture: CaptureConfig | None = None,
+        events_routes: RoutesConfig | None = None,
+        metrics_port: int | None = None,
         logging_config: dict | None = None,
     ):
         self.identity_file = identity_file
         self.workers = server_workers
         self.server_reload = server_reload
+        self.restart_batch_size = max(1, server_restart_batch_size)
+        self.drain_timeout = server_drain_timeout
+        self.preload = server_preload and not server_reload
+        if server_preload and server_reload:
+            logger.warning("Workers can't be preloaded with auto-reload, preload disabled")
+        self.preloaded_app: ASGIApp | str | None = None
+        self.readiness_file = Path(server_readiness_file) if server_readiness_file else None
         self.events_enabled = events_enabled
         self.events_pub_port = events_pub_port
         self.events_sub_port = events_sub_port
         self.events_metrics_collect_interval = events_metrics_collect_interval
+        self.events_capture = events_capture
+        self.events_routes = events_routes or RoutesConfig()
         self.logging_config = logging_config
         self.worker_identifiers = [str(uuid4()) for _ in range(server_workers)]
         self.worker_processes: dict[str, CombinedProcess] = {}
+        self.worker_started_at: dict[str, float] = {}
+        # Keyed by pid, a worker and its replacement share the same id.
+        self.worker_drained_events: dict[int, Event] = {}
+        self.worker_ready_conns: dict[int, Connection] = {}
+        self.worker_readiness: dict[str, WorkerReady] = {}
+        self.worker_crashes: dict[str, int] = {}
+        self.worker_restarts: dict[str, int] = {}
+        self.pending_restarts: dict[str, tuple[float, float]] = {}
         self.zmq_pubsub_router_process = None
+        self.zmq_ctx: zmq.Context | None = None
+        self.events_publisher: zmq.Socket | None = None
         self.monitor_thread = threading.Thread(target=self.monitor_workers, daemon=True)
+        self.desired_workers = server_workers
+        self.autoscaler = None
+        if server_max_workers and server_max_workers > server_workers:
+            if events_enabled:
+                self.autoscaler = Autoscaler(
+                    server_workers,
+                    server_max_workers,
+                    target_cpu=autoscale_target_cpu,
+                    target_rps=autoscale_target_rps,
+                    target_p99_ms=autoscale_target_p99,
+                )
+            else:
+                logger.warning("Worker autoscaling requires events, it has been disabled")
+        self.autoscale_thread = threading.Thread(target=self.autoscale_workers, daemon=True)
+        self.aggregator = MetricsAggregator(max_routes=self.events_routes.max_routes)
+        self.metrics_thread = threading.Thread(target=self.aggregate_metrics, daemon=True)
+        self.agent_metrics: AgentMetrics | None = None
+        self.metrics_server = None
+        if metrics_port is not None:
+            if events_enabled:
+                self.metrics_server = MetricsServer(lambda: self.agent_metrics, port=metrics_port)
+            else:
+                logger.warning("The metrics endpoint requires events, it has been disabled")
         self.stop_event = threading.Event()
         self.pause_event = threading.Event()
+        # Held while the worker table is changed: by the monitor thread, by a
+        # rolling restart for its whole duration and by the drain threads.
+        self.workers_lock = threading.RLock()
+        self.restart_event = threading.Event()
+        # Workers are spawned, or forked from the fork server when the app is
+        # preloaded. Their events and pipes must come from the context starting them.
+        self.mp_context = multiprocessing.get_context("spawn")
+        self.fork_context = multiprocessing.get_context("forkserver")
         self.watch_filter = PythonFilter(ignore_paths=None)
         self.watcher = watch(
             Path.cwd(),
@@ -130,6 +283,8 @@ class MasterBase(ABC):
             yield_on_timeout=True,
         )
         self.ziti_load_timeout_ms = ziti_load_timeout_ms
+        self.ziti_binds = ziti_binds
+        self.ziti_contexts = ziti_contexts
         self.server_backlog = server_backlog
         self.timeout_keep_alive = server_timeout_keep_alive
         self.limit_concurrency = server_limit_concurrency
@@ -143,36 +298,84 @@ class MasterBase(ABC):
     def setup_signals_handler(self):
         for sig in (signal.SIGINT, signal.SIGTERM):
             signal.signal(sig, self.handle_signal)
+        signal.signal(signal.SIGHUP, self.handle_restart_signal)
 
     def handle_signal(self, *args, **kwargs):
         self.stop_event.set()
 
-    def start_worker(self, worker_id: str):
-        """Start a single worker process"""
+    def handle_restart_signal(self, *args, **kwargs):
+        self.restart_event.set()
 
-        p = start_process(
-            start_uvicorn_worker,
-            "function",
-            (
-                worker_id,
-                self.get_asgi_app(),
-                self.identity_file,
-            ),
-            {
-                "ziti_load_timeout_ms": self.ziti_load_timeout_ms,
-                "server_backlog": self.server_backlog,
-                "server_timeout_keep_alive": self.timeout_keep_alive,
-                "server_limit_concurrency": self.limit_concurrency,
-                "server_limit_max_requests": self.limit_max_requests,
-                "events_enabled": self.events_enabled,
-                "events_pub_port": self.events_pub_port,
-                "events_metrics_collect_interval": self.events_metrics_collect_interval,
-                "logging_config": self.logging_config,
-            },
+    def start_worker(self, worker_id: str):
+        """
+        Start a single worker process. The worker reports its startup timings
+        through a pipe once it serves requests, see `handle_worker_ready`.
+        """
+        context = self.fork_context if self.preloaded_app is not None else self.mp_context
+        ready_conn, worker_ready_conn = context.Pipe(duplex=False)
+        drained_event = context.Event()
+        args = (
+            worker_id,
+            self.preloaded_app or self.get_asgi_app(),
+            self.identity_file,
         )
+        kwargs = {
+            "ziti_load_timeout_ms": self.ziti_load_timeout_ms,
+            "ziti_binds": self.ziti_binds,
+            "ziti_contexts": self.ziti_contexts,
+            "server_backlog": self.server_backlog,
+            "server_timeout_keep_alive": self.timeout_keep_alive,
+            "server_limit_concurrency": self.limit_concurrency,
+            "server_limit_max_requests": self.limit_max_requests,
+            "server_drain_timeout": self.drain_timeout,
+            "events_enabled": self.events_enabled,
+            "events_pub_port": self.events_pub_port,
+            "events_metrics_collect_interval": self.events_metrics_collect_interval,
+            "events_capture": self.events_capture,
+            "events_routes": self.events_routes,
+            "logging_config": self.logging_config,
+            "ready_conn": worker_ready_conn,
+            "drained_event": drained_event,
+        }
+        if self.preloaded_app is not None:
+            p = self.fork_worker(args, kwargs)
+        else:
+            p = start_process(start_uvicorn_worker, "function", args, kwargs)
+        # Only the worker holds the sending end, the pipe is closed if it dies.
+        worker_ready_conn.close()
+        self.worker_ready_conns[p.pid] = ready_conn
+        self.worker_drained_events[p.pid] = drained_event
+        self.worker_started_at[worker_id] = time.monotonic()
         logger.info(f"Worker {worker_id} [{p.pid}] started")
         return p
 
+    def preload_app(self):
+        """
+        Start a fork server importing the modules of the ASGI app once, the
+        workers are forked from it and share these modules instead of importing
+        them again. The fork server is a new single-threaded process: by the
+        time workers are restarted or added, the master runs several threads
+        and holds a ZMQ context, forking it would copy them in a broken state.
+        The Ziti context is only loaded by the workers, after the fork.
+        """
+        app = self.get_asgi_app()
+        app_module = app.partition(":")[0] if isinstance(app, str) else type(app).__module__
+        # Workers import the app from the current directory, so does the fork server.
+        if os.getcwd() not in sys.path:
+            sys.path.insert(0, os.getcwd())
+        # mrok.proxy.freeze must come last, it freezes what the other modules allocated.
+        self.fork_context.set_forkserver_preload([__name__, app_module, "mrok.proxy.freeze"])
+        forkserver.ensure_running()
+        self.preloaded_app = app
+        logger.info("Application preloaded, workers will be forked")
+
+    def fork_worker(self, args: tuple, kwargs: dict) -> CombinedProcess:
+        process = self.fork_context.Process(
+            target=start_forked_uvicorn_worker, args=args, kwargs=kwargs
+        )
+        process.start()
+        return ForkedProcess(process)
+
     def start_events_router(self):
         self.zmq_pubsub_router_process = start_process(
             start_events_router,
@@ -192,54 +395,418 @@ class MasterBase(ABC):
             p = self.start_worker(worker_id)
             self.worker_processes[worker_id] = p
 
+    def handle_worker_ready(self, worker_id: str, process: CombinedProcess) -> bool:
+        ready_conn = self.worker_ready_conns.pop(process.pid)
+        try:
+            startup: WorkerStartup = ready_conn.recv()
+        except EOFError:
+            # The worker exited before getting ready.
+            return False
+        finally:
+            ready_conn.close()
+        ready = WorkerReady(
+            worker_id=worker_id,
+            pid=process.pid,
+            ready_time=round(time.monotonic() - self.worker_started_at.get(worker_id, 0), 3),
+            ziti_load_time=round(startup.ziti_load_time, 3),
+            ziti_bind_time=round(startup.ziti_bind_time, 3),
+        )
+        self.worker_readiness[worker_id] = ready
+        logger.info(
+            f"Worker {worker_id} [{process.pid}] ready in {ready.ready_time:.2f}s "
+            f"(Ziti load {ready.ziti_load_time:.2f}s, bind {ready.ziti_bind_time:.2f}s)"
+        )
+        self.publish_event(BusEvent(type="worker_ready", data=ready))
+        self.write_readiness()
+        return True
+
+    def get_ready_workers(self) -> list[WorkerReady]:
+        return [
+            ready
+            for worker_id, process in self.worker_processes.items()
+            if (ready := self.worker_readiness.get(worker_id)) and ready.pid == process.pid
+        ]
+
+    def write_readiness(self):
+        """Write the readiness of the agent, ready once all its workers are, if configured."""
+        if self.readiness_file is None:
+            return
+        ready_workers = self.get_ready_workers()
+        readiness = AgentReadiness(
+            ready=bool(self.worker_processes) and len(ready_workers) == len(self.worker_processes),
+            workers=len(self.worker_processes),
+            ready_workers=ready_workers,
+        )
+        # Replaced atomically, readers never see a partially written file.
+        tmp_file = self.readiness_file.with_name(f".{self.readiness_file.name}.tmp")
+        try:
+            tmp_file.write_text(readiness.model_dump_json())
+            os.replace(tmp_file, self.readiness_file)
+        except OSError as e:
+            logger.warning(f"Cannot write readiness file {self.readiness_file}: {e}")
+
+    def release_worker(self, process: CombinedProcess):
+        """Forget a worker process that has exited or is being stopped."""
+        self.worker_drained_events.pop(process.pid, None)
+        ready_conn = self.worker_ready_conns.pop(process.pid, None)
+        if ready_conn is not None:
+            ready_conn.close()
+        for worker_id, ready in list(self.worker_readiness.items()):
+            if ready.pid == process.pid:
+                del self.worker_readiness[worker_id]
+
+    def start_events_publisher(self):
+        self.zmq_ctx = zmq.Context()
+        self.events_publisher = self.zmq_ctx.socket(zmq.PUB)
+        self.events_publisher.connect(f"tcp://localhost:{self.events_pub_port}")
+
+    def stop_events_publisher(self):
+        if self.events_publisher is not None:
+            self.events_publisher.close(linger=0)
+            self.zmq_ctx.term()  # type: ignore[union-attr]
+            self.events_publisher = self.zmq_ctx = None
+
+    def publish_event(self, event: BusEvent):
+        if self.events_publisher is None:
+            return
+        try:
+            self.events_publisher.send_multipart(encode_event(event), zmq.NOBLOCK)
+        except zmq.ZMQError as e:  # pragma: no cover
+            logger.warning(f"Cannot publish {event.type} event: {e}")
+
     def start(self):
+        if self.preload:
+            self.preload_app()
         self.start_events_router()
+        if self.events_enabled:
+            self.start_events_publisher()
         self.start_workers()
+        self.write_readiness()
         self.monitor_thread.start()
+        if self.autoscaler:
+            self.autoscale_thread.start()
+        if self.events_enabled:
+            self.metrics_thread.start()
+        if self.metrics_server:
+            self.metrics_server.start()
         self.pause_event.set()
 
     def stop_events_router(self):
         self.zmq_pubsub_router_process.stop(sigint_timeout=5, sigkill_timeout=1)
 
     def stop_workers(self):
-        for process in self.worker_processes.values():
-            if process.is_alive():  # pragma: no branch
-                process.stop(sigint_timeout=5, sigkill_timeout=1)
-        self.worker_processes.clear()
+        with self.workers_lock:
+            self.drain_workers(list(self.worker_processes.values()))
+            self.worker_processes.clear()
+            self.write_readiness()
+
+    def drain_workers(self, processes: list[CombinedProcess]):
+        """
+        Stop workers gracefully, all at once. On SIGINT a worker first unbinds
+        from the Ziti service so no new circuits reach it, then completes its
+        in-flight requests within `drain_timeout` and reports it's drained.
+        Workers still running after that are killed.
+        """
+        alive = [process for process in processes if process.is_alive()]
+        for process in alive:
+            os.kill(process.pid, signal.SIGINT)
+        deadline = time.monotonic() + self.drain_timeout + WORKER_DRAIN_GRACE
+        for process in alive:
+            drained_event = self.worker_drained_events.get(process.pid)
+            if drained_event is not None and self.wait_worker_drained(
+                process, drained_event, deadline
+            ):
+                logger.info(f"Worker [{process.pid}] drained")
+                process.join(WORKER_DRAIN_GRACE)
+            if process.exitcode is None:
+                logger.warning(f"Worker [{process.pid}] didn't drain in time, killing it")
+                process.stop(sigint_timeout=0, sigkill_timeout=1)
+        # Workers scaled down are drained by their own thread, concurrently with the monitor.
+        with self.workers_lock:
+            for process in processes:
+                self.release_worker(process)
+
+    def wait_worker_drained(
+        self, process: CombinedProcess, drained_event: Event, deadline: float
+    ) -> bool:
+        while not drained_event.wait(WORKER_READY_CHECK_DELAY):
+            if not process.is_alive() or time.monotonic() >= deadline:
+                return drained_event.is_set()
+        return True
 
     def stop(self):
         self.pause_event.clear()
         if self.monitor_thread.is_alive():  # pragma: no branch
             self.monitor_thread.join(timeout=MONITOR_THREAD_JOIN_TIMEOUT)
+        if self.autoscale_thread.is_alive():
+            self.autoscale_thread.join(timeout=AUTOSCALE_THREAD_JOIN_TIMEOUT)
+        if self.metrics_thread.is_alive():
+            self.metrics_thread.join(timeout=METRICS_THREAD_JOIN_TIMEOUT)
+        if self.metrics_server:
+            self.metrics_server.stop()
         self.stop_workers()
+        self.stop_events_publisher()
         self.stop_events_router()
 
     def restart(self):
+        """
+        Rolling restart: replace the workers `restart_batch_size` at a time,
+        stopping each worker only once its replacement is ready so that the
+        Ziti service always has bound terminators.
+
+        If a replacement doesn't get ready, it's stopped, the worker it should
+        replace keeps running and the remaining workers are not restarted.
+        """
         self.pause_event.clear()
-        self.stop_workers()
-        self.start_workers()
-        self.pause_event.set()
+        try:
+            # Waits for the monitor thread to finish the step it's running.
+            with self.workers_lock:
+                worker_ids = list(self.worker_processes)
+                for i in range(0, len(worker_ids), self.restart_batch_size):
+                    if not self.replace_workers(worker_ids[i : i + self.restart_batch_size]):
+                        logger.error("Restart aborted, the remaining workers were not restarted")
+                        break
+        finally:
+            self.pause_event.set()
+
+    def replace_workers(self, worker_ids: list[str]) -> bool:
+        replacements = {worker_id: self.start_worker(worker_id) for worker_id in worker_ids}
+
+        replaced = True
+        old_processes = []
+        for worker_id, process in replacements.items():
+            if not self.wait_worker_ready(worker_id, process):
+                logger.error(f"Worker {worker_id} [{process.pid}] didn't get ready")
+                process.stop(sigint_timeout=1, sigkill_timeout=1)
+                self.release_worker(process)
+                replaced = False
+                continue
+            old_process = self.worker_processes[worker_id]
+            self.worker_processes[worker_id] = process
+            self.pending_restarts.pop(worker_id, None)
+            old_processes.append(old_process)
+            logger.info(f"Replaced worker {worker_id} [{old_process.pid}] -> [{process.pid}]")
+        self.drain_workers(old_processes)
+        return replaced
+
+    def wait_worker_ready(
+        self,
+        worker_id: str,
+        process: CombinedProcess,
+        timeout: float = WORKER_READY_TIMEOUT,
+    ) -> bool:
+        ready_conn = self.worker_ready_conns[process.pid]
+        deadline = time.monotonic() + timeout
+        while not ready_conn.poll(WORKER_READY_CHECK_DELAY):
+            if self.stop_event.is_set() or not process.is_alive() or time.monotonic() >= deadline:
+                return False
+        return self.handle_worker_ready(worker_id, process)
+
+    def restart_requested(self) -> bool:
+        if not self.restart_event.is_set():
+            return False
+        self.restart_event.clear()
+        logger.warning("Restart requested, restarting workers...")
+        return True
 
     def monitor_workers(self):
+        """
+        Wait for workers to get ready or to exit and restart them. A worker that keeps crashing
+        is restarted with an exponential backoff, its crash count is reset once
+        it has been running for `WORKER_STABLE_UPTIME` seconds.
+        """
         while not self.stop_event.is_set():
             try:
                 self.pause_event.wait()
-                for worker_id, process in self.worker_processes.items():
-                    if not process.is_alive():
-                        logger.warning(f"Worker {worker_id} [{process.pid}] died unexpectedly")
-                        process.stop(sigint_timeout=1, sigkill_timeout=1)
-                        new_process = self.start_worker(worker_id)
-                        self.worker_processes[worker_id] = new_process
-                        logger.info(
-                            f"Restarted worker {worker_id} [{process.pid}] -> [{new_process.pid}]"
-                        )
-
-                time.sleep(MONITOR_THREAD_CHECK_DELAY)
-
+                with self.workers_lock:
+                    if self.autoscaler:
+                        self.scale_workers()
+                    self.restart_pending_workers()
+                self.wait_workers()
             except Exception as e:
                 logger.error(f"Error in worker monitoring: {e}")
                 time.sleep(MONITOR_THREAD_ERROR_DELAY)
 
+    def wait_workers(self):
+        with self.workers_lock:
+            sentinels = {
+                get_process_sentinel(process): worker_id
+                for worker_id, process in self.worker_processes.items()
+                if worker_id not in self.pending_restarts
+            }
+            ready_conns = {
+                ready_conn: worker_id
+                for worker_id, process in self.worker_processes.items()
+                if (ready_conn := self.worker_ready_conns.get(process.pid)) is not None
+            }
+            timeout = MONITOR_THREAD_CHECK_DELAY
+            if self.pending_restarts:
+                next_due = min(due for due, _ in self.pending_restarts.values())
+                timeout = min(timeout, max(0, next_due - time.monotonic()))
+
+        ready = wait([*ready_conns, *sentinels], timeout)
+        with self.workers_lock:
+            # Workers started or stopped by a restart are handled while the monitor is paused.
+            if not ready or not self.pause_event.is_set():
+                return
+            for ready_conn in ready:
+                if not isinstance(ready_conn, Connection):
+                    continue
+                worker_id = ready_conns[ready_conn]
+                process = self.worker_processes[worker_id]
+                if self.worker_ready_conns.get(process.pid) is ready_conn:
+                    self.handle_worker_ready(worker_id, process)
+            for sentinel in ready:
+                if isinstance(sentinel, Connection):
+                    continue
+                worker_id = sentinels[sentinel]
+                process = self.worker_processes[worker_id]
+                if get_process_sentinel(process) == sentinel:
+                    self.handle_worker_exit(worker_id, process)
+
+    def handle_worker_exit(self, worker_id: str, process: CombinedProcess):
+        process.stop(sigint_timeout=1, sigkill_timeout=1)
+        self.release_worker(process)
+        self.write_readiness()
+        if process.exitcode == 0:
+            # Clean exit, e.g. after serving `limit_max_requests`: not a crash.
+            self.worker_crashes[worker_id] = 0
+            self.pending_restarts[worker_id] = (time.monotonic(), 0.0)
+            logger.info(f"Worker {worker_id} [{process.pid}] exited, restarting")
+            return
+        uptime = time.monotonic() - self.worker_started_at.get(worker_id, 0)
+        crashes = 1 if uptime >= WORKER_STABLE_UPTIME else self.worker_crashes.get(worker_id, 0) + 1
+        self.worker_crashes[worker_id] = crashes
+        backoff = get_restart_backoff(crashes)
+        self.pending_restarts[worker_id] = (time.monotonic() + backoff, backoff)
+        logger.warning(
+            f"Worker {worker_id} [{process.pid}] died unexpectedly "
+            f"(exit code {process.exitcode}), restarting in {backoff:.1f}s"
+        )
+
+    def restart_pending_workers(self):
+        now = time.monotonic()
+        for worker_id, (due, backoff) in list(self.pending_restarts.items()):
+            if due > now:
+                continue
+            del self.pending_restarts[worker_id]
+            process = self.worker_processes[worker_id]
+            new_process = self.start_worker(worker_id)
+            self.worker_processes[worker_id] = new_process
+            self.worker_restarts[worker_id] = self.worker_restarts.get(worker_id, 0) + 1
+            logger.info(f"Restarted worker {worker_id} [{process.pid}] -> [{new_process.pid}]")
+            self.publish_event(
+                BusEvent(
+                    type="worker_restart",
+                    data=WorkerRestart(
+                        worker_id=worker_id,
+                        pid=process.pid,
+                        exit_code=process.exitcode,
+                        new_pid=new_process.pid,
+                        crashes=self.worker_crashes.get(worker_id, 0),
+                        restarts=self.worker_restarts[worker_id],
+                        backoff=round(backoff, 3),
+                    ),
+                )
+            )
+
+    def autoscale_workers(self):
+        """
+        Feed the autoscaler with the metrics published by the workers and
+        update the desired number of workers, the monitor thread applies it.
+        """
+        assert self.autoscaler is not None
+        ctx = zmq.Context()
+        subscriber = ctx.socket(zmq.SUB)
+        subscriber.connect(f"tcp://localhost:{self.events_sub_port}")
+        subscriber.setsockopt(zmq.SUBSCRIBE, STATUS_EVENT_PREFIX)
+        next_check = time.monotonic() + AUTOSCALE_INTERVAL
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    if subscriber.poll(AUTOSCALE_POLL_TIMEOUT_MS):
+                        event = decode_event(subscriber.recv_multipart())
+                        self.autoscaler.observe(event.data.metrics)  # type: ignore[union-attr]
+                    if time.monotonic() < next_check or not self.pause_event.is_set():
+                        continue
+                    with self.workers_lock:
+                        worker_ids = list(self.worker_processes)
+                        ready_workers = len(self.get_ready_workers())
+                    # Wait for the workers added by the last decision to serve requests.
+                    if ready_workers < len(worker_ids):
+                        continue
+                    next_check = time.monotonic() + AUTOSCALE_INTERVAL
+                    self.desired_workers = self.autoscaler.get_desired_workers(worker_ids)
+                except Exception as e:
+                    logger.error(f"Error in worker autoscaling: {e}")
+        finally:
+            subscriber.close(linger=0)
+            ctx.term()
+
+    def aggregate_metrics(self):
+        """
+        Merge the metrics published by the workers and publish them as an
+        `agent_status` event every `events_metrics_collect_interval` seconds.
+        The thread has its own sockets, ZMQ sockets can't be shared across threads.
+        """
+        ctx = zmq.Context()
+        subscriber = ctx.socket(zmq.SUB)
+        subscriber.connect(f"tcp://localhost:{self.events_sub_port}")
+        subscriber.setsockopt(zmq.SUBSCRIBE, STATUS_EVENT_PREFIX)
+        publisher = ctx.socket(zmq.PUB)
+        publisher.connect(f"tcp://localhost:{self.events_pub_port}")
+        next_publish = time.monotonic() + self.events_metrics_collect_interval
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    if subscriber.poll(METRICS_POLL_TIMEOUT_MS):
+                        event = decode_event(subscriber.recv_multipart())
+                        self.aggregator.observe(event.data)  # type: ignore[arg-type]
+                    if time.monotonic() < next_publish:
+                        continue
+                    next_publish = time.monotonic() + self.events_metrics_collect_interval
+                    with self.workers_lock:
+                        worker_ids = list(self.worker_processes)
+                    status = self.aggregator.aggregate(worker_ids)
+                    self.agent_metrics = status.metrics if status is not None else None
+                    if status is not None:
+                        publisher.send_multipart(
+                            encode_event(BusEvent(type="agent_status", data=status)), zmq.NOBLOCK
+                        )
+                except Exception as e:
+                    logger.error(f"Error in metrics aggregation: {e}")
+        finally:
+            subscriber.close(linger=0)
+            publisher.close(linger=0)
+            ctx.term()
+
+    def scale_workers(self):
+        """
+        Start or stop workers to match the desired number of workers.
+        The most recently started workers are stopped first.
+        """
+        current = len(self.worker_processes)
+        desired = self.desired_workers
+        if desired == current:
+            return
+        logger.info(f"Scaling workers {current} -> {desired}")
+        for _ in range(current, desired):
+            worker_id = str(uuid4())
+            self.worker_identifiers.append(worker_id)
+            self.worker_processes[worker_id] = self.start_worker(worker_id)
+        for worker_id in list(self.worker_processes)[desired:]:
+            process = self.worker_processes.pop(worker_id)
+            self.worker_identifiers.remove(worker_id)
+            self.pending_restarts.pop(worker_id, None)
+            if self.autoscaler:  # pragma: no branch
+                self.autoscaler.forget(worker_id)
+            self.aggregator.forget(worker_id)
+            self.worker_readiness.pop(worker_id, None)
+            # Don't hold the monitor thread while the worker drains.
+            threading.Thread(target=self.drain_workers, args=([process],), daemon=True).start()
+            logger.info(f"Worker {worker_id} [{process.pid}] draining")
+        self.write_readiness()
+
     def __iter__(self):
         return self
 
@@ -261,7 +828,11 @@ class MasterBase(ABC):
                             f"{', '.join(map(print_path, files_changed))} changed, reloading...",
                         )
                         self.restart()
+                    elif self.restart_requested():
+                        self.restart()
             else:
-                self.stop_event.wait()
+                while not self.stop_event.wait(RESTART_CHECK_DELAY):
+                    if self.restart_requested():
+                        self.restart()
         finally:
             self.stop()
@@ -4,20 +4,39 @@ import asyncio
 import logging
 import os
 import time
+from collections import Counter, deque
+from collections.abc import Iterable, Mapping
+from functools import lru_cache
 
 import psutil
 from hdrh.histogram import HdrHistogram
+from httpcore import AsyncConnectionPool
 
 from mrok.proxy.models import (
     DataTransferMetrics,
+    DialMetrics,
+    PoolMetrics,
     ProcessMetrics,
+    RequestBodyMetrics,
     RequestsMetrics,
     ResponseTimeMetrics,
+    RouteMetrics,
     WorkerMetrics,
 )
+from mrok.proxy.routes import OTHER_ROUTE, RoutesConfig, get_status_class
+from mrok.proxy.timing import UPSTREAM_PHASES
 
 logger = logging.getLogger("mrok.proxy")
 
+WINDOW_MAX_TICKS = 300
+LIFETIME_HISTOGRAM = "lifetime"
+# Upstream phases are often sub-millisecond: they are recorded in microseconds,
+# up to a minute, with a lower precision to keep their histograms small.
+PHASE_HISTOGRAM_ARGS = (1, 60_000_000, 2)
+# Response times of the routes, with a lower precision since there are many of them.
+ROUTE_HISTOGRAM_ARGS = (1, 60000, 2)
+ROUTE_CACHE_SIZE = 1024
+
 
 def _collect_process_usage(interval: float) -> ProcessMetrics:
     proc = psutil.Process(os.getpid())
@@ -49,79 +68,270 @@ async def get_process_metrics(interval: float = 0.1) -> ProcessMetrics:
     return await asyncio.to_thread(_collect_process_usage, interval)
 
 
+def get_response_time_metrics(hist: HdrHistogram) -> ResponseTimeMetrics:
+    percentiles = hist.get_percentile_to_value_dict([50, 90, 99])
+    return ResponseTimeMetrics(
+        avg=hist.get_mean_value(),
+        min=hist.get_min_value(),
+        max=hist.get_max_value(),
+        p50=percentiles.get(50, 0),
+        p90=percentiles.get(90, 0),
+        p99=percentiles.get(99, 0),
+    )
+
+
+def get_pool_metrics(pool: AsyncConnectionPool) -> PoolMetrics:
+    connections = pool.connections
+    return PoolMetrics(
+        connections=len(connections),
+        idle=sum(1 for connection in connections if connection.is_idle()),
+        pending=sum(1 for request in pool._requests if request.is_queued()),
+    )
+
+
+class WindowedHistogram:
+    """
+    Response times over the last 1s, 10s, 1m and 5m.
+
+    Values are recorded into an active one second histogram that is swapped out,
+    recorder-style, at every tick. The last ten seconds are kept and rolled up every
+    10s into the last six 10s histograms, which are rolled up every minute into the
+    last five 1m histograms. Windows are made of complete slots, the 1m window
+    moves every 10s and the 5m one every minute.
+
+    Complete seconds are also added to a lifetime histogram, so recording a value
+    is a single ``record_value`` call.
+    """
+
+    def __init__(self, lowest: int, highest: int, sigfigs: int, now: float):
+        self._args = (lowest, highest, sigfigs)
+        self._lifetime = HdrHistogram(*self._args)
+        self._active = self._new()
+        self._seconds: deque[HdrHistogram] = deque(maxlen=10)
+        self._ten_seconds: deque[HdrHistogram] = deque(maxlen=6)
+        self._minutes: deque[HdrHistogram] = deque(maxlen=5)
+        self._ticks = 0
+        self._next_tick = now + 1
+
+    def _new(self) -> HdrHistogram:
+        return HdrHistogram(*self._args, word_size=4)
+
+    def _merge(self, histograms: Iterable[HdrHistogram]) -> HdrHistogram:
+        merged = self._new()
+        for hist in histograms:
+            if hist.get_total_count():
+                merged.add(hist)
+        return merged
+
+    def record(self, value: float, now: float) -> None:
+        if now >= self._next_tick:
+            self.rotate(now)
+        self._active.record_value(value)
+
+    def rotate(self, now: float) -> None:
+        if now < self._next_tick:
+            return
+        ticks = int(now - self._next_tick) + 1
+        self._next_tick += ticks
+        if ticks >= WINDOW_MAX_TICKS:
+            # Past five minutes every slot is empty, reset them at once instead
+            # of replaying each tick on the request being recorded.
+            if self._active.get_total_count():
+                self._lifetime.add(self._active)
+                self._active = self._new()
+            self._seconds.clear()
+            self._ten_seconds.clear()
+            self._minutes.clear()
+            self._ticks += ticks
+            return
+        for _ in range(ticks):
+            if self._active.get_total_count():
+                self._lifetime.add(self._active)
+            self._seconds.append(self._active)
+            self._active = self._new()
+            self._ticks += 1
+            if self._ticks % 10 == 0:
+                self._ten_seconds.append(self._merge(self._seconds))
+            if self._ticks % 60 == 0:
+                self._minutes.append(self._merge(self._ten_seconds))
+
+    def get_lifetime(self) -> HdrHistogram:
+        lifetime = HdrHistogram(*self._args)
+        lifetime.add(self._lifetime)
+        if self._active.get_total_count():
+            lifetime.add(self._active)
+        return lifetime
+
+    def get_windows(self) -> dict[str, HdrHistogram]:
+        return {
+            "1s": self._seconds[-1] if self._seconds else self._new(),
+            "10s": self._merge(self._seconds),
+            "1m": self._merge(self._ten_seconds),
+            "5m": self._merge(self._minutes),
+        }
+
+
+class RouteStats:
+    def __init__(self) -> None:
+        self.requests: Counter[str] = Counter()
+        self.response_times = HdrHistogram(*ROUTE_HISTOGRAM_ARGS)
+
+    def get_metrics(self) -> RouteMetrics:
+        return RouteMetrics(
+            requests=dict(self.requests),
+            response_time=get_response_time_metrics(self.response_times),
+            histogram=self.response_times.encode().decode("ascii"),
+        )
+
+
 class MetricsCollector:
-    def __init__(self, worker_id: str, lowest=1, highest=60000, sigfigs=3):
+    """
+    Request metrics of a worker.
+
+    All the hooks are synchronous and only update plain counters: they run on the
+    event loop thread, so no lock is needed. Response times are recorded into a
+    windowed histogram that also keeps the lifetime ones.
+
+    Requests are also broken down by status class and by route, the request paths
+    being grouped into routes as configured by `routes`.
+
+    Dial times, upstream phase times and connection pool occupancy are only
+    reported by the proxy apps, see `ProxyAppBase.instrument`.
+    """
+
+    def __init__(
+        self,
+        worker_id: str,
+        lowest=1,
+        highest=60000,
+        sigfigs=3,
+        routes: RoutesConfig | None = None,
+    ):
         self.worker_id = worker_id
         self.total_requests = 0
         self.successful_requests = 0
         self.failed_requests = 0
         self.bytes_in = 0
         self.bytes_out = 0
+        self.request_bodies = dict.fromkeys(RequestBodyMetrics.model_fields, 0)
+        self.statuses: Counter[str] = Counter()
+        self.routes_config = routes or RoutesConfig()
+        self.routes: dict[str, RouteStats] = {}
+        # Clients request a limited set of paths, their routes are memoized.
+        self._normalize_path = lru_cache(maxsize=ROUTE_CACHE_SIZE)(self.routes_config.normalize)
 
         self._tick_last = time.time()
         self._tick_requests = 0
 
-        self.hist = HdrHistogram(lowest, highest, sigfigs)
+        self.windows = WindowedHistogram(lowest, highest, sigfigs, time.perf_counter())
 
-        self._lock = asyncio.Lock()
+        self.dials = 0
+        self.failed_dials = 0
+        self.dial_times = HdrHistogram(lowest, highest, sigfigs)
+        self.pool: AsyncConnectionPool | None = None
+        self.upstream_phases = {
+            phase: HdrHistogram(*PHASE_HISTOGRAM_ARGS) for phase in UPSTREAM_PHASES
+        }
 
-    async def on_request_start(self, scope):
+    def on_request_start(self, scope) -> float:
         return time.perf_counter()
 
-    async def on_request_body(self, length):
-        async with self._lock:
-            self.bytes_in += length
+    def on_request_body(self, length: int) -> None:
+        self.bytes_in += length
 
-    async def on_response_start(self, status_code):
-        pass  # reserved
+    def on_request_body_mode(self, mode: str) -> None:
+        self.request_bodies[mode] += 1
 
-    async def on_response_chunk(self, length):
-        async with self._lock:
-            self.bytes_out += length
+    def on_response_chunk(self, length: int) -> None:
+        self.bytes_out += length
 
-    async def on_request_end(self, start_time, status_code):
-        elapsed_ms = (time.perf_counter() - start_time) * 1000
+    def on_request_end(self, start_time: float, status_code: int, path: str | None = None) -> None:
+        now = time.perf_counter()
+        elapsed_ms = (now - start_time) * 1000
+        self.windows.record(elapsed_ms, now)
+        self.total_requests += 1
+        self._tick_requests += 1
+        if status_code < 500:
+            self.successful_requests += 1
+        else:
+            self.failed_requests += 1
+        status_class = get_status_class(status_code)
+        self.statuses[status_class] += 1
+        if path is not None:
+            stats = self._get_route_stats(path)
+            stats.requests[status_class] += 1
+            stats.response_times.record_value(elapsed_ms)
 
-        async with self._lock:
-            self.total_requests += 1
-            self._tick_requests += 1
+    def _get_route_stats(self, path: str) -> RouteStats:
+        route = self._normalize_path(path)
+        stats = self.routes.get(route)
+        if stats is not None:
+            return stats
+        if len(self.routes) - (OTHER_ROUTE in self.routes) >= self.routes_config.max_routes:
+            route = OTHER_ROUTE
+        return self.routes.setdefault(route, RouteStats())
 
-            if status_code < 500:
-                self.successful_requests += 1
-            else:
-                self.failed_requests += 1
+    def on_dial(self, elapsed: float, failed: bool) -> None:
+        self.dials += 1
+        if failed:
+            self.failed_dials += 1
+        self.dial_times.record_value(elapsed * 1000)
 
-            self.hist.record_value(elapsed_ms)
+    def on_upstream_phases(self, phases: Mapping[str, float]) -> None:
+        for phase, elapsed in phases.items():
+            self.upstream_phases[phase].record_value(elapsed * 1_000_000)
 
     async def snapshot(self) -> WorkerMetrics:
-        async with self._lock:
-            now = time.time()
-            delta = now - self._tick_last
-            rps = int(self._tick_requests / delta) if delta > 0 else 0
-            data = WorkerMetrics(
-                worker_id=self.worker_id,
-                process=await get_process_metrics(),
-                requests=RequestsMetrics(
-                    rps=rps,
-                    total=self.total_requests,
-                    successful=self.successful_requests,
-                    failed=self.failed_requests,
-                ),
-                data_transfer=DataTransferMetrics(
-                    bytes_in=self.bytes_in,
-                    bytes_out=self.bytes_out,
-                ),
-                response_time=ResponseTimeMetrics(
-                    avg=self.hist.get_mean_value(),
-                    min=self.hist.get_min_value(),
-                    max=self.hist.get_max_value(),
-                    p50=self.hist.get_value_at_percentile(50),
-                    p90=self.hist.get_value_at_percentile(90),
-                    p99=self.hist.get_value_at_percentile(99),
-                ),
-            )
-
-            self._tick_last = now
-            self._tick_requests = 0
-
-            return data
+        process = await get_process_metrics()
+
+        # No await from here on, the hooks can't run until the counters are read.
+        now = time.time()
+        delta = now - self._tick_last
+        rps = int(self._tick_requests / delta) if delta > 0 else 0
+        self._tick_last = now
+        self._tick_requests = 0
+        self.windows.rotate(time.perf_counter())
+        lifetime = self.windows.get_lifetime()
+        windows = self.windows.get_windows()
+
+        return WorkerMetrics(
+            worker_id=self.worker_id,
+            process=process,
+            requests=RequestsMetrics(
+                rps=rps,
+                total=self.total_requests,
+                successful=self.successful_requests,
+                failed=self.failed_requests,
+            ),
+            data_transfer=DataTransferMetrics(
+                bytes_in=self.bytes_in,
+                bytes_out=self.bytes_out,
+            ),
+            response_time=get_response_time_metrics(lifetime),
+            response_time_windows={
+                name: get_response_time_metrics(hist) for name, hist in windows.items()
+            },
+            response_time_histograms={
+                name: hist.encode().decode("ascii")
+                for name, hist in {LIFETIME_HISTOGRAM: lifetime, **windows}.items()
+            },
+            request_bodies=RequestBodyMetrics(**self.request_bodies),
+            statuses=dict(self.statuses),
+            routes={route: stats.get_metrics() for route, stats in self.routes.items()},
+            pool=get_pool_metrics(self.pool) if self.pool is not None else PoolMetrics(),
+            dials=DialMetrics(
+                total=self.dials,
+                failed=self.failed_dials,
+                histogram=self.dial_times.encode().decode("ascii") if self.dials else "",
+            ),
+            upstream_phases={
+                phase: get_response_time_metrics(hist)
+                for phase, hist in self.upstream_phases.items()
+                if hist.get_total_count()
+            },
+            upstream_phase_histograms={
+                phase: hist.encode().decode("ascii")
+                for phase, hist in self.upstream_phases.items()
+                if hist.get_total_count()
+            },
+        )
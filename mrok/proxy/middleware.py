@@ -1,7 +1,9 @@
-import asyncio
 import logging
 import time
+from collections.abc import Callable
 
+from mrok.constants import SCOPE_EXT_REQUEST_BODY
+from mrok.proxy.capture import CaptureConfig
 from mrok.proxy.metrics import MetricsCollector
 from mrok.proxy.models import FixedSizeByteBuffer, HTTPHeaders, HTTPRequest, HTTPResponse
 from mrok.types.proxy import (
@@ -24,36 +26,35 @@ class CaptureMiddleware:
         self,
         app: ASGIApp,
         on_response_complete: ResponseCompleteCallback,
+        config: CaptureConfig | None = None,
+        is_active: Callable[[], bool] | None = None,
     ):
         self.app = app
         self._on_response_complete = on_response_complete
+        self._config = config or CaptureConfig()
+        self._is_active = is_active
 
     async def __call__(self, scope: Scope, receive: ASGIReceive, send: ASGISend):
-        if scope["type"] != "http":
+        if (
+            scope["type"] != "http"
+            or (self._is_active is not None and not self._is_active())
+            or not self._config.match_request(scope["method"], scope["path"])
+        ):
             await self.app(scope, receive, send)
             return
 
         start_time = time.time()
         method = scope["method"]
-        path = scope["path"]
-        query_string = scope.get("query_string", b"")
-        req_headers_raw = scope.get("headers", [])
-        req_headers = HTTPHeaders.from_asgi(req_headers_raw)
-
         state = {}
 
-        req_buf = FixedSizeByteBuffer(MAX_REQUEST_BODY_BYTES)
-        capture_req_body = method.upper() not in ("GET", "HEAD", "OPTIONS", "TRACE")
-
-        request = HTTPRequest(
-            method=method,
-            url=path,
-            headers=req_headers,
-            query_string=query_string,
-            start_time=start_time,
+        capture_bodies = not self._config.headers_only
+        capture_req_body = capture_bodies and method.upper() not in (
+            "GET",
+            "HEAD",
+            "OPTIONS",
+            "TRACE",
         )
-
-        # Response capture
+        req_buf = FixedSizeByteBuffer(MAX_REQUEST_BODY_BYTES)
         resp_buf = FixedSizeByteBuffer(MAX_RESPONSE_BODY_BYTES)
 
         async def receive_wrapper() -> Message:
@@ -66,34 +67,40 @@ class CaptureMiddleware:
         async def send_wrapper(msg: Message):
             if msg["type"] == "http.response.start":
                 state["status"] = msg["status"]
-                resp_headers = HTTPHeaders.from_asgi(msg.get("headers", []))
-                state["resp_headers_raw"] = resp_headers
+                state["resp_headers_raw"] = msg.get("headers", [])
 
-            if msg["type"] == "http.response.body":
+            if capture_bodies and msg["type"] == "http.response.body":
                 body = msg.get("body", b"")
                 resp_buf.write(body)
 
             await send(msg)
 
         await self.app(scope, receive_wrapper, send_wrapper)
+        duration = time.time() - start_time
 
-        # Finalise request
-        request.body = req_buf.getvalue() if capture_req_body else None
-        request.body_truncated = req_buf.overflow if capture_req_body else None
+        status = state.get("status", 0)
+        if not self._config.match_status(status):
+            return
 
-        # Finalise response
-        end_time = time.time()
-        duration = end_time - start_time
+        request = HTTPRequest(
+            method=method,
+            url=scope["path"],
+            headers=HTTPHeaders.from_asgi(scope.get("headers", [])),
+            query_string=scope.get("query_string", b""),
+            start_time=start_time,
+            body=req_buf.getvalue() if capture_req_body else None,
+            body_truncated=req_buf.overflow if capture_req_body else None,
+        )
 
         response = HTTPResponse(
             request=request,
-            status=state["status"] or 0,
-            headers=state["resp_headers_raw"],
+            status=status,
+            headers=HTTPHeaders.from_asgi(state.get("resp_headers_raw", [])),
             duration=duration,
-            body=resp_buf.getvalue(),
-            body_truncated=resp_buf.overflow,
+            body=resp_buf.getvalue() if capture_bodies else None,
+            body_truncated=resp_buf.overflow if capture_bodies else None,
         )
-        asyncio.create_task(self._on_response_complete(response))
+        self._on_response_complete(response)
 
 
 class MetricsMiddleware:
@@ -105,13 +112,14 @@ class MetricsMiddleware:
         if scope["type"] != "http":
             return await self.app(scope, receive, send)
 
-        start_time = await self.metrics.on_request_start(scope)
+        metrics = self.metrics
+        start_time = metrics.on_request_start(scope)
         status_code = 500
 
         async def wrapped_receive():
             msg = await receive()
             if msg["type"] == "http.request" and msg.get("body"):  # pragma: no branch
-                await self.metrics.on_request_body(len(msg["body"]))
+                metrics.on_request_body(len(msg["body"]))
             return msg
 
         async def wrapped_send(msg):
@@ -119,15 +127,16 @@ class MetricsMiddleware:
 
             if msg["type"] == "http.response.start":
                 status_code = msg["status"]
-                await self.metrics.on_response_start(status_code)
 
             elif msg["type"] == "http.response.body":  # pragma: no branch
-                body = msg.get("body", b"")
-                await self.metrics.on_response_chunk(len(body))
+                metrics.on_response_chunk(len(msg.get("body", b"")))
 
             return await send(msg)
 
         try:
             await self.app(scope, wrapped_receive, wrapped_send)
         finally:
-            await self.metrics.on_request_end(start_time, status_code)
+            body_mode = scope.get("extensions", {}).get(SCOPE_EXT_REQUEST_BODY)
+            if body_mode:
+                metrics.on_request_body_mode(body_mode)
+            metrics.on_request_end(start_time, status_code, scope.get("path"))
@@ -190,6 +190,12 @@ class RequestsMetrics(BaseModel):
     failed: int
 
 
+class RequestBodyMetrics(BaseModel):
+    memory: int = 0
+    file: int = 0
+    stream: int = 0
+
+
 class ResponseTimeMetrics(BaseModel):
     avg: float
     min: int
@@ -199,12 +205,52 @@ class ResponseTimeMetrics(BaseModel):
     p99: int
 
 
+class RouteMetrics(BaseModel):
+    # Requests by status class.
+    requests: dict[str, int]
+    response_time: ResponseTimeMetrics
+    # HdrHistogram encoding of the response times.
+    histogram: str = ""
+
+
+class CaptureMetrics(BaseModel):
+    queued: int = 0
+    dropped: int = 0
+
+
+class PoolMetrics(BaseModel):
+    connections: int = 0
+    idle: int = 0
+    pending: int = 0
+
+
+class DialMetrics(BaseModel):
+    total: int = 0
+    failed: int = 0
+    # HdrHistogram encoding of the dial times.
+    histogram: str = ""
+
+
 class WorkerMetrics(BaseModel):
     worker_id: str
     data_transfer: DataTransferMetrics
     requests: RequestsMetrics
     response_time: ResponseTimeMetrics
+    response_time_windows: dict[str, ResponseTimeMetrics] = Field(default_factory=dict)
+    # HdrHistogram encodings of the lifetime and windowed response times.
+    response_time_histograms: dict[str, str] = Field(default_factory=dict)
     process: ProcessMetrics
+    request_bodies: RequestBodyMetrics = Field(default_factory=RequestBodyMetrics)
+    # Requests by status class.
+    statuses: dict[str, int] = Field(default_factory=dict)
+    routes: dict[str, RouteMetrics] = Field(default_factory=dict)
+    capture: CaptureMetrics = Field(default_factory=CaptureMetrics)
+    pool: PoolMetrics = Field(default_factory=PoolMetrics)
+    dials: DialMetrics = Field(default_factory=DialMetrics)
+    # Time spent in each phase of the upstream requests, in microseconds.
+    upstream_phases: dict[str, ResponseTimeMetrics] = Field(default_factory=dict)
+    # HdrHistogram encodings of the upstream phase times.
+    upstream_phase_histograms: dict[str, str] = Field(default_factory=dict)
 
 
 class Status(BaseModel):
@@ -213,6 +259,58 @@ class Status(BaseModel):
     metrics: WorkerMetrics
 
 
+class ImbalanceMetrics(BaseModel):
+    """Highest to average ratio across the workers, 1 when the load is evenly spread."""
+
+    rps: float
+    cpu: float
+    p99: float
+
+
+class AgentMetrics(WorkerMetrics):
+    workers: int
+    imbalance: ImbalanceMetrics
+
+
+class AgentStatus(BaseModel):
+    type: Literal["agent_status"] = "agent_status"
+    meta: ServiceMetadata
+    metrics: AgentMetrics
+
+
+class WorkerRestart(BaseModel):
+    type: Literal["worker_restart"] = "worker_restart"
+    worker_id: str
+    pid: int
+    exit_code: int | None
+    new_pid: int
+    crashes: int
+    restarts: int
+    backoff: float
+
+
+class WorkerStartup(BaseModel):
+    """Timings reported by a worker once it serves requests, in seconds."""
+
+    ziti_load_time: float = 0
+    ziti_bind_time: float = 0
+
+
+class WorkerReady(WorkerStartup):
+    type: Literal["worker_ready"] = "worker_ready"
+    worker_id: str
+    pid: int
+    ready_time: float
+
+
+class AgentReadiness(BaseModel):
+    ready: bool
+    workers: int
+    ready_workers: list[WorkerReady]
+
+
 class Event(BaseModel):
-    type: Literal["status", "response"]
-    data: Status | HTTPResponse = Field(discriminator="type")
+    type: Literal["status", "agent_status", "response", "worker_restart", "worker_ready"]
+    data: Status | AgentStatus | HTTPResponse | WorkerRestart | WorkerReady = Field(
+        discriminator="type"
+    )
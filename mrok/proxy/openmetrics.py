@@ -0,0 +1,299 @@
+"""
+OpenMetrics exposition of the worker metrics.
+
+Agents serve the metrics aggregated from their workers and the frontend the ones
+merged from its gunicorn workers, on a local port separate from the proxied traffic.
+"""
+
+import logging
+import threading
+from collections.abc import Callable, Iterable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from hdrh.histogram import HdrHistogram
+
+from mrok.proxy.metrics import LIFETIME_HISTOGRAM
+from mrok.proxy.models import AgentMetrics, WorkerMetrics
+
+logger = logging.getLogger("mrok.proxy")
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+METRICS_PREFIX = "mrok"
+# Upper bounds, in seconds, of the histograms buckets.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+METRICS_SERVER_JOIN_TIMEOUT = 5
+
+Labels = dict[str, str]
+Sample = tuple[Labels, float]
+
+
+def format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{escape_label_value(value)}"' for name, value in labels.items())
+    return f"{{{pairs}}}"
+
+
+def get_histogram_buckets(
+    encoded: str, units_per_second: int = 1000
+) -> tuple[list[tuple[float, int]], int, float]:
+    """
+    Cumulative counts of the `DURATION_BUCKETS` of an encoded HdrHistogram of
+    milliseconds, or `units_per_second` units, with its total count and the sum
+    of its values in seconds.
+    """
+    counts = [0] * len(DURATION_BUCKETS)
+    if not encoded:
+        return list(zip(DURATION_BUCKETS, counts, strict=True)), 0, 0.0
+    hist = HdrHistogram.decode(encoded.encode("ascii"))
+    total = hist.get_total_count()
+    for item in hist.get_recorded_iterator():
+        seconds = item.value_iterated_to / units_per_second
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                counts[index] += item.count_at_value_iterated_to
+                break
+    cumulative = 0
+    buckets = []
+    for bound, count in zip(DURATION_BUCKETS, counts, strict=True):
+        cumulative += count
+        buckets.append((bound, cumulative))
+    return buckets, total, hist.get_mean_value() * total / units_per_second
+
+
+class OpenMetricsWriter:
+    def __init__(self, prefix: str = METRICS_PREFIX):
+        self._prefix = prefix
+        self._lines: list[str] = []
+
+    def _family(self, name: str, metric_type: str, help: str, unit: str | None) -> str:
+        name = f"{self._prefix}_{name}"
+        self._lines.append(f"# TYPE {name} {metric_type}")
+        if unit:
+            self._lines.append(f"# UNIT {name} {unit}")
+        self._lines.append(f"# HELP {name} {help}")
+        return name
+
+    def gauge(
+        self, name: str, help: str, samples: Iterable[Sample], unit: str | None = None
+    ) -> None:
+        name = self._family(name, "gauge", help, unit)
+        for labels, value in samples:
+            self._lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+
+    def counter(
+        self, name: str, help: str, samples: Iterable[Sample], unit: str | None = None
+    ) -> None:
+        name = self._family(name, "counter", help, unit)
+        for labels, value in samples:
+            self._lines.append(f"{name}_total{format_labels(labels)} {format_value(value)}")
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        samples: Iterable[tuple[Labels, str]],
+        units_per_second: int = 1000,
+    ) -> None:
+        """Histograms, in seconds, of encoded HdrHistograms of milliseconds."""
+        name = self._family(name, "histogram", help, "seconds")
+        for labels, encoded in samples:
+            buckets, total, total_sum = get_histogram_buckets(encoded, units_per_second)
+            for bound, count in buckets:
+                bucket_labels = format_labels({**labels, "le": format_value(bound)})
+                self._lines.append(f"{name}_bucket{bucket_labels} {count}")
+            self._lines.append(f"{name}_bucket{format_labels({**labels, 'le': '+Inf'})} {total}")
+            self._lines.append(f"{name}_count{format_labels(labels)} {total}")
+            self._lines.append(f"{name}_sum{format_labels(labels)} {format_value(total_sum)}")
+
+    def render(self) -> bytes:
+        return "\n".join([*self._lines, "# EOF", ""]).encode()
+
+
+def render_metrics(metrics: WorkerMetrics | None) -> bytes:
+    writer = OpenMetricsWriter()
+    if metrics is None:
+        return writer.render()
+
+    if isinstance(metrics, AgentMetrics):
+        writer.gauge("workers", "Workers reporting metrics.", [({}, metrics.workers)])
+        writer.gauge(
+            "worker_imbalance",
+            "Highest to average ratio across the workers.",
+            [({"metric": name}, value) for name, value in metrics.imbalance],
+        )
+    writer.counter(
+        "requests",
+        "HTTP requests served.",
+        [
+            ({"result": "successful"}, metrics.requests.successful),
+            ({"result": "failed"}, metrics.requests.failed),
+        ],
+    )
+    writer.gauge("requests_per_second", "HTTP requests per second.", [({}, metrics.requests.rps)])
+    writer.histogram(
+        "request_duration_seconds",
+        "HTTP requests duration.",
+        [({}, metrics.response_time_histograms.get(LIFETIME_HISTOGRAM, ""))],
+    )
+    writer.counter(
+        "responses",
+        "HTTP responses by status class.",
+        [({"status": status}, value) for status, value in metrics.statuses.items()],
+    )
+    writer.counter(
+        "route_requests",
+        "HTTP requests by route and status class.",
+        [
+            ({"route": route, "status": status}, value)
+            for route, route_metrics in metrics.routes.items()
+            for status, value in route_metrics.requests.items()
+        ],
+    )
+    writer.histogram(
+        "route_request_duration_seconds",
+        "HTTP requests duration by route.",
+        [
+            ({"route": route}, route_metrics.histogram)
+            for route, route_metrics in metrics.routes.items()
+        ],
+    )
+    writer.counter(
+        "received_bytes", "Request body bytes.", [({}, metrics.data_transfer.bytes_in)], "bytes"
+    )
+    writer.counter(
+        "sent_bytes", "Response body bytes.", [({}, metrics.data_transfer.bytes_out)], "bytes"
+    )
+    writer.counter(
+        "request_bodies",
+        "Request bodies by the way they were forwarded upstream.",
+        [({"mode": mode}, value) for mode, value in metrics.request_bodies],
+    )
+    writer.gauge("process_cpu_percent", "CPU usage of the workers.", [({}, metrics.process.cpu)])
+    writer.gauge(
+        "process_memory_percent", "Memory usage of the workers.", [({}, metrics.process.mem)]
+    )
+    writer.gauge(
+        "pool_connections",
+        "Upstream connections in the pools.",
+        [
+            ({"state": "active"}, metrics.pool.connections - metrics.pool.idle),
+            ({"state": "idle"}, metrics.pool.idle),
+        ],
+    )
+    writer.gauge(
+        "pool_pending_requests",
+        "Requests waiting for an upstream connection.",
+        [({}, metrics.pool.pending)],
+    )
+    writer.counter(
+        "dials",
+        "Upstream connection attempts.",
+        [
+            ({"result": "successful"}, metrics.dials.total - metrics.dials.failed),
+            ({"result": "failed"}, metrics.dials.failed),
+        ],
+    )
+    writer.histogram(
+        "dial_duration_seconds",
+        "Upstream connection attempts duration.",
+        [({}, metrics.dials.histogram)],
+    )
+    writer.histogram(
+        "upstream_phase_duration_seconds",
+        "Time spent in each phase of the upstream requests.",
+        [
+            ({"phase": phase}, encoded)
+            for phase, encoded in metrics.upstream_phase_histograms.items()
+        ],
+        units_per_second=1_000_000,
+    )
+    writer.gauge(
+        "capture_queued_responses",
+        "Captured responses waiting to be published.",
+        [({}, metrics.capture.queued)],
+    )
+    writer.counter(
+        "capture_dropped_responses",
+        "Captured responses dropped because the queue was full.",
+        [({}, metrics.capture.dropped)],
+    )
+    return writer.render()
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    server: "MetricsHTTPServer"
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        try:
+            body = render_metrics(self.server.get_metrics())
+        except Exception as e:
+            logger.error(f"Cannot render metrics: {e}")
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Metrics request: {format % args}")
+
+
+class MetricsHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], get_metrics: Callable[[], WorkerMetrics | None]):
+        super().__init__(address, MetricsRequestHandler)
+        self.get_metrics = get_metrics
+
+
+class MetricsServer:
+    """Serve the metrics returned by `get_metrics` on `/metrics` from a thread."""
+
+    def __init__(
+        self,
+        get_metrics: Callable[[], WorkerMetrics | None],
+        *,
+        host: str = "127.0.0.1",
+        port: int = 9090,
+    ):
+        self.get_metrics = get_metrics
+        self.host = host
+        self.port = port
+        self._server: MetricsHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._server = MetricsHTTPServer((self.host, self.port), self.get_metrics)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Metrics available at http://{self.host}:{self.port}/metrics")
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(timeout=METRICS_SERVER_JOIN_TIMEOUT)  # type: ignore[union-attr]
+        self._server = self._thread = None
+
+    def close_after_fork(self) -> None:
+        """Close the listening socket inherited by a forked child, the thread isn't."""
+        if self._server is None:
+            return
+        self._server.server_close()
+        self._server = self._thread = None
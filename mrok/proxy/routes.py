@@ -0,0 +1,68 @@
+import re
+from dataclasses import dataclass, field
+
+DEFAULT_MAX_ROUTES = 100
+OTHER_ROUTE = "other"
+ID_PLACEHOLDER = "{id}"
+PARAMETER_PATTERN = re.compile(r"^\{\w+\}$")
+# Numbers, UUIDs and tokens of at least 8 characters that contain a digit.
+ID_SEGMENT_PATTERN = re.compile(
+    r"^(?:\d+|[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}|(?=[\w.~-]*\d)[\w.~-]{8,})$",
+    re.IGNORECASE,
+)
+
+
+def get_status_class(status: int) -> str:
+    return f"{status // 100}xx"
+
+
+def compile_route_pattern(pattern: str) -> re.Pattern[str]:
+    segments = (
+        r"[^/]+" if PARAMETER_PATTERN.match(segment) else re.escape(segment)
+        for segment in pattern.split("/")
+    )
+    return re.compile(f"^{'/'.join(segments)}$")
+
+
+@dataclass(frozen=True)
+class RoutesConfig:
+    """How request paths are grouped into routes for the per-route metrics.
+
+    Paths are matched against the ``patterns`` route templates first, where ``{name}``
+    segments match any single path segment, e.g. ``/users/{user_id}/orders``. Otherwise,
+    when ``collapse_ids`` is set, the segments that look like identifiers are replaced
+    by ``{id}``.
+
+    At most ``max_routes`` routes are tracked, the requests to further routes are
+    counted in the ``other`` route.
+    """
+
+    patterns: tuple[str, ...] = ()
+    collapse_ids: bool = True
+    max_routes: int = DEFAULT_MAX_ROUTES
+    _compiled: tuple[tuple[re.Pattern[str], str], ...] = field(
+        default=(), init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        if self.max_routes < 1:
+            raise ValueError("max_routes must be positive.")
+        for pattern in self.patterns:
+            if not pattern.startswith("/"):
+                raise ValueError(f"Invalid route pattern: {pattern}.")
+        object.__setattr__(
+            self,
+            "_compiled",
+            tuple((compile_route_pattern(pattern), pattern) for pattern in self.patterns),
+        )
+
+    def normalize(self, path: str) -> str:
+        for regex, pattern in self._compiled:
+            if regex.match(path):
+                return pattern
+        if not self.collapse_ids:
+            return path
+        return "/".join(
+            ID_PLACEHOLDER if ID_SEGMENT_PATTERN.match(segment) else segment
+            for segment in path.split("/")
+        )
@@ -1,9 +1,12 @@
 import asyncio
+import contextlib
 import select
 import sys
+from collections.abc import AsyncIterable, AsyncIterator, Iterator
+from contextvars import ContextVar
 from typing import Any
 
-from httpcore import AsyncNetworkStream
+from httpcore import AsyncNetworkStream, WriteError
 
 from mrok.types.proxy import ASGIReceive
 
@@ -21,18 +24,59 @@ def is_readable(sock):  # pragma: no cover
     return bool(p.poll(0))
 
 
+_expect_continue: ContextVar["ExpectContinue | None"] = ContextVar(
+    "mrok_expect_continue", default=None
+)
+
+
 class AIONetworkStream(AsyncNetworkStream):
     def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
         self._reader = reader
         self._writer = writer
+        self._pending = b""
 
     async def read(self, n: int, timeout: float | None = None) -> bytes:
+        if self._pending:
+            data, self._pending = self._pending[:n], self._pending[n:]
+            return data
         return await asyncio.wait_for(self._reader.read(n), timeout)
 
     async def write(self, data: bytes, timeout: float | None = None) -> None:
+        expectation = _expect_continue.get()
+        if expectation is not None and expectation.stream is None:
+            expectation.stream = self
         self._writer.write(data)
         await asyncio.wait_for(self._writer.drain(), timeout)
 
+    async def wait_for_continue(self, timeout: float) -> bool:
+        """
+        Wait for the interim response to a request sent with `Expect: 100-continue`.
+
+        Return True if the body should be sent, that is the peer answered
+        `100 Continue` or didn't answer within `timeout` seconds. Any other
+        response is kept to be read by the HTTP connection.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while b"\r\n\r\n" not in self._pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return True
+            try:
+                data = await asyncio.wait_for(self._reader.read(4096), remaining)
+            except TimeoutError:
+                return True
+            if not data:
+                return False
+            self._pending += data
+
+        head, _, rest = self._pending.partition(b"\r\n\r\n")
+        status_line = head.split(b"\r\n", 1)[0].split(b" ", 2)
+        if len(status_line) > 1 and status_line[1] == b"100":
+            self._pending = rest
+            return True
+        return False
+
     async def aclose(self) -> None:
         self._writer.close()
         await self._writer.wait_closed()
@@ -45,11 +89,44 @@ class AIONetworkStream(AsyncNetworkStream):
         return transport.get_extra_info(info)
 
 
+class ExpectContinue:
+    """
+    Hold back a request body sent with `Expect: 100-continue` until the upstream
+    agrees to receive it or the timeout expires.
+
+    While active, the first `AIONetworkStream` written to (the one the request
+    headers are sent through) is the one the interim response is read from.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.stream: AIONetworkStream | None = None
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator["ExpectContinue"]:
+        token = _expect_continue.set(self)
+        try:
+            yield self
+        finally:
+            _expect_continue.reset(token)
+
+    async def gate(self, body: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        if self.stream is not None and not await self.stream.wait_for_continue(self.timeout):
+            # httpcore stops sending the request and reads the upstream response.
+            raise WriteError("The upstream answered before receiving the request body.")
+        async for chunk in body:
+            yield chunk
+
+
 class ASGIRequestBodyStream:
     def __init__(self, receive: ASGIReceive):
         self._receive = receive
         self._more_body = True
 
+    @property
+    def more_body(self) -> bool:
+        return self._more_body
+
     def __aiter__(self):
         return self
 
@@ -66,3 +143,13 @@ class ASGIRequestBodyStream:
             raise Exception("Client disconnected.")
 
         raise Exception("Unexpected asgi message.")
+
+
+async def chain_body(*parts: bytes | AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    for part in parts:
+        if isinstance(part, bytes):
+            if part:
+                yield part
+            continue
+        async for chunk in part:
+            yield chunk
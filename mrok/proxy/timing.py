@@ -0,0 +1,68 @@
+import time
+from typing import Any
+
+# Phases of an upstream request, in the order they happen.
+UPSTREAM_PHASES = (
+    "pool_wait",
+    "dial",
+    "request_headers",
+    "request_body",
+    "response_headers",
+    "response_body",
+)
+
+# httpcore trace events, without their `connection.`/`http11.` prefix, that start
+# and end each phase. The pool wait ends as soon as the request got a connection.
+PHASE_STARTS = {
+    "connect_tcp.started": "dial",
+    "connect_unix_socket.started": "dial",
+    "send_request_headers.started": "request_headers",
+    "send_request_body.started": "request_body",
+    "receive_response_headers.started": "response_headers",
+    "receive_response_body.started": "response_body",
+}
+PHASE_ENDS = {
+    "connect_tcp.complete": "dial",
+    "connect_unix_socket.complete": "dial",
+    "start_tls.complete": "dial",
+    "send_request_headers.complete": "request_headers",
+    "send_request_body.complete": "request_body",
+    "receive_response_headers.complete": "response_headers",
+    "receive_response_body.complete": "response_body",
+}
+
+
+class UpstreamTimings:
+    """
+    Time spent in each phase of an upstream request, in seconds.
+
+    Instances are passed to httpcore as the `trace` request extension. Phases
+    that didn't happen, like the dial of a request sent on a kept-alive
+    connection, are left out. `started` holds the `time.perf_counter` time
+    each phase started at.
+    """
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+        self._start = time.perf_counter()
+        self.started: dict[str, float] = {}
+
+    async def __call__(self, name: str, info: dict[str, Any]) -> None:
+        now = time.perf_counter()
+        event = name.split(".", 1)[-1]
+        if "pool_wait" not in self.phases and event in PHASE_STARTS:
+            self.phases["pool_wait"] = now - self._start
+        if event in PHASE_STARTS:
+            self.started.setdefault(PHASE_STARTS[event], now)
+        elif event in PHASE_ENDS:
+            phase = PHASE_ENDS[event]
+            if phase in self.started:
+                self.phases[phase] = now - self.started[phase]
+
+    def get_server_timing(self) -> bytes:
+        """Value of a `Server-Timing` header with the phases completed so far."""
+        return ", ".join(
+            f"{phase};dur={self.phases[phase] * 1000:.3f}"
+            for phase in UPSTREAM_PHASES
+            if phase in self.phases
+        ).encode()
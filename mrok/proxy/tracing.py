@@ -0,0 +1,381 @@
+"""
+Sampled distributed tracing of the proxied requests.
+
+The sampling decision is taken when a request arrives (head-based): requests
+carrying a W3C `traceparent` header follow its sampled flag, the others are
+sampled with the configured probability. Nothing is allocated for the requests
+that aren't sampled, their `traceparent` header, if any, is forwarded untouched.
+
+Sampled requests get a `proxy` server span, with `auth`, `upstream`, `dial` and
+`streaming` child spans, and the upstream request carries a `traceparent`
+header so that the next hop continues the trace. Spans are exported in batches,
+off the event loop, in the OTLP/JSON encoding.
+"""
+
+import abc
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+import urllib.request
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import EllipsisType
+from typing import Any
+
+from mrok.constants import SCOPE_EXT_AUTH_TIME
+from mrok.proxy.timing import UpstreamTimings
+from mrok.types.proxy import Scope
+
+logger = logging.getLogger("mrok.proxy")
+
+DEFAULT_OTLP_ENDPOINT = "http://localhost:4318/v1/traces"
+DEFAULT_TRACE_SAMPLE_RATE = 0.01
+TRACEPARENT = b"traceparent"
+TRACEPARENT_PATTERN = re.compile(
+    rb"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})(-.*)?$"
+)
+INVALID_TRACE_ID = "0" * 32
+INVALID_SPAN_ID = "0" * 16
+SAMPLED_FLAG = 0x01
+# OTLP span kinds and status codes.
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_CODE_ERROR = 2
+OTLP_EXPORT_TIMEOUT = 10.0
+
+
+@dataclass(frozen=True)
+class TracingConfig:
+    """How requests are sampled and where their spans are exported.
+
+    ``exporter`` is either an OTLP/HTTP traces endpoint, e.g. the one of a
+    collector listening on localhost, or the path of a file the spans are
+    appended to, one OTLP/JSON request per line.
+
+    Spans wait in a queue of at most ``max_queue_size`` spans and are exported
+    every ``export_interval`` seconds, spans that don't fit are dropped.
+    """
+
+    sample_rate: float = DEFAULT_TRACE_SAMPLE_RATE
+    exporter: str = DEFAULT_OTLP_ENDPOINT
+    service_name: str = "mrok"
+    export_interval: float = 5.0
+    max_queue_size: int = 2048
+
+    def __post_init__(self):
+        if not 0 <= self.sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1.")
+        if self.export_interval <= 0 or self.max_queue_size < 1:
+            raise ValueError("export_interval and max_queue_size must be positive.")
+        if not self.exporter:
+            raise ValueError("exporter must be an OTLP endpoint or a file path.")
+
+
+@dataclass(frozen=True)
+class TraceParent:
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+
+def parse_traceparent(value: bytes) -> TraceParent | None:
+    """Parse a W3C `traceparent` header value, `None` if it's invalid."""
+    match = TRACEPARENT_PATTERN.match(value.strip())
+    if not match:
+        return None
+    version, trace_id, span_id, flags = (group.decode() for group in match.groups()[:4])
+    # Later versions may append fields, version 00 can't.
+    if version == "ff" or (version == "00" and match.group(5)):
+        return None
+    if trace_id == INVALID_TRACE_ID or span_id == INVALID_SPAN_ID:
+        return None
+    return TraceParent(
+        trace_id=trace_id, span_id=span_id, sampled=bool(int(flags, 16) & SAMPLED_FLAG)
+    )
+
+
+def format_traceparent(trace_id: str, span_id: str) -> bytes:
+    return f"00-{trace_id}-{span_id}-01".encode()
+
+
+# All-zero ids are invalid.
+def generate_trace_id() -> str:
+    return f"{random.getrandbits(128) or 1:032x}"
+
+
+def generate_span_id() -> str:
+    return f"{random.getrandbits(64) or 1:016x}"
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int
+    kind: int = SPAN_KIND_INTERNAL
+    attributes: dict[str, str | int] = field(default_factory=dict)
+    error: str | None = None
+
+
+def encode_attributes(attributes: dict[str, str | int]) -> list[dict[str, Any]]:
+    return [
+        {
+            "key": key,
+            "value": {"intValue": str(value)} if isinstance(value, int) else {"stringValue": value},
+        }
+        for key, value in attributes.items()
+    ]
+
+
+def encode_spans(spans: Sequence[Span], service_name: str) -> dict[str, Any]:
+    """OTLP/JSON `ExportTraceServiceRequest` with `spans`."""
+    encoded = []
+    for span in spans:
+        item: dict[str, Any] = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": span.kind,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": encode_attributes(span.attributes),
+        }
+        if span.parent_id is not None:
+            item["parentSpanId"] = span.parent_id
+        if span.error is not None:
+            item["status"] = {"code": STATUS_CODE_ERROR, "message": span.error}
+        encoded.append(item)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": encode_attributes({"service.name": service_name})},
+                "scopeSpans": [{"scope": {"name": "mrok"}, "spans": encoded}],
+            }
+        ]
+    }
+
+
+class SpanExporter(abc.ABC):
+    """Send batches of spans somewhere, called from a thread of the default executor."""
+
+    def __init__(self, service_name: str):
+        self.service_name = service_name
+
+    @abc.abstractmethod
+    def export(self, spans: Sequence[Span]) -> None:
+        raise NotImplementedError()
+
+
+class OTLPSpanExporter(SpanExporter):
+    def __init__(self, service_name: str, endpoint: str = DEFAULT_OTLP_ENDPOINT):
+        super().__init__(service_name)
+        self.endpoint = endpoint
+
+    def export(self, spans: Sequence[Span]) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(encode_spans(spans, self.service_name)).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=OTLP_EXPORT_TIMEOUT):
+            pass
+
+
+class FileSpanExporter(SpanExporter):
+    def __init__(self, service_name: str, path: str | Path):
+        super().__init__(service_name)
+        self.path = Path(path)
+
+    def export(self, spans: Sequence[Span]) -> None:
+        # A single unbuffered append so that the lines of the workers don't interleave.
+        with self.path.open("ab", buffering=0) as f:
+            f.write(json.dumps(encode_spans(spans, self.service_name)).encode() + b"\n")
+
+
+def create_exporter(config: TracingConfig) -> SpanExporter:
+    if config.exporter.startswith(("http://", "https://")):
+        return OTLPSpanExporter(config.service_name, config.exporter)
+    return FileSpanExporter(config.service_name, config.exporter)
+
+
+class Trace:
+    """
+    Spans of a sampled request.
+
+    Times are `time.perf_counter` readings, converted to wall clock times when
+    the spans are built.
+    """
+
+    def __init__(self, tracer: "Tracer", trace_id: str, parent_id: str | None):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.span_id = generate_span_id()
+        self.upstream_span_id = generate_span_id()
+        self.spans: list[Span] = []
+        self._epoch_ns = time.time_ns()
+        self._start = time.perf_counter()
+        self._upstream_start: float | None = None
+        self._upstream_end: float | None = None
+        self._upstream_attributes: dict[str, str | int] = {}
+        self._timings: UpstreamTimings | None = None
+
+    def inject(self, headers: list[tuple[bytes, bytes]]) -> None:
+        """Make the upstream request a child of the `upstream` span."""
+        headers[:] = [(k, v) for k, v in headers if k.lower() != TRACEPARENT]
+        headers.append((TRACEPARENT, format_traceparent(self.trace_id, self.upstream_span_id)))
+
+    def upstream_started(self, url: str, timings: UpstreamTimings | None) -> None:
+        self._upstream_start = time.perf_counter()
+        self._upstream_attributes["url.full"] = url
+        self._timings = timings
+
+    def upstream_finished(self, status: int) -> None:
+        self._upstream_end = time.perf_counter()
+        self._upstream_attributes["http.response.status_code"] = status
+
+    def finish(self, scope: Scope, status: int, error: str | None = None) -> None:
+        """Build the spans of the request and queue them for export."""
+        end = time.perf_counter()
+        start = self._start
+        auth_time = scope.get("extensions", {}).get(SCOPE_EXT_AUTH_TIME)
+        if auth_time is not None:
+            start = min(start, auth_time[0])
+            self._add_span("auth", *auth_time)
+        if self._upstream_start is not None:
+            self._add_span(
+                "upstream",
+                self._upstream_start,
+                self._upstream_end or end,
+                span_id=self.upstream_span_id,
+                kind=SPAN_KIND_CLIENT,
+                attributes=self._upstream_attributes,
+                error=error if self._upstream_end is None else None,
+            )
+            if self._timings is not None and "dial" in self._timings.phases:
+                dial_start = self._timings.started["dial"]
+                self._add_span(
+                    "dial",
+                    dial_start,
+                    dial_start + self._timings.phases["dial"],
+                    parent_id=self.upstream_span_id,
+                )
+        if self._upstream_end is not None:
+            self._add_span("streaming", self._upstream_end, end, error=error)
+        self._add_span(
+            "proxy",
+            start,
+            end,
+            span_id=self.span_id,
+            parent_id=self.parent_id,
+            kind=SPAN_KIND_SERVER,
+            attributes={
+                "http.request.method": scope.get("method", "GET"),
+                "url.path": scope.get("path", "/"),
+                "http.response.status_code": status,
+            },
+            error=error,
+        )
+        self.tracer.submit(self.spans)
+
+    def _add_span(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        *,
+        span_id: str | None = None,
+        parent_id: str | None | EllipsisType = ...,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: dict[str, str | int] | None = None,
+        error: str | None = None,
+    ) -> None:
+        # Spans are children of the `proxy` span unless told otherwise.
+        self.spans.append(
+            Span(
+                name=name,
+                trace_id=self.trace_id,
+                span_id=span_id or generate_span_id(),
+                parent_id=self.span_id if parent_id is ... else parent_id,
+                start_ns=self._to_ns(start),
+                end_ns=self._to_ns(end),
+                kind=kind,
+                attributes=attributes or {},
+                error=error,
+            )
+        )
+
+    def _to_ns(self, perf_time: float) -> int:
+        return self._epoch_ns + round((perf_time - self._start) * 1_000_000_000)
+
+
+class Tracer:
+    """
+    Take the sampling decisions and export the spans of the sampled requests.
+
+    The export is scheduled on the running event loop when the first spans are
+    queued, so instances can be created before forking the workers. `close`
+    exports the spans still queued, it's called on the lifespan shutdown.
+    """
+
+    def __init__(self, config: TracingConfig, exporter: SpanExporter | None = None):
+        self.config = config
+        self.exporter = exporter or create_exporter(config)
+        self.dropped = 0
+        self._queue: list[Span] = []
+        self._export_handle: asyncio.TimerHandle | None = None
+        self._exports: set[asyncio.Future[None]] = set()
+
+    def start_trace(self, scope: Scope) -> Trace | None:
+        """Trace of the request if it's sampled, `None` otherwise."""
+        for name, value in scope.get("headers", ()):
+            if name == TRACEPARENT:
+                parent = parse_traceparent(value)
+                if parent is not None:
+                    return Trace(self, parent.trace_id, parent.span_id) if parent.sampled else None
+                break
+        if random.random() >= self.config.sample_rate:
+            return None
+        return Trace(self, generate_trace_id(), None)
+
+    def submit(self, spans: list[Span]) -> None:
+        if len(self._queue) + len(spans) > self.config.max_queue_size:
+            self.dropped += len(spans)
+            return
+        self._queue.extend(spans)
+        if self._export_handle is None:
+            self._export_handle = asyncio.get_running_loop().call_later(
+                self.config.export_interval, self.flush
+            )
+
+    def flush(self) -> None:
+        """Export the queued spans in the default executor."""
+        self._export_handle = None
+        spans, self._queue = self._queue, []
+        if spans:
+            export = asyncio.get_running_loop().run_in_executor(None, self._export, spans)
+            self._exports.add(export)
+            export.add_done_callback(self._exports.discard)
+
+    async def close(self) -> None:
+        """Export the queued spans and wait for all the exports to complete."""
+        if self._export_handle is not None:
+            self._export_handle.cancel()
+        self.flush()
+        if self._exports:
+            await asyncio.gather(*self._exports)
+
+    def _export(self, spans: list[Span]) -> None:
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            logger.error(f"Cannot export {len(spans)} spans: {e}")
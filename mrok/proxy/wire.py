@@ -0,0 +1,58 @@
+"""
+Wire format of the events bus.
+
+Each event is published as a multipart message:
+
+- frame 0: the event type (``status``, ``response``, ...), subscribers filter on it.
+- frame 1: the wire format version and a flags byte, followed by the event data
+  as JSON without the request and response bodies.
+- frames 2+: the raw request body then the raw response body, each one only when
+  its flag is set.
+"""
+
+import json
+import struct
+from collections.abc import Sequence
+from typing import Any
+
+from mrok.proxy.models import Event, HTTPResponse
+
+WIRE_VERSION = 1
+HEADER = struct.Struct("!BB")
+FLAG_REQUEST_BODY = 0x01
+FLAG_RESPONSE_BODY = 0x02
+BODIES: dict[str, Any] = {"body": True, "request": {"body": True}}
+
+
+def encode_event(event: Event) -> list[bytes]:
+    flags = 0
+    bodies = []
+    exclude = None
+    if isinstance(event.data, HTTPResponse):
+        exclude = BODIES
+        if event.data.request.body is not None:
+            flags |= FLAG_REQUEST_BODY
+            bodies.append(event.data.request.body)
+        if event.data.body is not None:
+            flags |= FLAG_RESPONSE_BODY
+            bodies.append(event.data.body)
+    header = HEADER.pack(WIRE_VERSION, flags) + event.data.model_dump_json(exclude=exclude).encode()
+    return [event.type.encode(), header, *bodies]
+
+
+def decode_event(frames: Sequence[bytes]) -> Event:
+    if len(frames) < 2 or len(frames[1]) < HEADER.size:
+        raise ValueError("Malformed event message.")
+    version, flags = HEADER.unpack_from(frames[1])
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported events wire format version: {version}.")
+    bodies = list(frames[2:])
+    if len(bodies) != (flags & FLAG_REQUEST_BODY) + (flags & FLAG_RESPONSE_BODY) // 2:
+        raise ValueError("Malformed event message.")
+
+    data = json.loads(frames[1][HEADER.size :])
+    if flags & FLAG_REQUEST_BODY:
+        data["request"]["body"] = bodies.pop(0)
+    if flags & FLAG_RESPONSE_BODY:
+        data["body"] = bodies.pop(0)
+    return Event.model_validate({"type": frames[0].decode(), "data": data})
@@ -1,15 +1,20 @@
 import asyncio
 import contextlib
 import logging
+from multiprocessing.connection import Connection
+from multiprocessing.synchronize import Event
 from pathlib import Path
 
 from uvicorn.importer import import_from_string
 
 from mrok.conf import get_settings
 from mrok.logging import setup_logging
-from mrok.proxy.asgi import ASGIAppWrapper
+from mrok.proxy.app import ProxyAppBase
+from mrok.proxy.asgi import ASGIAppWrapper, combine_lifespans
+from mrok.proxy.capture import CaptureConfig
 from mrok.proxy.events import EventsPublisher
 from mrok.proxy.models import Identity
+from mrok.proxy.routes import RoutesConfig
 from mrok.proxy.ziticorn import BackendConfig, Server
 from mrok.types.proxy import ASGIApp
 
@@ -24,25 +29,37 @@ class Worker:
         identity_file: str | Path,
         *,
         ziti_load_timeout_ms: int = 5000,
+        ziti_binds: int = 1,
+        ziti_contexts: int = 1,
         server_backlog: int = 2048,
         server_timeout_keep_alive: int = 5,
         server_limit_concurrency: int | None = None,
         server_limit_max_requests: int | None = None,
+        server_drain_timeout: int = 30,
         events_enabled: bool = True,
         events_publisher_port: int = 50000,
         events_metrics_collect_interval: float = 5.0,
+        events_capture: CaptureConfig | None = None,
+        events_routes: RoutesConfig | None = None,
         logging_config: dict | None = None,
+        ready_conn: Connection | None = None,
+        drained_event: Event | None = None,
     ):
         self._worker_id = worker_id
         self._identity_file = identity_file
         self._identity = Identity.load_from_file(self._identity_file)
         self._app = app
         self._ziti_load_timeout_ms = ziti_load_timeout_ms
+        self._ziti_binds = ziti_binds
+        self._ziti_contexts = ziti_contexts
         self._server_backlog = server_backlog
         self._server_timeout_keep_alive = server_timeout_keep_alive
         self._server_limit_concurrency = server_limit_concurrency
         self._server_limit_max_requests = server_limit_max_requests
+        self._server_drain_timeout = server_drain_timeout
         self._logging_config = logging_config
+        self._ready_conn = ready_conn
+        self._drained_event = drained_event
 
         self._events_enabled = events_enabled
         self._event_publisher = (
@@ -51,16 +68,21 @@ class Worker:
                 meta=self._identity.mrok,
                 events_publisher_port=events_publisher_port,
                 events_metrics_collect_interval=events_metrics_collect_interval,
+                events_capture=events_capture,
+                events_routes=events_routes,
             )
             if events_enabled
             else None
         )
 
     def setup_app(self):
-        app = ASGIAppWrapper(
-            self._app if not isinstance(self._app, str) else import_from_string(self._app),
-            lifespan=self._event_publisher.lifespan if self._events_enabled else None,
-        )
+        asgi_app = self._app if not isinstance(self._app, str) else import_from_string(self._app)
+        lifespan = self._event_publisher.lifespan if self._events_enabled else None
+        if isinstance(asgi_app, ProxyAppBase):
+            lifespan = (
+                combine_lifespans(lifespan, asgi_app.lifespan) if lifespan else asgi_app.lifespan
+            )
+        app = ASGIAppWrapper(asgi_app, lifespan=lifespan)
 
         if self._events_enabled:
             self._event_publisher.setup_middleware(app)
@@ -78,7 +100,10 @@ class Worker:
             timeout_keep_alive=self._server_timeout_keep_alive,
             limit_concurrency=self._server_limit_concurrency,
             limit_max_requests=self._server_limit_max_requests,
+            drain_timeout=self._server_drain_timeout,
+            ziti_binds=self._ziti_binds,
+            ziti_contexts=self._ziti_contexts,
         )
-        server = Server(config)
+        server = Server(config, ready_conn=self._ready_conn, drained_event=self._drained_event)
         with contextlib.suppress(KeyboardInterrupt, asyncio.CancelledError):
             server.run()
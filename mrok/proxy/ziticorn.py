@@ -1,15 +1,19 @@
 import logging
 import socket
+import time
 from collections.abc import Callable
+from multiprocessing.connection import Connection
+from multiprocessing.synchronize import Event
 from pathlib import Path
 from typing import Any
 
 import openziti
+from openziti.context import ZitiContext
 from uvicorn import config, server
 from uvicorn.lifespan.on import LifespanOn
 from uvicorn.protocols.http.httptools_impl import HttpToolsProtocol as UvHttpToolsProtocol
 
-from mrok.proxy.models import Identity
+from mrok.proxy.models import Identity, WorkerStartup
 from mrok.types.proxy import ASGIApp
 
 logger = logging.getLogger("mrok.proxy")
@@ -32,12 +36,50 @@ class HttpToolsProtocol(UvHttpToolsProtocol):
 
 
 class Server(server.Server):
+    config: "BackendConfig"
+
+    def __init__(
+        self,
+        config: "BackendConfig",
+        *,
+        ready_conn: Connection | None = None,
+        drained_event: Event | None = None,
+    ) -> None:
+        super().__init__(config)
+        self.ready_conn = ready_conn
+        self.drained_event = drained_event
+
     async def serve(self, sockets: list[socket.socket] | None = None) -> None:
         if not sockets:
-            sockets = [self.config.bind_socket()]
+            sockets = self.config.bind_sockets()
         with self.capture_signals():
             await self._serve(sockets)
 
+    async def startup(self, sockets: list[socket.socket] | None = None) -> None:
+        await super().startup(sockets=sockets)
+        # Not started if the lifespan startup failed.
+        if self.started and self.ready_conn is not None:
+            self.ready_conn.send(
+                WorkerStartup(
+                    ziti_load_time=self.config.ziti_load_time,
+                    ziti_bind_time=self.config.ziti_bind_time,
+                )
+            )
+            self.ready_conn.close()
+
+    async def shutdown(self, sockets: list[socket.socket] | None = None) -> None:
+        # Closing the listening Ziti sockets removes their terminators, so the
+        # edge routers stop routing new circuits here while requests complete.
+        logger.info("Unbinding from Ziti service, draining in-flight requests")
+        for listener in self.servers:
+            listener.close()
+        for sock in sockets or []:
+            sock.close()
+        # The listening sockets are closed, uvicorn only drains the connections.
+        await super().shutdown()
+        if self.drained_event is not None:
+            self.drained_event.set()
+
 
 class BackendConfig(config.Config):
     def __init__(
@@ -49,10 +91,17 @@ class BackendConfig(config.Config):
         timeout_keep_alive: int = 5,
         limit_concurrency: int | None = None,
         limit_max_requests: int | None = None,
+        drain_timeout: int | None = None,
+        ziti_binds: int = 1,
+        ziti_contexts: int = 1,
     ):
         self.identity_file = identity_file
         self.identity = Identity.load_from_file(self.identity_file)
         self.ziti_load_timeout_ms = ziti_load_timeout_ms
+        self.ziti_binds = max(1, ziti_binds)
+        self.ziti_contexts = max(1, min(ziti_contexts, self.ziti_binds))
+        self.ziti_load_time = 0.0
+        self.ziti_bind_time = 0.0
         super().__init__(
             app,
             loop="asyncio",
@@ -61,22 +110,47 @@ class BackendConfig(config.Config):
             timeout_keep_alive=timeout_keep_alive,
             limit_concurrency=limit_concurrency,
             limit_max_requests=limit_max_requests,
+            timeout_graceful_shutdown=drain_timeout,
         )
 
-    def bind_socket(self) -> socket.socket:
-        logger.info(
-            "Connect to Ziti service "
-            f"'{self.identity.mrok.extension} ({self.identity.mrok.instance})'"
-        )
-
+    def load_ziti_context(self) -> ZitiContext:
+        started_at = time.perf_counter()
         ctx, err = openziti.load(str(self.identity_file), timeout=self.ziti_load_timeout_ms)
+        self.ziti_load_time += time.perf_counter() - started_at
         if err != 0:
             raise RuntimeError(f"Failed to load Ziti identity from {self.identity_file}: {err}")
+        return ctx
 
+    def bind_ziti_socket(self, ctx: ZitiContext) -> socket.socket:
+        started_at = time.perf_counter()
         sock = ctx.bind(self.identity.mrok.extension)
         sock.listen(self.backlog)
+        self.ziti_bind_time += time.perf_counter() - started_at
         logger.info(f"listening on ziti service {self.identity.mrok.extension} for connections")
         return sock
 
+    def bind_socket(self) -> socket.socket:
+        logger.info(
+            "Connect to Ziti service "
+            f"'{self.identity.mrok.extension} ({self.identity.mrok.instance})'"
+        )
+        return self.bind_ziti_socket(self.load_ziti_context())
+
+    def bind_sockets(self) -> list[socket.socket]:
+        """
+        Bind the service `ziti_binds` times, each bind is a terminator Ziti
+        spreads the circuits across. The binds are distributed over
+        `ziti_contexts` contexts, each with its own edge router connections.
+        """
+        if self.ziti_binds == 1:
+            return [self.bind_socket()]
+        logger.info(
+            f"Connect to Ziti service '{self.identity.mrok.extension} "
+            f"({self.identity.mrok.instance})' with {self.ziti_binds} binds "
+            f"over {self.ziti_contexts} contexts"
+        )
+        contexts = [self.load_ziti_context() for _ in range(self.ziti_contexts)]
+        return [self.bind_ziti_socket(contexts[i % len(contexts)]) for i in range(self.ziti_binds)]
+
     def configure_logging(self) -> None:
         return
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from collections.abc import Awaitable, Callable, Coroutine, Mapping, MutableMapping
+from collections.abc import Awaitable, Callable, Mapping, MutableMapping
 from contextlib import AbstractAsyncContextManager
-from typing import Any, Never
+from typing import Any
 
 from mrok.proxy.models import HTTPResponse
 
@@ -17,4 +17,6 @@ StatefulLifespan = Callable[[ASGIApp], AbstractAsyncContextManager[Mapping[str,
 Lifespan = StatelessLifespan | StatefulLifespan
 
 LifespanCallback = Callable[[], Awaitable[None]]
-ResponseCompleteCallback = Callable[[HTTPResponse], Coroutine[Any, Any, Never]]
+ResponseCompleteCallback = Callable[[HTTPResponse], None]
+# Called with the time taken by a connection attempt in seconds and whether it failed.
+DialCallback = Callable[[float, bool], None]
@@ -0,0 +1,101 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator, Callable
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from watchfiles import Change, awatch
+
+from mrok.conf import (
+    SETTINGS_FILES,
+    Settings,
+    SettingsSnapshot,
+    get_settings_snapshot,
+    load_settings,
+    set_settings,
+)
+
+logger = logging.getLogger("mrok")
+
+SettingsListener = Callable[[SettingsSnapshot], Callable[[], None]]
+
+
+def _is_watched(paths: frozenset[Path], change: Change, path: str) -> bool:
+    return Path(path) in paths
+
+
+class SettingsWatcher:
+    """
+    Watch the settings files and the error templates they reference and, when
+    they change, load the settings again and swap the new snapshot in.
+
+    Listeners are called with the new snapshot before it is swapped in and
+    return a callable that applies it. If loading the settings or any listener
+    fails, the current configuration is kept.
+
+    Settings are loaded and listeners are called in a worker thread, the new
+    snapshot is swapped in and applied on the event loop.
+    """
+
+    def __init__(self, debounce_ms: int = 1600):
+        self._debounce_ms = debounce_ms
+        self._listeners: list[SettingsListener] = []
+
+    def add_listener(self, listener: SettingsListener) -> None:
+        self._listeners.append(listener)
+
+    def _prepare(self) -> tuple[Settings, SettingsSnapshot, list[Callable[[], None]]]:
+        settings = load_settings()
+        snapshot = SettingsSnapshot.from_settings(settings)
+        return settings, snapshot, [listener(snapshot) for listener in self._listeners]
+
+    async def reload(self) -> bool:
+        try:
+            settings, snapshot, apply_callbacks = await asyncio.to_thread(self._prepare)
+        except Exception:
+            logger.exception("Invalid settings, keeping the current configuration")
+            return False
+
+        set_settings(settings, snapshot)
+        for apply in apply_callbacks:
+            apply()
+        logger.info("Settings reloaded")
+        return True
+
+    def get_watched_paths(self) -> frozenset[Path]:
+        paths = {Path(name).resolve() for name in SETTINGS_FILES}
+        for templates in get_settings_snapshot().frontend.errors.values():
+            paths.update(Path(template).resolve() for template in templates.values())
+        return frozenset(paths)
+
+    async def run(self) -> None:
+        try:
+            while True:
+                paths = self.get_watched_paths()
+                directories = {path.parent for path in paths if path.parent.is_dir()}
+                if not directories:  # pragma: no cover
+                    return
+
+                async for _ in awatch(
+                    *directories,
+                    watch_filter=partial(_is_watched, paths),
+                    recursive=False,
+                    debounce=self._debounce_ms,
+                ):
+                    await self.reload()
+                    if self.get_watched_paths() != paths:
+                        break
+        except Exception:
+            logger.exception("Settings watcher stopped")
+
+    @contextlib.asynccontextmanager
+    async def lifespan(self, app: Any) -> AsyncIterator[None]:
+        task = asyncio.create_task(self.run())
+        try:
+            yield
+        finally:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
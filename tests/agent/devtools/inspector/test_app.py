@@ -1,13 +1,21 @@
 import asyncio
+from typing import Any
 
 import pytest
+import zmq
 from pytest_mock import MockerFixture
 from textual.pilot import Pilot
 
 from mrok.agent.devtools.inspector.app import MIN_COLS, MIN_ROWS, InspectorApp, module_main
+from mrok.proxy.models import Event
+from mrok.proxy.wire import encode_event
 from tests.types import ResponseEventFactory, SnapCompare, StatusEventFactory, ZMQPublisher
 
 
+def send_event(socket: zmq.Socket, event: dict[str, Any]) -> None:
+    socket.send_multipart(encode_event(Event.model_validate(event)))
+
+
 def test_app_get_headers(
     response_event_factory: ResponseEventFactory,
     status_event_factory: StatusEventFactory,
@@ -17,8 +25,8 @@ def test_app_get_headers(
     s, port = zmq_publisher
 
     async def run_before(pilot: Pilot):
-        await asyncio.to_thread(s.send_json, response_event_factory())
-        await asyncio.to_thread(s.send_json, status_event_factory())
+        await asyncio.to_thread(send_event, s, response_event_factory())
+        await asyncio.to_thread(send_event, s, status_event_factory())
         await pilot.click(offset=(5, 9))
 
     assert snap_compare(
@@ -35,8 +43,8 @@ def test_app_get_payload(
     s, port = zmq_publisher
 
     async def run_before(pilot: Pilot):
-        await asyncio.to_thread(s.send_json, response_event_factory())
-        await asyncio.to_thread(s.send_json, status_event_factory())
+        await asyncio.to_thread(send_event, s, response_event_factory())
+        await asyncio.to_thread(send_event, s, status_event_factory())
         await pilot.click(offset=(5, 9))
         await pilot.click(offset=(13, 20))
         await pilot.click(offset=(2, 22))
@@ -55,8 +63,8 @@ def test_app_get_preview(
     s, port = zmq_publisher
 
     async def run_before(pilot: Pilot):
-        await asyncio.to_thread(s.send_json, response_event_factory())
-        await asyncio.to_thread(s.send_json, status_event_factory())
+        await asyncio.to_thread(send_event, s, response_event_factory())
+        await asyncio.to_thread(send_event, s, status_event_factory())
         await pilot.click(offset=(5, 9))
         await pilot.click(offset=(22, 20))
         await pilot.click(offset=(2, 22))
@@ -77,8 +85,8 @@ def test_app_get_raw_response(
     status = status_event_factory(process_cpu=32.2, process_mem=100)
 
     async def run_before(pilot: Pilot):
-        await asyncio.to_thread(s.send_json, status)
-        await asyncio.to_thread(s.send_json, response_event_factory())
+        await asyncio.to_thread(send_event, s, status)
+        await asyncio.to_thread(send_event, s, response_event_factory())
         await pilot.click(offset=(5, 9))
         await pilot.click(offset=(31, 20))
         await pilot.click(offset=(2, 22))
@@ -101,8 +109,8 @@ def test_app_get_preview_binary(
     )
 
     async def run_before(pilot: Pilot):
-        await asyncio.to_thread(s.send_json, response_event)
-        await asyncio.to_thread(s.send_json, status_event_factory())
+        await asyncio.to_thread(send_event, s, response_event)
+        await asyncio.to_thread(send_event, s, status_event_factory())
         await pilot.click(offset=(5, 9))
         await pilot.click(offset=(22, 20))
         await pilot.click(offset=(2, 22))
@@ -126,8 +134,8 @@ def test_app_get_raw_response_binary(
     )
 
     async def run_before(pilot: Pilot):
-        await asyncio.to_thread(s.send_json, status_event_factory())
-        await asyncio.to_thread(s.send_json, response_event)
+        await asyncio.to_thread(send_event, s, status_event_factory())
+        await asyncio.to_thread(send_event, s, response_event)
         await pilot.click(offset=(5, 9))
         await pilot.click(offset=(31, 20))
         await pilot.click(offset=(2, 22))
@@ -155,8 +163,8 @@ def test_app_post_headers(
     )
 
     async def run_before(pilot: Pilot):
-        await asyncio.to_thread(s.send_json, status_event_factory())
-        await asyncio.to_thread(s.send_json, response_event)
+        await asyncio.to_thread(send_event, s, status_event_factory())
+        await asyncio.to_thread(send_event, s, response_event)
         await pilot.click(offset=(5, 9))
 
     assert snap_compare(
@@ -182,8 +190,8 @@ def test_app_post_json_body(
     )
 
     async def run_before(pilot: Pilot):
-        await asyncio.to_thread(s.send_json, status_event_factory())
-        await asyncio.to_thread(s.send_json, response_event)
+        await asyncio.to_thread(send_event, s, status_event_factory())
+        await asyncio.to_thread(send_event, s, response_event)
         await pilot.click(offset=(5, 9))
         await pilot.click(offset=(13, 20))
         await pilot.click(offset=(2, 22))
@@ -213,8 +221,8 @@ def test_app_post_preview_multipart(
     )
 
     async def run_before(pilot: Pilot):
-        await asyncio.to_thread(s.send_json, status_event_factory())
-        await asyncio.to_thread(s.send_json, response_event)
+        await asyncio.to_thread(send_event, s, status_event_factory())
+        await asyncio.to_thread(send_event, s, response_event)
         await pilot.click(offset=(5, 9))
         await pilot.click(offset=(13, 20))
         await pilot.click(offset=(2, 22))
@@ -243,8 +251,8 @@ def test_app_post_preview_body_truncated(
     )
 
     async def run_before(pilot: Pilot):
-        await asyncio.to_thread(s.send_json, status_event_factory())
-        await asyncio.to_thread(s.send_json, response_event)
+        await asyncio.to_thread(send_event, s, status_event_factory())
+        await asyncio.to_thread(send_event, s, response_event)
         await pilot.click(offset=(5, 9))
         await pilot.click(offset=(13, 20))
         await pilot.click(offset=(2, 22))
@@ -267,8 +275,8 @@ def test_app_delete_headers(
     )
 
     async def run_before(pilot: Pilot):
-        await asyncio.to_thread(s.send_json, status_event_factory())
-        await asyncio.to_thread(s.send_json, response_event)
+        await asyncio.to_thread(send_event, s, status_event_factory())
+        await asyncio.to_thread(send_event, s, response_event)
         await pilot.click(offset=(5, 9))
 
     assert snap_compare(
@@ -294,8 +302,8 @@ def test_app_non_200_headers(
     )
 
     async def run_before(pilot: Pilot):
-        await asyncio.to_thread(s.send_json, status_event_factory())
-        await asyncio.to_thread(s.send_json, response_event)
+        await asyncio.to_thread(send_event, s, status_event_factory())
+        await asyncio.to_thread(send_event, s, response_event)
         await pilot.click(offset=(5, 9))
 
     assert snap_compare(
@@ -314,6 +322,29 @@ def test_app_hide_metrics(
     )
 
 
+def test_app_routes(
+    status_event_factory: StatusEventFactory,
+    zmq_publisher: ZMQPublisher,
+    snap_compare: SnapCompare,
+):
+    s, port = zmq_publisher
+    status = status_event_factory()
+    response_time = {"avg": 10.0, "min": 1, "max": 30, "p50": 11, "p90": 22, "p99": 28}
+    status["data"]["metrics"]["routes"] = {
+        "/users/{id}": {"requests": {"2xx": 30, "4xx": 2}, "response_time": response_time},
+        "/health": {"requests": {"2xx": 50}, "response_time": response_time},
+        "other": {"requests": {"5xx": 1}, "response_time": response_time},
+    }
+
+    async def run_before(pilot: Pilot):
+        await asyncio.to_thread(send_event, s, status)
+        await pilot.press("r")
+
+    assert snap_compare(
+        InspectorApp(port), run_before=run_before, terminal_size=(MIN_COLS, MIN_ROWS)
+    )
+
+
 @pytest.mark.parametrize(
     ("w", "h"),
     [
@@ -18,6 +18,8 @@ def test_init(
     addr: str,
 ):
     m_async_pool_ctor = mocker.patch("mrok.agent.sidecar.app.AsyncConnectionPool")
+    m_backend = mocker.MagicMock()
+    mocker.patch("mrok.agent.sidecar.app.AIONetworkBackend", return_value=m_backend)
     app = SidecarProxyApp(
         target,
         max_connections=5000,
@@ -31,6 +33,7 @@ def test_init(
         max_keepalive_connections=5,
         keepalive_expiry=60,
         retries=1,
+        network_backend=m_backend,
     )
 
     assert app._target_type == "tcp"
@@ -41,6 +44,8 @@ def test_init_uds(
     mocker: MockerFixture,
 ):
     m_async_pool_ctor = mocker.patch("mrok.agent.sidecar.app.AsyncConnectionPool")
+    m_backend = mocker.MagicMock()
+    mocker.patch("mrok.agent.sidecar.app.AIONetworkBackend", return_value=m_backend)
     app = SidecarProxyApp(
         "/path/to/proxy.sock",
         max_connections=5000,
@@ -55,6 +60,7 @@ def test_init_uds(
         keepalive_expiry=60,
         retries=1,
         uds="/path/to/proxy.sock",
+        network_backend=m_backend,
     )
 
     assert app._target_type == "unix"
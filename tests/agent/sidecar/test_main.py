@@ -24,6 +24,16 @@ def test_sidecar_agent(mocker: MockerFixture):
         max_keepalive_connections=None,
         keepalive_expiry=None,
         retries=0,
+        response_buffering=False,
+        response_buffer_memory_size=64 * 1024,
+        response_buffer_max_size=1024 * 1024 * 1024,
+        response_buffers_memory_limit=64 * 1024 * 1024,
+        request_buffer_size=64 * 1024,
+        request_buffering=False,
+        request_buffer_max_size=1024 * 1024 * 1024,
+        expect_continue_timeout=1.0,
+        server_timing=False,
+        tracing=None,
     )
 
 
@@ -58,10 +68,33 @@ def test_run(mocker: MockerFixture):
         events_publishers_port=4000,
         events_subscribers_port=5000,
         events_metrics_collect_interval=5.0,
+        events_capture=None,
+        events_routes=None,
+        metrics_port=None,
         server_backlog=2048,
         server_limit_concurrency=None,
         server_limit_max_requests=None,
+        server_restart_batch_size=1,
+        server_drain_timeout=30,
+        server_max_workers=None,
+        server_preload=False,
+        server_readiness_file=None,
+        autoscale_target_cpu=70.0,
+        autoscale_target_rps=None,
+        autoscale_target_p99=None,
         server_timeout_keep_alive=5,
         ziti_load_timeout_ms=5000,
+        ziti_binds=1,
+        ziti_contexts=1,
+        response_buffering=False,
+        response_buffer_memory_size=64 * 1024,
+        response_buffer_max_size=1024 * 1024 * 1024,
+        response_buffers_memory_limit=64 * 1024 * 1024,
+        request_buffer_size=64 * 1024,
+        request_buffering=False,
+        request_buffer_max_size=1024 * 1024 * 1024,
+        expect_continue_timeout=1.0,
+        server_timing=False,
+        tracing=None,
     )
     mocked_agent.run.assert_called_once()
@@ -37,15 +37,28 @@ def test_run(mocker: MockerFixture):
         "my.app:app",
         "ziti-identity.json",
         ziti_load_timeout_ms=5000,
+        ziti_binds=1,
+        ziti_contexts=1,
         server_workers=10,
         server_reload=True,
         server_backlog=2048,
         server_limit_concurrency=None,
         server_limit_max_requests=None,
+        server_restart_batch_size=1,
+        server_drain_timeout=30,
+        server_max_workers=None,
+        server_preload=False,
+        server_readiness_file=None,
+        autoscale_target_cpu=70.0,
+        autoscale_target_rps=None,
+        autoscale_target_p99=None,
         server_timeout_keep_alive=5,
         events_publishers_port=4000,
         events_subscribers_port=5000,
         events_metrics_collect_interval=5.0,
+        events_capture=None,
+        events_routes=None,
+        metrics_port=None,
         logging_config=None,
     )
     mocked_agent.run.assert_called_once()
@@ -5,6 +5,9 @@ from pytest_mock import MockerFixture
 from typer.testing import CliRunner
 
 from mrok.cli import app
+from mrok.proxy.capture import CaptureConfig
+from mrok.proxy.routes import RoutesConfig
+from mrok.proxy.tracing import TracingConfig
 
 
 def test_run_asgi(
@@ -18,8 +21,17 @@ def test_run_asgi(
         app,
         shlex.split(
             "agent run asgi my:app ins-1234-5678-0001.json -w 2 --server-reload "
+            "--ziti-binds 4 --ziti-contexts 2 "
+            "--server-restart-batch-size 2 --server-drain-timeout 10 "
+            "--server-max-workers 8 --server-preload --server-readiness-file /tmp/readiness.json "
+            "--autoscale-target-cpu 60 --autoscale-target-p99 250 "
             "--events-publishers-port 4000 "
-            "--events-subscribers-port 5000"
+            "--events-subscribers-port 5000 "
+            "--capture-sample-rate 0.25 --capture-method post --capture-path /api/* "
+            "--capture-exclude-path /api/health --capture-status 5xx --capture-status 404 "
+            "--capture-headers-only --capture-queue-size 100 --capture-queue-overflow drop-new "
+            "--route-pattern /users/{user_id} --route-pattern /orders/{id}/items "
+            "--no-route-id-collapsing --max-routes 20 --metrics-port 9100"
         ),
     )
     assert result.exit_code == 0
@@ -27,15 +39,41 @@ def test_run_asgi(
         "ins-1234-5678-0001.json",
         "my:app",
         ziti_load_timeout_ms=5000,
+        ziti_binds=4,
+        ziti_contexts=2,
         server_workers=2,
         server_reload=True,
         server_backlog=2048,
         server_limit_concurrency=None,
         server_limit_max_requests=None,
+        server_restart_batch_size=2,
+        server_drain_timeout=10,
+        server_max_workers=8,
+        server_preload=True,
+        server_readiness_file="/tmp/readiness.json",
+        autoscale_target_cpu=60.0,
+        autoscale_target_rps=None,
+        autoscale_target_p99=250.0,
         server_timeout_keep_alive=5,
         events_publishers_port=4000,
         events_subscribers_port=5000,
         events_metrics_collect_interval=5.0,
+        events_capture=CaptureConfig(
+            sample_rate=0.25,
+            methods=("POST",),
+            paths=("/api/*",),
+            exclude_paths=("/api/health",),
+            statuses=("5xx", "404"),
+            headers_only=True,
+            queue_size=100,
+            queue_overflow="drop-new",
+        ),
+        events_routes=RoutesConfig(
+            patterns=("/users/{user_id}", "/orders/{id}/items"),
+            collapse_ids=False,
+            max_routes=20,
+        ),
+        metrics_port=9100,
     )
 
 
@@ -64,7 +102,12 @@ def test_run_sidecar(
             "--upstream-max-connections 312 "
             "--upstream-max-keepalive-connections 11 "
             "--upstream_keepalive_expiry 3.22 "
-            "--upstream-max-connect-retries 2"
+            "--upstream-max-connect-retries 2 "
+            "--response-buffering --response-buffer-memory-size 1024 "
+            "--response-buffer-max-size 4096 --response-buffers-memory-limit 8192 "
+            "--request-buffer-size 512 --request-buffering --request-buffer-max-size 2048 "
+            "--expect-continue-timeout 2.5 --server-timing --metrics-port 9100 "
+            "--trace-exporter /tmp/spans.jsonl --trace-sample-rate 0.5"
         ),
     )
     assert result.exit_code == 0
@@ -77,12 +120,87 @@ def test_run_sidecar(
         upstream_max_keepalive_connections=11,
         upstream_keepalive_expiry=3.22,
         upstream_max_connect_retries=2,
+        response_buffering=True,
+        response_buffer_memory_size=1024,
+        response_buffer_max_size=4096,
+        response_buffers_memory_limit=8192,
+        request_buffer_size=512,
+        request_buffering=True,
+        request_buffer_max_size=2048,
+        expect_continue_timeout=2.5,
+        server_timing=True,
+        tracing=TracingConfig(
+            sample_rate=0.5, exporter="/tmp/spans.jsonl", service_name="mrok-sidecar"
+        ),
         events_publishers_port=4000,
         events_subscribers_port=5000,
         events_metrics_collect_interval=5.0,
+        events_capture=CaptureConfig(),
+        events_routes=RoutesConfig(),
+        metrics_port=9100,
         server_backlog=2048,
         server_limit_concurrency=None,
         server_limit_max_requests=None,
+        server_restart_batch_size=1,
+        server_drain_timeout=30,
+        server_max_workers=None,
+        server_preload=False,
+        server_readiness_file=None,
+        autoscale_target_cpu=70.0,
+        autoscale_target_rps=None,
+        autoscale_target_p99=None,
         server_timeout_keep_alive=5,
         ziti_load_timeout_ms=5000,
+        ziti_binds=1,
+        ziti_contexts=1,
+    )
+
+
+@pytest.mark.parametrize(
+    "option",
+    [
+        "--capture-sample-rate 2",
+        "--capture-status 600",
+        "--capture-status 5x",
+        "--capture-queue-size 0",
+        "--capture-queue-overflow block",
+    ],
+)
+def test_run_asgi_invalid_capture_options(mocker: MockerFixture, option: str):
+    mocked_ziticorn = mocker.patch("mrok.cli.commands.agent.run.asgi.ziticorn.run")
+    runner = CliRunner()
+
+    result = runner.invoke(
+        app,
+        shlex.split(f"agent run asgi my:app ins-1234-5678-0001.json {option}"),
+    )
+    assert result.exit_code != 0
+    mocked_ziticorn.assert_not_called()
+
+
+@pytest.mark.parametrize("option", ["--max-routes 0", "--route-pattern users/{id}"])
+def test_run_asgi_invalid_routes_options(mocker: MockerFixture, option: str):
+    mocked_ziticorn = mocker.patch("mrok.cli.commands.agent.run.asgi.ziticorn.run")
+    runner = CliRunner()
+
+    result = runner.invoke(
+        app,
+        shlex.split(f"agent run asgi my:app ins-1234-5678-0001.json {option}"),
+    )
+    assert result.exit_code != 0
+    mocked_ziticorn.assert_not_called()
+
+
+def test_run_sidecar_invalid_tracing_options(mocker: MockerFixture):
+    mocked_sidecar = mocker.patch("mrok.cli.commands.agent.run.sidecar.sidecar.run")
+    runner = CliRunner()
+
+    result = runner.invoke(
+        app,
+        shlex.split(
+            "agent run sidecar ins-1234-5678-0001.json :8000 "
+            "--trace-exporter /tmp/spans.jsonl --trace-sample-rate 2"
+        ),
     )
+    assert result.exit_code != 0
+    mocked_sidecar.assert_not_called()
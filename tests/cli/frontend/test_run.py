@@ -5,6 +5,7 @@ from pytest_mock import MockerFixture
 from typer.testing import CliRunner
 
 from mrok.cli import app
+from mrok.proxy.tracing import TracingConfig
 
 
 def test_run(mocker: MockerFixture):
@@ -23,6 +24,17 @@ def test_run(mocker: MockerFixture):
         max_connections=1000,
         max_keepalive_connections=100,
         keepalive_expiry=300.0,
+        response_buffering=False,
+        response_buffer_memory_size=64 * 1024,
+        response_buffer_max_size=1024 * 1024 * 1024,
+        response_buffers_memory_limit=64 * 1024 * 1024,
+        request_buffer_size=64 * 1024,
+        request_buffering=False,
+        request_buffer_max_size=1024 * 1024 * 1024,
+        expect_continue_timeout=1.0,
+        server_timing=False,
+        tracing=None,
+        metrics_port=None,
     )
 
 
@@ -50,6 +62,27 @@ def test_run_with_options(mocker: MockerFixture):
             "--max-pool-keepalive-expiry",
             "3.22",
             "--reload",
+            "--response-buffering",
+            "--response-buffer-memory-size",
+            "1024",
+            "--response-buffer-max-size",
+            "4096",
+            "--response-buffers-memory-limit",
+            "8192",
+            "--request-buffer-size",
+            "512",
+            "--request-buffering",
+            "--request-buffer-max-size",
+            "2048",
+            "--expect-continue-timeout",
+            "2.5",
+            "--server-timing",
+            "--trace-exporter",
+            "http://localhost:4318/v1/traces",
+            "--trace-sample-rate",
+            "0.1",
+            "--metrics-port",
+            "9100",
         ],
     )
     assert result.exit_code == 0
@@ -62,4 +95,19 @@ def test_run_with_options(mocker: MockerFixture):
         max_connections=312,
         max_keepalive_connections=11,
         keepalive_expiry=3.22,
+        response_buffering=True,
+        response_buffer_memory_size=1024,
+        response_buffer_max_size=4096,
+        response_buffers_memory_limit=8192,
+        request_buffer_size=512,
+        request_buffering=True,
+        request_buffer_max_size=2048,
+        expect_continue_timeout=2.5,
+        server_timing=True,
+        tracing=TracingConfig(
+            sample_rate=0.1,
+            exporter="http://localhost:4318/v1/traces",
+            service_name="mrok-frontend",
+        ),
+        metrics_port=9100,
     )
@@ -12,12 +12,21 @@ import zmq
 from asgi_lifespan import LifespanManager
 from dynaconf import Dynaconf
 from fastapi import FastAPI
+from httpcore import Request
 from httpx import ASGITransport, AsyncClient
 from pytest_httpx import HTTPXMock
 
 from mrok.conf import Settings, get_settings
+from mrok.proxy.app import ProxyAppBase
 from mrok.types.proxy import ASGIReceive, ASGISend, Message
-from tests.types import ReceiveFactory, SendFactory, SettingsFactory, StatusEventFactory
+from tests.types import (
+    ProxyAppFactory,
+    ReceiveFactory,
+    SendFactory,
+    SettingsFactory,
+    StatusEventFactory,
+    UpstreamHandler,
+)
 
 
 @pytest.fixture
@@ -346,6 +355,26 @@ def send_factory() -> SendFactory:
     return _factory
 
 
+@pytest.fixture
+def proxy_app_factory() -> ProxyAppFactory:
+    def _factory(handler: UpstreamHandler | None = None, /, **kwargs: Any) -> ProxyAppBase:
+        class Pool:
+            async def handle_async_request(self, req: Request) -> Any:
+                assert handler is not None
+                return await handler(req)
+
+        class ProxyApp(ProxyAppBase):
+            def setup_connection_pool(self, *args: Any, **kwargs: Any) -> Pool:
+                return Pool()
+
+            def get_upstream_base_url(self, scope):
+                return "http://upstream"
+
+        return ProxyApp(**kwargs)
+
+    return _factory
+
+
 @pytest.fixture()
 def response_event_factory():
     def _response_event(
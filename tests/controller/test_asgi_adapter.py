@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock
 import pytest
 
 from mrok.authentication import AuthIdentity
+from mrok.constants import SCOPE_EXT_AUTH_TIME, SCOPE_EXT_TRACE
 from mrok.frontend.middleware import ASGIAuthenticationMiddleware
 
 
@@ -23,10 +24,30 @@ async def test_auth_success_sets_identity(mocker):
     await middleware(scope, receive, send)
     auth_manager.assert_awaited_once_with(scope)
     assert scope["identity"] is not None
+    assert "extensions" not in scope
 
     asgi_app.assert_awaited_once_with(scope, receive, send)
 
 
+@pytest.mark.asyncio
+async def test_auth_timed_for_sampled_requests(mocker):
+    auth_manager = AsyncMock(return_value=None)
+
+    asgi_app = AsyncMock(name="mock_asgi_app")
+    scope = {"type": "http", "extensions": {SCOPE_EXT_TRACE: mocker.MagicMock()}}
+    receive = AsyncMock(name="mock_receive")
+    send = AsyncMock(name="mock_send")
+    middleware = ASGIAuthenticationMiddleware(
+        asgi_app,
+        auth_manager=auth_manager,
+    )
+    await middleware(scope, receive, send)
+    auth_manager.assert_awaited_once_with(scope)
+    start, end = scope["extensions"][SCOPE_EXT_AUTH_TIME]
+    assert start <= end
+    asgi_app.assert_awaited_once_with(scope, receive, send)
+
+
 @pytest.mark.asyncio
 async def test_auth_no_identity(mocker):
     auth_manager = AsyncMock(return_value=None)
@@ -43,3 +64,21 @@ async def test_auth_no_identity(mocker):
     auth_manager.assert_awaited_once_with(scope)
     assert "identity" not in scope
     asgi_app.assert_awaited_once_with(scope, receive, send)
+
+
+@pytest.mark.asyncio
+async def test_auth_without_backends():
+    auth_manager = AsyncMock(active_backends=[])
+
+    asgi_app = AsyncMock(name="mock_asgi_app")
+    scope = {"type": "http"}
+    receive = AsyncMock(name="mock_receive")
+    send = AsyncMock(name="mock_send")
+    middleware = ASGIAuthenticationMiddleware(
+        asgi_app,
+        auth_manager=auth_manager,
+    )
+    await middleware(scope, receive, send)
+    auth_manager.assert_not_awaited()
+    assert "extensions" not in scope
+    asgi_app.assert_awaited_once_with(scope, receive, send)
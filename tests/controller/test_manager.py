@@ -71,3 +71,46 @@ async def test_backends_do_not_authenticate(mocker):
     assert result is None
 
     backend1.authenticate.assert_awaited_once()
+
+
+def test_prepare_reload(mocker):
+    backend_cls = mocker.MagicMock()
+    mocker.patch(
+        "mrok.authentication.manager.get_authentication_backend",
+        return_value=backend_cls,
+    )
+    manager = HTTPAuthManager(DynaBox({"backends": []}))
+    new_settings = DynaBox({"backends": ["jwt"], "jwt": {"audience": "mrok"}})
+
+    apply = manager.prepare_reload(new_settings)
+
+    backend_cls.assert_called_once_with({"audience": "mrok"})
+    assert manager.active_backends == []
+    apply()
+    assert manager.active_backends == [backend_cls.return_value]
+    assert manager.auth_settings is new_settings
+
+
+def test_prepare_reload_invalid_backend(mocker):
+    manager = HTTPAuthManager(DynaBox({"backends": []}))
+    mocker.patch(
+        "mrok.authentication.manager.get_authentication_backend",
+        return_value=None,
+    )
+
+    with pytest.raises(ValueError, match="Backend 'unknown' is not registered."):
+        manager.prepare_reload(DynaBox({"backends": ["unknown"]}))
+    assert manager.active_backends == []
+
+
+def test_prepare_reload_without_backends(mocker):
+    backend_cls = mocker.MagicMock()
+    mocker.patch(
+        "mrok.authentication.manager.get_authentication_backend",
+        return_value=backend_cls,
+    )
+    manager = HTTPAuthManager(DynaBox({"backends": ["jwt"], "jwt": {"audience": "mrok"}}))
+
+    with pytest.raises(ValueError, match="No authentication backends configured"):
+        manager.prepare_reload(DynaBox({"backends": []}))
+    assert manager.active_backends == [backend_cls.return_value]
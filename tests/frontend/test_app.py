@@ -1,7 +1,8 @@
 import pytest
-from jinja2 import Template
+from jinja2 import Template, TemplateNotFound
 from pytest_mock import MockerFixture
 
+from mrok.conf import SettingsSnapshot
 from mrok.frontend.app import FrontendProxyApp
 from mrok.proxy.app import ProxyAppBase
 from mrok.proxy.exceptions import InvalidTargetError
@@ -16,7 +17,7 @@ def test_init(
     m_ziti_backend_ctor = mocker.patch(
         "mrok.frontend.app.AIOZitiNetworkBackend", return_value=m_ziti_backend
     )
-    FrontendProxyApp(
+    app = FrontendProxyApp(
         "my-identity-file",
         max_connections=5000,
         max_keepalive_connections=5,
@@ -31,7 +32,100 @@ def test_init(
         retries=1,
         network_backend=m_ziti_backend,
     )
-    m_ziti_backend_ctor.assert_called_once_with("my-identity-file")
+    m_ziti_backend_ctor.assert_called_once_with("my-identity-file", on_dial=app._on_dial)
+
+
+def test_init_header_rules(
+    mocker: MockerFixture,
+    settings_factory: SettingsFactory,
+):
+    settings = settings_factory(
+        frontend={
+            "headers": {
+                "request": [{"action": "remove", "name": "X-Internal"}],
+                "response": [{"action": "set", "name": "Server", "value": "mrok"}],
+            },
+        },
+    )
+    mocker.patch(
+        "mrok.frontend.app.get_settings_snapshot",
+        return_value=SettingsSnapshot.from_settings(settings),
+    )
+    mocker.patch("mrok.frontend.app.AsyncConnectionPool")
+
+    app = FrontendProxyApp("my-identity-file")
+
+    headers = app._prepare_headers({"headers": [(b"x-internal", b"1"), (b"accept", b"*/*")]})
+    assert headers == [(b"accept", b"*/*"), (b"x-forwarded-proto", b"https")]
+    assert app._response_headers([(b"server", b"uvicorn")]) == [(b"server", b"mrok")]
+
+
+def test_init_missing_error_template(
+    mocker: MockerFixture,
+    settings_factory: SettingsFactory,
+):
+    mocker.patch("mrok.frontend.app.AsyncConnectionPool")
+    settings = settings_factory(
+        frontend={
+            "domain": "ext.mrok.test",
+            "errors": {"502": {"html": "/does/not/exist.html"}},
+        }
+    )
+    mocker.patch(
+        "mrok.frontend.app.get_settings_snapshot",
+        return_value=SettingsSnapshot.from_settings(settings),
+    )
+
+    app = FrontendProxyApp("my-identity-file")
+
+    assert app._error_pages == {}
+
+
+def test_prepare_settings_reload(
+    mocker: MockerFixture,
+    settings_factory: SettingsFactory,
+    ziti_frontend_error_template_html_file: str,
+):
+    mocker.patch("mrok.frontend.app.AsyncConnectionPool")
+    app = FrontendProxyApp("my-identity-file")
+    pool = app._pool
+    settings = SettingsSnapshot.from_settings(
+        settings_factory(
+            frontend={
+                "domain": "ext.mrok.test",
+                "errors": {"502": {"html": ziti_frontend_error_template_html_file}},
+                "headers": {"response": [{"action": "remove", "name": "server"}]},
+            },
+        )
+    )
+
+    apply = app.prepare_settings_reload(settings)
+    assert app._response_headers([(b"server", b"uvicorn")]) == [(b"server", b"uvicorn")]
+
+    apply()
+    assert app._response_headers([(b"server", b"uvicorn")]) == []
+    assert list(app._error_pages) == [502]
+    assert list(app._error_pages[502]) == ["text/html"]
+    assert app._pool is pool
+
+
+def test_prepare_settings_reload_missing_template(
+    mocker: MockerFixture,
+    settings_factory: SettingsFactory,
+):
+    mocker.patch("mrok.frontend.app.AsyncConnectionPool")
+    app = FrontendProxyApp("my-identity-file")
+    settings = SettingsSnapshot.from_settings(
+        settings_factory(
+            frontend={
+                "domain": "ext.mrok.test",
+                "errors": {"502": {"html": "/does/not/exist.html"}},
+            },
+        )
+    )
+
+    with pytest.raises(TemplateNotFound):
+        app.prepare_settings_reload(settings)
 
 
 @pytest.mark.parametrize(
@@ -124,7 +218,10 @@ async def test_html_error(
             },
         }
     )
-    mocker.patch("mrok.frontend.app.get_settings", return_value=settings)
+    mocker.patch(
+        "mrok.frontend.app.get_settings_snapshot",
+        return_value=SettingsSnapshot.from_settings(settings),
+    )
     m_send_error = mocker.patch.object(ProxyAppBase, "send_error_response")
     m_send = mocker.AsyncMock()
     scope = {
@@ -136,11 +233,7 @@ async def test_html_error(
     app = FrontendProxyApp("my-identity")
 
     await app.send_error_response(
-        {
-            "headers": [
-                (b"accept", accept_header.encode("latin-1")),
-            ],
-        },
+        scope,
         m_send,
         502,
         "bad gateway",
@@ -149,7 +242,7 @@ async def test_html_error(
         scope,
         m_send,
         502,
-        template.render({"status": 502, "body": "bad gateway"}),
+        template.render({"status": 502, "body": "bad gateway"}).encode(),
         headers=[
             (b"content-type", b"text/html"),
         ],
@@ -171,7 +264,10 @@ async def test_html_error_no_html_template(
             },
         }
     )
-    mocker.patch("mrok.frontend.app.get_settings", return_value=settings)
+    mocker.patch(
+        "mrok.frontend.app.get_settings_snapshot",
+        return_value=SettingsSnapshot.from_settings(settings),
+    )
     m_send_error = mocker.patch.object(ProxyAppBase, "send_error_response")
     m_send = mocker.AsyncMock()
     scope = {
@@ -183,11 +279,7 @@ async def test_html_error_no_html_template(
     app = FrontendProxyApp("my-identity")
 
     await app.send_error_response(
-        {
-            "headers": [
-                (b"accept", b"text/html"),
-            ],
-        },
+        scope,
         m_send,
         502,
         "bad gateway",
@@ -216,7 +308,10 @@ async def test_html_error_no_accept(
             },
         }
     )
-    mocker.patch("mrok.frontend.app.get_settings", return_value=settings)
+    mocker.patch(
+        "mrok.frontend.app.get_settings_snapshot",
+        return_value=SettingsSnapshot.from_settings(settings),
+    )
     m_send_error = mocker.patch.object(ProxyAppBase, "send_error_response")
     m_send = mocker.AsyncMock()
     scope = {
@@ -228,11 +323,7 @@ async def test_html_error_no_accept(
     app = FrontendProxyApp("my-identity")
 
     await app.send_error_response(
-        {
-            "headers": [
-                (b"host", b"localhost"),
-            ],
-        },
+        scope,
         m_send,
         502,
         "bad gateway",
@@ -277,7 +368,10 @@ async def test_json_error(
             },
         }
     )
-    mocker.patch("mrok.frontend.app.get_settings", return_value=settings)
+    mocker.patch(
+        "mrok.frontend.app.get_settings_snapshot",
+        return_value=SettingsSnapshot.from_settings(settings),
+    )
     m_send_error = mocker.patch.object(ProxyAppBase, "send_error_response")
     m_send = mocker.AsyncMock()
     scope = {
@@ -289,11 +383,7 @@ async def test_json_error(
     app = FrontendProxyApp("my-identity")
 
     await app.send_error_response(
-        {
-            "headers": [
-                (b"accept", accept_header.encode("latin-1")),
-            ],
-        },
+        scope,
         m_send,
         502,
         "bad gateway",
@@ -302,7 +392,7 @@ async def test_json_error(
         scope,
         m_send,
         502,
-        template.render({"status": 502, "body": "bad gateway"}),
+        template.render({"status": 502, "body": "bad gateway"}).encode(),
         headers=[
             (b"content-type", b"application/json"),
         ],
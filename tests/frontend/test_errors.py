@@ -0,0 +1,109 @@
+import logging
+from pathlib import Path
+
+import pytest
+from jinja2 import TemplateNotFound
+
+from mrok.frontend.errors import ErrorPage, build_error_pages, create_jinja_env
+
+
+def write_template(tmp_path: Path, name: str, source: str) -> Path:
+    path = tmp_path / name
+    path.write_text(source)
+    return path
+
+
+def test_error_page_static(tmp_path: Path):
+    write_template(tmp_path, "502.json", '{"status": {{ status }}, "body": "{{ body }}"}')
+
+    page = ErrorPage(create_jinja_env(tmp_path), "502.json", 502, "application/json")
+
+    assert page.is_static is True
+    assert page.headers == [(b"content-type", b"application/json")]
+    assert page.render("bad gateway") == b'{"status": 502, "body": "bad gateway"}'
+
+
+def test_error_page_static_escapes_html_body(tmp_path: Path):
+    write_template(tmp_path, "502.html", "<h1>{{ status_title }}</h1><p>{{ body }}</p>")
+
+    page = ErrorPage(create_jinja_env(tmp_path), "502.html", 502, "text/html")
+
+    assert page.is_static is True
+    assert page.render("<b>&</b>") == (b"<h1>Bad Gateway</h1><p>&lt;b&gt;&amp;&lt;/b&gt;</p>")
+
+
+def test_error_page_body_repeated(tmp_path: Path):
+    write_template(tmp_path, "503.html", "<title>{{ body }}</title><p>{{ body }}</p>")
+
+    page = ErrorPage(create_jinja_env(tmp_path), "503.html", 503, "text/html")
+
+    assert page.is_static is True
+    assert page.render("down") == b"<title>down</title><p>down</p>"
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "{{ body | upper }}",
+        "{% if body %}<p>{{ body }}</p>{% endif %}",
+        "{{ status }}",
+    ],
+)
+def test_error_page_dynamic_body(tmp_path: Path, source: str):
+    write_template(tmp_path, "502.html", source)
+
+    page = ErrorPage(create_jinja_env(tmp_path), "502.html", 502, "text/html")
+    template = create_jinja_env(tmp_path).get_template("502.html")
+
+    assert page.is_static is False
+    assert page.needs_request is False
+    assert page.render("bad gateway") == template.render(status=502, body="bad gateway").encode()
+
+
+def test_error_page_request(tmp_path: Path):
+    write_template(tmp_path, "502.html", "{{ request.path }}: {{ body }}")
+
+    page = ErrorPage(create_jinja_env(tmp_path), "502.html", 502, "text/html")
+
+    assert page.is_static is False
+    assert page.needs_request is True
+    assert page.render("bad gateway", {"path": "/api"}) == b"/api: bad gateway"
+
+
+def test_build_error_pages(tmp_path: Path):
+    html = write_template(tmp_path, "502.html", "{{ body }}")
+    json = write_template(tmp_path, "502.json", '"{{ body }}"')
+
+    pages = build_error_pages(
+        {"502": {"html": str(html), "json": str(json), "xml": "/path/to/502.xml"}},
+        strict=True,
+    )
+
+    assert list(pages) == [502]
+    assert set(pages[502]) == {"text/html", "application/json"}
+    assert pages[502]["application/json"].render("bad gateway") == b'"bad gateway"'
+
+
+def test_build_error_pages_strict_missing_template(tmp_path: Path):
+    with pytest.raises(TemplateNotFound):
+        build_error_pages({"502": {"html": str(tmp_path / "missing.html")}}, strict=True)
+
+
+def test_build_error_pages_skips_missing_template(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+):
+    # `setup_logging` stops the mrok loggers from propagating to caplog.
+    monkeypatch.setattr(logging.getLogger("mrok"), "propagate", True)
+    caplog.set_level(logging.WARNING, logger="mrok.proxy")
+    html = write_template(tmp_path, "503.html", "{{ body }}")
+
+    pages = build_error_pages(
+        {
+            "502": {"html": str(tmp_path / "missing.html")},
+            "503": {"html": str(html)},
+        },
+        strict=False,
+    )
+
+    assert list(pages) == [503]
+    assert "Cannot load the 502 error template" in caplog.text
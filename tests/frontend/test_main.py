@@ -18,6 +18,8 @@ def test_run(mocker: MockerFixture):
 
     run("my-identity.json", "localhost", 2423, 4, False, 1001, 323, 99.5)
 
+    assert "when_ready" not in m_standalone_app.mock_calls[0].args[0]
+
     assert m_standalone_app.mock_calls[0].args[0]["bind"] == "localhost:2423"
     assert m_standalone_app.mock_calls[0].args[0]["workers"] == 4
     assert (
@@ -30,5 +32,27 @@ def test_run(mocker: MockerFixture):
     assert m_standalone_app.mock_calls[0].args[0]["mrok"]["max_connections"] == 1001
     assert m_standalone_app.mock_calls[0].args[0]["mrok"]["max_keepalive_connections"] == 323
     assert m_standalone_app.mock_calls[0].args[0]["mrok"]["keepalive_expiry"] == 99.5
+    assert m_standalone_app.mock_calls[0].args[0]["mrok"]["response_buffering"] is False
+    assert m_standalone_app.mock_calls[0].args[0]["mrok"]["server_timing"] is False
+    assert m_standalone_app.mock_calls[0].args[0]["mrok"]["tracing"] is None
 
     m_app.run.assert_called_once()
+
+
+def test_run_metrics_port(mocker: MockerFixture, tmp_path):
+    mocker.patch("mrok.frontend.main.get_logging_config", return_value={})
+    mocker.patch("mrok.frontend.main.get_settings")
+    mocker.patch("mrok.frontend.main.tempfile.mkdtemp", return_value=str(tmp_path))
+    m_exporter_cls = mocker.patch("mrok.frontend.main.MetricsExporter")
+    m_exporter = m_exporter_cls.return_value
+    m_standalone_app = mocker.patch("mrok.frontend.main.StandaloneApplication")
+
+    run("my-identity.json", "localhost", 2423, 4, False, 1001, 323, 99.5, metrics_port=9100)
+
+    m_exporter_cls.assert_called_once_with(str(tmp_path), port=9100)
+    options = m_standalone_app.mock_calls[0].args[0]
+    assert options["mrok"]["metrics_dir"] == str(tmp_path)
+    assert options["when_ready"] == m_exporter.when_ready
+    assert options["post_fork"] == m_exporter.post_fork
+    assert options["child_exit"] == m_exporter.child_exit
+    assert options["on_exit"] == m_exporter.on_exit
@@ -0,0 +1,116 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from mrok.frontend.metrics import MetricsExporter, WorkerMetricsWriter, get_snapshot_path
+from mrok.proxy.asgi import ASGIAppWrapper
+from mrok.proxy.middleware import MetricsMiddleware
+from mrok.proxy.models import (
+    DataTransferMetrics,
+    ProcessMetrics,
+    RequestsMetrics,
+    ResponseTimeMetrics,
+    WorkerMetrics,
+)
+
+
+def make_worker_metrics(worker_id: str, successful: int) -> WorkerMetrics:
+    return WorkerMetrics(
+        worker_id=worker_id,
+        data_transfer=DataTransferMetrics(bytes_in=10, bytes_out=20),
+        requests=RequestsMetrics(rps=1, total=successful, successful=successful, failed=0),
+        response_time=ResponseTimeMetrics(avg=1, min=1, max=1, p50=1, p90=1, p99=1),
+        process=ProcessMetrics(cpu=1, mem=1),
+    )
+
+
+def test_writer_setup(mocker: MockerFixture, tmp_path: Path):
+    proxy_app = mocker.MagicMock()
+    app = ASGIAppWrapper(proxy_app)
+    writer = WorkerMetricsWriter(tmp_path)
+
+    writer.setup(app, proxy_app)
+
+    assert app.middleware[0].cls is MetricsMiddleware
+    proxy_app.instrument.assert_called_once_with(writer.collector)
+
+
+@pytest.mark.asyncio
+async def test_writer_flush(mocker: MockerFixture, tmp_path: Path):
+    mocker.patch("mrok.frontend.metrics.os.getpid", return_value=1234)
+    writer = WorkerMetricsWriter(tmp_path)
+    snapshot = make_worker_metrics("1234", 3)
+    mocker.patch.object(writer.collector, "snapshot", return_value=snapshot)
+
+    await writer.flush()
+
+    assert [path.name for path in tmp_path.iterdir()] == ["1234.json"]
+    path = get_snapshot_path(tmp_path, 1234)
+    assert WorkerMetrics.model_validate_json(path.read_bytes()) == snapshot
+
+
+@pytest.mark.asyncio
+async def test_writer_lifespan(mocker: MockerFixture, tmp_path: Path):
+    writer = WorkerMetricsWriter(tmp_path, flush_interval=0)
+    flushed = asyncio.Event()
+    errors = [Exception("disk full")]
+
+    def flush():
+        if errors:
+            raise errors.pop()
+        flushed.set()
+
+    mocked_flush = mocker.patch.object(writer, "flush", side_effect=flush)
+    mocked_logger = mocker.patch("mrok.frontend.metrics.logger")
+
+    async with writer.lifespan(None):
+        await asyncio.wait_for(flushed.wait(), timeout=1)
+
+    assert mocked_flush.await_count >= 2
+    mocked_logger.error.assert_called_once_with("Cannot write the worker metrics: disk full")
+
+
+def test_exporter_collect(tmp_path: Path):
+    exporter = MetricsExporter(tmp_path, port=0)
+    assert exporter.collect() is None
+
+    for pid, successful in ((1, 3), (2, 4)):
+        get_snapshot_path(tmp_path, pid).write_text(
+            make_worker_metrics(str(pid), successful).model_dump_json()
+        )
+    get_snapshot_path(tmp_path, 3).with_suffix(".tmp").write_text("{")
+
+    metrics = exporter.collect()
+
+    assert metrics is not None
+    assert metrics.workers == 2
+    assert metrics.requests.successful == 7
+    assert metrics.data_transfer.bytes_out == 40
+
+
+def test_exporter_hooks(mocker: MockerFixture, tmp_path: Path):
+    directory = tmp_path / "metrics"
+    directory.mkdir()
+    exporter = MetricsExporter(directory, port=0)
+    exporter.server = mocker.MagicMock()
+    server = mocker.MagicMock()
+    worker = mocker.MagicMock()
+    worker.pid = 1
+    get_snapshot_path(directory, 1).write_text("{}")
+    get_snapshot_path(directory, 1).with_suffix(".tmp").write_text("{")
+
+    exporter.when_ready(server)
+    exporter.server.start.assert_called_once()
+
+    exporter.post_fork(server, worker)
+    exporter.server.close_after_fork.assert_called_once()
+
+    exporter.child_exit(server, worker)
+    assert list(directory.iterdir()) == []
+    exporter.child_exit(server, worker)
+
+    exporter.on_exit(server)
+    exporter.server.stop.assert_called_once()
+    assert not directory.exists()
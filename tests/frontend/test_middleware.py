@@ -3,7 +3,7 @@ import json
 import pytest
 from pytest_mock import MockerFixture
 
-from mrok.frontend.middleware import HealthCheckMiddleware
+from mrok.frontend.middleware import HealthCheckMiddleware, TracingMiddleware
 
 
 @pytest.mark.asyncio
@@ -58,3 +58,19 @@ async def test_healthcheck_passtrhough(
     )
 
     m_app.assert_awaited_once_with(scope, m_receive, m_send)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("scope_type", "traced"), [("http", True), ("lifespan", False)])
+async def test_tracing_middleware(mocker: MockerFixture, scope_type: str, traced: bool):
+    m_app = mocker.AsyncMock()
+    m_proxy_app = mocker.MagicMock()
+    m_receive = mocker.AsyncMock()
+    m_send = mocker.AsyncMock()
+    middleware = TracingMiddleware(m_app, proxy_app=m_proxy_app)
+    scope = {"type": scope_type}
+
+    await middleware(scope, m_receive, m_send)
+
+    assert m_proxy_app.start_trace.called is traced
+    m_app.assert_awaited_once_with(scope, m_receive, m_send)
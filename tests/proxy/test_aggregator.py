@@ -0,0 +1,164 @@
+import pytest
+from hdrh.histogram import HdrHistogram
+
+from mrok.proxy.aggregator import MetricsAggregator, get_imbalance
+from mrok.proxy.metrics import PHASE_HISTOGRAM_ARGS, ROUTE_HISTOGRAM_ARGS, get_response_time_metrics
+from mrok.proxy.models import (
+    CaptureMetrics,
+    DataTransferMetrics,
+    DialMetrics,
+    PoolMetrics,
+    ProcessMetrics,
+    RequestBodyMetrics,
+    RequestsMetrics,
+    ResponseTimeMetrics,
+    RouteMetrics,
+    ServiceMetadata,
+    Status,
+    WorkerMetrics,
+)
+
+
+def encode(*values: int) -> str:
+    hist = HdrHistogram(1, 60000, 3)
+    for value in values:
+        hist.record_value(value)
+    return hist.encode().decode("ascii")
+
+
+def encode_phase(*values: int) -> str:
+    hist = HdrHistogram(*PHASE_HISTOGRAM_ARGS)
+    for value in values:
+        hist.record_value(value)
+    return hist.encode().decode("ascii")
+
+
+def route_metrics(requests: dict[str, int], *values: int) -> RouteMetrics:
+    hist = HdrHistogram(*ROUTE_HISTOGRAM_ARGS)
+    for value in values:
+        hist.record_value(value)
+    return RouteMetrics(
+        requests=requests,
+        response_time=get_response_time_metrics(hist),
+        histogram=hist.encode().decode("ascii"),
+    )
+
+
+def worker_status(
+    worker_id: str, *, cpu: float = 0, rps: int = 0, p99: int = 0, values: tuple = ()
+) -> Status:
+    response_time = ResponseTimeMetrics(avg=0, min=0, max=0, p50=0, p90=0, p99=p99)
+    return Status(
+        meta=ServiceMetadata(extension="ext-1", instance="ins-1"),
+        metrics=WorkerMetrics(
+            worker_id=worker_id,
+            data_transfer=DataTransferMetrics(bytes_in=10, bytes_out=20),
+            requests=RequestsMetrics(rps=rps, total=rps, successful=rps, failed=0),
+            response_time=response_time,
+            response_time_windows={"1m": response_time},
+            response_time_histograms={"lifetime": encode(*values), "1m": encode(*values)},
+            process=ProcessMetrics(cpu=cpu, mem=1),
+            request_bodies=RequestBodyMetrics(memory=1, file=2),
+            capture=CaptureMetrics(queued=1, dropped=3),
+            pool=PoolMetrics(connections=3, idle=1, pending=2),
+            dials=DialMetrics(total=2, failed=1, histogram=encode(*values[:2])),
+        ),
+    )
+
+
+def test_get_imbalance():
+    assert get_imbalance([10, 10]) == 1
+    assert get_imbalance([30, 10]) == 1.5
+    assert get_imbalance([0, 0]) == 1
+
+
+def test_aggregate():
+    aggregator = MetricsAggregator()
+    aggregator.observe(worker_status("w1", cpu=20, rps=30, p99=100, values=(100,) * 99), now=0)
+    aggregator.observe(worker_status("w2", cpu=60, rps=10, p99=300, values=(900,)), now=0)
+
+    status = aggregator.aggregate(["w1", "w2"], now=10)
+
+    assert status is not None
+    assert status.meta.extension == "ext-1"
+    metrics = status.metrics
+    assert metrics.worker_id == "agent"
+    assert metrics.workers == 2
+    assert metrics.process == ProcessMetrics(cpu=80, mem=2)
+    assert metrics.requests == RequestsMetrics(rps=40, total=40, successful=40, failed=0)
+    assert metrics.data_transfer == DataTransferMetrics(bytes_in=20, bytes_out=40)
+    assert metrics.request_bodies == RequestBodyMetrics(memory=2, file=4)
+    assert metrics.capture == CaptureMetrics(queued=2, dropped=6)
+    assert metrics.pool == PoolMetrics(connections=6, idle=2, pending=4)
+    assert metrics.dials.total == 4
+    assert metrics.dials.failed == 2
+    dial_times = HdrHistogram.decode(metrics.dials.histogram.encode())
+    assert dial_times.get_total_count() == 3
+    lifetime = HdrHistogram.decode(metrics.response_time_histograms["lifetime"].encode())
+    assert lifetime.get_total_count() == 100
+    # Percentiles of all the requests, not the average of the workers ones.
+    assert metrics.response_time.p90 == 100
+    assert metrics.response_time.max == pytest.approx(900, rel=0.01)
+    assert metrics.response_time_windows["1m"].p50 == 100
+    assert metrics.imbalance.rps == 1.5
+    assert metrics.imbalance.cpu == 1.5
+    assert metrics.imbalance.p99 == 1.5
+
+
+def test_aggregate_skips_stale_and_forgotten_workers():
+    aggregator = MetricsAggregator(metrics_max_age=30)
+    aggregator.observe(worker_status("w1", rps=30), now=0)
+    aggregator.observe(worker_status("w2", rps=10), now=50)
+    aggregator.observe(worker_status("w3", rps=20), now=50)
+    aggregator.forget("w3")
+
+    status = aggregator.aggregate(["w1", "w2", "w3"], now=60)
+
+    assert status is not None
+    assert status.metrics.workers == 1
+    assert status.metrics.requests.rps == 10
+    assert aggregator.aggregate(["w1"], now=60) is None
+
+
+def test_merge_upstream_phases():
+    w1 = worker_status("w1").metrics
+    w1.upstream_phase_histograms = {"dial": encode_phase(1000, 3000)}
+    w2 = worker_status("w2").metrics
+    w2.upstream_phase_histograms = {
+        "dial": encode_phase(5_000_000),
+        "response_headers": encode_phase(200),
+    }
+
+    metrics = MetricsAggregator().merge([w1, w2])
+
+    assert list(metrics.upstream_phase_histograms) == ["dial", "response_headers"]
+    assert metrics.upstream_phases["dial"].max == pytest.approx(5_000_000, rel=0.01)
+    assert metrics.upstream_phases["response_headers"].p50 == pytest.approx(200, rel=0.01)
+    dial = HdrHistogram.decode(metrics.upstream_phase_histograms["dial"].encode())
+    assert dial.get_total_count() == 3
+
+
+def test_merge_routes():
+    w1 = worker_status("w1").metrics
+    w1.statuses = {"2xx": 5, "5xx": 1}
+    w1.routes = {
+        "/users/{id}": route_metrics({"2xx": 3}, 10, 20, 30),
+        "/health": route_metrics({"2xx": 2}, 1),
+        "other": route_metrics({"5xx": 1}, 900),
+    }
+    w2 = worker_status("w2").metrics
+    w2.statuses = {"2xx": 1, "4xx": 2}
+    w2.routes = {
+        "/users/{id}": route_metrics({"4xx": 2}, 40),
+        "/orders": route_metrics({"2xx": 1}, 5),
+    }
+
+    metrics = MetricsAggregator(max_routes=1).merge([w1, w2])
+
+    assert metrics.statuses == {"2xx": 6, "5xx": 1, "4xx": 2}
+    assert list(metrics.routes) == ["/users/{id}", "other"]
+    assert metrics.routes["/users/{id}"].requests == {"2xx": 3, "4xx": 2}
+    assert metrics.routes["/users/{id}"].response_time.max == pytest.approx(40, rel=0.01)
+    assert metrics.routes["other"].requests == {"5xx": 1, "2xx": 3}
+    other = HdrHistogram.decode(metrics.routes["other"].histogram.encode())
+    assert other.get_total_count() == 3
@@ -1,16 +1,20 @@
 import asyncio
 from collections.abc import Callable
 from http import HTTPStatus
+from pathlib import Path
 from typing import Any
 
 import pytest
 from httpcore import Request
 from pytest_mock import MockerFixture
 
-from mrok.proxy.app import HOP_BY_HOP_HEADERS, ProxyAppBase
+from mrok.constants import SCOPE_EXT_AUTH_TIME, SCOPE_EXT_TRACE
 from mrok.proxy.exceptions import ProxyError
+from mrok.proxy.headers import HOP_BY_HOP_HEADERS
+from mrok.proxy.stream import _expect_continue
+from mrok.proxy.tracing import TracingConfig
 from mrok.types.proxy import ASGIReceive, ASGISend, Message
-from tests.types import ReceiveFactory, SendFactory
+from tests.types import ProxyAppFactory, ReceiveFactory, SendFactory, UpstreamHandler
 
 
 class _DummyResponse:
@@ -56,12 +60,13 @@ def _find_header(hdrs, name: bytes):
     "hop_by_hop_headers",
     [
         [],
-        HOP_BY_HOP_HEADERS,
+        sorted(HOP_BY_HOP_HEADERS),
     ],
 )
 async def test_app_success(
     incoming_xf: list[tuple[bytes, bytes]],
     hop_by_hop_headers: list[bytes],
+    proxy_app_factory: ProxyAppFactory,
     receive_factory: ReceiveFactory,
     send_factory: SendFactory,
 ) -> None:
@@ -71,31 +76,16 @@ async def test_app_success(
     resp_headers = [(b"content-type", b"text/plain")]
     resp_headers.extend([(hhh_name, b"value") for hhh_name in hop_by_hop_headers])
 
-    class Pool:
-        async def handle_async_request(self, req):
-            captured["req"] = req
-            return _DummyResponse(
-                headers=resp_headers,
-                status=200,
-                chunks=[b"one", b"two"],
-            )
+    async def handler(req: Request) -> _DummyResponse:
+        await asyncio.sleep(0)
+        captured["req"] = req
+        return _DummyResponse(
+            headers=resp_headers,
+            status=200,
+            chunks=[b"one", b"two"],
+        )
 
-    pool = Pool()
-
-    class ProxyApp(ProxyAppBase):
-        def setup_connection_pool(
-            self,
-            max_connections=1000,
-            max_keepalive_connections=10,
-            keepalive_expiry=120,
-            retries=0,
-        ):
-            return pool
-
-        def get_upstream_base_url(self, scope):
-            return "http://upstream"
-
-    app = ProxyApp()
+    app = proxy_app_factory(handler)
 
     scope_headers: list[tuple[bytes, bytes]] = []
     scope_headers.extend(incoming_xf)
@@ -155,20 +145,19 @@ async def test_app_success(
 
 @pytest.mark.asyncio
 async def test_proxyerror_returns_custom_status_and_message(
+    proxy_app_factory: ProxyAppFactory,
     mocker: MockerFixture,
     receive_factory: ReceiveFactory,
     send_factory: SendFactory,
 ) -> None:
     sent: list[Message] = []
 
-    class App(ProxyAppBase):
-        def setup_connection_pool(self, *a, **k):
-            return None
-
-        def get_upstream_base_url(self, scope):
-            raise ProxyError(HTTPStatus.IM_A_TEAPOT, "short and stout")
-
-    app = App()
+    app = proxy_app_factory()
+    mocker.patch.object(
+        app,
+        "get_upstream_base_url",
+        side_effect=ProxyError(HTTPStatus.IM_A_TEAPOT, "short and stout"),
+    )
     scope = {"type": "http", "path": "/"}
     receive = receive_factory()
     send = send_factory(sent)
@@ -182,24 +171,18 @@ async def test_proxyerror_returns_custom_status_and_message(
 
 @pytest.mark.asyncio
 async def test_generic_exception_produces_502(
+    proxy_app_factory: ProxyAppFactory,
     mocker: MockerFixture,
     receive_factory: ReceiveFactory,
     send_factory: SendFactory,
 ) -> None:
     sent: list[Message] = []
 
-    class Pool:
-        async def handle_async_request(self, req):
-            raise RuntimeError("boom")
-
-    class ProxyApp(ProxyAppBase):
-        def setup_connection_pool(self, *a, **k):
-            return Pool()
+    async def handler(req: Request) -> _DummyResponse:
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
 
-        def get_upstream_base_url(self, scope):
-            return "http://upstream"
-
-    app = ProxyApp()
+    app = proxy_app_factory(handler)
     scope = {"type": "http", "path": "/", "method": "GET"}
     receive = receive_factory()
     send = send_factory(sent)
@@ -213,24 +196,12 @@ async def test_generic_exception_produces_502(
 
 @pytest.mark.asyncio
 async def test_lifespan_scope_no_send(
+    proxy_app_factory: ProxyAppFactory,
     receive_factory: ReceiveFactory,
     send_factory: SendFactory,
 ) -> None:
-    class ProxyApp(ProxyAppBase):
-        def setup_connection_pool(
-            self,
-            max_connections=1000,
-            max_keepalive_connections=10,
-            keepalive_expiry=120,
-            retries=0,
-        ):
-            pass
-
-        def get_upstream_base_url(self, scope):
-            pass
-
     sends: list[Message] = []
-    app = ProxyApp()
+    app = proxy_app_factory()
     scope = {"type": "lifespan"}
     receive = receive_factory()
     send = send_factory(sends)
@@ -241,24 +212,12 @@ async def test_lifespan_scope_no_send(
 
 @pytest.mark.asyncio
 async def test_non_http_scope_sends_unsupported(
+    proxy_app_factory: ProxyAppFactory,
     receive_factory: Callable[[], ASGIReceive],
     send_factory: Callable[[list[dict]], ASGISend],
 ) -> None:
-    class ProxyApp(ProxyAppBase):
-        def setup_connection_pool(
-            self,
-            max_connections=1000,
-            max_keepalive_connections=10,
-            keepalive_expiry=120,
-            retries=0,
-        ):
-            pass
-
-        def get_upstream_base_url(self, scope):
-            pass
-
     sends: list[dict] = []
-    app = ProxyApp()
+    app = proxy_app_factory()
     scope = {"type": "websocket"}
     receive = receive_factory()
     send = send_factory(sends)
@@ -270,3 +229,534 @@ async def test_non_http_scope_sends_unsupported(
     assert sends[0]["status"] == 500
     assert sends[1]["type"] == "http.response.body"
     assert sends[1]["body"] == b"Unsupported"
+
+
+def _respond(response: _DummyResponse) -> UpstreamHandler:
+    async def handler(req: Request) -> _DummyResponse:
+        await asyncio.sleep(0)
+        return response
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_buffered_response_releases_upstream_before_sending(
+    proxy_app_factory: ProxyAppFactory,
+    mocker: MockerFixture,
+    receive_factory: ReceiveFactory,
+) -> None:
+    events: list[str] = []
+    bodies: list[bytes] = []
+    response = _DummyResponse(chunks=[b"one", b"two", b"three"])
+    mocker.patch.object(response, "aclose", side_effect=lambda: events.append("aclose"))
+
+    async def send(msg: Message) -> None:
+        await asyncio.sleep(0)
+        events.append(msg["type"])
+        if msg["type"] == "http.response.body":
+            bodies.append(msg["body"])
+
+    app = proxy_app_factory(
+        _respond(response), response_buffering=True, response_buffer_memory_size=4
+    )
+    scope = {"type": "http", "method": "GET", "path": "/"}
+
+    await app(scope, receive_factory(), send)
+
+    assert events[:2] == ["aclose", "http.response.start"]
+    assert b"".join(bodies) == b"onetwothree"
+    assert bodies[-1] == b""
+    assert app._response_buffers_budget.used == 0
+
+
+@pytest.mark.asyncio
+async def test_buffered_response_over_max_size_streams_remainder(
+    proxy_app_factory: ProxyAppFactory,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+) -> None:
+    sent: list[Message] = []
+    response = _DummyResponse(chunks=[b"one", b"two", b"three", b"four"])
+    app = proxy_app_factory(_respond(response), response_buffering=True, response_buffer_max_size=6)
+    scope = {"type": "http", "method": "GET", "path": "/"}
+
+    await app(scope, receive_factory(), send_factory(sent))
+
+    assert sent[0]["type"] == "http.response.start"
+    assert [m["body"] for m in sent[1:]] == [b"one", b"two", b"three", b"four", b""]
+    assert sent[-1]["more_body"] is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "headers",
+    [
+        [(b"content-type", b"text/event-stream")],
+        [(b"content-type", b"text/plain"), (b"X-Accel-Buffering", b"no")],
+    ],
+)
+async def test_unbufferable_response_is_streamed(
+    proxy_app_factory: ProxyAppFactory,
+    mocker: MockerFixture,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+    headers: list[tuple[bytes, bytes]],
+) -> None:
+    sent: list[Message] = []
+    response = _DummyResponse(headers=headers, chunks=[b"data: 1\n\n"])
+    app = proxy_app_factory(_respond(response), response_buffering=True)
+    m_buffered = mocker.patch.object(app, "_send_buffered_response")
+    scope = {"type": "http", "method": "GET", "path": "/"}
+
+    await app(scope, receive_factory(), send_factory(sent))
+
+    m_buffered.assert_not_called()
+    assert sent[1]["body"] == b"data: 1\n\n"
+
+
+def _capture_request(captured: dict[str, Any]) -> UpstreamHandler:
+    async def handler(req: Request) -> _DummyResponse:
+        captured["headers"] = req.headers
+        captured["body"] = b"".join([chunk async for chunk in req.stream])
+        return _DummyResponse()
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_request_without_body_has_no_framing_headers(
+    proxy_app_factory: ProxyAppFactory,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+) -> None:
+    captured: dict[str, Any] = {}
+    app = proxy_app_factory(_capture_request(captured))
+    scope: dict[str, Any] = {"type": "http", "method": "GET", "path": "/"}
+
+    await app(scope, receive_factory(), send_factory([]))
+
+    assert captured["body"] == b""
+    assert _find_header(captured["headers"], b"content-length") is None
+    assert _find_header(captured["headers"], b"transfer-encoding") is None
+    assert "extensions" not in scope
+
+
+@pytest.mark.asyncio
+async def test_small_request_body_is_sent_with_content_length(
+    proxy_app_factory: ProxyAppFactory,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+) -> None:
+    captured: dict[str, Any] = {}
+    app = proxy_app_factory(_capture_request(captured), request_buffer_size=16)
+    scope: dict[str, Any] = {
+        "type": "http",
+        "method": "POST",
+        "path": "/",
+        "headers": [(b"transfer-encoding", b"chunked")],
+    }
+    receive = receive_factory(
+        [
+            {"type": "http.request", "body": b'{"a": ', "more_body": True},
+            {"type": "http.request", "body": b"1}", "more_body": False},
+        ]
+    )
+
+    await app(scope, receive, send_factory([]))
+
+    assert captured["body"] == b'{"a": 1}'
+    assert _find_header(captured["headers"], b"content-length") == b"8"
+    assert _find_header(captured["headers"], b"transfer-encoding") is None
+    assert scope["extensions"]["mrok.request_body"] == "memory"
+
+
+@pytest.mark.asyncio
+async def test_large_request_body_is_streamed(
+    proxy_app_factory: ProxyAppFactory,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+) -> None:
+    captured: dict[str, Any] = {}
+    app = proxy_app_factory(_capture_request(captured), request_buffer_size=4)
+    scope: dict[str, Any] = {"type": "http", "method": "POST", "path": "/"}
+    receive = receive_factory(
+        [
+            {"type": "http.request", "body": b"hello ", "more_body": True},
+            {"type": "http.request", "body": b"mrok", "more_body": False},
+        ]
+    )
+
+    await app(scope, receive, send_factory([]))
+
+    assert captured["body"] == b"hello mrok"
+    assert _find_header(captured["headers"], b"transfer-encoding") == b"chunked"
+    assert scope["extensions"]["mrok.request_body"] == "stream"
+
+
+@pytest.mark.asyncio
+async def test_large_request_body_is_spooled(
+    proxy_app_factory: ProxyAppFactory,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+) -> None:
+    captured: dict[str, Any] = {}
+    app = proxy_app_factory(
+        _capture_request(captured), request_buffer_size=4, request_buffering=True
+    )
+    scope: dict[str, Any] = {
+        "type": "http",
+        "method": "POST",
+        "path": "/",
+        "headers": [(b"Content-Length", b"10")],
+    }
+    receive = receive_factory(
+        [
+            {"type": "http.request", "body": b"hello ", "more_body": True},
+            {"type": "http.request", "body": b"mrok", "more_body": False},
+        ]
+    )
+
+    await app(scope, receive, send_factory([]))
+
+    assert captured["body"] == b"hello mrok"
+    assert [v for k, v in captured["headers"] if k.lower() == b"content-length"] == [b"10"]
+    assert _find_header(captured["headers"], b"transfer-encoding") is None
+    assert scope["extensions"]["mrok.request_body"] == "file"
+
+
+@pytest.mark.asyncio
+async def test_request_body_over_max_size_streams_remainder(
+    proxy_app_factory: ProxyAppFactory,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+) -> None:
+    captured: dict[str, Any] = {}
+    app = proxy_app_factory(
+        _capture_request(captured),
+        request_buffer_size=2,
+        request_buffering=True,
+        request_buffer_max_size=8,
+    )
+    scope: dict[str, Any] = {"type": "http", "method": "POST", "path": "/"}
+    receive = receive_factory(
+        [
+            {"type": "http.request", "body": b"one ", "more_body": True},
+            {"type": "http.request", "body": b"two ", "more_body": True},
+            {"type": "http.request", "body": b"three", "more_body": False},
+        ]
+    )
+
+    await app(scope, receive, send_factory([]))
+
+    assert captured["body"] == b"one two three"
+    assert scope["extensions"]["mrok.request_body"] == "stream"
+
+
+@pytest.mark.asyncio
+async def test_request_body_spooling_client_disconnect(
+    proxy_app_factory: ProxyAppFactory,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+) -> None:
+    sent: list[Message] = []
+    captured: dict[str, Any] = {}
+    app = proxy_app_factory(
+        _capture_request(captured), request_buffer_size=2, request_buffering=True
+    )
+    scope: dict[str, Any] = {"type": "http", "method": "POST", "path": "/"}
+    receive = receive_factory(
+        [
+            {"type": "http.request", "body": b"one ", "more_body": True},
+            {"type": "http.disconnect"},
+        ]
+    )
+
+    await app(scope, receive, send_factory(sent))
+
+    assert "body" not in captured
+    assert sent[0]["status"] == 502
+
+
+@pytest.mark.asyncio
+async def test_expect_continue_request_body_is_not_read_upfront(
+    proxy_app_factory: ProxyAppFactory,
+    mocker: MockerFixture,
+    send_factory: SendFactory,
+) -> None:
+    events: list[str] = []
+
+    async def receive() -> Message:
+        events.append("receive")
+        await asyncio.sleep(0)
+        return {"type": "http.request", "body": b"payload", "more_body": False}
+
+    async def handler(req: Request) -> _DummyResponse:
+        events.append("upstream")
+        expectation = _expect_continue.get()
+        assert expectation is not None
+        assert expectation.timeout == 2.5
+        expectation.stream = mocker.MagicMock(wait_for_continue=mocker.AsyncMock(return_value=True))
+        assert b"".join([chunk async for chunk in req.stream]) == b"payload"
+        return _DummyResponse()
+
+    app = proxy_app_factory(handler, expect_continue_timeout=2.5)
+    scope: dict[str, Any] = {
+        "type": "http",
+        "method": "POST",
+        "path": "/",
+        "headers": [(b"content-length", b"7"), (b"expect", b"100-continue")],
+    }
+
+    await app(scope, receive, send_factory([]))
+
+    assert events == ["upstream", "receive"]
+    assert scope["extensions"]["mrok.request_body"] == "stream"
+    assert _expect_continue.get() is None
+
+
+def test_instrument(mocker: MockerFixture, proxy_app_factory: ProxyAppFactory):
+    app = proxy_app_factory()
+    app._on_dial(0.1, False)
+    metrics = mocker.MagicMock()
+
+    app.instrument(metrics)
+    app._on_dial(0.2, True)
+
+    assert metrics.pool is app._pool
+    metrics.on_dial.assert_called_once_with(0.2, True)
+
+
+def _trace_request(response: _DummyResponse, captured: dict[str, Any]) -> UpstreamHandler:
+    async def handler(req: Request) -> _DummyResponse:
+        captured["req"] = req
+        trace = req.extensions.get("trace")
+        if trace is not None:
+            await trace("http11.send_request_headers.started", {})
+            await trace("http11.send_request_headers.complete", {})
+        return response
+
+    return handler
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("response_buffering", [False, True])
+async def test_server_timing(
+    proxy_app_factory: ProxyAppFactory,
+    response_buffering: bool,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+) -> None:
+    sent: list[Message] = []
+    captured: dict[str, Any] = {}
+    app = proxy_app_factory(
+        _trace_request(_DummyResponse(), captured),
+        server_timing=True,
+        response_buffering=response_buffering,
+    )
+
+    await app({"type": "http", "method": "GET", "path": "/"}, receive_factory(), send_factory(sent))
+
+    server_timing = _find_header(sent[0]["headers"], b"server-timing")
+    assert server_timing is not None
+    assert server_timing.startswith(b"pool_wait;dur=")
+    assert b"request_headers;dur=" in server_timing
+
+
+@pytest.mark.asyncio
+async def test_upstream_timings_not_traced_by_default(
+    proxy_app_factory: ProxyAppFactory,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+) -> None:
+    sent: list[Message] = []
+    captured: dict[str, Any] = {}
+    app = proxy_app_factory(_trace_request(_DummyResponse(), captured))
+
+    await app({"type": "http", "method": "GET", "path": "/"}, receive_factory(), send_factory(sent))
+
+    assert "trace" not in captured["req"].extensions
+    assert _find_header(sent[0]["headers"], b"server-timing") is None
+
+
+@pytest.mark.asyncio
+async def test_upstream_timings_reported_to_metrics(
+    proxy_app_factory: ProxyAppFactory,
+    mocker: MockerFixture,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+) -> None:
+    sent: list[Message] = []
+    captured: dict[str, Any] = {}
+    app = proxy_app_factory(_trace_request(_DummyResponse(), captured))
+    metrics = mocker.MagicMock()
+    app.instrument(metrics)
+
+    await app({"type": "http", "method": "GET", "path": "/"}, receive_factory(), send_factory(sent))
+
+    assert _find_header(sent[0]["headers"], b"server-timing") is None
+    phases = metrics.on_upstream_phases.call_args.args[0]
+    assert list(phases) == ["pool_wait", "request_headers"]
+
+
+TRACEPARENT = b"00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+@pytest.mark.asyncio
+async def test_tracing_sampled_request(
+    proxy_app_factory: ProxyAppFactory,
+    mocker: MockerFixture,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+    tmp_path: Path,
+) -> None:
+    sent: list[Message] = []
+    captured: dict[str, Any] = {}
+    app = proxy_app_factory(
+        _trace_request(_DummyResponse(status=201), captured),
+        tracing=TracingConfig(sample_rate=0, exporter=str(tmp_path / "spans.jsonl")),
+    )
+    mocked_submit = mocker.patch.object(app._tracer, "submit")
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/users",
+        "headers": [(b"traceparent", TRACEPARENT), (b"tracestate", b"vendor=1")],
+        "extensions": {SCOPE_EXT_AUTH_TIME: (0.0, 0.0)},
+    }
+
+    await app(scope, receive_factory(), send_factory(sent))
+
+    assert sent[0]["status"] == 201
+    spans = {span.name: span for span in mocked_submit.call_args.args[0]}
+    assert list(spans) == ["auth", "upstream", "streaming", "proxy"]
+    proxy = spans["proxy"]
+    assert proxy.trace_id == "0af7651916cd43dd8448eb211c80319c"
+    assert proxy.parent_id == "b7ad6b7169203331"
+    assert proxy.attributes == {
+        "http.request.method": "POST",
+        "url.path": "/users",
+        "http.response.status_code": 201,
+    }
+    assert proxy.error is None
+    assert spans["auth"].parent_id == proxy.span_id
+    assert spans["streaming"].parent_id == proxy.span_id
+    upstream = spans["upstream"]
+    assert upstream.parent_id == proxy.span_id
+    assert upstream.attributes == {
+        "url.full": "http://upstream/users",
+        "http.response.status_code": 201,
+    }
+    headers = captured["req"].headers
+    assert _find_header(headers, b"traceparent") == (
+        f"00-0af7651916cd43dd8448eb211c80319c-{upstream.span_id}-01".encode()
+    )
+    assert _find_header(headers, b"tracestate") == b"vendor=1"
+    assert "trace" in captured["req"].extensions
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "headers",
+    [[], [(b"traceparent", b"00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-00")]],
+)
+async def test_tracing_unsampled_request(
+    proxy_app_factory: ProxyAppFactory,
+    mocker: MockerFixture,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+    tmp_path: Path,
+    headers: list[tuple[bytes, bytes]],
+) -> None:
+    sent: list[Message] = []
+    captured: dict[str, Any] = {}
+    app = proxy_app_factory(
+        _trace_request(_DummyResponse(), captured),
+        tracing=TracingConfig(sample_rate=0, exporter=str(tmp_path / "spans.jsonl")),
+    )
+    mocked_submit = mocker.patch.object(app._tracer, "submit")
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": headers}
+
+    await app(scope, receive_factory(), send_factory(sent))
+
+    assert sent[0]["status"] == 200
+    assert "trace" not in captured["req"].extensions
+    assert _find_header(captured["req"].headers, b"traceparent") == (
+        headers[0][1] if headers else None
+    )
+    mocked_submit.assert_not_called()
+
+
+def test_start_trace_kept_in_scope(proxy_app_factory: ProxyAppFactory, tmp_path: Path) -> None:
+    app = proxy_app_factory(
+        _trace_request(_DummyResponse(), {}),
+        tracing=TracingConfig(sample_rate=1, exporter=str(tmp_path / "spans.jsonl")),
+    )
+    scope: dict[str, Any] = {"type": "http"}
+
+    trace = app.start_trace(scope)
+
+    assert trace is not None
+    assert scope["extensions"][SCOPE_EXT_TRACE] is trace
+    assert app.start_trace(scope) is trace
+
+
+@pytest.mark.asyncio
+async def test_lifespan_closes_tracer(
+    proxy_app_factory: ProxyAppFactory, mocker: MockerFixture, tmp_path: Path
+) -> None:
+    app = proxy_app_factory(
+        _trace_request(_DummyResponse(), {}),
+        tracing=TracingConfig(exporter=str(tmp_path / "spans.jsonl")),
+    )
+    mocked_close = mocker.patch.object(app._tracer, "close")
+
+    async with app.lifespan(app):
+        mocked_close.assert_not_awaited()
+
+    mocked_close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_lifespan_tracing_disabled(proxy_app_factory: ProxyAppFactory) -> None:
+    app = proxy_app_factory(_trace_request(_DummyResponse(), {}))
+
+    async with app.lifespan(app) as state:
+        assert state is None
+
+
+def test_start_trace_tracing_disabled(proxy_app_factory: ProxyAppFactory) -> None:
+    app = proxy_app_factory(_trace_request(_DummyResponse(), {}))
+    scope: dict[str, Any] = {"type": "http"}
+
+    assert app.start_trace(scope) is None
+    assert scope == {"type": "http"}
+
+
+@pytest.mark.asyncio
+async def test_tracing_upstream_error(
+    proxy_app_factory: ProxyAppFactory,
+    mocker: MockerFixture,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+    tmp_path: Path,
+) -> None:
+    sent: list[Message] = []
+
+    async def handler(req: Request) -> _DummyResponse:
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    app = proxy_app_factory(
+        handler, tracing=TracingConfig(sample_rate=1, exporter=str(tmp_path / "spans.jsonl"))
+    )
+    mocked_submit = mocker.patch.object(app._tracer, "submit")
+
+    await app({"type": "http", "method": "GET", "path": "/"}, receive_factory(), send_factory(sent))
+
+    assert sent[0]["status"] == 502
+    spans = {span.name: span for span in mocked_submit.call_args.args[0]}
+    assert list(spans) == ["upstream", "proxy"]
+    assert spans["upstream"].error == "boom"
+    assert spans["proxy"].parent_id is None
+    assert spans["proxy"].attributes["http.response.status_code"] == 502
+    assert spans["proxy"].error == "boom"
@@ -3,7 +3,7 @@ from contextlib import asynccontextmanager
 import pytest
 from pytest_mock import MockerFixture
 
-from mrok.proxy.asgi import ASGIAppWrapper
+from mrok.proxy.asgi import ASGIAppWrapper, combine_lifespans
 from mrok.types.proxy import Message
 from tests.types import ReceiveFactory, SendFactory
 
@@ -206,3 +206,34 @@ async def test_wrapper_lifespan_state_unsupported(
         await wrapper({"type": "lifespan"}, receive, send)
 
     assert str(cv.value) == '"state" is unsupported by the current ASGI Server.'
+
+
+@pytest.mark.asyncio
+async def test_combine_lifespans(mocker: MockerFixture):
+    manager = mocker.MagicMock()
+    manager.first_startup = mocker.AsyncMock()
+    manager.first_shutdown = mocker.AsyncMock()
+    manager.second_startup = mocker.AsyncMock()
+    manager.second_shutdown = mocker.AsyncMock()
+
+    @asynccontextmanager
+    async def first(app):
+        await manager.first_startup()
+        yield {"first": 1}
+        await manager.first_shutdown()
+
+    @asynccontextmanager
+    async def second(app):
+        await manager.second_startup()
+        yield
+        await manager.second_shutdown()
+
+    async with combine_lifespans(first, second)(mocker.MagicMock()) as state:
+        assert state == {"first": 1}
+
+    assert manager.mock_calls == [
+        mocker.call.first_startup(),
+        mocker.call.second_startup(),
+        mocker.call.second_shutdown(),
+        mocker.call.first_shutdown(),
+    ]
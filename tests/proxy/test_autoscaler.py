@@ -0,0 +1,122 @@
+import pytest
+
+from mrok.proxy.autoscaler import Autoscaler
+from mrok.proxy.models import (
+    DataTransferMetrics,
+    ProcessMetrics,
+    RequestsMetrics,
+    ResponseTimeMetrics,
+    WorkerMetrics,
+)
+
+
+def worker_metrics(worker_id: str, *, cpu: float = 0, rps: int = 0, p99: int = 0):
+    return WorkerMetrics(
+        worker_id=worker_id,
+        data_transfer=DataTransferMetrics(bytes_in=0, bytes_out=0),
+        requests=RequestsMetrics(rps=rps, total=0, successful=0, failed=0),
+        response_time=ResponseTimeMetrics(avg=0, min=0, max=0, p50=0, p90=0, p99=p99),
+        process=ProcessMetrics(cpu=cpu, mem=0),
+    )
+
+
+@pytest.mark.parametrize(
+    ("min_workers", "max_workers", "kwargs"),
+    [
+        (0, 2, {}),
+        (3, 2, {}),
+        (1, 2, {"scale_up_threshold": 0.5, "scale_down_threshold": 0.5}),
+    ],
+)
+def test_invalid_config(min_workers: int, max_workers: int, kwargs: dict):
+    with pytest.raises(ValueError):
+        Autoscaler(min_workers, max_workers, **kwargs)
+
+
+def test_get_load():
+    autoscaler = Autoscaler(1, 4, target_cpu=50, target_rps=100, target_p99_ms=200)
+    autoscaler.observe(worker_metrics("w1", cpu=20, rps=30, p99=100), now=0)
+    autoscaler.observe(worker_metrics("w2", cpu=40, rps=50, p99=300), now=0)
+
+    assert autoscaler.get_load(["w1"], now=0) == 0.5
+    assert autoscaler.get_load(["w1", "w2"], now=0) == 1.5
+
+
+def test_get_load_uses_last_minute_p99():
+    autoscaler = Autoscaler(1, 4, target_cpu=None, target_p99_ms=200)
+    metrics = worker_metrics("w1", p99=1000)
+    metrics.response_time_windows["1m"] = ResponseTimeMetrics(
+        avg=0, min=0, max=0, p50=0, p90=0, p99=100
+    )
+    autoscaler.observe(metrics, now=0)
+
+    assert autoscaler.get_load(["w1"], now=0) == 0.5
+
+
+def test_get_load_ignores_stale_and_unknown_workers():
+    autoscaler = Autoscaler(1, 4, target_cpu=50, metrics_max_age=30)
+    autoscaler.observe(worker_metrics("w1", cpu=10), now=0)
+    autoscaler.observe(worker_metrics("w2", cpu=50), now=20)
+    autoscaler.observe(worker_metrics("w3", cpu=100), now=20)
+
+    assert autoscaler.get_load(["w1", "w2"], now=40) == 1.0
+    assert autoscaler.get_load(["w1"], now=40) is None
+    autoscaler.forget("w2")
+    assert autoscaler.get_load(["w2"], now=40) is None
+
+
+def test_scale_up_proportionally():
+    autoscaler = Autoscaler(2, 10, target_cpu=50)
+    for worker_id in ("w1", "w2"):
+        autoscaler.observe(worker_metrics(worker_id, cpu=100), now=0)
+
+    assert autoscaler.get_desired_workers(["w1", "w2"], now=0) == 4
+
+
+def test_scale_up_capped():
+    autoscaler = Autoscaler(2, 3, target_cpu=10)
+    autoscaler.observe(worker_metrics("w1", cpu=100), now=0)
+
+    assert autoscaler.get_desired_workers(["w1", "w2"], now=0) == 3
+
+
+def test_hysteresis():
+    autoscaler = Autoscaler(1, 10, target_cpu=50, scale_down_cooldown=0)
+    autoscaler.observe(worker_metrics("w1", cpu=30), now=0)
+    autoscaler.observe(worker_metrics("w2", cpu=40), now=0)
+
+    assert autoscaler.get_desired_workers(["w1", "w2"], now=0) == 2
+
+
+def test_scale_down_one_worker_at_a_time():
+    autoscaler = Autoscaler(1, 10, target_cpu=50, scale_down_cooldown=60, metrics_max_age=300)
+    for worker_id in ("w1", "w2", "w3"):
+        autoscaler.observe(worker_metrics(worker_id, cpu=5), now=0)
+
+    assert autoscaler.get_desired_workers(["w1", "w2", "w3"], now=0) == 2
+    assert autoscaler.get_desired_workers(["w1", "w2"], now=30) == 2
+    assert autoscaler.get_desired_workers(["w1", "w2"], now=60) == 1
+    assert autoscaler.get_desired_workers(["w1"], now=200) == 1
+
+
+def test_cooldown_after_scale_up():
+    autoscaler = Autoscaler(1, 10, target_cpu=50, scale_up_cooldown=30, scale_down_cooldown=100)
+    autoscaler.observe(worker_metrics("w1", cpu=100), now=0)
+    assert autoscaler.get_desired_workers(["w1"], now=0) == 2
+
+    autoscaler.observe(worker_metrics("w1", cpu=100), now=10)
+    autoscaler.observe(worker_metrics("w2", cpu=100), now=10)
+    assert autoscaler.get_desired_workers(["w1", "w2"], now=10) == 2
+    assert autoscaler.get_desired_workers(["w1", "w2"], now=30) == 4
+
+    for worker_id in ("w1", "w2", "w3", "w4"):
+        autoscaler.observe(worker_metrics(worker_id, cpu=0), now=100)
+    assert autoscaler.get_desired_workers(["w1", "w2", "w3", "w4"], now=100) == 4
+    assert autoscaler.get_desired_workers(["w1", "w2", "w3", "w4"], now=130) == 3
+
+
+def test_no_metrics_keeps_workers_within_bounds():
+    autoscaler = Autoscaler(2, 4)
+
+    assert autoscaler.get_desired_workers(["w1", "w2", "w3"], now=0) == 3
+    assert autoscaler.get_desired_workers(["w1"], now=0) == 2
@@ -1,7 +1,10 @@
+import socket
+
 import pytest
+from httpcore import ConnectError, ConnectTimeout
 from pytest_mock import MockerFixture
 
-from mrok.proxy.backend import AIOZitiNetworkBackend
+from mrok.proxy.backend import AIONetworkBackend, AIOZitiNetworkBackend
 from mrok.proxy.exceptions import InvalidTargetError, TargetUnavailableError
 
 
@@ -23,8 +26,10 @@ async def test_connect_tcp(mocker: MockerFixture):
         "mrok.proxy.backend.asyncio.open_connection", return_value=(mocked_reader, mocked_writer)
     )
 
-    backend = AIOZitiNetworkBackend("my_identity_file.json")
+    on_dial = mocker.MagicMock()
+    backend = AIOZitiNetworkBackend("my_identity_file.json", on_dial=on_dial)
     stream = await backend.connect_tcp("ziti-svc", 0)
+    on_dial.assert_called_once_with(mocker.ANY, False)
     mocked_ziti_load.assert_called_once_with("my_identity_file.json", timeout=10000)
     mocked_ziti_ctx.connect.assert_called_once_with("ziti-svc")
     mocked_aio_netstream_ctor.assert_called_once_with(mocked_reader, mocked_writer)
@@ -70,9 +75,11 @@ async def test_connect_tcp_target_unavailable(mocker: MockerFixture):
     mocked_ziti_ctx.connect.side_effect = Exception(-24, "service unavailable")
     mocker.patch("mrok.proxy.backend.openziti.load", return_value=(mocked_ziti_ctx, 0))
 
-    backend = AIOZitiNetworkBackend("my_identity_file.json")
+    on_dial = mocker.MagicMock()
+    backend = AIOZitiNetworkBackend("my_identity_file.json", on_dial=on_dial)
     with pytest.raises(TargetUnavailableError):
         await backend.connect_tcp("ziti-svc", 0)
+    on_dial.assert_called_once_with(mocker.ANY, True)
 
 
 @pytest.mark.asyncio
@@ -92,3 +99,68 @@ async def test_sleep(mocker: MockerFixture):
     backend = AIOZitiNetworkBackend("my_identity_file.json")
     await backend.sleep(4)
     mocked_sleep.assert_awaited_once_with(4)
+
+
+@pytest.mark.asyncio
+async def test_aio_backend_connect_tcp(mocker: MockerFixture):
+    m_sock = mocker.MagicMock()
+    m_writer = mocker.MagicMock()
+    m_writer.get_extra_info.return_value = m_sock
+    m_reader = mocker.MagicMock()
+    m_aio_ns = mocker.MagicMock()
+    m_aio_netstream_ctor = mocker.patch(
+        "mrok.proxy.backend.AIONetworkStream", return_value=m_aio_ns
+    )
+    m_openconn = mocker.patch(
+        "mrok.proxy.backend.asyncio.open_connection", return_value=(m_reader, m_writer)
+    )
+    option = (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    on_dial = mocker.MagicMock()
+    backend = AIONetworkBackend(on_dial=on_dial)
+    stream = await backend.connect_tcp(
+        "localhost", 8000, local_address="127.0.0.1", socket_options=[option]
+    )
+
+    m_openconn.assert_called_once_with("localhost", 8000, local_addr=("127.0.0.1", 0))
+    m_sock.setsockopt.assert_called_once_with(*option)
+    m_aio_netstream_ctor.assert_called_once_with(m_reader, m_writer)
+    on_dial.assert_called_once_with(mocker.ANY, False)
+    assert stream == m_aio_ns
+
+
+@pytest.mark.asyncio
+async def test_aio_backend_connect_unix_socket(mocker: MockerFixture):
+    m_reader = mocker.MagicMock()
+    m_writer = mocker.MagicMock()
+    m_aio_ns = mocker.MagicMock()
+    mocker.patch("mrok.proxy.backend.AIONetworkStream", return_value=m_aio_ns)
+    m_openconn = mocker.patch(
+        "mrok.proxy.backend.asyncio.open_unix_connection", return_value=(m_reader, m_writer)
+    )
+
+    backend = AIONetworkBackend()
+    stream = await backend.connect_unix_socket("/tmp/app.sock")
+
+    m_openconn.assert_called_once_with("/tmp/app.sock")
+    assert stream == m_aio_ns
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("error", "expected"),
+    [
+        (ConnectionRefusedError("refused"), ConnectError),
+        (TimeoutError(), ConnectTimeout),
+    ],
+)
+async def test_aio_backend_connect_errors(
+    mocker: MockerFixture, error: Exception, expected: type[Exception]
+):
+    mocker.patch("mrok.proxy.backend.asyncio.open_connection", side_effect=error)
+
+    on_dial = mocker.MagicMock()
+    backend = AIONetworkBackend(on_dial=on_dial)
+    with pytest.raises(expected):
+        await backend.connect_tcp("localhost", 8000)
+    on_dial.assert_called_once_with(mocker.ANY, True)
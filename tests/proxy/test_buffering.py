@@ -0,0 +1,91 @@
+import pytest
+
+from mrok.proxy.buffering import BufferMemoryBudget, SpooledBodyBuffer
+
+
+async def _collect(buffer: SpooledBodyBuffer) -> bytes:
+    return b"".join([chunk async for chunk in buffer.drain()])
+
+
+def test_memory_budget():
+    budget = BufferMemoryBudget(10)
+    assert budget.acquire(6) is True
+    assert budget.acquire(6) is False
+    assert budget.used == 6
+    budget.release(6)
+    assert budget.used == 0
+    budget.release(6)
+    assert budget.used == 0
+
+
+def test_memory_budget_unlimited():
+    budget = BufferMemoryBudget(None)
+    assert budget.acquire(1024 * 1024 * 1024) is True
+
+
+@pytest.mark.asyncio
+async def test_buffer_in_memory():
+    budget = BufferMemoryBudget(100)
+    buffer = SpooledBodyBuffer(budget=budget, memory_size=10, max_size=None)
+    assert await buffer.write(b"hello") is True
+    assert await buffer.write(b"") is True
+    assert await buffer.write(b"mrok!") is True
+    assert buffer.spilled is False
+    assert buffer.size == 10
+    assert budget.used == 10
+
+    assert await _collect(buffer) == b"hellomrok!"
+    assert budget.used == 0
+    buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_buffer_spill_to_file():
+    budget = BufferMemoryBudget(100)
+    buffer = SpooledBodyBuffer(budget=budget, memory_size=6, max_size=None)
+    await buffer.write(b"hello")
+    await buffer.write(b"mrok")
+    await buffer.write(b"!")
+    assert buffer.spilled is True
+    assert budget.used == 5
+
+    assert await _collect(buffer) == b"hellomrok!"
+    buffer.close()
+    assert buffer.spilled is False
+    assert budget.used == 0
+
+
+@pytest.mark.asyncio
+async def test_buffer_spill_when_budget_exhausted():
+    budget = BufferMemoryBudget(8)
+    other = SpooledBodyBuffer(budget=budget, memory_size=8, max_size=None)
+    await other.write(b"12345678")
+
+    buffer = SpooledBodyBuffer(budget=budget, memory_size=8, max_size=None)
+    await buffer.write(b"mrok")
+    assert buffer.spilled is True
+    assert await _collect(buffer) == b"mrok"
+
+    buffer.close()
+    other.close()
+    assert budget.used == 0
+
+
+@pytest.mark.asyncio
+async def test_buffer_max_size():
+    budget = BufferMemoryBudget(100)
+    buffer = SpooledBodyBuffer(budget=budget, memory_size=4, max_size=8)
+    assert await buffer.write(b"hello") is True
+    assert await buffer.write(b"mrok") is False
+    assert buffer.size == 5
+    assert await _collect(buffer) == b"hello"
+    buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_buffer_without_budget():
+    buffer = SpooledBodyBuffer(memory_size=0, max_size=None)
+    await buffer.write(b"mrok")
+    assert buffer.spilled is True
+    assert await _collect(buffer) == b"mrok"
+    buffer.close()
@@ -0,0 +1,57 @@
+import pytest
+from pytest_mock import MockerFixture
+
+from mrok.proxy.capture import CaptureConfig
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"sample_rate": -0.1},
+        {"sample_rate": 1.5},
+        {"statuses": ("6xx",)},
+        {"statuses": ("20",)},
+        {"statuses": ("abc",)},
+        {"queue_size": 0},
+        {"queue_max_bytes": 0},
+        {"queue_overflow": "block"},
+    ],
+)
+def test_invalid_config(kwargs: dict):
+    with pytest.raises(ValueError):
+        CaptureConfig(**kwargs)
+
+
+def test_normalization():
+    config = CaptureConfig(methods=("get", "Post"), statuses=("5XX",))
+    assert config.methods == ("GET", "POST")
+    assert config.statuses == ("5xx",)
+
+
+def test_match_request():
+    config = CaptureConfig(
+        methods=("GET", "POST"),
+        paths=("/api/*", "/admin"),
+        exclude_paths=("/api/health",),
+    )
+    assert config.match_request("get", "/api/users") is True
+    assert config.match_request("POST", "/admin") is True
+    assert config.match_request("DELETE", "/api/users") is False
+    assert config.match_request("GET", "/other") is False
+    assert config.match_request("GET", "/api/health") is False
+
+
+def test_match_request_sampling(mocker: MockerFixture):
+    mocker.patch("mrok.proxy.capture.random.random", side_effect=[0.1, 0.3])
+    config = CaptureConfig(sample_rate=0.2)
+    assert config.match_request("GET", "/") is True
+    assert config.match_request("GET", "/") is False
+
+
+def test_match_status():
+    assert CaptureConfig().match_status(200) is True
+    config = CaptureConfig(statuses=("5xx", "404"))
+    assert config.match_status(503) is True
+    assert config.match_status(404) is True
+    assert config.match_status(400) is False
+    assert config.match_status(200) is False
@@ -73,3 +73,66 @@ def test_backend_config_bind_socket_ziti_error(mocker: MockerFixture, ziti_ident
         config.bind_socket()
 
     assert str(cv.value) == f"Failed to load Ziti identity from {ziti_identity_file}: 1"
+
+
+def test_backend_config_bind_sockets_single(mocker: MockerFixture, ziti_identity_file: str):
+    mocked_socket = mocker.MagicMock()
+    mocked_bind = mocker.patch.object(BackendConfig, "bind_socket", return_value=mocked_socket)
+
+    async def fake_asgi_app(scope, receive, send):
+        pass
+
+    config = BackendConfig(fake_asgi_app, ziti_identity_file)
+    assert config.bind_sockets() == [mocked_socket]
+    mocked_bind.assert_called_once()
+
+
+def test_backend_config_bind_sockets(
+    mocker: MockerFixture, ziti_identity_json: dict, ziti_identity_file: str
+):
+    contexts = [mocker.MagicMock(), mocker.MagicMock()]
+    mocked_openziti_load = mocker.patch(
+        "mrok.proxy.ziticorn.openziti.load",
+        side_effect=[(ctx, 0) for ctx in contexts],
+    )
+
+    async def fake_asgi_app(scope, receive, send):
+        pass
+
+    config = BackendConfig(
+        fake_asgi_app, ziti_identity_file, backlog=4096, ziti_binds=3, ziti_contexts=2
+    )
+    sockets = config.bind_sockets()
+
+    assert mocked_openziti_load.call_count == 2
+    assert config.ziti_load_time > 0
+    assert config.ziti_bind_time > 0
+    assert sockets == [
+        contexts[0].bind.return_value,
+        contexts[1].bind.return_value,
+        contexts[0].bind.return_value,
+    ]
+    assert contexts[0].bind.call_count == 2
+    contexts[1].bind.assert_called_once_with(ziti_identity_json["mrok"]["extension"])
+    contexts[0].bind.return_value.listen.assert_called_with(4096)
+
+
+@pytest.mark.parametrize(
+    ("binds", "contexts", "expected_binds", "expected_contexts"),
+    [(0, 0, 1, 1), (2, 4, 2, 2), (4, 2, 4, 2)],
+)
+def test_backend_config_binds_bounds(
+    ziti_identity_file: str,
+    binds: int,
+    contexts: int,
+    expected_binds: int,
+    expected_contexts: int,
+):
+    async def fake_asgi_app(scope, receive, send):
+        pass
+
+    config = BackendConfig(
+        fake_asgi_app, ziti_identity_file, ziti_binds=binds, ziti_contexts=contexts
+    )
+    assert config.ziti_binds == expected_binds
+    assert config.ziti_contexts == expected_contexts
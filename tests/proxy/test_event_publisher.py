@@ -5,8 +5,12 @@ import pytest
 import zmq
 from pytest_mock import MockerFixture
 
-from mrok.proxy.events import EventsPublisher
+from mrok.proxy.app import ProxyAppBase
+from mrok.proxy.asgi import ASGIAppWrapper
+from mrok.proxy.capture import CaptureConfig
+from mrok.proxy.events import EVENTS_SNDHWM, EventsPublisher, ResponsesQueue
 from mrok.proxy.models import (
+    CaptureMetrics,
     DataTransferMetrics,
     Event,
     HTTPHeaders,
@@ -19,6 +23,8 @@ from mrok.proxy.models import (
     Status,
     WorkerMetrics,
 )
+from mrok.proxy.routes import RoutesConfig
+from mrok.proxy.wire import encode_event
 
 
 async def test_publish_metrics_event(
@@ -52,6 +58,7 @@ async def test_publish_metrics_event(
     event_publisher._publisher = mocker.AsyncMock()
     event_publisher._metrics_collector = mocker.AsyncMock()
     event_publisher._metrics_collector.snapshot.return_value = metrics_snapshot  # type: ignore
+    event_publisher.enqueue_response_event(captured_response())
 
     task = asyncio.create_task(event_publisher.publish_metrics_event())
     await asyncio.sleep(0.1)
@@ -59,6 +66,7 @@ async def test_publish_metrics_event(
     with contextlib.suppress(asyncio.CancelledError):
         await task
 
+    assert metrics_snapshot.capture == CaptureMetrics(queued=1, dropped=0)
     metrics_events = Event(
         type="status",
         data=Status(
@@ -66,13 +74,13 @@ async def test_publish_metrics_event(
             metrics=metrics_snapshot,
         ),
     )
-    event_publisher._publisher.send_string.assert_called_once_with(  # type: ignore
-        metrics_events.model_dump_json()
+    event_publisher._publisher.send_multipart.assert_called_once_with(  # type: ignore
+        encode_event(metrics_events), copy=False
     )
 
 
 @pytest.mark.asyncio
-async def test_publish_response_event(
+async def test_publish_response_events(
     mocker: MockerFixture,
     ziti_identity_file: str,
 ):
@@ -98,11 +106,18 @@ async def test_publish_response_event(
 
     event_publisher._publisher = mocker.AsyncMock()
 
-    await event_publisher.publish_response_event(resp)
+    event_publisher.enqueue_response_event(resp)
+    event_publisher.enqueue_response_event(resp)
+    task = asyncio.create_task(event_publisher.publish_response_events())
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
 
     resp_event = Event(type="response", data=resp)
-    event_publisher._publisher.send_string.assert_awaited_once_with(  # type: ignore
-        resp_event.model_dump_json()
+    assert event_publisher._publisher.send_multipart.await_count == 2  # type: ignore
+    event_publisher._publisher.send_multipart.assert_awaited_with(  # type: ignore
+        encode_event(resp_event), copy=False
     )
 
 
@@ -145,22 +160,30 @@ async def test_on_startup(
         "mrok.proxy.events.MetricsCollector", return_value=m_metrics
     )
     m_publish_metrics_event = mocker.patch.object(EventsPublisher, "publish_metrics_event")
+    m_publish_response_events = mocker.patch.object(EventsPublisher, "publish_response_events")
+    m_track_subscriptions = mocker.patch.object(EventsPublisher, "track_subscriptions")
 
     identity = Identity.load_from_file(ziti_identity_file)
     event_publisher = EventsPublisher(
         worker_id="my-worker-id",
         meta=identity.mrok,
         events_publisher_port=8282,
+        events_routes=RoutesConfig(max_routes=5),
     )
 
     await event_publisher.on_startup()
-    m_metricscollector_ctor.assert_called_once_with("my-worker-id")
+    m_metricscollector_ctor.assert_called_once_with(
+        "my-worker-id", routes=RoutesConfig(max_routes=5)
+    )
     assert event_publisher._metrics_collector == m_metrics
     assert event_publisher._zmq_ctx == m_zmq_ctx
-    m_zmq_ctx.socket.assert_called_once_with(zmq.PUB)
+    m_zmq_ctx.socket.assert_called_once_with(zmq.XPUB)
+    m_publisher.setsockopt.assert_called_once_with(zmq.SNDHWM, EVENTS_SNDHWM)
     m_publisher.connect.assert_called_once_with("tcp://localhost:8282")
     await asyncio.sleep(0.001)
     m_publish_metrics_event.assert_awaited_once()
+    m_publish_response_events.assert_awaited_once()
+    m_track_subscriptions.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -179,12 +202,117 @@ async def test_on_shutdown(
             await asyncio.sleep(5)
 
     task = asyncio.create_task(my_coro())
+    responses_task = asyncio.create_task(my_coro())
+    subscriptions_task = asyncio.create_task(my_coro())
 
     event_publisher._publish_task = task  # type: ignore
+    event_publisher._responses_task = responses_task  # type: ignore
+    event_publisher._subscriptions_task = subscriptions_task  # type: ignore
     event_publisher._publisher = mocker.MagicMock()
     event_publisher._zmq_ctx = mocker.MagicMock()
 
     await event_publisher.on_shutdown()
     assert task.cancelled()
+    assert responses_task.cancelled()
+    assert subscriptions_task.cancelled()
     event_publisher._publisher.close.assert_called_once()  # type: ignore
     event_publisher._zmq_ctx.term.assert_called_once()  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_track_subscriptions(mocker: MockerFixture):
+    event_publisher = EventsPublisher(worker_id="my-worker-id")
+    messages: asyncio.Queue[bytes] = asyncio.Queue()
+    event_publisher._publisher = mocker.MagicMock()
+    event_publisher._publisher.recv = messages.get  # type: ignore
+
+    task = asyncio.create_task(event_publisher.track_subscriptions())
+    assert event_publisher.has_response_subscribers() is False
+
+    await messages.put(b"\x01status")
+    await messages.put(b"\x01status")
+    await messages.put(b"\x00status")
+    await asyncio.sleep(0.01)
+    assert event_publisher.has_response_subscribers() is False
+
+    await messages.put(b"\x01")
+    await messages.put(b"\x01response")
+    await asyncio.sleep(0.01)
+    assert event_publisher.has_response_subscribers() is True
+
+    await messages.put(b"\x00")
+    await asyncio.sleep(0.01)
+    assert event_publisher.has_response_subscribers() is True
+
+    await messages.put(b"\x00response")
+    await asyncio.sleep(0.01)
+    assert event_publisher.has_response_subscribers() is False
+    assert event_publisher._subscriptions == {b"status": 1}
+
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+def captured_response(body: bytes | None = None) -> HTTPResponse:
+    return HTTPResponse(
+        request=HTTPRequest(method="GET", url="/", headers=HTTPHeaders(), start_time=0),
+        status=200,
+        headers=HTTPHeaders(),
+        duration=1,
+        body=body,
+    )
+
+
+@pytest.mark.asyncio
+async def test_responses_queue_get_batch():
+    queue = ResponsesQueue(CaptureConfig())
+    responses = [captured_response(b"a"), captured_response(b"b"), captured_response(b"c")]
+    for response in responses:
+        queue.put(response)
+
+    assert await queue.get_batch(2) == responses[:2]
+    assert await queue.get_batch(2) == responses[2:]
+    assert len(queue) == 0
+
+    task = asyncio.create_task(queue.get_batch(2))
+    await asyncio.sleep(0.01)
+    assert not task.done()
+    queue.put(responses[0])
+    assert await task == [responses[0]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("overflow", "expected"),
+    [("drop-oldest", [b"2", b"3"]), ("drop-new", [b"1", b"2"])],
+)
+async def test_responses_queue_overflow(overflow: str, expected: list[bytes]):
+    queue = ResponsesQueue(CaptureConfig(queue_size=2, queue_overflow=overflow))  # type: ignore[arg-type]
+    for body in (b"1", b"2", b"3"):
+        queue.put(captured_response(body))
+
+    assert queue.dropped == 1
+    assert [response.body for response in await queue.get_batch(10)] == expected
+
+
+@pytest.mark.asyncio
+async def test_responses_queue_max_bytes():
+    queue = ResponsesQueue(CaptureConfig(queue_max_bytes=10))
+    queue.put(captured_response(b"x" * 11))
+    queue.put(captured_response(b"x" * 6))
+    queue.put(captured_response(b"y" * 6))
+
+    assert queue.dropped == 2
+    assert [response.body for response in await queue.get_batch(10)] == [b"y" * 6]
+
+
+def test_setup_middleware_instruments_proxy_app(mocker: MockerFixture):
+    proxy_app = mocker.MagicMock(spec=ProxyAppBase)
+    app = ASGIAppWrapper(proxy_app)
+    event_publisher = EventsPublisher(worker_id="my-worker-id")
+
+    event_publisher.setup_middleware(app)
+
+    assert len(app.middleware) == 2
+    proxy_app.instrument.assert_called_once_with(event_publisher._metrics_collector)
@@ -0,0 +1,14 @@
+import importlib
+import sys
+
+from pytest_mock import MockerFixture
+
+
+def test_import_freezes_objects(mocker: MockerFixture):
+    mocked_freeze = mocker.patch("gc.freeze")
+    mocker.patch.dict(sys.modules)
+    sys.modules.pop("mrok.proxy.freeze", None)
+
+    importlib.import_module("mrok.proxy.freeze")
+
+    mocked_freeze.assert_called_once_with()
@@ -0,0 +1,191 @@
+import pytest
+from pydantic import ValidationError
+from pytest_mock import MockerFixture
+
+from mrok.proxy.headers import (
+    HOP_BY_HOP_HEADERS,
+    HeaderRewriter,
+    HeaderRule,
+    RequestHeaders,
+    _parse_accept_header,
+    parse_accept_header,
+)
+
+
+def test_rewriter_drops_hop_by_hop_headers():
+    rewriter = HeaderRewriter()
+    headers = [(name, b"value") for name in sorted(HOP_BY_HOP_HEADERS)]
+    headers.append((b"Content-Type", b"text/plain"))
+
+    assert rewriter(headers) == [(b"Content-Type", b"text/plain")]
+
+
+def test_rewriter_rules():
+    rewriter = HeaderRewriter(
+        [
+            {"action": "remove", "name": "X-Secret"},
+            {"action": "set", "name": "Server", "value": "mrok"},
+            {"action": "add", "name": "Vary", "value": "Accept"},
+            {"action": "append", "name": "Via", "value": "1.1 mrok"},
+            {"action": "append", "name": "X-Missing", "value": "a"},
+            HeaderRule(action="rename", name="X-Old", to="X-New"),
+        ]
+    )
+    headers = [
+        (b"x-secret", b"s3cr3t"),
+        (b"Server", b"uvicorn"),
+        (b"Vary", b"Origin"),
+        (b"Via", b"1.0 lb"),
+        (b"X-Old", b"value"),
+    ]
+
+    assert rewriter(headers) == [
+        (b"Vary", b"Origin"),
+        (b"Via", b"1.0 lb, 1.1 mrok"),
+        (b"x-new", b"value"),
+        (b"x-missing", b"a"),
+        (b"server", b"mrok"),
+        (b"vary", b"Accept"),
+    ]
+
+
+def test_rewriter_last_set_wins():
+    rewriter = HeaderRewriter(
+        [
+            {"action": "set", "name": "x-a", "value": "1"},
+            {"action": "set", "name": "X-A", "value": "2"},
+        ]
+    )
+    assert rewriter([(b"x-a", b"0")]) == [(b"x-a", b"2")]
+
+
+def test_rewriter_append_and_defaults():
+    rewriter = HeaderRewriter(
+        [{"action": "append", "name": "x-forwarded-for", "value": "10.0.0.1"}]
+    )
+    headers = [(b"X-Forwarded-For", b"1.2.3.4"), (b"x-forwarded-host", b"orig")]
+
+    result = rewriter(
+        headers,
+        append={b"x-forwarded-for": b"127.0.0.1"},
+        defaults={b"x-forwarded-host": b"localhost", b"x-forwarded-port": b"8000"},
+    )
+
+    assert result == [
+        (b"X-Forwarded-For", b"1.2.3.4, 10.0.0.1, 127.0.0.1"),
+        (b"x-forwarded-host", b"orig"),
+        (b"x-forwarded-port", b"8000"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        {"action": "set", "name": "x-a"},
+        {"action": "add", "name": "x-a"},
+        {"action": "append", "name": "x-a"},
+        {"action": "rename", "name": "x-a"},
+        {"action": "replace", "name": "x-a", "value": "b"},
+    ],
+)
+def test_rewriter_invalid_rule(rule: dict):
+    with pytest.raises(ValidationError):
+        HeaderRewriter([rule])
+
+
+@pytest.mark.parametrize(
+    ("accept_header", "expected"),
+    [
+        ("text/html, application/json", ["text/html", "application/json"]),
+        ("text/html;q=0.8, application/json;q=0.9", ["application/json", "text/html"]),
+        (
+            "text/plain;q=0.1, text/html, application/json;q=0.5",
+            ["text/html", "application/json", "text/plain"],
+        ),
+        (
+            "application/json;q=0.7, text/html;q=0.7, text/plain;q=0.7",
+            ["application/json", "text/html", "text/plain"],
+        ),
+        ("*/*;q=0.1, application/json, text/*;q=0.5", ["application/json", "text/*", "*/*"]),
+        (
+            "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,application/json;q=0.8",
+            [
+                "text/html",
+                "application/xhtml+xml",
+                "image/webp",
+                "application/xml",
+                "application/json",
+            ],
+        ),
+        ("application/json, text/html;q=0", ["application/json", "text/html"]),
+        (None, ["*/*"]),
+        ("", ["*/*"]),
+    ],
+)
+def test_parse_accept_header(accept_header: str | None, expected: list[str]):
+    assert parse_accept_header(accept_header) == expected
+
+
+def test_parse_accept_header_memoized():
+    accept = "application/json;q=0.5, text/html"
+    parsed = parse_accept_header(accept)
+    parsed.append("text/plain")
+
+    assert parse_accept_header(accept) == ["text/html", "application/json"]
+    assert _parse_accept_header(accept) is _parse_accept_header(accept)
+
+
+def test_wrong_accept_string():
+    assert parse_accept_header(",") == []
+
+
+def test_wrong_weight():
+    assert parse_accept_header(
+        "text/html;q=0.8, application/json;q=0.9, application/xml;q=1a4"
+    ) == ["application/json", "text/html", "application/xml"]
+
+
+def test_request_headers_view():
+    raw = [
+        (b"Host", b"ext-1234-5678.exts.s1.today"),
+        (b"Accept", b"application/json;q=0.5, text/html"),
+        (b"Authorization", b"Bearer  token "),
+    ]
+    scope: dict = {"type": "http", "headers": raw}
+
+    headers = RequestHeaders.from_scope(scope)
+
+    assert RequestHeaders.from_scope(scope) is headers
+    assert scope["extensions"]["mrok.headers"] is headers
+    assert headers.get("host") == "ext-1234-5678.exts.s1.today"
+    assert headers.get("X-Missing", "default") == "default"
+    assert headers.accept == ("text/html", "application/json")
+    assert headers.bearer_token == "token"
+
+
+def test_request_headers_view_rebuilt_on_new_headers():
+    scope: dict = {"type": "http", "headers": [(b"accept", b"text/html")]}
+    headers = RequestHeaders.from_scope(scope)
+
+    scope["headers"] = [(b"accept", b"application/json")]
+
+    assert RequestHeaders.from_scope(scope) is not headers
+    assert RequestHeaders.from_scope(scope).accept == ("application/json",)
+
+
+@pytest.mark.parametrize(
+    "authorization",
+    [None, b"Bearer ", b"Basic dXNlcjpwYXNz", b"token"],
+)
+def test_request_headers_no_bearer_token(authorization: bytes | None):
+    raw = [(b"authorization", authorization)] if authorization is not None else []
+    assert RequestHeaders(raw).bearer_token is None
+
+
+def test_request_headers_target_resolved_once(mocker: MockerFixture):
+    resolve = mocker.MagicMock(return_value=None)
+    headers = RequestHeaders([(b"host", b"whatever")])
+
+    assert headers.get_target(resolve) is None
+    assert headers.get_target(resolve) is None
+    resolve.assert_called_once_with(headers.index)
@@ -1,4 +1,6 @@
+import os
 import signal
+import sys
 import threading
 import time
 from collections.abc import Generator
@@ -8,12 +10,24 @@ import zmq
 from pytest_mock import MockerFixture
 from watchfiles import Change
 
+from mrok.proxy.capture import CaptureConfig
 from mrok.proxy.master import (
+    METRICS_THREAD_JOIN_TIMEOUT,
     MONITOR_THREAD_JOIN_TIMEOUT,
+    STATUS_EVENT_PREFIX,
+    WORKER_BACKOFF_MAX,
+    WORKER_DRAIN_GRACE,
+    WORKER_STABLE_UPTIME,
+    ForkedProcess,
     MasterBase,
+    get_restart_backoff,
     start_events_router,
+    start_forked_uvicorn_worker,
     start_uvicorn_worker,
 )
+from mrok.proxy.models import AgentReadiness, Event, WorkerReady, WorkerStartup
+from mrok.proxy.routes import RoutesConfig
+from mrok.proxy.wire import decode_event, encode_event
 from tests.conftest import SettingsFactory
 
 
@@ -62,6 +76,8 @@ def test_start_uvicorn_worker_hook(
         events_enabled=False,
         events_pub_port=2233,
         events_metrics_collect_interval=24.0,
+        events_capture=CaptureConfig(headers_only=True),
+        events_routes=RoutesConfig(max_routes=10),
     )
     m_worker_ctor.assert_called_once_with(
         "my-wk-id",
@@ -70,12 +86,19 @@ def test_start_uvicorn_worker_hook(
         events_enabled=False,
         events_publisher_port=2233,
         events_metrics_collect_interval=24.0,
+        events_capture=CaptureConfig(headers_only=True),
+        events_routes=RoutesConfig(max_routes=10),
         ziti_load_timeout_ms=5000,
+        ziti_binds=1,
+        ziti_contexts=1,
         server_backlog=2048,
         server_timeout_keep_alive=5,
         server_limit_concurrency=None,
         server_limit_max_requests=None,
+        server_drain_timeout=30,
         logging_config=None,
+        ready_conn=None,
+        drained_event=None,
     )
     m_worker.run.assert_called_once()
 
@@ -95,10 +118,14 @@ def test_init(mocker: MockerFixture):
         events_pub_port=50000,
         events_sub_port=51000,
         events_metrics_collect_interval=7.0,
+        server_restart_batch_size=2,
+        server_drain_timeout=10,
     )
     assert master.identity_file == "my-identity.json"
     assert master.workers == 3
     assert master.server_reload is True
+    assert master.restart_batch_size == 2
+    assert master.drain_timeout == 10
     assert master.events_enabled is False
     assert master.events_pub_port == 50000
     assert master.events_sub_port == 51000
@@ -106,6 +133,42 @@ def test_init(mocker: MockerFixture):
     mocked_setup_signals.assert_called_once()
 
 
+def test_init_metrics_server(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    mocker.patch.object(Master, "setup_signals_handler")
+    mocked_server_cls = mocker.patch("mrok.proxy.master.MetricsServer")
+
+    master = Master("my-identity.json", metrics_port=9100)
+
+    assert master.metrics_server is mocked_server_cls.return_value
+    get_metrics = mocked_server_cls.call_args.args[0]
+    assert mocked_server_cls.call_args.kwargs == {"port": 9100}
+    assert get_metrics() is None
+    master.agent_metrics = mocker.MagicMock()
+    assert get_metrics() is master.agent_metrics
+
+
+def test_init_metrics_server_events_disabled(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    mocker.patch.object(Master, "setup_signals_handler")
+    mocked_server_cls = mocker.patch("mrok.proxy.master.MetricsServer")
+    mocked_logger = mocker.patch("mrok.proxy.master.logger")
+
+    master = Master("my-identity.json", events_enabled=False, metrics_port=9100)
+
+    assert master.metrics_server is None
+    mocked_server_cls.assert_not_called()
+    mocked_logger.warning.assert_called_once_with(
+        "The metrics endpoint requires events, it has been disabled"
+    )
+
+
 def test_setup_signals_handler(mocker: MockerFixture):
     class Master(MasterBase):
         def get_asgi_app(self):
@@ -113,9 +176,10 @@ def test_setup_signals_handler(mocker: MockerFixture):
 
     mocked_signal = mocker.patch("mrok.proxy.master.signal.signal")
     master = Master("my-identity.json")
-    assert mocked_signal.call_count == 2
+    assert mocked_signal.call_count == 3
     assert mocked_signal.mock_calls[0].args == (signal.SIGINT, master.handle_signal)
     assert mocked_signal.mock_calls[1].args == (signal.SIGTERM, master.handle_signal)
+    assert mocked_signal.mock_calls[2].args == (signal.SIGHUP, master.handle_restart_signal)
 
 
 def test_handle_signal(mocker: MockerFixture):
@@ -129,6 +193,17 @@ def test_handle_signal(mocker: MockerFixture):
     assert master.stop_event.is_set() is True
 
 
+def test_handle_restart_signal(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    master.handle_restart_signal()
+    assert master.restart_requested() is True
+    assert master.restart_requested() is False
+
+
 def test_start_worker(mocker: MockerFixture):
     m_asgi_app = mocker.AsyncMock()
 
@@ -137,6 +212,7 @@ def test_start_worker(mocker: MockerFixture):
             return m_asgi_app
 
     m_proc = mocker.MagicMock()
+    m_proc.pid = 1234
     mocked_start_process = mocker.patch("mrok.proxy.master.start_process", return_value=m_proc)
 
     master = Master(
@@ -147,7 +223,10 @@ def test_start_worker(mocker: MockerFixture):
         events_pub_port=50000,
         events_sub_port=51000,
         events_metrics_collect_interval=10,
+        events_capture=CaptureConfig(sample_rate=0.5),
+        events_routes=RoutesConfig(max_routes=10),
     )
+    assert master.aggregator.max_routes == 10
     assert master.start_worker("my-worker-id") == m_proc
     mocked_start_process.assert_called_once_with(
         start_uvicorn_worker,
@@ -159,16 +238,26 @@ def test_start_worker(mocker: MockerFixture):
         ),
         {
             "ziti_load_timeout_ms": 5000,
+            "ziti_binds": 1,
+            "ziti_contexts": 1,
             "server_backlog": 2048,
             "server_timeout_keep_alive": 5,
             "server_limit_concurrency": None,
             "server_limit_max_requests": None,
+            "server_drain_timeout": 30,
             "events_metrics_collect_interval": 10,
+            "events_capture": CaptureConfig(sample_rate=0.5),
+            "events_routes": RoutesConfig(max_routes=10),
             "events_enabled": True,
             "events_pub_port": 50000,
             "logging_config": None,
+            "ready_conn": mocker.ANY,
+            "drained_event": master.worker_drained_events[1234],
         },
     )
+    worker_ready_conn = mocked_start_process.call_args.args[3]["ready_conn"]
+    assert worker_ready_conn.closed is True
+    assert master.worker_ready_conns[1234].readable is True
 
 
 def test_start_events_router(mocker: MockerFixture):
@@ -222,6 +311,7 @@ def test_start(mocker: MockerFixture):
             return mocker.AsyncMock()
 
     mocked_start_events_router = mocker.patch.object(Master, "start_events_router")
+    mocked_start_events_publisher = mocker.patch.object(Master, "start_events_publisher")
     mocked_start_workers = mocker.patch.object(Master, "start_workers")
     mocked_monitor_thread = mocker.MagicMock()
 
@@ -229,10 +319,31 @@ def test_start(mocker: MockerFixture):
         "my-identity.json",
     )
     master.monitor_thread = mocked_monitor_thread
+    master.metrics_thread = mocker.MagicMock()
+    master.metrics_server = mocker.MagicMock()
     master.start()
     mocked_start_events_router.assert_called_once()
+    mocked_start_events_publisher.assert_called_once()
     mocked_start_workers.assert_called_once()
     mocked_monitor_thread.start.assert_called_once()
+    master.metrics_thread.start.assert_called_once()
+    master.metrics_server.start.assert_called_once()
+
+
+def test_start_events_disabled(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    mocker.patch.object(Master, "start_events_router")
+    mocker.patch.object(Master, "start_workers")
+    master = Master("my-identity.json", events_enabled=False)
+    master.monitor_thread = mocker.MagicMock()
+    master.metrics_thread = mocker.MagicMock()
+
+    master.start()
+
+    master.metrics_thread.start.assert_not_called()
 
 
 def test_stop_workers(mocker: MockerFixture):
@@ -242,15 +353,84 @@ def test_stop_workers(mocker: MockerFixture):
 
     w0 = mocker.MagicMock()
     w1 = mocker.MagicMock()
+    mocked_drain = mocker.patch.object(Master, "drain_workers")
     master = Master("my-identity.json")
 
     master.worker_processes = {"id1": w0, "id2": w1}
     master.stop_workers()
-    w0.stop.assert_called_once_with(sigint_timeout=5, sigkill_timeout=1)
-    w1.stop.assert_called_once_with(sigint_timeout=5, sigkill_timeout=1)
+    mocked_drain.assert_called_once_with([w0, w1])
     assert master.worker_processes == {}
 
 
+def test_drain_workers(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    mocked_kill = mocker.patch("mrok.proxy.master.os.kill")
+    master = Master("my-identity.json", server_drain_timeout=10)
+    drained = mock_process(mocker, 1)
+    drained.join.side_effect = lambda timeout: setattr(drained, "exitcode", 0)
+    stuck = mock_process(mocker, 2)
+    dead = mock_process(mocker, 3, exitcode=1)
+    dead.is_alive.return_value = False
+    drained_event = mocker.MagicMock()
+    drained_event.wait.return_value = True
+    stuck_event = mocker.MagicMock()
+    stuck_event.wait.return_value = False
+    stuck_event.is_set.return_value = False
+    master.worker_drained_events = {1: drained_event, 2: stuck_event}
+    mocker.patch("mrok.proxy.master.time.monotonic", side_effect=[0, 100])
+
+    master.drain_workers([drained, stuck, dead])
+
+    assert mocked_kill.mock_calls == [
+        mocker.call(1, signal.SIGINT),
+        mocker.call(2, signal.SIGINT),
+    ]
+    drained.join.assert_called_once_with(WORKER_DRAIN_GRACE)
+    drained.stop.assert_not_called()
+    stuck.join.assert_not_called()
+    stuck.stop.assert_called_once_with(sigint_timeout=0, sigkill_timeout=1)
+    dead.stop.assert_not_called()
+    assert master.worker_drained_events == {}
+
+
+def test_drain_workers_releases_under_workers_lock(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    process = mock_process(mocker, 1, exitcode=0)
+    process.is_alive.return_value = False
+    locked: list[bool] = []
+    mocker.patch.object(
+        Master,
+        "release_worker",
+        side_effect=lambda process: locked.append(is_locked_elsewhere(master.workers_lock)),
+    )
+
+    master.drain_workers([process])
+
+    assert locked == [True]
+
+
+def test_wait_worker_drained_process_exited(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    process = mock_process(mocker, 1, exitcode=1)
+    process.is_alive.return_value = False
+    drained_event = mocker.MagicMock()
+    drained_event.wait.return_value = False
+    drained_event.is_set.return_value = False
+
+    assert master.wait_worker_drained(process, drained_event, time.monotonic() + 60) is False
+
+
 def test_stop_event_router(mocker: MockerFixture):
     class Master(MasterBase):
         def get_asgi_app(self):
@@ -277,11 +457,15 @@ def test_stop(mocker: MockerFixture):
 
     master = Master("my-identity.json")
     master.monitor_thread = mocked_monitor_thread
+    master.metrics_thread = mocker.MagicMock()
+    master.metrics_server = mocker.MagicMock()
     master.stop()
 
     mocked_stop_events_router.assert_called_once()
     mocked_stop_workers.assert_called_once()
     mocked_monitor_thread.join.assert_called_once_with(timeout=MONITOR_THREAD_JOIN_TIMEOUT)
+    master.metrics_thread.join.assert_called_once_with(timeout=METRICS_THREAD_JOIN_TIMEOUT)
+    master.metrics_server.stop.assert_called_once()
 
 
 def test_restart(mocker: MockerFixture):
@@ -289,12 +473,256 @@ def test_restart(mocker: MockerFixture):
         def get_asgi_app(self):
             return mocker.AsyncMock()
 
-    mocked_stop = mocker.patch.object(Master, "stop_workers")
-    mocked_start = mocker.patch.object(Master, "start_workers")
+    old1, old2, new1, new2 = (mocker.MagicMock() for _ in range(4))
+    manager = mocker.MagicMock()
+    mocked_start_worker = mocker.patch.object(Master, "start_worker", side_effect=[new1, new2])
+    manager.attach_mock(mocked_start_worker, "start_worker")
+    mocked_drain = mocker.patch.object(Master, "drain_workers")
+    manager.attach_mock(mocked_drain, "drain_workers")
+    mocker.patch.object(Master, "wait_worker_ready", return_value=True)
+    master = Master("my-identity.json", server_drain_timeout=10)
+    master.worker_processes = {"id1": old1, "id2": old2}
+
+    master.restart()
+
+    assert [name for name, _, _ in manager.mock_calls] == [
+        "start_worker",
+        "drain_workers",
+        "start_worker",
+        "drain_workers",
+    ]
+    assert mocked_start_worker.mock_calls[0].args[0] == "id1"
+    assert mocked_start_worker.mock_calls[1].args[0] == "id2"
+    assert mocked_drain.mock_calls == [mocker.call([old1]), mocker.call([old2])]
+    assert master.worker_processes == {"id1": new1, "id2": new2}
+    assert master.pause_event.is_set() is True
+
+
+def test_restart_batches(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    mocked_replace = mocker.patch.object(Master, "replace_workers", return_value=True)
+    master = Master("my-identity.json", server_restart_batch_size=2)
+    master.worker_processes = {f"id{i}": mocker.MagicMock() for i in range(5)}
+
+    master.restart()
+
+    assert [call.args[0] for call in mocked_replace.mock_calls] == [
+        ["id0", "id1"],
+        ["id2", "id3"],
+        ["id4"],
+    ]
+
+
+def is_locked_elsewhere(lock) -> bool:
+    acquired: list[bool] = []
+    thread = threading.Thread(target=lambda: acquired.append(lock.acquire(blocking=False)))
+    thread.start()
+    thread.join()
+    return not acquired[0]
+
+
+def test_restart_holds_workers_lock(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    master.worker_processes = {"id1": mocker.MagicMock()}
+    locked: list[bool] = []
+
+    def replace_workers(worker_ids):
+        locked.append(is_locked_elsewhere(master.workers_lock))
+        return True
+
+    mocker.patch.object(Master, "replace_workers", side_effect=replace_workers)
+
+    master.restart()
+
+    assert locked == [True]
+    assert is_locked_elsewhere(master.workers_lock) is False
+
+
+def test_restart_replacement_not_ready(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    old1, old2, new1 = (mocker.MagicMock() for _ in range(3))
+    mocked_start_worker = mocker.patch.object(Master, "start_worker", return_value=new1)
+    mocker.patch.object(Master, "wait_worker_ready", return_value=False)
     master = Master("my-identity.json")
+    master.worker_processes = {"id1": old1, "id2": old2}
+
     master.restart()
-    mocked_stop.assert_called()
-    mocked_start.assert_called()
+
+    mocked_start_worker.assert_called_once()
+    new1.stop.assert_called_once_with(sigint_timeout=1, sigkill_timeout=1)
+    old1.stop.assert_not_called()
+    old2.stop.assert_not_called()
+    assert master.worker_processes == {"id1": old1, "id2": old2}
+    assert master.pause_event.is_set() is True
+
+
+def test_wait_worker_ready(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    process = mock_process(mocker, 1)
+    ready_conn = mocker.MagicMock()
+    ready_conn.poll.side_effect = [False, False, True]
+    master.worker_ready_conns = {1: ready_conn}
+    mocked_handle_ready = mocker.patch.object(Master, "handle_worker_ready", return_value=True)
+
+    assert master.wait_worker_ready("id1", process) is True
+    assert ready_conn.poll.call_count == 3
+    mocked_handle_ready.assert_called_once_with("id1", process)
+
+
+def test_wait_worker_ready_process_died(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    process = mock_process(mocker, 1, exitcode=1)
+    process.is_alive.return_value = False
+    ready_conn = mocker.MagicMock()
+    ready_conn.poll.return_value = False
+    master.worker_ready_conns = {1: ready_conn}
+
+    assert master.wait_worker_ready("id1", process) is False
+
+
+def test_wait_worker_ready_timeout(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    mocker.patch("mrok.proxy.master.WORKER_READY_CHECK_DELAY", 0.01)
+    master = Master("my-identity.json")
+    process = mock_process(mocker, 1)
+    process.is_alive.return_value = True
+    ready_conn, _ = master.mp_context.Pipe(duplex=False)
+    master.worker_ready_conns = {1: ready_conn}
+
+    assert master.wait_worker_ready("id1", process, timeout=0.05) is False
+
+
+def test_handle_worker_ready(mocker: MockerFixture, tmp_path: Path):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    readiness_file = tmp_path / "readiness.json"
+    master = Master("my-identity.json", server_workers=2, server_readiness_file=readiness_file)
+    mocked_publish = mocker.patch.object(Master, "publish_event")
+    ready_process = mock_process(mocker, 1)
+    master.worker_processes = {"id1": ready_process, "id2": mock_process(mocker, 2)}
+    master.worker_started_at = {"id1": time.monotonic() - 2}
+    ready_conn, worker_ready_conn = master.mp_context.Pipe(duplex=False)
+    worker_ready_conn.send(WorkerStartup(ziti_load_time=0.5, ziti_bind_time=0.25))
+    master.worker_ready_conns = {1: ready_conn}
+
+    assert master.handle_worker_ready("id1", ready_process) is True
+
+    assert master.worker_ready_conns == {}
+    assert ready_conn.closed is True
+    ready = master.worker_readiness["id1"]
+    assert ready.pid == 1
+    assert ready.ziti_load_time == 0.5
+    assert ready.ziti_bind_time == 0.25
+    assert 2 <= ready.ready_time < 3
+    event = mocked_publish.call_args.args[0]
+    assert event.type == "worker_ready"
+    assert event.data == ready
+    readiness = AgentReadiness.model_validate_json(readiness_file.read_text())
+    assert readiness.ready is False
+    assert readiness.workers == 2
+    assert readiness.ready_workers == [ready]
+
+
+def test_handle_worker_ready_worker_exited(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    process = mock_process(mocker, 1, exitcode=1)
+    ready_conn, worker_ready_conn = master.mp_context.Pipe(duplex=False)
+    worker_ready_conn.close()
+    master.worker_ready_conns = {1: ready_conn}
+
+    assert master.handle_worker_ready("id1", process) is False
+    assert master.worker_readiness == {}
+    assert master.worker_ready_conns == {}
+
+
+def test_write_readiness(mocker: MockerFixture, tmp_path: Path):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    readiness_file = tmp_path / "readiness.json"
+    master = Master("my-identity.json", server_readiness_file=str(readiness_file))
+    master.worker_processes = {"id1": mock_process(mocker, 1), "id2": mock_process(mocker, 3)}
+    master.worker_readiness = {
+        "id1": WorkerReady(worker_id="id1", pid=1, ready_time=1),
+        # Readiness of a replaced worker process.
+        "id2": WorkerReady(worker_id="id2", pid=2, ready_time=1),
+    }
+
+    master.write_readiness()
+    readiness = AgentReadiness.model_validate_json(readiness_file.read_text())
+    assert readiness.ready is False
+    assert [ready.worker_id for ready in readiness.ready_workers] == ["id1"]
+
+    master.worker_readiness["id2"] = WorkerReady(worker_id="id2", pid=3, ready_time=1)
+    master.write_readiness()
+    readiness = AgentReadiness.model_validate_json(readiness_file.read_text())
+    assert readiness.ready is True
+    assert readiness.workers == 2
+    assert list(tmp_path.iterdir()) == [readiness_file]
+
+
+def test_write_readiness_error(mocker: MockerFixture, tmp_path: Path):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    mock_logger = mocker.patch("mrok.proxy.master.logger.warning")
+    master = Master("my-identity.json", server_readiness_file=tmp_path / "missing" / "r.json")
+
+    master.write_readiness()
+
+    assert mock_logger.call_args.args[0].startswith("Cannot write readiness file")
+
+
+def test_release_worker(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    process = mock_process(mocker, 1)
+    ready_conn = mocker.MagicMock()
+    master.worker_ready_conns = {1: ready_conn}
+    master.worker_drained_events = {1: mocker.MagicMock()}
+    master.worker_readiness = {
+        "id1": WorkerReady(worker_id="id1", pid=1, ready_time=1),
+        "id2": WorkerReady(worker_id="id2", pid=2, ready_time=1),
+    }
+
+    master.release_worker(process)
+
+    ready_conn.close.assert_called_once()
+    assert master.worker_ready_conns == {}
+    assert master.worker_drained_events == {}
+    assert list(master.worker_readiness) == ["id2"]
 
 
 def test_iter(mocker: MockerFixture):
@@ -357,57 +785,331 @@ def test_run_with_reload(mocker: MockerFixture):
     mocked_restart.assert_called_once()
 
 
-def test_monitor_workers_restarts_dead_process(mocker: MockerFixture):
+def test_run_restart_requested(mocker: MockerFixture):
     class Master(MasterBase):
         def get_asgi_app(self):
             return mocker.AsyncMock()
 
-    mocker.patch("mrok.proxy.master.MONITOR_THREAD_CHECK_DELAY", 0.1)
-
-    mock_start_worker = mocker.patch.object(Master, "start_worker")
+    mocker.patch.object(Master, "start")
+    mocker.patch.object(Master, "stop")
     master = Master("my-identity.json")
+    mocked_stop_event = mocker.MagicMock()
+    mocked_stop_event.wait.side_effect = [False, True]
+    master.stop_event = mocked_stop_event
+    mocked_restart = mocker.patch.object(Master, "restart")
+    master.handle_restart_signal()
+
+    master.run()
+
+    mocked_restart.assert_called_once()
 
-    dead_process = mocker.Mock()
-    dead_process.is_alive.return_value = False
-    dead_process.pid = 12345
 
-    alive_process = mocker.Mock()
-    alive_process.is_alive.return_value = True
-    alive_process.pid = 12346
+def mock_process(mocker: MockerFixture, pid: int, *, exitcode: int | None = None):
+    process = mocker.MagicMock()
+    process.pid = pid
+    process.exitcode = exitcode
+    process._p.sentinel = pid
+    return process
 
-    new_process = mocker.Mock()
-    new_process.pid = 12347
 
+def test_get_restart_backoff():
+    assert get_restart_backoff(1) == 0
+    assert 0.25 <= get_restart_backoff(2) <= 0.5
+    assert 0.5 <= get_restart_backoff(3) <= 1
+    assert WORKER_BACKOFF_MAX / 2 <= get_restart_backoff(100) <= WORKER_BACKOFF_MAX
+
+
+def test_wait_workers(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    dead_process = mock_process(mocker, 12345, exitcode=1)
+    alive_process = mock_process(mocker, 12346)
     master.worker_processes = {"id1": dead_process, "id2": alive_process}
+    master.worker_started_at = {"id1": time.monotonic() - WORKER_STABLE_UPTIME}
     master.pause_event.set()
+    mocked_wait = mocker.patch("mrok.proxy.master.wait", return_value=[12345])
 
-    mock_start_worker.return_value = new_process
-
-    monitor_thread = threading.Thread(target=master.monitor_workers)
-    monitor_thread.start()
-    time.sleep(0.1)
-    master.stop_event.set()
-    monitor_thread.join()
+    master.wait_workers()
 
+    mocked_wait.assert_called_once_with([12345, 12346], 1)
     dead_process.stop.assert_called_once_with(sigint_timeout=1, sigkill_timeout=1)
-    mock_start_worker.assert_called_once_with("id1")
-    assert master.worker_processes["id1"] == new_process
-    assert master.worker_processes["id2"] == alive_process
+    alive_process.stop.assert_not_called()
+    assert master.worker_crashes == {"id1": 1}
+    assert list(master.pending_restarts) == ["id1"]
+    assert master.pending_restarts["id1"][1] == 0
 
 
-def test_monitor_workers_handles_is_alive_exception(mocker: MockerFixture):
+def test_wait_workers_ready(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    starting = mock_process(mocker, 12345)
+    ready = mock_process(mocker, 12346)
+    master.worker_processes = {"id1": starting, "id2": ready}
+    ready_conn, _ = master.mp_context.Pipe(duplex=False)
+    master.worker_ready_conns = {12345: ready_conn}
+    master.pause_event.set()
+    mocked_wait = mocker.patch("mrok.proxy.master.wait", return_value=[ready_conn])
+    mocked_handle_ready = mocker.patch.object(Master, "handle_worker_ready")
+    mocked_handle_exit = mocker.patch.object(Master, "handle_worker_exit")
+
+    master.wait_workers()
+
+    mocked_wait.assert_called_once_with([ready_conn, 12345, 12346], 1)
+    mocked_handle_ready.assert_called_once_with("id1", starting)
+    mocked_handle_exit.assert_not_called()
+
+
+def test_wait_workers_paused(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    process = mock_process(mocker, 12345)
+    master.worker_processes = {"id1": process}
+    mocker.patch("mrok.proxy.master.wait", return_value=[12345])
+
+    master.wait_workers()
+
+    process.stop.assert_not_called()
+    assert master.pending_restarts == {}
+
+
+def test_wait_workers_replaced_worker(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    process = mock_process(mocker, 12345)
+    new_process = mock_process(mocker, 12346)
+    master.worker_processes = {"id1": process}
+    master.pause_event.set()
+
+    def replace_worker(sentinels, timeout):
+        master.worker_processes["id1"] = new_process
+        return [12345]
+
+    mocker.patch("mrok.proxy.master.wait", side_effect=replace_worker)
+
+    master.wait_workers()
+
+    process.stop.assert_not_called()
+    assert master.pending_restarts == {}
+
+
+def test_wait_workers_crash_loop(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    process = mock_process(mocker, 12345)
+    master.worker_processes = {"id1": process}
+    master.worker_started_at = {"id1": time.monotonic()}
+    master.worker_crashes = {"id1": 3}
+    master.pause_event.set()
+    mocker.patch("mrok.proxy.master.wait", return_value=[12345])
+
+    master.wait_workers()
+
+    due, backoff = master.pending_restarts["id1"]
+    assert master.worker_crashes == {"id1": 4}
+    assert 1 <= backoff <= 2
+    assert due > time.monotonic()
+
+
+def test_wait_workers_clean_exit(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    process = mock_process(mocker, 12345, exitcode=0)
+    master.worker_processes = {"id1": process}
+    master.worker_started_at = {"id1": time.monotonic()}
+    master.worker_crashes = {"id1": 3}
+    master.pause_event.set()
+    mocker.patch("mrok.proxy.master.wait", return_value=[12345])
+    mocked_logger = mocker.patch("mrok.proxy.master.logger")
+
+    master.wait_workers()
+
+    due, backoff = master.pending_restarts["id1"]
+    assert master.worker_crashes == {"id1": 0}
+    assert backoff == 0
+    assert due <= time.monotonic()
+    mocked_logger.info.assert_called_once_with("Worker id1 [12345] exited, restarting")
+    mocked_logger.warning.assert_not_called()
+
+
+def test_wait_workers_until_pending_restart(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    master.worker_processes = {
+        "id1": mock_process(mocker, 12345),
+        "id2": mock_process(mocker, 12346),
+    }
+    master.pending_restarts = {"id1": (time.monotonic() + 0.5, 0.5)}
+    mocked_wait = mocker.patch("mrok.proxy.master.wait", return_value=[])
+
+    master.wait_workers()
+
+    sentinels, timeout = mocked_wait.call_args.args
+    assert sentinels == [12346]
+    assert 0 < timeout <= 0.5
+
+
+def test_restart_pending_workers(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    dead_process = mock_process(mocker, 12345, exitcode=1)
+    waiting_process = mock_process(mocker, 12346, exitcode=1)
+    new_process = mock_process(mocker, 12347)
+    mocked_start_worker = mocker.patch.object(Master, "start_worker", return_value=new_process)
+    master.worker_processes = {"id1": dead_process, "id2": waiting_process}
+    master.worker_started_at = {"id1": 0}
+    master.worker_crashes = {"id1": 2, "id2": 5}
+    master.pending_restarts = {
+        "id1": (time.monotonic(), 0.3),
+        "id2": (time.monotonic() + 60, 8.0),
+    }
+    master.events_publisher = mocker.MagicMock()
+
+    master.restart_pending_workers()
+
+    mocked_start_worker.assert_called_once_with("id1")
+    assert master.worker_processes == {"id1": new_process, "id2": waiting_process}
+    assert list(master.pending_restarts) == ["id2"]
+    assert master.worker_restarts == {"id1": 1}
+    event = decode_event(master.events_publisher.send_multipart.call_args.args[0])
+    assert event.type == "worker_restart"
+    assert event.data.model_dump() == {
+        "type": "worker_restart",
+        "worker_id": "id1",
+        "pid": 12345,
+        "exit_code": 1,
+        "new_pid": 12347,
+        "crashes": 2,
+        "restarts": 1,
+        "backoff": 0.3,
+    }
+
+
+def test_publish_event_events_disabled(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json", events_enabled=False)
+    master.publish_event(mocker.MagicMock())
+    assert master.events_publisher is None
+
+
+def test_start_stop_events_publisher(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    m_socket = mocker.MagicMock()
+    m_zmq_ctx = mocker.MagicMock()
+    m_zmq_ctx.socket.return_value = m_socket
+    mocker.patch("mrok.proxy.master.zmq.Context", return_value=m_zmq_ctx)
+    master = Master("my-identity.json", events_pub_port=4000)
+
+    master.start_events_publisher()
+    m_zmq_ctx.socket.assert_called_once_with(zmq.PUB)
+    m_socket.connect.assert_called_once_with("tcp://localhost:4000")
+
+    master.stop_events_publisher()
+    m_socket.close.assert_called_once_with(linger=0)
+    m_zmq_ctx.term.assert_called_once()
+    assert master.events_publisher is None
+
+
+def test_monitor_workers(mocker: MockerFixture):
     class Master(MasterBase):
         def get_asgi_app(self):
             return mocker.AsyncMock()
 
-    mocker.patch("mrok.proxy.master.MONITOR_THREAD_ERROR_DELAY", 0.1)
-    mock_logger = mocker.patch("mrok.proxy.master.logger.error")
     master = Master("my-identity.json")
+    mocked_restart_pending = mocker.patch.object(Master, "restart_pending_workers")
+
+    def wait_workers():
+        master.stop_event.set()
+
+    mocked_wait_exits = mocker.patch.object(Master, "wait_workers", side_effect=wait_workers)
+    master.pause_event.set()
+
+    master.monitor_workers()
+
+    mocked_restart_pending.assert_called_once()
+    mocked_wait_exits.assert_called_once()
+
+
+def test_monitor_workers_holds_workers_lock(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json")
+    locked: list[bool] = []
+    mocker.patch.object(
+        Master,
+        "restart_pending_workers",
+        side_effect=lambda: locked.append(is_locked_elsewhere(master.workers_lock)),
+    )
+
+    def wait_workers():
+        locked.append(is_locked_elsewhere(master.workers_lock))
+        master.stop_event.set()
+
+    mocker.patch.object(Master, "wait_workers", side_effect=wait_workers)
+    master.pause_event.set()
+
+    master.monitor_workers()
 
-    problematic_process = mocker.Mock()
-    problematic_process.is_alive.side_effect = Exception("Test exception")
+    assert locked == [True, False]
 
-    master.worker_processes = {"id": problematic_process}
+
+def test_monitor_workers_scales_workers(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json", server_workers=1, server_max_workers=2)
+    mocked_scale = mocker.patch.object(Master, "scale_workers")
+    mocker.patch.object(Master, "restart_pending_workers")
+    mocker.patch.object(Master, "wait_workers", side_effect=master.stop_event.set)
+    master.pause_event.set()
+
+    master.monitor_workers()
+
+    mocked_scale.assert_called_once()
+
+
+def test_monitor_workers_handles_exception(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    mocker.patch("mrok.proxy.master.MONITOR_THREAD_ERROR_DELAY", 0.1)
+    mock_logger = mocker.patch("mrok.proxy.master.logger.error")
+    master = Master("my-identity.json")
+    mocker.patch("mrok.proxy.master.wait", side_effect=Exception("Test exception"))
+    master.worker_processes = {"id": mock_process(mocker, 12345)}
     master.pause_event.set()
 
     monitor_thread = threading.Thread(target=master.monitor_workers)
@@ -418,3 +1120,402 @@ def test_monitor_workers_handles_is_alive_exception(mocker: MockerFixture):
     monitor_thread.join()
 
     assert mock_logger.mock_calls[0].args[0] == "Error in worker monitoring: Test exception"
+
+
+def test_init_autoscaler(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master(
+        "my-identity.json",
+        server_workers=2,
+        server_max_workers=6,
+        autoscale_target_cpu=60,
+        autoscale_target_p99=250,
+    )
+    assert master.autoscaler is not None
+    assert master.autoscaler.min_workers == 2
+    assert master.autoscaler.max_workers == 6
+    assert master.autoscaler.target_cpu == 60
+    assert master.autoscaler.target_rps is None
+    assert master.autoscaler.target_p99_ms == 250
+
+
+def test_init_autoscaler_disabled(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    assert Master("my-identity.json", server_workers=2).autoscaler is None
+    assert Master("my-identity.json", server_workers=2, server_max_workers=2).autoscaler is None
+    assert (
+        Master(
+            "my-identity.json", server_workers=2, server_max_workers=4, events_enabled=False
+        ).autoscaler
+        is None
+    )
+
+
+def test_start_autoscale_thread(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    mocker.patch.object(Master, "start_events_router")
+    mocker.patch.object(Master, "start_events_publisher")
+    mocker.patch.object(Master, "start_workers")
+    master = Master("my-identity.json", server_workers=1, server_max_workers=2)
+    master.monitor_thread = mocker.MagicMock()
+    master.autoscale_thread = mocker.MagicMock()
+    master.metrics_thread = mocker.MagicMock()
+
+    master.start()
+
+    master.autoscale_thread.start.assert_called_once()
+
+
+def test_scale_workers_up(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    new_processes = [mock_process(mocker, 2), mock_process(mocker, 3)]
+    mocked_start_worker = mocker.patch.object(Master, "start_worker", side_effect=new_processes)
+    master = Master("my-identity.json", server_workers=1, server_max_workers=4)
+    master.worker_processes = {master.worker_identifiers[0]: mock_process(mocker, 1)}
+    master.desired_workers = 3
+
+    master.scale_workers()
+
+    assert mocked_start_worker.call_count == 2
+    assert list(master.worker_processes) == master.worker_identifiers
+    assert list(master.worker_processes.values())[1:] == new_processes
+
+
+def test_scale_workers_down(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    mocked_thread = mocker.patch("mrok.proxy.master.threading").Thread
+    master = Master(
+        "my-identity.json", server_workers=3, server_max_workers=4, server_drain_timeout=10
+    )
+    processes = [mock_process(mocker, pid) for pid in (1, 2, 3)]
+    master.worker_processes = dict(zip(master.worker_identifiers, processes, strict=True))
+    removed_id = master.worker_identifiers[2]
+    master.pending_restarts = {removed_id: (0, 0)}
+    master.aggregator = mocker.MagicMock()
+    master.desired_workers = 2
+
+    master.scale_workers()
+
+    assert list(master.worker_processes.values()) == processes[:2]
+    assert removed_id not in master.worker_identifiers
+    assert master.pending_restarts == {}
+    master.aggregator.forget.assert_called_once_with(removed_id)
+    mocked_thread.assert_called_with(
+        target=master.drain_workers, args=([processes[2]],), daemon=True
+    )
+    mocked_thread.return_value.start.assert_called_once()
+
+
+def test_autoscale_workers(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    mocker.patch("mrok.proxy.master.AUTOSCALE_INTERVAL", 0)
+    master = Master(
+        "my-identity.json", server_workers=1, server_max_workers=4, events_sub_port=4001
+    )
+    master.worker_processes = {"w1": mock_process(mocker, 1)}
+    master.worker_readiness = {"w1": WorkerReady(worker_id="w1", pid=1, ready_time=1)}
+    master.pause_event.set()
+    m_autoscaler = mocker.MagicMock()
+    m_autoscaler.get_desired_workers.return_value = 3
+    master.autoscaler = m_autoscaler
+    metrics = {
+        "worker_id": "w1",
+        "data_transfer": {"bytes_in": 0, "bytes_out": 0},
+        "requests": {"rps": 10, "total": 10, "successful": 10, "failed": 0},
+        "response_time": {"avg": 1, "min": 1, "max": 1, "p50": 1, "p90": 1, "p99": 1},
+        "process": {"cpu": 90, "mem": 1},
+    }
+    event = Event.model_validate(
+        {
+            "type": "status",
+            "data": {
+                "type": "status",
+                "meta": {"identity": "ins-1", "extension": "ext-1", "instance": "ins-1"},
+                "metrics": metrics,
+            },
+        }
+    )
+    m_socket = mocker.MagicMock()
+    m_socket.poll.return_value = 1
+
+    def recv_multipart():
+        master.stop_event.set()
+        return encode_event(event)
+
+    m_socket.recv_multipart.side_effect = recv_multipart
+    m_zmq_ctx = mocker.MagicMock()
+    m_zmq_ctx.socket.return_value = m_socket
+    mocker.patch("mrok.proxy.master.zmq.Context", return_value=m_zmq_ctx)
+    master.workers_lock = mocker.MagicMock()
+
+    master.autoscale_workers()
+
+    master.workers_lock.__enter__.assert_called_once()
+    assert encode_event(event)[0].startswith(STATUS_EVENT_PREFIX)
+    m_socket.connect.assert_called_once_with("tcp://localhost:4001")
+    m_socket.setsockopt.assert_called_once_with(zmq.SUBSCRIBE, STATUS_EVENT_PREFIX)
+    assert m_autoscaler.observe.call_args.args[0].worker_id == "w1"
+    m_autoscaler.get_desired_workers.assert_called_once_with(["w1"])
+    assert master.desired_workers == 3
+    m_socket.close.assert_called_once_with(linger=0)
+    m_zmq_ctx.term.assert_called_once()
+
+
+def test_init_preload(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    assert Master("my-identity.json", server_preload=True).preload is True
+    assert Master("my-identity.json", server_preload=True, server_reload=True).preload is False
+
+
+def test_start_preload(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    mocked_preload = mocker.patch.object(Master, "preload_app")
+    mocker.patch.object(Master, "start_events_router")
+    mocker.patch.object(Master, "start_events_publisher")
+    mocker.patch.object(Master, "start_workers")
+    master = Master("my-identity.json", server_preload=True)
+    master.monitor_thread = mocker.MagicMock()
+    master.metrics_thread = mocker.MagicMock()
+
+    master.start()
+
+    mocked_preload.assert_called_once()
+
+
+def test_preload_app(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return "my.app:app"
+
+    mocked_ensure_running = mocker.patch("mrok.proxy.master.forkserver.ensure_running")
+    mocker.patch("mrok.proxy.master.sys.path", [])
+    master = Master("my-identity.json", server_preload=True)
+    master.fork_context = m_context = mocker.MagicMock()
+
+    master.preload_app()
+
+    m_context.set_forkserver_preload.assert_called_once_with(
+        ["mrok.proxy.master", "my.app", "mrok.proxy.freeze"]
+    )
+    mocked_ensure_running.assert_called_once()
+    assert master.preloaded_app == "my.app:app"
+    assert sys.path == [os.getcwd()]
+
+
+def test_preload_app_instance(mocker: MockerFixture):
+    class App:
+        pass
+
+    app = App()
+
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return app
+
+    mocker.patch("mrok.proxy.master.forkserver.ensure_running")
+    master = Master("my-identity.json", server_preload=True)
+    master.fork_context = m_context = mocker.MagicMock()
+
+    master.preload_app()
+
+    m_context.set_forkserver_preload.assert_called_once_with(
+        ["mrok.proxy.master", "tests.proxy.test_master", "mrok.proxy.freeze"]
+    )
+    assert master.preloaded_app is app
+
+
+def test_start_worker_preloaded(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    m_app = mocker.AsyncMock()
+    mocked_start_process = mocker.patch("mrok.proxy.master.start_process")
+    m_proc = mocker.MagicMock()
+    m_proc.pid = 1234
+    mocked_fork_worker = mocker.patch.object(Master, "fork_worker", return_value=m_proc)
+    master = Master("my-identity.json", server_preload=True)
+    master.preloaded_app = m_app
+    master.fork_context = m_context = mocker.MagicMock()
+    ready_conn, worker_ready_conn = mocker.MagicMock(), mocker.MagicMock()
+    m_context.Pipe.return_value = (ready_conn, worker_ready_conn)
+
+    assert master.start_worker("my-worker-id") == m_proc
+
+    mocked_start_process.assert_not_called()
+    args, kwargs = mocked_fork_worker.call_args.args
+    assert args == ("my-worker-id", m_app, "my-identity.json")
+    m_context.Pipe.assert_called_once_with(duplex=False)
+    assert kwargs["ready_conn"] is worker_ready_conn
+    assert kwargs["drained_event"] is m_context.Event.return_value
+    assert master.worker_ready_conns[1234] is ready_conn
+    assert master.worker_drained_events[1234] is m_context.Event.return_value
+
+
+def test_fork_worker(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json", server_preload=True)
+    m_context = mocker.MagicMock()
+    m_process = m_context.Process.return_value
+    m_process.pid = 1234
+    m_process.exitcode = 0
+    m_process.is_alive.return_value = False
+    master.fork_context = m_context
+
+    process = master.fork_worker(("my-worker-id",), {"events_enabled": False})
+
+    m_context.Process.assert_called_once_with(
+        target=start_forked_uvicorn_worker,
+        args=("my-worker-id",),
+        kwargs={"events_enabled": False},
+    )
+    m_process.start.assert_called_once()
+    assert isinstance(process, ForkedProcess)
+    assert process.pid == 1234
+    assert process.exitcode == 0
+    assert process.is_alive() is False
+    process.join(1)
+    m_process.join.assert_called_once_with(1)
+
+
+def test_start_forked_uvicorn_worker(mocker: MockerFixture):
+    mocked_freeze = mocker.patch("gc.freeze")
+    mocked_signal = mocker.patch("mrok.proxy.master.signal.signal")
+    mocked_start = mocker.patch("mrok.proxy.master.start_uvicorn_worker")
+
+    start_forked_uvicorn_worker("my-worker-id", events_enabled=False)
+
+    mocked_freeze.assert_not_called()
+    assert mocked_signal.mock_calls == [
+        mocker.call(signal.SIGINT, signal.default_int_handler),
+        mocker.call(signal.SIGTERM, signal.SIG_DFL),
+        mocker.call(signal.SIGHUP, signal.SIG_DFL),
+    ]
+    mocked_start.assert_called_once_with("my-worker-id", events_enabled=False)
+
+
+def test_autoscale_workers_waits_for_ready_workers(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    mocker.patch("mrok.proxy.master.AUTOSCALE_INTERVAL", 0)
+    master = Master("my-identity.json", server_workers=1, server_max_workers=4)
+    master.worker_processes = {"w1": mock_process(mocker, 1), "w2": mock_process(mocker, 2)}
+    master.worker_readiness = {"w1": WorkerReady(worker_id="w1", pid=1, ready_time=1)}
+    master.pause_event.set()
+    master.autoscaler = m_autoscaler = mocker.MagicMock()
+    m_socket = mocker.MagicMock()
+    m_socket.poll.side_effect = lambda timeout: master.stop_event.set()
+    mocker.patch("mrok.proxy.master.zmq.Context").return_value.socket.return_value = m_socket
+
+    master.autoscale_workers()
+
+    m_autoscaler.get_desired_workers.assert_not_called()
+    assert master.desired_workers == 1
+
+
+def test_aggregate_metrics(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master(
+        "my-identity.json",
+        events_pub_port=4000,
+        events_sub_port=4001,
+        events_metrics_collect_interval=0,
+    )
+    master.worker_processes = {"w1": mock_process(mocker, 1)}
+    metrics = {
+        "worker_id": "w1",
+        "data_transfer": {"bytes_in": 0, "bytes_out": 0},
+        "requests": {"rps": 10, "total": 10, "successful": 10, "failed": 0},
+        "response_time": {"avg": 1, "min": 1, "max": 1, "p50": 1, "p90": 1, "p99": 1},
+        "process": {"cpu": 90, "mem": 1},
+    }
+    event = Event.model_validate(
+        {
+            "type": "status",
+            "data": {
+                "type": "status",
+                "meta": {"extension": "ext-1", "instance": "ins-1"},
+                "metrics": metrics,
+            },
+        }
+    )
+    m_subscriber = mocker.MagicMock()
+    m_subscriber.poll.return_value = 1
+    m_subscriber.recv_multipart.return_value = encode_event(event)
+    m_publisher = mocker.MagicMock()
+    m_publisher.send_multipart.side_effect = lambda *args: master.stop_event.set()
+    m_zmq_ctx = mocker.MagicMock()
+    m_zmq_ctx.socket.side_effect = [m_subscriber, m_publisher]
+    mocker.patch("mrok.proxy.master.zmq.Context", return_value=m_zmq_ctx)
+    master.aggregator = mocker.MagicMock(wraps=master.aggregator)
+    master.workers_lock = mocker.MagicMock()
+
+    master.aggregate_metrics()
+
+    master.workers_lock.__enter__.assert_called_once()
+
+    m_subscriber.connect.assert_called_once_with("tcp://localhost:4001")
+    m_subscriber.setsockopt.assert_called_once_with(zmq.SUBSCRIBE, STATUS_EVENT_PREFIX)
+    m_publisher.connect.assert_called_once_with("tcp://localhost:4000")
+    master.aggregator.aggregate.assert_called_once_with(["w1"])
+    frames, flags = m_publisher.send_multipart.call_args.args
+    assert flags == zmq.NOBLOCK
+    published = decode_event(frames)
+    assert published.type == "agent_status"
+    assert published.data.metrics.workers == 1
+    assert published.data.metrics.requests.rps == 10
+    assert published.data.meta.extension == "ext-1"
+    assert master.agent_metrics == published.data.metrics
+    m_subscriber.close.assert_called_once_with(linger=0)
+    m_publisher.close.assert_called_once_with(linger=0)
+    m_zmq_ctx.term.assert_called_once()
+
+
+def test_aggregate_metrics_no_fresh_metrics(mocker: MockerFixture):
+    class Master(MasterBase):
+        def get_asgi_app(self):
+            return mocker.AsyncMock()
+
+    master = Master("my-identity.json", events_metrics_collect_interval=0)
+    master.worker_processes = {"w1": mock_process(mocker, 1)}
+    m_socket = mocker.MagicMock()
+    m_socket.poll.side_effect = lambda timeout: master.stop_event.set()
+    mocker.patch("mrok.proxy.master.zmq.Context").return_value.socket.return_value = m_socket
+    mocked_logger = mocker.patch("mrok.proxy.master.logger")
+
+    master.aggregate_metrics()
+
+    m_socket.send_multipart.assert_not_called()
+    mocked_logger.error.assert_not_called()
@@ -1,8 +1,15 @@
 import pytest
+from hdrh.histogram import HdrHistogram
 from pytest_mock import MockerFixture
 
-from mrok.proxy.metrics import MetricsCollector, get_process_metrics
-from mrok.proxy.models import ProcessMetrics
+from mrok.proxy.metrics import (
+    MetricsCollector,
+    WindowedHistogram,
+    get_pool_metrics,
+    get_process_metrics,
+)
+from mrok.proxy.models import PoolMetrics, ProcessMetrics
+from mrok.proxy.routes import RoutesConfig
 
 
 @pytest.mark.asyncio
@@ -25,24 +32,26 @@ async def test_get_process_metrics(
 async def test_worker_metrics_collector(
     mocker: MockerFixture,
 ):
-    mocker.patch("mrok.proxy.metrics.time.perf_counter", side_effect=[0, 33, 75, 99])
+    mocker.patch("mrok.proxy.metrics.time.perf_counter", side_effect=[0, 0, 33, 75, 99, 100])
     mocker.patch(
         "mrok.proxy.metrics.get_process_metrics", return_value=ProcessMetrics(cpu=7.3, mem=44.1)
     )
     collector = MetricsCollector("my-worker-id")
-    begin = await collector.on_request_start({})
-    await collector.on_request_body(23)
-    await collector.on_request_body(32)
-    await collector.on_response_start(200)
-    await collector.on_response_chunk(11)
-    await collector.on_response_chunk(13)
-    await collector.on_request_end(begin, 200)
-
-    begin = await collector.on_request_start({})
-    await collector.on_request_body(11)
-    await collector.on_request_body(4)
-    await collector.on_response_start(500)
-    await collector.on_request_end(begin, 500)
+    begin = collector.on_request_start({})
+    collector.on_request_body(23)
+    collector.on_request_body(32)
+    collector.on_response_chunk(11)
+    collector.on_response_chunk(13)
+    collector.on_request_end(begin, 200)
+
+    begin = collector.on_request_start({})
+    collector.on_request_body(11)
+    collector.on_request_body(4)
+    collector.on_request_end(begin, 500)
+
+    collector.on_request_body_mode("memory")
+    collector.on_request_body_mode("memory")
+    collector.on_request_body_mode("file")
 
     snapshot = await collector.snapshot()
 
@@ -61,3 +70,176 @@ async def test_worker_metrics_collector(
     assert snapshot.response_time.p50 > 0
     assert snapshot.response_time.p90 > 0
     assert snapshot.response_time.p99 > 0
+    assert snapshot.request_bodies.memory == 2
+    assert snapshot.request_bodies.file == 1
+    assert snapshot.request_bodies.stream == 0
+
+
+def test_windowed_histogram():
+    windows = WindowedHistogram(1, 60000, 3, now=0)
+    windows.rotate(now=0.2)
+    windows.record(500, now=0.5)
+    windows.record(10, now=1.5)
+
+    current = windows.get_windows()
+    assert current["1s"].get_max_value() == pytest.approx(500, rel=0.01)
+    assert current["10s"].get_total_count() == 1
+    assert windows.get_lifetime().get_total_count() == 2
+
+    windows.rotate(now=10)
+    current = windows.get_windows()
+    assert current["1s"].get_total_count() == 0
+    assert current["10s"].get_total_count() == 2
+    assert current["1m"].get_total_count() == 2
+    assert current["5m"].get_total_count() == 0
+
+    windows.rotate(now=60)
+    current = windows.get_windows()
+    assert current["10s"].get_total_count() == 0
+    assert current["1m"].get_total_count() == 2
+    assert current["5m"].get_total_count() == 2
+
+    windows.rotate(now=1000)
+    assert all(hist.get_total_count() == 0 for hist in windows.get_windows().values())
+    assert windows.get_lifetime().get_total_count() == 2
+
+
+def test_windowed_histogram_idle(mocker: MockerFixture):
+    windows = WindowedHistogram(1, 60000, 3, now=0)
+    windows.record(500, now=0.5)
+    windows.rotate(now=30)
+    mocked_merge = mocker.patch.object(windows, "_merge", wraps=windows._merge)
+
+    windows.record(10, now=1000.5)
+
+    mocked_merge.assert_not_called()
+    assert all(hist.get_total_count() == 0 for hist in windows.get_windows().values())
+    assert windows.get_lifetime().get_total_count() == 2
+
+    windows.rotate(now=1010)
+    assert windows.get_windows()["10s"].get_total_count() == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_metrics_collector_windows(mocker: MockerFixture):
+    mocker.patch("mrok.proxy.metrics.time.perf_counter", side_effect=[0, 0, 0.5, 1, 2, 10])
+    mocker.patch(
+        "mrok.proxy.metrics.get_process_metrics", return_value=ProcessMetrics(cpu=0, mem=0)
+    )
+    collector = MetricsCollector("my-worker-id")
+
+    collector.on_request_end(collector.on_request_start({}), 200)
+    collector.on_request_end(collector.on_request_start({}), 200)
+    snapshot = await collector.snapshot()
+
+    assert snapshot.response_time.max == pytest.approx(1000, rel=0.01)
+    assert snapshot.response_time.min == pytest.approx(500, rel=0.01)
+    assert list(snapshot.response_time_windows) == ["1s", "10s", "1m", "5m"]
+    assert snapshot.response_time_windows["1s"].max == 0
+    assert snapshot.response_time_windows["10s"].p99 == pytest.approx(1000, rel=0.01)
+    assert snapshot.response_time_windows["1m"].p50 == pytest.approx(500, rel=0.01)
+    assert snapshot.response_time_windows["5m"].p99 == 0
+    assert list(snapshot.response_time_histograms) == ["lifetime", "1s", "10s", "1m", "5m"]
+    lifetime = HdrHistogram.decode(snapshot.response_time_histograms["lifetime"].encode())
+    assert lifetime.get_total_count() == 2
+
+
+def test_get_pool_metrics(mocker: MockerFixture):
+    pool = mocker.MagicMock()
+    pool.connections = [mocker.MagicMock(), mocker.MagicMock(), mocker.MagicMock()]
+    for connection, idle in zip(pool.connections, (True, False, False), strict=True):
+        connection.is_idle.return_value = idle
+    pool._requests = [mocker.MagicMock(), mocker.MagicMock()]
+    for request, queued in zip(pool._requests, (True, False), strict=True):
+        request.is_queued.return_value = queued
+
+    assert get_pool_metrics(pool) == PoolMetrics(connections=3, idle=1, pending=1)
+
+
+@pytest.mark.asyncio
+async def test_worker_metrics_collector_dials_and_pool(mocker: MockerFixture):
+    mocker.patch(
+        "mrok.proxy.metrics.get_process_metrics", return_value=ProcessMetrics(cpu=0, mem=0)
+    )
+    mocker.patch(
+        "mrok.proxy.metrics.get_pool_metrics",
+        return_value=PoolMetrics(connections=2, idle=1, pending=0),
+    )
+    collector = MetricsCollector("my-worker-id")
+    snapshot = await collector.snapshot()
+    assert snapshot.pool == PoolMetrics()
+    assert snapshot.dials.total == 0
+    assert snapshot.dials.histogram == ""
+
+    collector.pool = mocker.MagicMock()
+    collector.on_dial(0.002, False)
+    collector.on_dial(0.5, True)
+    snapshot = await collector.snapshot()
+
+    assert snapshot.pool == PoolMetrics(connections=2, idle=1, pending=0)
+    assert snapshot.dials.total == 2
+    assert snapshot.dials.failed == 1
+    dial_times = HdrHistogram.decode(snapshot.dials.histogram.encode())
+    assert dial_times.get_max_value() == pytest.approx(500, rel=0.01)
+
+
+@pytest.mark.asyncio
+async def test_worker_metrics_collector_upstream_phases(mocker: MockerFixture):
+    mocker.patch(
+        "mrok.proxy.metrics.get_process_metrics", return_value=ProcessMetrics(cpu=0, mem=0)
+    )
+    collector = MetricsCollector("my-worker-id")
+    snapshot = await collector.snapshot()
+    assert snapshot.upstream_phases == {}
+    assert snapshot.upstream_phase_histograms == {}
+
+    collector.on_upstream_phases({"pool_wait": 0.0002, "response_headers": 0.05})
+    collector.on_upstream_phases({"pool_wait": 0.0004})
+    snapshot = await collector.snapshot()
+
+    assert list(snapshot.upstream_phases) == ["pool_wait", "response_headers"]
+    assert snapshot.upstream_phases["pool_wait"].max == pytest.approx(400, rel=0.01)
+    assert snapshot.upstream_phases["response_headers"].p50 == pytest.approx(50_000, rel=0.01)
+    pool_wait = HdrHistogram.decode(snapshot.upstream_phase_histograms["pool_wait"].encode())
+    assert pool_wait.get_total_count() == 2
+
+
+@pytest.mark.asyncio
+async def test_worker_metrics_collector_routes(mocker: MockerFixture):
+    mocker.patch(
+        "mrok.proxy.metrics.get_process_metrics", return_value=ProcessMetrics(cpu=1, mem=1)
+    )
+    collector = MetricsCollector(
+        "my-worker-id", routes=RoutesConfig(patterns=("/files/{name}",), max_routes=2)
+    )
+
+    for path, status in (
+        ("/users/1", 200),
+        ("/users/2", 404),
+        ("/files/report.pdf", 200),
+        ("/orders", 500),
+        ("/health", 200),
+        ("/users/3", 302),
+        (None, 200),
+    ):
+        collector.on_request_end(collector.on_request_start({}), status, path)
+
+    snapshot = await collector.snapshot()
+
+    assert snapshot.statuses == {"2xx": 4, "4xx": 1, "3xx": 1, "5xx": 1}
+    assert list(snapshot.routes) == ["/users/{id}", "/files/{name}", "other"]
+    assert snapshot.routes["/users/{id}"].requests == {"2xx": 1, "4xx": 1, "3xx": 1}
+    assert snapshot.routes["other"].requests == {"5xx": 1, "2xx": 1}
+    hist = HdrHistogram.decode(snapshot.routes["/files/{name}"].histogram.encode())
+    assert hist.get_total_count() == 1
+
+
+def test_worker_metrics_collector_routes_memoized(mocker: MockerFixture):
+    mocked_normalize = mocker.patch.object(RoutesConfig, "normalize", return_value="/users/{id}")
+    collector = MetricsCollector("my-worker-id")
+
+    for path in ("/users/1", "/users/1", "/users/2", "/users/1"):
+        collector.on_request_end(collector.on_request_start({}), 200, path)
+
+    assert mocked_normalize.call_count == 2
+    assert collector.routes["/users/{id}"].requests == {"2xx": 4}
@@ -1,8 +1,7 @@
-import asyncio
-
 import pytest
 from pytest_mock import MockerFixture
 
+from mrok.proxy.capture import CaptureConfig
 from mrok.proxy.middleware import CaptureMiddleware, MetricsMiddleware
 from mrok.proxy.models import HTTPResponse
 from mrok.types.proxy import Message
@@ -25,7 +24,7 @@ async def test_metrics(
 
     m_app = MockApp()
 
-    m_metrics = mocker.AsyncMock()
+    m_metrics = mocker.MagicMock()
     m_metrics.on_request_start.return_value = 100
 
     sent: list[Message] = []
@@ -38,15 +37,36 @@ async def test_metrics(
     send = send_factory(sent)
 
     middleware = MetricsMiddleware(m_app, m_metrics)
-    await middleware({"type": "http"}, receive, send)
+    await middleware({"type": "http", "path": "/users/1"}, receive, send)
 
-    m_metrics.on_request_start.assert_awaited_once_with({"type": "http"})
+    m_metrics.on_request_start.assert_called_once_with({"type": "http", "path": "/users/1"})
     assert m_metrics.on_request_body.mock_calls[0].args[0] == len(b"Who are")
     assert m_metrics.on_request_body.mock_calls[1].args[0] == len(b"You!")
-    m_metrics.on_response_start.assert_awaited_once_with(200)
     assert m_metrics.on_response_chunk.mock_calls[0].args[0] == len(b"OK")
     assert m_metrics.on_response_chunk.mock_calls[1].args[0] == len(b"Mrok!")
-    m_metrics.on_request_end.assert_awaited_once_with(100, 200)
+    m_metrics.on_request_body_mode.assert_not_called()
+    m_metrics.on_request_end.assert_called_once_with(100, 200, "/users/1")
+
+
+@pytest.mark.asyncio
+async def test_metrics_request_body_mode(
+    mocker: MockerFixture,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+):
+    async def app(scope, receive, send):
+        await receive()
+        scope.setdefault("extensions", {})["mrok.request_body"] = "file"
+        await send({"type": "http.response.start", "status": 201})
+
+    m_metrics = mocker.MagicMock()
+    m_metrics.on_request_start.return_value = 100
+
+    middleware = MetricsMiddleware(app, m_metrics)
+    await middleware({"type": "http"}, receive_factory(), send_factory([]))
+
+    m_metrics.on_request_body_mode.assert_called_once_with("file")
+    m_metrics.on_request_end.assert_called_once_with(100, 201, None)
 
 
 @pytest.mark.asyncio
@@ -54,7 +74,7 @@ async def test_metrics_lifespan(
     mocker: MockerFixture,
 ):
     m_app = mocker.AsyncMock()
-    m_metrics = mocker.AsyncMock()
+    m_metrics = mocker.MagicMock()
     m_receive = mocker.AsyncMock()
     m_send = mocker.AsyncMock()
 
@@ -86,7 +106,7 @@ async def test_capture(
 
     m_app = MockApp()
 
-    m_metrics = mocker.AsyncMock()
+    m_metrics = mocker.MagicMock()
     m_metrics.on_request_start.return_value = 100
 
     sent: list[Message] = []
@@ -111,14 +131,12 @@ async def test_capture(
 
     received_response: HTTPResponse | None = None
 
-    async def on_response_complete(response: HTTPResponse):
+    def on_response_complete(response: HTTPResponse):
         nonlocal received_response
-        await asyncio.sleep(0)
         received_response = response
 
     middleware = CaptureMiddleware(m_app, on_response_complete)
     await middleware(scope, receive, send)
-    await asyncio.sleep(0.1)
 
     assert received_response is not None
     assert received_response.request.method == "POST"
@@ -137,11 +155,102 @@ async def test_capture_lifespan(
     mocker: MockerFixture,
 ):
     m_app = mocker.AsyncMock()
-    m_response_callback = mocker.AsyncMock()
+    m_response_callback = mocker.MagicMock()
     m_receive = mocker.AsyncMock()
     m_send = mocker.AsyncMock()
 
     middleware = CaptureMiddleware(m_app, m_response_callback)
     await middleware({"type": "lifespan"}, m_receive, m_send)
     m_app.assert_awaited_once_with({"type": "lifespan"}, m_receive, m_send)
-    m_response_callback.assert_not_awaited()
+    m_response_callback.assert_not_called()
+
+
+async def capture_app(scope, receive, send):
+    await receive()
+    await send({"type": "http.response.start", "status": 404, "headers": []})
+    await send({"type": "http.response.body", "body": b"Not found", "more_body": False})
+
+
+def capture_scope(method: str = "POST", path: str = "/foo") -> dict:
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [(b"content-type", b"text/plain")],
+    }
+
+
+@pytest.mark.asyncio
+async def test_capture_without_subscribers(
+    mocker: MockerFixture,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+):
+    m_response_callback = mocker.MagicMock()
+    m_buffer = mocker.patch("mrok.proxy.middleware.FixedSizeByteBuffer")
+    sent: list[Message] = []
+    receive = receive_factory([{"type": "http.request", "body": b"data", "more_body": False}])
+
+    middleware = CaptureMiddleware(capture_app, m_response_callback, is_active=lambda: False)
+    await middleware(capture_scope(), receive, send_factory(sent))
+
+    assert [msg["type"] for msg in sent] == ["http.response.start", "http.response.body"]
+    m_buffer.assert_not_called()
+    m_response_callback.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("config", "method", "path", "captured"),
+    [
+        (CaptureConfig(methods=("get",)), "POST", "/foo", False),
+        (CaptureConfig(methods=("get",)), "GET", "/foo", True),
+        (CaptureConfig(paths=("/api/*",)), "POST", "/foo", False),
+        (CaptureConfig(paths=("/api/*",)), "POST", "/api/foo", True),
+        (CaptureConfig(exclude_paths=("/api/health",)), "GET", "/api/health", False),
+        (CaptureConfig(statuses=("5xx",)), "POST", "/foo", False),
+        (CaptureConfig(statuses=("4xx",)), "POST", "/foo", True),
+        (CaptureConfig(statuses=("404",)), "POST", "/foo", True),
+        (CaptureConfig(sample_rate=0), "POST", "/foo", False),
+    ],
+)
+async def test_capture_filters(
+    mocker: MockerFixture,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+    config: CaptureConfig,
+    method: str,
+    path: str,
+    captured: bool,
+):
+    m_response_callback = mocker.MagicMock()
+    receive = receive_factory([{"type": "http.request", "body": b"", "more_body": False}])
+
+    middleware = CaptureMiddleware(capture_app, m_response_callback, config, lambda: True)
+    await middleware(capture_scope(method, path), receive, send_factory([]))
+
+    assert m_response_callback.call_count == int(captured)
+
+
+@pytest.mark.asyncio
+async def test_capture_headers_only(
+    mocker: MockerFixture,
+    receive_factory: ReceiveFactory,
+    send_factory: SendFactory,
+):
+    m_response_callback = mocker.MagicMock()
+    receive = receive_factory([{"type": "http.request", "body": b"data", "more_body": False}])
+
+    middleware = CaptureMiddleware(
+        capture_app, m_response_callback, CaptureConfig(headers_only=True)
+    )
+    await middleware(capture_scope(), receive, send_factory([]))
+
+    response: HTTPResponse = m_response_callback.call_args.args[0]
+    assert response.status == 404
+    assert response.request.headers["content-type"] == "text/plain"
+    assert response.request.body is None
+    assert response.request.body_truncated is None
+    assert response.body is None
+    assert response.body_truncated is None
@@ -0,0 +1,176 @@
+import urllib.error
+import urllib.request
+
+import pytest
+from hdrh.histogram import HdrHistogram
+from pytest_mock import MockerFixture
+
+from mrok.proxy.models import (
+    AgentMetrics,
+    DataTransferMetrics,
+    DialMetrics,
+    ImbalanceMetrics,
+    PoolMetrics,
+    ProcessMetrics,
+    RequestsMetrics,
+    ResponseTimeMetrics,
+    RouteMetrics,
+    WorkerMetrics,
+)
+from mrok.proxy.openmetrics import (
+    CONTENT_TYPE,
+    MetricsServer,
+    format_labels,
+    get_histogram_buckets,
+    render_metrics,
+)
+
+
+def encode(*values: int) -> str:
+    hist = HdrHistogram(1, 60000, 3)
+    for value in values:
+        hist.record_value(value)
+    return hist.encode().decode("ascii")
+
+
+def agent_metrics() -> AgentMetrics:
+    return AgentMetrics(
+        worker_id="agent",
+        workers=2,
+        imbalance=ImbalanceMetrics(rps=1.5, cpu=1, p99=1.25),
+        data_transfer=DataTransferMetrics(bytes_in=10, bytes_out=20),
+        requests=RequestsMetrics(rps=4, total=3, successful=2, failed=1),
+        response_time=ResponseTimeMetrics(avg=0, min=0, max=0, p50=0, p90=0, p99=0),
+        response_time_histograms={"lifetime": encode(3, 40, 2000)},
+        process=ProcessMetrics(cpu=12.5, mem=3),
+        pool=PoolMetrics(connections=5, idle=2, pending=1),
+        dials=DialMetrics(total=4, failed=1, histogram=encode(2, 2, 2, 300)),
+        upstream_phase_histograms={"dial": encode(200, 20000)},
+        statuses={"2xx": 2, "5xx": 1},
+        routes={
+            "/users/{id}": RouteMetrics(
+                requests={"2xx": 2, "5xx": 1},
+                response_time=ResponseTimeMetrics(avg=0, min=0, max=0, p50=0, p90=0, p99=0),
+                histogram=encode(3, 40, 2000),
+            ),
+        },
+    )
+
+
+def test_format_labels():
+    assert format_labels({}) == ""
+    assert format_labels({"a": "1", "b": 'x"\\\n'}) == '{a="1",b="x\\"\\\\\\n"}'
+
+
+def test_get_histogram_buckets():
+    buckets, total, total_sum = get_histogram_buckets(encode(3, 40, 2000))
+
+    assert dict(buckets)[0.005] == 1
+    assert dict(buckets)[0.025] == 1
+    assert dict(buckets)[0.05] == 2
+    assert dict(buckets)[2.5] == 3
+    assert dict(buckets)[60] == 3
+    assert total == 3
+    assert total_sum == pytest.approx(2.043, rel=0.01)
+
+
+def test_get_histogram_buckets_empty():
+    buckets, total, total_sum = get_histogram_buckets("")
+
+    assert all(count == 0 for _, count in buckets)
+    assert total == 0
+    assert total_sum == 0
+
+
+def test_render_metrics_none():
+    assert render_metrics(None) == b"# EOF\n"
+
+
+def test_render_metrics():
+    lines = render_metrics(agent_metrics()).decode().splitlines()
+
+    assert lines[-1] == "# EOF"
+    assert "# TYPE mrok_workers gauge" in lines
+    assert "mrok_workers 2" in lines
+    assert 'mrok_worker_imbalance{metric="rps"} 1.5' in lines
+    assert "# TYPE mrok_requests counter" in lines
+    assert 'mrok_requests_total{result="successful"} 2' in lines
+    assert 'mrok_requests_total{result="failed"} 1' in lines
+    assert "# UNIT mrok_request_duration_seconds seconds" in lines
+    assert 'mrok_request_duration_seconds_bucket{le="0.005"} 1' in lines
+    assert 'mrok_request_duration_seconds_bucket{le="+Inf"} 3' in lines
+    assert "mrok_request_duration_seconds_count 3" in lines
+    assert "mrok_received_bytes_total 10" in lines
+    assert "mrok_sent_bytes_total 20" in lines
+    assert "mrok_process_cpu_percent 12.5" in lines
+    assert 'mrok_pool_connections{state="active"} 3' in lines
+    assert 'mrok_pool_connections{state="idle"} 2' in lines
+    assert "mrok_pool_pending_requests 1" in lines
+    assert 'mrok_dials_total{result="successful"} 3' in lines
+    assert 'mrok_dials_total{result="failed"} 1' in lines
+    assert 'mrok_dial_duration_seconds_bucket{le="0.005"} 3' in lines
+    assert "mrok_dial_duration_seconds_count 4" in lines
+    assert 'mrok_upstream_phase_duration_seconds_bucket{phase="dial",le="0.005"} 1' in lines
+    assert 'mrok_upstream_phase_duration_seconds_bucket{phase="dial",le="0.025"} 2' in lines
+    assert 'mrok_upstream_phase_duration_seconds_count{phase="dial"} 2' in lines
+    assert "# TYPE mrok_responses counter" in lines
+    assert 'mrok_responses_total{status="2xx"} 2' in lines
+    assert 'mrok_responses_total{status="5xx"} 1' in lines
+    assert 'mrok_route_requests_total{route="/users/{id}",status="2xx"} 2' in lines
+    assert 'mrok_route_requests_total{route="/users/{id}",status="5xx"} 1' in lines
+    assert 'mrok_route_request_duration_seconds_bucket{route="/users/{id}",le="0.05"} 2' in lines
+    assert 'mrok_route_request_duration_seconds_count{route="/users/{id}"} 3' in lines
+
+
+def test_render_metrics_worker():
+    metrics = WorkerMetrics.model_validate(agent_metrics().model_dump())
+
+    body = render_metrics(metrics).decode()
+
+    assert "mrok_workers" not in body
+    assert 'mrok_requests_total{result="successful"} 2' in body
+
+
+def test_metrics_server():
+    server = MetricsServer(agent_metrics, port=0)
+    server.start()
+    try:
+        url = f"http://127.0.0.1:{server.port}"
+        with urllib.request.urlopen(f"{url}/metrics") as response:
+            assert response.status == 200
+            assert response.headers["content-type"] == CONTENT_TYPE
+            assert response.read() == render_metrics(agent_metrics())
+        with pytest.raises(urllib.error.HTTPError) as cv:
+            urllib.request.urlopen(f"{url}/other")
+        assert cv.value.code == 404
+    finally:
+        server.stop()
+    server.stop()
+
+
+def test_metrics_server_error(mocker: MockerFixture):
+    mocked_logger = mocker.patch("mrok.proxy.openmetrics.logger")
+    server = MetricsServer(mocker.MagicMock(side_effect=Exception("boom")), port=0)
+    server.start()
+    try:
+        with pytest.raises(urllib.error.HTTPError) as cv:
+            urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics")
+        assert cv.value.code == 500
+    finally:
+        server.stop()
+    mocked_logger.error.assert_called_once_with("Cannot render metrics: boom")
+
+
+def test_metrics_server_close_after_fork(mocker: MockerFixture):
+    mocked_server_cls = mocker.patch("mrok.proxy.openmetrics.MetricsHTTPServer")
+    mocked_server_cls.return_value.server_address = ("127.0.0.1", 9090)
+    mocker.patch("mrok.proxy.openmetrics.threading.Thread")
+    server = MetricsServer(agent_metrics, port=0)
+    server.close_after_fork()
+    server.start()
+
+    server.close_after_fork()
+
+    mocked_server_cls.return_value.server_close.assert_called_once()
+    mocked_server_cls.return_value.shutdown.assert_not_called()
+    server.stop()
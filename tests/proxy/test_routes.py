@@ -0,0 +1,65 @@
+import pytest
+
+from mrok.proxy.routes import RoutesConfig, get_status_class
+
+
+@pytest.mark.parametrize(
+    ("status", "expected"),
+    [(101, "1xx"), (200, "2xx"), (304, "3xx"), (404, "4xx"), (503, "5xx")],
+)
+def test_get_status_class(status: int, expected: str):
+    assert get_status_class(status) == expected
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        ("/", "/"),
+        ("/users", "/users"),
+        ("/users/123", "/users/{id}"),
+        ("/users/123/orders/456", "/users/{id}/orders/{id}"),
+        ("/docs/3f2b8c1e-9a4d-4e2f-8b1a-0c9d8e7f6a5b", "/docs/{id}"),
+        ("/blobs/a1b2c3d4e5f6a7b8", "/blobs/{id}"),
+        ("/instances/INS-1234-5678-0001", "/instances/{id}"),
+        ("/api/v1/settings", "/api/v1/settings"),
+        ("/organization-settings", "/organization-settings"),
+    ],
+)
+def test_normalize_collapse_ids(path: str, expected: str):
+    assert RoutesConfig().normalize(path) == expected
+
+
+def test_normalize_patterns():
+    config = RoutesConfig(patterns=("/users/{user_id}", "/files/{name}/download"))
+
+    assert config.normalize("/users/john") == "/users/{user_id}"
+    assert config.normalize("/files/report.pdf/download") == "/files/{name}/download"
+    assert config.normalize("/users/john/orders") == "/users/john/orders"
+    assert config.normalize("/files/123") == "/files/{id}"
+
+
+def test_normalize_patterns_are_not_regexes():
+    config = RoutesConfig(patterns=("/a.b/{id}",))
+
+    assert config.normalize("/a.b/1") == "/a.b/{id}"
+    assert config.normalize("/axb/name") == "/axb/name"
+
+
+def test_normalize_without_collapsing_ids():
+    assert RoutesConfig(collapse_ids=False).normalize("/users/123") == "/users/123"
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "error"),
+    [
+        ({"max_routes": 0}, "max_routes must be positive."),
+        ({"patterns": ("users/{id}",)}, "Invalid route pattern: users/{id}."),
+    ],
+)
+def test_routes_config_validation(kwargs: dict, error: str):
+    with pytest.raises(ValueError, match=error):
+        RoutesConfig(**kwargs)
+
+
+def test_routes_config_equality():
+    assert RoutesConfig(patterns=("/users/{id}",)) == RoutesConfig(patterns=("/users/{id}",))
@@ -1,13 +1,16 @@
+import asyncio
+
 import pytest
 from pytest_mock import MockerFixture
 
+from mrok.proxy.models import WorkerStartup
 from mrok.proxy.ziticorn import BackendConfig, Server
 
 
 @pytest.mark.asyncio
 async def test_serve(mocker: MockerFixture, ziti_identity_file: str):
     mocked_socket = mocker.MagicMock()
-    mocker.patch.object(BackendConfig, "bind_socket", return_value=mocked_socket)
+    mocker.patch.object(BackendConfig, "bind_sockets", return_value=[mocked_socket])
     mocked_inner_serve = mocker.patch.object(Server, "_serve")
 
     async def fake_asgi_app(scope, receive, send):
@@ -23,7 +26,7 @@ async def test_serve(mocker: MockerFixture, ziti_identity_file: str):
 @pytest.mark.asyncio
 async def test_serve_with_socket(mocker: MockerFixture, ziti_identity_file: str):
     mocked_socket = mocker.MagicMock()
-    mocked_bind = mocker.patch.object(BackendConfig, "bind_socket")
+    mocked_bind = mocker.patch.object(BackendConfig, "bind_sockets")
     mocked_inner_serve = mocker.patch.object(Server, "_serve")
 
     async def fake_asgi_app(scope, receive, send):
@@ -35,3 +38,94 @@ async def test_serve_with_socket(mocker: MockerFixture, ziti_identity_file: str)
     await server.serve([mocked_socket])
     mocked_inner_serve.assert_awaited_once_with([mocked_socket])
     mocked_bind.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_startup_reports_ready(mocker: MockerFixture, ziti_identity_file: str):
+    async def fake_startup(self, sockets=None):
+        await asyncio.sleep(0)
+        self.started = True
+
+    mocker.patch("mrok.proxy.ziticorn.server.Server.startup", fake_startup)
+    ready_conn = mocker.MagicMock()
+
+    async def fake_asgi_app(scope, receive, send):
+        pass
+
+    config = BackendConfig(fake_asgi_app, ziti_identity_file)
+    config.ziti_load_time = 1.5
+    config.ziti_bind_time = 0.5
+    server = Server(config, ready_conn=ready_conn)
+    await server.startup()
+    ready_conn.send.assert_called_once_with(WorkerStartup(ziti_load_time=1.5, ziti_bind_time=0.5))
+    ready_conn.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_startup_failed_not_ready(mocker: MockerFixture, ziti_identity_file: str):
+    async def fake_startup(self, sockets=None):
+        await asyncio.sleep(0)
+        self.should_exit = True
+
+    mocker.patch("mrok.proxy.ziticorn.server.Server.startup", fake_startup)
+    ready_conn = mocker.MagicMock()
+
+    async def fake_asgi_app(scope, receive, send):
+        pass
+
+    server = Server(BackendConfig(fake_asgi_app, ziti_identity_file), ready_conn=ready_conn)
+    await server.startup()
+    ready_conn.send.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_sets_drained_event(mocker: MockerFixture, ziti_identity_file: str):
+    calls = []
+
+    async def fake_shutdown(self, sockets=None):
+        await asyncio.sleep(0)
+        calls.append(sockets)
+
+    mocker.patch("mrok.proxy.ziticorn.server.Server.shutdown", fake_shutdown)
+    drained_event = mocker.MagicMock()
+    drained_event.set.side_effect = lambda: calls.append("drained")
+    sockets = [mocker.MagicMock()]
+
+    async def fake_asgi_app(scope, receive, send):
+        pass
+
+    server = Server(BackendConfig(fake_asgi_app, ziti_identity_file), drained_event=drained_event)
+    server.servers = []
+    await server.shutdown(sockets)
+    assert calls == [None, "drained"]
+
+
+@pytest.mark.asyncio
+async def test_shutdown_unbinds_before_draining(mocker: MockerFixture, ziti_identity_file: str):
+    calls = []
+
+    async def fake_shutdown(self, sockets=None):
+        await asyncio.sleep(0)
+        calls.append("drain")
+
+    mocker.patch("mrok.proxy.ziticorn.server.Server.shutdown", fake_shutdown)
+    listener = mocker.MagicMock()
+    listener.close.side_effect = lambda: calls.append("close listener")
+    sock = mocker.MagicMock()
+    sock.close.side_effect = lambda: calls.append("close socket")
+
+    async def fake_asgi_app(scope, receive, send):
+        pass
+
+    server = Server(BackendConfig(fake_asgi_app, ziti_identity_file))
+    server.servers = [listener]
+    await server.shutdown([sock])
+    assert calls == ["close listener", "close socket", "drain"]
+
+
+def test_config_drain_timeout(ziti_identity_file: str):
+    async def fake_asgi_app(scope, receive, send):
+        pass
+
+    config = BackendConfig(fake_asgi_app, ziti_identity_file, drain_timeout=15)
+    assert config.timeout_graceful_shutdown == 15
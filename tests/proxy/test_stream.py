@@ -1,9 +1,15 @@
 import asyncio
 
 import pytest
+from httpcore import WriteError
 from pytest_mock import MockerFixture
 
-from mrok.proxy.stream import AIONetworkStream, ASGIRequestBodyStream
+from mrok.proxy.stream import (
+    AIONetworkStream,
+    ASGIRequestBodyStream,
+    ExpectContinue,
+    chain_body,
+)
 
 
 @pytest.mark.asyncio
@@ -65,6 +71,84 @@ async def test_aio_network_stream_close(mocker: MockerFixture):
     m_writer.wait_closed.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("data", "expected", "pending"),
+    [
+        (b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 200 OK", True, b"HTTP/1.1 200 OK"),
+        (
+            b"HTTP/1.1 413 Payload Too Large\r\n\r\n",
+            False,
+            b"HTTP/1.1 413 Payload Too Large\r\n\r\n",
+        ),
+        (b"", False, b""),
+    ],
+)
+async def test_aio_network_stream_wait_for_continue(
+    mocker: MockerFixture, data: bytes, expected: bool, pending: bytes
+):
+    reader = asyncio.StreamReader()
+    if data:
+        reader.feed_data(data)
+    reader.feed_eof()
+
+    aions = AIONetworkStream(reader, mocker.MagicMock())
+    assert await aions.wait_for_continue(1.0) is expected
+    assert await aions.read(1024) == pending
+
+
+@pytest.mark.asyncio
+async def test_aio_network_stream_wait_for_continue_timeout(mocker: MockerFixture):
+    reader = asyncio.StreamReader()
+    reader.feed_data(b"HTTP/1.1 ")
+
+    aions = AIONetworkStream(reader, mocker.MagicMock())
+    assert await aions.wait_for_continue(0.05) is True
+    assert await aions.read(4) == b"HTTP"
+    assert await aions.read(1024) == b"/1.1 "
+
+
+@pytest.mark.asyncio
+async def test_expect_continue_gate(mocker: MockerFixture):
+    m_writer = mocker.AsyncMock()
+    m_writer.write = mocker.MagicMock()
+    reader = asyncio.StreamReader()
+    reader.feed_data(b"HTTP/1.1 100 Continue\r\n\r\n")
+    aions = AIONetworkStream(reader, m_writer)
+
+    expectation = ExpectContinue(1.0)
+    with expectation.activate():
+        await aions.write(b"POST / HTTP/1.1\r\n\r\n")
+    assert expectation.stream is aions
+
+    chunks = [chunk async for chunk in expectation.gate(chain_body(b"a", b"b"))]
+    assert chunks == [b"a", b"b"]
+
+
+@pytest.mark.asyncio
+async def test_expect_continue_gate_rejected(mocker: MockerFixture):
+    reader = asyncio.StreamReader()
+    reader.feed_data(b"HTTP/1.1 401 Unauthorized\r\ncontent-length: 0\r\n\r\n")
+    expectation = ExpectContinue(1.0)
+    expectation.stream = AIONetworkStream(reader, mocker.MagicMock())
+    body = mocker.MagicMock()
+
+    with pytest.raises(WriteError):
+        await anext(expectation.gate(body))
+    body.__aiter__.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_aio_network_stream_write_outside_expectation(mocker: MockerFixture):
+    m_writer = mocker.AsyncMock()
+    m_writer.write = mocker.MagicMock()
+    aions = AIONetworkStream(mocker.MagicMock(), m_writer)
+
+    expectation = ExpectContinue(1.0)
+    await aions.write(b"data")
+    assert expectation.stream is None
+
+
 @pytest.mark.parametrize("readable", [True, False])
 def test_aio_network_stream_extra_info_is_readable(
     mocker: MockerFixture,
@@ -119,9 +203,11 @@ async def test_asgi_request_body_stream():
         return next(msg_iter)
 
     stream = ASGIRequestBodyStream(receive)
+    assert stream.more_body is True
 
     chunks = [chunk async for chunk in stream]
     assert chunks == [b"first chunk", b"second chunk"]
+    assert stream.more_body is False
 
 
 @pytest.mark.asyncio
@@ -166,3 +252,14 @@ async def test_asgi_request_body_unknown_msg():
         await anext(stream)
 
     assert str(cv.value) == "Unexpected asgi message."
+
+
+@pytest.mark.asyncio
+async def test_chain_body():
+    async def _gen():
+        await asyncio.sleep(0)
+        yield b"three"
+        yield b"four"
+
+    chunks = [chunk async for chunk in chain_body(b"one", b"", b"two", _gen())]
+    assert chunks == [b"one", b"two", b"three", b"four"]
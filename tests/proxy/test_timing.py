@@ -0,0 +1,62 @@
+import pytest
+from pytest_mock import MockerFixture
+
+from mrok.proxy.timing import UpstreamTimings
+
+
+@pytest.mark.asyncio
+async def test_upstream_timings_new_connection(mocker: MockerFixture):
+    mocked_time = mocker.patch("mrok.proxy.timing.time")
+    mocked_time.perf_counter.side_effect = [10.0, 10.5, 10.75, 10.8, 10.9, 11, 11.25, 11.5, 13.5]
+    timings = UpstreamTimings()
+
+    for name in (
+        "connection.connect_tcp.started",
+        "connection.connect_tcp.complete",
+        "connection.start_tls.complete",
+        "http11.send_request_headers.started",
+        "http11.send_request_headers.complete",
+        "http11.receive_response_headers.started",
+        "http11.receive_response_headers.complete",
+        "http11.response_closed.started",
+    ):
+        await timings(name, {})
+
+    assert timings.phases == pytest.approx(
+        {
+            "pool_wait": 0.5,
+            "dial": 0.3,
+            "request_headers": 0.1,
+            "response_headers": 0.25,
+        }
+    )
+    assert timings.get_server_timing() == (
+        b"pool_wait;dur=500.000, dial;dur=300.000, "
+        b"request_headers;dur=100.000, response_headers;dur=250.000"
+    )
+
+
+@pytest.mark.asyncio
+async def test_upstream_timings_kept_alive_connection(mocker: MockerFixture):
+    mocked_time = mocker.patch("mrok.proxy.timing.time")
+    mocked_time.perf_counter.side_effect = [1.0, 1.002, 1.003, 1.004, 1.5, 1.5, 2.5]
+    timings = UpstreamTimings()
+
+    for name in (
+        "http11.send_request_headers.started",
+        "http11.send_request_headers.complete",
+        "http11.send_request_body.started",
+        "http11.send_request_body.complete",
+        "http11.receive_response_body.started",
+        "http11.receive_response_body.complete",
+    ):
+        await timings(name, {})
+
+    assert list(timings.phases) == ["pool_wait", "request_headers", "request_body", "response_body"]
+    assert timings.phases["pool_wait"] == pytest.approx(0.002)
+    assert timings.phases["request_body"] == pytest.approx(0.496)
+    assert timings.phases["response_body"] == pytest.approx(1)
+
+
+def test_upstream_timings_empty():
+    assert UpstreamTimings().get_server_timing() == b""
@@ -0,0 +1,259 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from mrok.constants import SCOPE_EXT_AUTH_TIME
+from mrok.proxy.timing import UpstreamTimings
+from mrok.proxy.tracing import (
+    SPAN_KIND_CLIENT,
+    SPAN_KIND_SERVER,
+    FileSpanExporter,
+    OTLPSpanExporter,
+    Span,
+    SpanExporter,
+    TraceParent,
+    Tracer,
+    TracingConfig,
+    create_exporter,
+    encode_spans,
+    parse_traceparent,
+)
+
+TRACE_ID = "0af7651916cd43dd8448eb211c80319c"
+PARENT_ID = "b7ad6b7169203331"
+
+
+class MemoryExporter(SpanExporter):
+    def __init__(self):
+        super().__init__("test")
+        self.batches: list[list[Span]] = []
+        self.exported = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+
+    def export(self, spans):
+        self.batches.append(list(spans))
+        self.loop.call_soon_threadsafe(self.exported.set)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (f"00-{TRACE_ID}-{PARENT_ID}-01", TraceParent(TRACE_ID, PARENT_ID, True)),
+        (f"00-{TRACE_ID}-{PARENT_ID}-00", TraceParent(TRACE_ID, PARENT_ID, False)),
+        (f" 00-{TRACE_ID}-{PARENT_ID}-03 ", TraceParent(TRACE_ID, PARENT_ID, True)),
+        (f"01-{TRACE_ID}-{PARENT_ID}-01-future", TraceParent(TRACE_ID, PARENT_ID, True)),
+        (f"00-{TRACE_ID}-{PARENT_ID}-01-future", None),
+        (f"ff-{TRACE_ID}-{PARENT_ID}-01", None),
+        (f"00-{'0' * 32}-{PARENT_ID}-01", None),
+        (f"00-{TRACE_ID}-{'0' * 16}-01", None),
+        (f"00-{TRACE_ID.upper()}-{PARENT_ID}-01", None),
+        ("garbage", None),
+    ],
+)
+def test_parse_traceparent(value: str, expected: TraceParent | None):
+    assert parse_traceparent(value.encode()) == expected
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "error"),
+    [
+        ({"sample_rate": 1.5}, "sample_rate must be between 0 and 1."),
+        ({"export_interval": 0}, "export_interval and max_queue_size must be positive."),
+        ({"max_queue_size": 0}, "export_interval and max_queue_size must be positive."),
+        ({"exporter": ""}, "exporter must be an OTLP endpoint or a file path."),
+    ],
+)
+def test_tracing_config_validation(kwargs: dict, error: str):
+    with pytest.raises(ValueError, match=error):
+        TracingConfig(**kwargs)
+
+
+def test_create_exporter(tmp_path: Path):
+    otlp = create_exporter(TracingConfig(service_name="frontend"))
+    assert isinstance(otlp, OTLPSpanExporter)
+    assert otlp.endpoint == "http://localhost:4318/v1/traces"
+    assert otlp.service_name == "frontend"
+
+    file = create_exporter(TracingConfig(exporter=str(tmp_path / "spans.jsonl")))
+    assert isinstance(file, FileSpanExporter)
+    assert file.path == tmp_path / "spans.jsonl"
+
+
+def test_encode_spans():
+    spans = [
+        Span("proxy", TRACE_ID, "a" * 16, None, 10, 20, SPAN_KIND_SERVER, {"status": 200}),
+        Span("upstream", TRACE_ID, "b" * 16, "a" * 16, 12, 18, SPAN_KIND_CLIENT, error="boom"),
+    ]
+
+    encoded = encode_spans(spans, "mrok-frontend")
+
+    resource_spans = encoded["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "mrok-frontend"}}
+    ]
+    proxy, upstream = resource_spans["scopeSpans"][0]["spans"]
+    assert proxy == {
+        "traceId": TRACE_ID,
+        "spanId": "a" * 16,
+        "name": "proxy",
+        "kind": SPAN_KIND_SERVER,
+        "startTimeUnixNano": "10",
+        "endTimeUnixNano": "20",
+        "attributes": [{"key": "status", "value": {"intValue": "200"}}],
+    }
+    assert upstream["parentSpanId"] == "a" * 16
+    assert upstream["status"] == {"code": 2, "message": "boom"}
+
+
+def test_file_exporter(tmp_path: Path):
+    path = tmp_path / "spans.jsonl"
+    exporter = FileSpanExporter("mrok", path)
+    span = Span("proxy", TRACE_ID, PARENT_ID, None, 10, 20)
+
+    exporter.export([span])
+    exporter.export([span, span])
+
+    lines = path.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        encode_spans([span], "mrok"),
+        encode_spans([span, span], "mrok"),
+    ]
+
+
+def test_otlp_exporter(mocker: MockerFixture):
+    mocked_urlopen = mocker.patch("mrok.proxy.tracing.urllib.request.urlopen")
+    exporter = OTLPSpanExporter("mrok", "http://localhost:4318/v1/traces")
+    span = Span("proxy", TRACE_ID, PARENT_ID, None, 10, 20)
+
+    exporter.export([span])
+
+    request = mocked_urlopen.call_args.args[0]
+    assert request.full_url == "http://localhost:4318/v1/traces"
+    assert request.get_method() == "POST"
+    assert request.get_header("Content-type") == "application/json"
+    assert json.loads(request.data) == encode_spans([span], "mrok")
+
+
+@pytest.mark.parametrize(
+    ("headers", "random_value", "sampled"),
+    [
+        ([(b"traceparent", f"00-{TRACE_ID}-{PARENT_ID}-01".encode())], 0.99, True),
+        ([(b"traceparent", f"00-{TRACE_ID}-{PARENT_ID}-00".encode())], 0.0, False),
+        ([(b"traceparent", b"invalid")], 0.2, True),
+        ([], 0.2, True),
+        ([], 0.5, False),
+    ],
+)
+def test_tracer_start_trace(
+    mocker: MockerFixture,
+    tmp_path: Path,
+    headers: list[tuple[bytes, bytes]],
+    random_value: float,
+    sampled: bool,
+):
+    mocker.patch("mrok.proxy.tracing.random.random", return_value=random_value)
+    tracer = Tracer(TracingConfig(sample_rate=0.5, exporter=str(tmp_path / "spans.jsonl")))
+
+    trace = tracer.start_trace({"type": "http", "headers": headers})
+
+    assert (trace is not None) is sampled
+    if trace is not None and headers and headers[0][1] != b"invalid":
+        assert trace.trace_id == TRACE_ID
+        assert trace.parent_id == PARENT_ID
+
+
+def test_trace_spans(mocker: MockerFixture):
+    mocked_time = mocker.patch("mrok.proxy.tracing.time")
+    mocked_time.time_ns.return_value = 1_000_000_000_000
+    mocked_time.perf_counter.side_effect = [10.0, 10.5, 12.0, 13.0]
+    tracer = Tracer(TracingConfig(sample_rate=1), exporter=mocker.MagicMock())
+    mocked_submit = mocker.patch.object(tracer, "submit")
+    trace = tracer.start_trace({"type": "http"})
+    assert trace is not None
+    timings = UpstreamTimings()
+    timings.started["dial"] = 10.6
+    timings.phases["dial"] = 0.4
+
+    headers = [(b"Traceparent", b"stale"), (b"accept", b"*/*")]
+    trace.inject(headers)
+    trace.upstream_started("http://upstream/items", timings)
+    trace.upstream_finished(200)
+    trace.finish(
+        {"method": "GET", "path": "/items", "extensions": {SCOPE_EXT_AUTH_TIME: (9.5, 9.75)}},
+        200,
+    )
+
+    assert headers == [
+        (b"accept", b"*/*"),
+        (b"traceparent", f"00-{trace.trace_id}-{trace.upstream_span_id}-01".encode()),
+    ]
+    spans = {span.name: span for span in mocked_submit.call_args.args[0]}
+    assert list(spans) == ["auth", "upstream", "dial", "streaming", "proxy"]
+    assert all(span.trace_id == trace.trace_id for span in spans.values())
+    assert spans["proxy"].parent_id is None
+    assert spans["dial"].parent_id == trace.upstream_span_id
+    assert spans["upstream"].kind == SPAN_KIND_CLIENT
+    assert {name: (span.start_ns, span.end_ns) for name, span in spans.items()} == {
+        "auth": (999_500_000_000, 999_750_000_000),
+        "upstream": (1_000_500_000_000, 1_002_000_000_000),
+        "dial": (1_000_600_000_000, 1_001_000_000_000),
+        "streaming": (1_002_000_000_000, 1_003_000_000_000),
+        "proxy": (999_500_000_000, 1_003_000_000_000),
+    }
+
+
+@pytest.mark.asyncio
+async def test_tracer_exports_in_batches():
+    exporter = MemoryExporter()
+    tracer = Tracer(TracingConfig(export_interval=0.01, max_queue_size=3), exporter=exporter)
+    span = Span("proxy", TRACE_ID, PARENT_ID, None, 10, 20)
+
+    tracer.submit([span, span])
+    tracer.submit([span, span])
+    tracer.submit([span])
+
+    await asyncio.wait_for(exporter.exported.wait(), timeout=1)
+    assert exporter.batches == [[span, span, span]]
+    assert tracer.dropped == 2
+    tracer.flush()
+    await asyncio.sleep(0.01)
+    assert len(exporter.batches) == 1
+
+
+@pytest.mark.asyncio
+async def test_tracer_close():
+    exporter = MemoryExporter()
+    tracer = Tracer(TracingConfig(export_interval=60), exporter=exporter)
+    span = Span("proxy", TRACE_ID, PARENT_ID, None, 10, 20)
+    tracer.submit([span])
+
+    await tracer.close()
+
+    assert exporter.batches == [[span]]
+    assert tracer._export_handle is None
+    assert tracer._exports == set()
+
+
+@pytest.mark.asyncio
+async def test_tracer_close_nothing_queued():
+    exporter = MemoryExporter()
+    tracer = Tracer(TracingConfig(), exporter=exporter)
+
+    await tracer.close()
+
+    assert exporter.batches == []
+
+
+def test_tracer_export_error(mocker: MockerFixture):
+    exporter = mocker.MagicMock()
+    exporter.export.side_effect = OSError("connection refused")
+    mocked_logger = mocker.patch("mrok.proxy.tracing.logger")
+    tracer = Tracer(TracingConfig(), exporter=exporter)
+    span = Span("proxy", TRACE_ID, PARENT_ID, None, 10, 20)
+
+    tracer._export([span])
+
+    mocked_logger.error.assert_called_once_with("Cannot export 1 spans: connection refused")
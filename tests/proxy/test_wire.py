@@ -0,0 +1,93 @@
+import pytest
+
+from mrok.proxy.models import (
+    Event,
+    HTTPHeaders,
+    HTTPRequest,
+    HTTPResponse,
+    WorkerRestart,
+)
+from mrok.proxy.wire import HEADER, WIRE_VERSION, decode_event, encode_event
+
+
+def response_event(request_body: bytes | None, response_body: bytes | None) -> Event:
+    return Event(
+        type="response",
+        data=HTTPResponse(
+            request=HTTPRequest(
+                method="POST",
+                url="/foo",
+                headers=HTTPHeaders({"content-type": "application/json"}),
+                query_string=b"a=1",
+                start_time=1.5,
+                body=request_body,
+                body_truncated=False if request_body is not None else None,
+            ),
+            status=201,
+            headers=HTTPHeaders({"content-type": "text/plain"}),
+            duration=0.25,
+            body=response_body,
+            body_truncated=True if response_body is not None else None,
+        ),
+    )
+
+
+@pytest.mark.parametrize(
+    ("request_body", "response_body", "body_frames"),
+    [
+        (b'{"my": "json"}', b"\x00\xffbinary", [b'{"my": "json"}', b"\x00\xffbinary"]),
+        (None, b"OK", [b"OK"]),
+        (b"data", None, [b"data"]),
+        (None, None, []),
+    ],
+)
+def test_encode_decode_response(
+    request_body: bytes | None,
+    response_body: bytes | None,
+    body_frames: list[bytes],
+):
+    event = response_event(request_body, response_body)
+
+    frames = encode_event(event)
+
+    assert frames[0] == b"response"
+    assert frames[1][0] == WIRE_VERSION
+    assert b'"body"' not in frames[1][HEADER.size :]
+    assert frames[2:] == body_frames
+    assert decode_event(frames) == event
+
+
+def test_encode_decode_worker_restart():
+    event = Event(
+        type="worker_restart",
+        data=WorkerRestart(
+            worker_id="w1",
+            pid=1,
+            exit_code=1,
+            new_pid=2,
+            crashes=1,
+            restarts=1,
+            backoff=0.5,
+        ),
+    )
+
+    frames = encode_event(event)
+
+    assert frames[0] == b"worker_restart"
+    assert len(frames) == 2
+    assert decode_event(frames) == event
+
+
+@pytest.mark.parametrize(
+    ("frames", "error"),
+    [
+        ([b"status"], "Malformed event message."),
+        ([b"status", b"\x01"], "Malformed event message."),
+        ([b"status", b"\x02\x00{}"], "Unsupported events wire format version: 2."),
+        ([b"response", b"\x01\x03{}", b"data"], "Malformed event message."),
+    ],
+)
+def test_decode_invalid_message(frames: list[bytes], error: str):
+    with pytest.raises(ValueError) as cv:
+        decode_event(frames)
+    assert str(cv.value) == error
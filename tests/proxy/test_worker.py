@@ -1,9 +1,10 @@
 from pytest_mock import MockerFixture
 
 from mrok.proxy.asgi import ASGIAppWrapper
+from mrok.proxy.capture import CaptureConfig
 from mrok.proxy.middleware import CaptureMiddleware, MetricsMiddleware
 from mrok.proxy.worker import Worker
-from tests.types import SettingsFactory
+from tests.types import ProxyAppFactory, SettingsFactory
 
 
 def test_setup_app(
@@ -11,10 +12,12 @@ def test_setup_app(
     ziti_identity_file: str,
 ):
     m_app = mocker.AsyncMock()
+    capture_config = CaptureConfig(headers_only=True)
     worker = Worker(
         "my-worker-id",
         m_app,
         ziti_identity_file,
+        events_capture=capture_config,
     )
     app = worker.setup_app()
     assert isinstance(app, ASGIAppWrapper)
@@ -23,7 +26,11 @@ def test_setup_app(
     assert app.middleware[0].cls == MetricsMiddleware
     assert app.middleware[0].args[0] == worker._event_publisher._metrics_collector
     assert app.middleware[1].cls == CaptureMiddleware
-    assert app.middleware[1].args[0] == worker._event_publisher.publish_response_event
+    assert app.middleware[1].args[0] == worker._event_publisher.enqueue_response_event
+    assert app.middleware[1].kwargs == {
+        "config": capture_config,
+        "is_active": worker._event_publisher.has_response_subscribers,
+    }
 
 
 def test_setup_app_events_disabled(
@@ -49,6 +56,23 @@ def test_setup_app_events_disabled(
     assert app.middleware == []
 
 
+def test_setup_app_proxy_app_lifespan(
+    mocker: MockerFixture,
+    ziti_identity_file: str,
+    proxy_app_factory: ProxyAppFactory,
+):
+    proxy_app = proxy_app_factory()
+    mocked_lifespan = mocker.patch.object(proxy_app, "lifespan")
+    worker = Worker(
+        "my-worker-id",
+        proxy_app,
+        ziti_identity_file,
+        events_enabled=False,
+    )
+    app = worker.setup_app()
+    assert app.lifespan is mocked_lifespan
+
+
 def test_run(
     mocker: MockerFixture,
     ziti_identity_file: str,
@@ -65,16 +89,23 @@ def test_run(
     m_server_ctor = mocker.patch("mrok.proxy.worker.Server", return_value=m_server)
     m_app = mocker.MagicMock()
     mocker.patch.object(Worker, "setup_app", return_value=m_app)
+    m_ready_conn = mocker.MagicMock()
+    m_drained_event = mocker.MagicMock()
 
     worker = Worker(
         "my-worker-id",
         m_app,
         ziti_identity_file,
         ziti_load_timeout_ms=5000,
+        ziti_binds=1,
+        ziti_contexts=1,
         server_backlog=2048,
         server_timeout_keep_alive=5,
         server_limit_concurrency=None,
         server_limit_max_requests=None,
+        server_drain_timeout=20,
+        ready_conn=m_ready_conn,
+        drained_event=m_drained_event,
     )
     worker.run()
 
@@ -87,6 +118,11 @@ def test_run(
         timeout_keep_alive=5,
         limit_concurrency=None,
         limit_max_requests=None,
+        drain_timeout=20,
+        ziti_binds=1,
+        ziti_contexts=1,
+    )
+    m_server_ctor.assert_called_once_with(
+        m_mrokconfig, ready_conn=m_ready_conn, drained_event=m_drained_event
     )
-    m_server_ctor.assert_called_once_with(m_mrokconfig)
     m_server.run.assert_called_once()
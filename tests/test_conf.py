@@ -0,0 +1,110 @@
+import copy
+import pickle
+
+import pytest
+from pytest_mock import MockerFixture
+
+from mrok import conf
+from mrok.conf import FrozenConfig, SettingsSnapshot
+from tests.types import SettingsFactory
+
+
+def test_frozen_config():
+    config = FrozenConfig({"audience": "mrok", "oidc": {"claims": ["sub", "email"]}})
+
+    assert config.audience == "mrok"
+    assert config["audience"] == "mrok"
+    assert config.get("missing") is None
+    assert config.oidc.claims == ("sub", "email")
+    assert dict(config) == {"audience": "mrok", "oidc": config.oidc}
+
+    with pytest.raises(AttributeError):
+        config.audience = "other"
+    with pytest.raises(AttributeError):
+        del config.audience
+    with pytest.raises(AttributeError):
+        config.missing  # noqa: B018
+
+
+def test_frozen_config_keys_named_as_methods():
+    config = FrozenConfig({"items": [1, 2], "get": "value", "keys": {"a": 1}})
+
+    assert config["items"] == (1, 2)
+    assert config["get"] == "value"
+    assert config["keys"].a == 1
+    assert config.get("get") == "value"
+    assert dict(config) == {"items": (1, 2), "get": "value", "keys": config["keys"]}
+    assert list(config.values()) == [(1, 2), "value", config["keys"]]
+
+
+def test_frozen_config_case_insensitive():
+    config = FrozenConfig({"BACKENDS": ["oidc"], "OIDC": {"AUDIENCE": "aud"}})
+
+    assert dict(config) == {"backends": ("oidc",), "oidc": config.oidc}
+    assert config.oidc.audience == "aud"
+    assert config["OIDC"].AUDIENCE == "aud"
+    assert config.get("backends") == ("oidc",)
+    assert "Backends" in config
+
+
+def test_frozen_config_pickle():
+    config = FrozenConfig({"audience": "mrok", "oidc": {"claims": ["sub"]}})
+
+    assert pickle.loads(pickle.dumps(config)) == config
+    assert copy.deepcopy(config).oidc.claims == ("sub",)
+
+
+@pytest.mark.parametrize("domain", ["exts.s1.today", ".exts.s1.today"])
+def test_settings_snapshot(settings_factory: SettingsFactory, domain: str):
+    settings = settings_factory(
+        frontend={
+            "domain": domain,
+            "auth": {"enabled": True, "backends": ["jwt"], "jwt": {"audience": "mrok"}},
+            "errors": {"502": {"html": "/errors/502.html"}},
+        },
+    )
+
+    snapshot = SettingsSnapshot.from_settings(settings)
+
+    assert snapshot.frontend.domain == ".exts.s1.today"
+    assert snapshot.frontend.auth_enabled is True
+    assert snapshot.frontend.auth.jwt.audience == "mrok"
+    assert snapshot.frontend.errors["502"].html == "/errors/502.html"
+    assert dict(snapshot.frontend.headers) == {}
+    assert snapshot.controller_auth.backends == ("oidc",)
+    assert snapshot.extension_regex.fullmatch("ext-1234-5678")
+    assert snapshot.instance_regex.fullmatch("INS-1234-5678-0001")
+    assert not snapshot.extension_regex.fullmatch("ins-1234-5678-0001")
+
+
+def test_settings_snapshot_get_and_set(mocker: MockerFixture, settings_factory: SettingsFactory):
+    mocker.patch.object(conf, "_snapshot", None)
+    mocker.patch("mrok.conf.get_settings", return_value=settings_factory())
+
+    snapshot = conf.get_settings_snapshot()
+    assert conf.get_settings_snapshot() is snapshot
+    assert snapshot.frontend.domain == ".exts.s1.today"
+    assert snapshot.frontend.auth_enabled is False
+
+    new_snapshot = SettingsSnapshot.from_settings(
+        settings_factory(frontend={"domain": "other.domain"})
+    )
+    conf.set_settings_snapshot(new_snapshot)
+    assert conf.get_settings_snapshot() is new_snapshot
+
+
+def test_settings_snapshot_from_env_vars(mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch):
+    mocker.patch("mrok.conf.SETTINGS_FILES", [])
+    monkeypatch.setenv("MROK_CONTROLLER__AUTH__BACKENDS", '["oidc"]')
+    monkeypatch.setenv("MROK_CONTROLLER__AUTH__OIDC__AUDIENCE", "aud")
+    monkeypatch.setenv("MROK_FRONTEND__AUTH__ENABLED", "true")
+    monkeypatch.setenv("MROK_FRONTEND__AUTH__BACKENDS", '["jwt"]')
+    monkeypatch.setenv("MROK_FRONTEND__ERRORS__502__HTML", "/errors/502.html")
+
+    snapshot = SettingsSnapshot.from_settings(conf.load_settings())
+
+    assert snapshot.controller_auth.backends == ("oidc",)
+    assert snapshot.controller_auth.oidc.audience == "aud"
+    assert snapshot.frontend.auth_enabled is True
+    assert snapshot.frontend.auth.get("backends") == ("jwt",)
+    assert snapshot.frontend.errors["502"].html == "/errors/502.html"
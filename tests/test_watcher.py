@@ -0,0 +1,157 @@
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from mrok.authentication import HTTPAuthManager
+from mrok.conf import SettingsSnapshot
+from mrok.watcher import SettingsWatcher
+from tests.types import SettingsFactory
+
+
+@pytest.mark.asyncio
+async def test_reload(mocker: MockerFixture, settings_factory: SettingsFactory):
+    settings = settings_factory()
+    mocker.patch("mrok.watcher.load_settings", return_value=settings)
+    m_set_settings = mocker.patch("mrok.watcher.set_settings")
+    applied: list[SettingsSnapshot] = []
+
+    def listener(snapshot: SettingsSnapshot):
+        assert not m_set_settings.called
+        assert threading.current_thread() is not threading.main_thread()
+
+        def apply():
+            assert threading.current_thread() is threading.main_thread()
+            applied.append(snapshot)
+
+        return apply
+
+    watcher = SettingsWatcher()
+    watcher.add_listener(listener)
+
+    assert await watcher.reload() is True
+    snapshot = m_set_settings.call_args.args[1]
+    m_set_settings.assert_called_once_with(settings, snapshot)
+    assert applied == [snapshot]
+
+
+@pytest.mark.asyncio
+async def test_reload_rejected_by_listener(
+    mocker: MockerFixture, settings_factory: SettingsFactory
+):
+    mocker.patch("mrok.watcher.load_settings", return_value=settings_factory())
+    m_set_settings = mocker.patch("mrok.watcher.set_settings")
+    m_apply = mocker.MagicMock()
+
+    def invalid(snapshot: SettingsSnapshot):
+        raise ValueError("Backend 'unknown' is not registered.")
+
+    watcher = SettingsWatcher()
+    watcher.add_listener(lambda snapshot: m_apply)
+    watcher.add_listener(invalid)
+
+    assert await watcher.reload() is False
+    m_set_settings.assert_not_called()
+    m_apply.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reload_invalid_settings(mocker: MockerFixture):
+    settings = mocker.MagicMock()
+    settings.get.side_effect = lambda key, default=None: (
+        {"extension": {"regex": "EXT-(\\d{4}"}} if key == "identifiers" else {}
+    )
+    mocker.patch("mrok.watcher.load_settings", return_value=settings)
+    m_set_settings = mocker.patch("mrok.watcher.set_settings")
+
+    assert await SettingsWatcher().reload() is False
+    m_set_settings.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reload_env_vars_keeps_auth_backends(
+    mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch
+):
+    backend_cls = mocker.MagicMock()
+    mocker.patch("mrok.authentication.manager.get_authentication_backend", return_value=backend_cls)
+    mocker.patch("mrok.conf.SETTINGS_FILES", [])
+    mocker.patch("mrok.watcher.set_settings")
+    monkeypatch.setenv("MROK_CONTROLLER__AUTH__BACKENDS", '["oidc"]')
+    monkeypatch.setenv("MROK_CONTROLLER__AUTH__OIDC__AUDIENCE", "aud")
+    manager = HTTPAuthManager({"backends": ["oidc"], "oidc": {"audience": "mrok"}})
+    watcher = SettingsWatcher()
+    watcher.add_listener(lambda snapshot: manager.prepare_reload(snapshot.controller_auth))
+
+    assert await watcher.reload() is True
+    backend_cls.assert_called_with({"audience": "aud"})
+    assert manager.active_backends == [backend_cls.return_value]
+
+    monkeypatch.delenv("MROK_CONTROLLER__AUTH__BACKENDS")
+    assert await watcher.reload() is False
+    assert manager.active_backends == [backend_cls.return_value]
+
+
+def test_get_watched_paths(mocker: MockerFixture, settings_factory: SettingsFactory):
+    settings = settings_factory(
+        frontend={
+            "domain": "exts.s1.today",
+            "errors": {"502": {"html": "/errors/502.html", "json": "/errors/502.json"}},
+        },
+    )
+    mocker.patch(
+        "mrok.watcher.get_settings_snapshot",
+        return_value=SettingsSnapshot.from_settings(settings),
+    )
+
+    assert SettingsWatcher().get_watched_paths() == {
+        Path("settings.yaml").resolve(),
+        Path(".secrets.yaml").resolve(),
+        Path("/errors/502.html"),
+        Path("/errors/502.json"),
+    }
+
+
+@pytest.mark.asyncio
+async def test_run_reloads_on_changes(mocker: MockerFixture, tmp_path: Path):
+    settings_file = tmp_path / "settings.yaml"
+    settings_file.touch()
+    mocker.patch("mrok.watcher.SETTINGS_FILES", [str(settings_file)])
+    mocker.patch(
+        "mrok.watcher.get_settings_snapshot",
+        return_value=mocker.MagicMock(frontend=mocker.MagicMock(errors={})),
+    )
+
+    async def awatch(*paths, watch_filter, **kwargs):
+        await asyncio.sleep(0)
+        assert paths == (tmp_path,)
+        assert kwargs["recursive"] is False
+        assert watch_filter(None, str(settings_file))
+        assert not watch_filter(None, str(tmp_path / "other.yaml"))
+        yield {(None, str(settings_file))}
+        yield {(None, str(settings_file))}
+
+    mocker.patch("mrok.watcher.awatch", side_effect=awatch)
+
+    watcher = SettingsWatcher()
+    m_reload = mocker.patch.object(watcher, "reload", side_effect=[True, asyncio.CancelledError])
+
+    with pytest.raises(asyncio.CancelledError):
+        await watcher.run()
+    assert m_reload.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_lifespan_stops_watching(mocker: MockerFixture):
+    started = asyncio.Event()
+
+    async def run():
+        started.set()
+        await asyncio.sleep(60)
+
+    watcher = SettingsWatcher()
+    mocker.patch.object(watcher, "run", side_effect=run)
+
+    async with watcher.lifespan(None):
+        await started.wait()
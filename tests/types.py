@@ -3,10 +3,12 @@ from pathlib import PurePath
 from typing import Any, Protocol
 
 import zmq
+from httpcore import Request
 from textual.app import App
 from textual.pilot import Pilot
 
 from mrok.conf import Settings
+from mrok.proxy.app import ProxyAppBase
 from mrok.types.proxy import ASGIReceive, ASGISend, Message
 
 ZMQPublisher = tuple[zmq.Socket, int]
@@ -31,6 +33,14 @@ class ReceiveFactory(Protocol):
 
 SendFactory = Callable[[list[Message]], ASGISend]
 
+UpstreamHandler = Callable[[Request], Awaitable[Any]]
+
+
+class ProxyAppFactory(Protocol):
+    def __call__(
+        self, handler: UpstreamHandler | None = None, /, **kwargs: Any
+    ) -> ProxyAppBase: ...
+
 
 class StatusEventFactory(Protocol):
     def __call__(